@@ -10,14 +10,37 @@ This package provides modular components for:
 __version__ = "1.0.0"
 
 from .config import AnalyzerConfig, load_config
-from .data_loader import load_exchange_symbol_data
-from .analysis import analyze_pair_fast
+from .data_loader import load_exchange_symbol_data, load_exchange_symbol_trades
+from .analysis import analyze_pair_fast, sweep_pair
 from .discovery import discover_data
+from .catalog import PartitionCatalog
+from .series_cache import SeriesCache
+from .alignment import SymbolTimeline
+from .partials import PairPartial
+from .streaming import analyze_symbol_streaming
+from .results_cache import ResultsCache
+from .live import LiveAnalyzer
+from .mean_reversion import mean_reversion_stats
+from .backtest import CostModel, backtest_joined
+from .lead_lag import lead_lag_stats
 
 __all__ = [
     'AnalyzerConfig',
     'load_config',
     'load_exchange_symbol_data',
+    'load_exchange_symbol_trades',
     'analyze_pair_fast',
-    'discover_data'
+    'sweep_pair',
+    'discover_data',
+    'PartitionCatalog',
+    'SeriesCache',
+    'SymbolTimeline',
+    'PairPartial',
+    'analyze_symbol_streaming',
+    'ResultsCache',
+    'LiveAnalyzer',
+    'mean_reversion_stats',
+    'CostModel',
+    'backtest_joined',
+    'lead_lag_stats'
 ]
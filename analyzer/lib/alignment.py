@@ -0,0 +1,108 @@
+"""
+Symbol-wide alignment of all exchanges on one timeline.
+
+analyze_pair_fast synchronizes a pair with join_asof, so a symbol listed on
+N exchanges costs N·(N−1)/2 joins over the same frames. SymbolTimeline
+aligns all exchanges once: their (already sorted) timestamps are merged into
+a single timeline and, per exchange, the as-of row (last quote at or before
+each timestamp) is computed in one pass. A pair view is then a gather of
+the second exchange's bid/ask at the first exchange's rows - no join.
+
+Pair views are identical to pair_deviation's join_asof (backward, last quote
+at or before the timestamp, including quotes with the same timestamp) for
+null-free input, which is what the loaders return.
+"""
+
+from datetime import timedelta
+from typing import Dict, List, Optional
+import numpy as np
+import polars as pl
+
+from .analysis import with_deviation
+
+
+class SymbolTimeline:
+    """
+    One symbol's quotes of all exchanges aligned on a unified timeline.
+
+    Holds, per exchange, the timeline group of each of its rows and the
+    as-of row of that exchange at every timeline group; bid/ask stay in the
+    original frames.
+    """
+
+    def __init__(self, exchange_data: Dict[str, pl.DataFrame]):
+        """
+        Align exchanges with one merge of the sorted timestamps.
+
+        Args:
+            exchange_data: Exchange name -> DataFrame (timestamp, bestBid, bestAsk),
+                sorted by timestamp
+        """
+        self.exchanges: List[str] = sorted(exchange_data)
+        self._data = {exchange: exchange_data[exchange] for exchange in self.exchanges}
+        self._groups: Dict[str, np.ndarray] = {}
+        self._asof: Dict[str, np.ndarray] = {}
+        if not self.exchanges:
+            return
+
+        timestamps = [self._data[exchange]['timestamp'].to_physical().to_numpy() for exchange in self.exchanges]
+        sizes = np.array([len(ts) for ts in timestamps])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        # Stable sort (timsort) of concatenated sorted runs is a k-way merge
+        all_timestamps = np.concatenate(timestamps)
+        order = np.argsort(all_timestamps, kind='stable')
+        sources = np.repeat(np.arange(len(self.exchanges)), sizes)[order]
+        rows = order - offsets[sources]
+
+        # Rows sharing a timestamp form one group: quotes at the same instant
+        # see each other (join_asof backward matches keys <= timestamp)
+        sorted_timestamps = all_timestamps[order]
+        is_group_end = np.ones(len(sorted_timestamps), dtype=bool)
+        np.not_equal(sorted_timestamps[1:], sorted_timestamps[:-1], out=is_group_end[:-1])
+        group_ends = np.flatnonzero(is_group_end)
+        group = np.empty(len(sorted_timestamps), dtype=np.int64)
+        group[0] = 0
+        np.cumsum(is_group_end[:-1], out=group[1:])
+
+        for i, exchange in enumerate(self.exchanges):
+            is_own = sources == i
+            # Row indices of an exchange increase along the timeline, so a
+            # running max is its as-of row (-1 before its first quote)
+            last_row = np.maximum.accumulate(np.where(is_own, rows, -1))
+            self._asof[exchange] = last_row[group_ends]
+            self._groups[exchange] = group[is_own]
+
+    def pair(self, ex1: str, ex2: str, max_quote_age: Optional[timedelta] = None) -> Optional[pl.DataFrame]:
+        """
+        Synchronized pair frame, equivalent to pair_deviation(data[ex1], data[ex2], max_quote_age).
+
+        Returns:
+            DataFrame with timestamp, bid/ask of both exchanges, ratio and
+            deviation, or None if either exchange has no data
+        """
+        if ex1 not in self._data or ex2 not in self._data or self._data[ex1].is_empty():
+            return None
+
+        asof_rows = self._asof[ex2][self._groups[ex1]]
+        # As-of rows never decrease, so rows without a prior ex2 quote are a prefix
+        n_missing = int(np.searchsorted(asof_rows, 0))
+        indices = pl.Series(asof_rows[n_missing:], dtype=pl.UInt32)
+
+        data1 = self._data[ex1]
+        data2 = self._data[ex2]
+        columns = [('bestBid', 'bid_ex2'), ('bestAsk', 'ask_ex2')]
+        if max_quote_age is not None:
+            columns.append(('timestamp', 'timestamp_ex2'))
+        joined = data1.select([
+            pl.col('timestamp'),
+            pl.col('bestBid').alias('bid_ex1'),
+            pl.col('bestAsk').alias('ask_ex1')
+        ]).with_columns([
+            pl.concat([
+                pl.Series([None] * n_missing, dtype=data2[column].dtype),
+                data2[column].gather(indices)
+            ]).alias(name)
+            for column, name in columns
+        ])
+        return with_deviation(joined, max_quote_age)
@@ -4,8 +4,81 @@ Core analysis functions for arbitrage opportunity detection.
 Implements mean-reversion analysis for price ratio deviations between exchanges.
 """
 
+import numpy as np
 import polars as pl
-from typing import Optional, Dict, Any, List
+from datetime import timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from .mean_reversion import mean_reversion_stats
+
+
+# Profitability thresholds in % of every engine unless a run sets its own
+DEFAULT_THRESHOLDS = [0.3, 0.5, 0.4]
+
+
+def threshold_labels(thresholds: List[float], labels: Optional[List[str]] = None) -> List[str]:
+    """
+    Column suffix per threshold of the metrics.
+
+    Derived from the values unless given: 0.4% -> '040bp', 0.125% -> '012_5bp'.
+
+    Raises:
+        ValueError: If there isn't exactly one label per threshold, or two thresholds share a label
+    """
+    if labels is None:
+        labels = []
+        for threshold in thresholds:
+            bp = round(threshold * 100, 2)
+            labels.append(f"{int(bp):03d}bp" if bp == int(bp) else f"{bp:06.2f}".rstrip('0').replace('.', '_') + 'bp')
+    if len(labels) != len(thresholds) or len(set(labels)) != len(labels):
+        raise ValueError(f"Need one distinct label per threshold, got {labels} for {thresholds}")
+    return list(labels)
+
+
+def _as_bool_array(values) -> np.ndarray:
+    """Convert a Polars Series / array-like of bool to a NumPy bool array (nulls = False)."""
+    if isinstance(values, pl.Series):
+        values = values.fill_null(False).to_numpy()
+    return np.asarray(values, dtype=bool)
+
+
+def find_complete_cycles(above, in_neutral) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Vectorized cycle detection for one or more thresholds in one call.
+
+    Same state machine as the original per-row loop: a row above threshold
+    arms the cycle, the first neutral row after that completes it (a row
+    that is above threshold is never treated as neutral). Instead of
+    iterating rows, only "event" rows (above or neutral) are kept; a cycle
+    ends at every neutral event whose previous event was above, and starts at
+    the first above event after the previous completion.
+
+    Args:
+        above: Bool array of shape (n,) or (k, n) - one row per threshold
+        in_neutral: Bool array of shape (n,), shared by all thresholds
+
+    Returns:
+        One (starts, ends) pair of row-index arrays per threshold. starts[i]
+        is the first row above threshold of cycle i, ends[i] the row where it
+        returned to neutral. A trailing open cycle is not included.
+    """
+    above = np.atleast_2d(_as_bool_array(above))
+    neutral = _as_bool_array(in_neutral)
+
+    results = []
+    for above_k in above:
+        events = np.flatnonzero(above_k | neutral)
+        is_above = above_k[events]
+        prev_above = np.empty_like(is_above)
+        if len(is_above):
+            prev_above[0] = False
+            prev_above[1:] = is_above[:-1]
+
+        ends = events[~is_above & prev_above]
+        starts = events[is_above & ~prev_above][:len(ends)]
+        results.append((starts, ends))
+
+    return results
 
 
 def count_complete_cycles(above_threshold_series, in_neutral_series) -> int:
@@ -25,21 +98,318 @@ def count_complete_cycles(above_threshold_series, in_neutral_series) -> int:
     Returns:
         Number of complete cycles
     """
-    above = above_threshold_series.to_numpy()
-    neutral = in_neutral_series.to_numpy()
+    _, ends = find_complete_cycles(above_threshold_series, in_neutral_series)[0]
+    return len(ends)
+
+
+# Executable arbitrage directions as signed edges in % (> 0 = profitable before fees):
+# bid1_ask2 = sell on ex1 at its bid, buy on ex2 at its ask; bid2_ask1 = the reverse
+DIRECTION_EDGES = {
+    'bid1_ask2': (pl.col('bid_ex1') / pl.col('ask_ex2') - 1.0) * 100,
+    'bid2_ask1': (pl.col('bid_ex2') / pl.col('ask_ex1') - 1.0) * 100,
+}
+
+# Mid/mid deviation in %, reported next to the bid/bid deviation as a reference
+MID_DEVIATION = (
+    (pl.col('bid_ex1') + pl.col('ask_ex1')) / (pl.col('bid_ex2') + pl.col('ask_ex2')) - 1.0
+) * 100
+
+
+# Series with cycle and time-above metrics: |bid deviation|, the executable
+# edges and |mid deviation| (the bid/bid metrics' names carry no series prefix)
+PAIR_SERIES = {
+    'deviation': pl.col('deviation').abs(),
+    **DIRECTION_EDGES,
+    'mid': MID_DEVIATION.abs(),
+}
+
+
+def pair_aggregate_exprs(
+    thresholds: List[float],
+    zero_threshold: float
+) -> Tuple[List[pl.Expr], Dict[str, Tuple[List[pl.Expr], pl.Expr]]]:
+    """
+    Expressions every engine reduces a synchronized pair with.
+
+    For an executable direction a row is above when its edge > threshold and
+    neutral when the edge < zero_threshold (the edge is gone, the position
+    can be unwound). The mid reference uses |deviation| like the bid/bid
+    metrics.
+
+    Args:
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        (aggregates, flags): one-row aggregates that pair_aggregate_values
+        reads, and per series of PAIR_SERIES its above flag per threshold
+        and its neutral flag (nulls = False) for cycle counting
+    """
+    deviation = pl.col('deviation')
+    # FIXED: Use multiplication to detect true sign flips (+1 to -1 or vice versa)
+    # This prevents counting transitions through exactly 0.0 as two separate events
+    deviation_sign = deviation.sign()
+
+    flags = {}
+    aggregates = [
+        pl.len().alias('rows'),
+        deviation.count().alias('valid'),
+        deviation.sum().alias('deviation_sum'),
+        deviation.min().alias('deviation_min'),
+        deviation.max().alias('deviation_max'),
+        deviation.drop_nulls().last().alias('last_deviation'),
+        (deviation_sign * deviation_sign.shift(1) < 0).sum().alias('zero_crossings'),
+        (pl.col('timestamp').max() - pl.col('timestamp').min()).dt.total_microseconds().alias('duration_us'),
+        *(edge.max().alias(f'max_edge_{name}') for name, edge in DIRECTION_EDGES.items()),
+        MID_DEVIATION.min().alias('mid_min'),
+        MID_DEVIATION.max().alias('mid_max'),
+    ]
+    for name, expr in PAIR_SERIES.items():
+        aggregates.append(expr.count().alias(f'valid_{name}'))
+        above = []
+        for k, threshold in enumerate(thresholds):
+            aggregates.append((expr > threshold).sum().alias(f'n_above_{name}_{k}'))
+            above.append((expr > threshold).fill_null(False).alias(f'above_{name}_{k}'))
+        flags[name] = (above, (expr < zero_threshold).fill_null(False).alias(f'neutral_{name}'))
+    return aggregates, flags
+
+
+def pair_aggregate_values(row: Dict[str, Any], thresholds: List[float]) -> Dict[str, Any]:
+    """
+    Raw aggregates (without cycles) from a collected pair_aggregate_exprs row.
+
+    Returns:
+        Dict with assemble_metrics' keys except cycles and the stale aggregates
+    """
+    return {
+        'rows': row['rows'],
+        'valid': row['valid'],
+        'deviation_sum': float(row['deviation_sum'] or 0.0),
+        'deviation_min': row['deviation_min'],
+        'deviation_max': row['deviation_max'],
+        'last_deviation': row['last_deviation'],
+        'zero_crossings': int(row['zero_crossings']),
+        'duration_sec': (row['duration_us'] or 0) / 10**6,
+        'max_edge': {name: row[f'max_edge_{name}'] for name in DIRECTION_EDGES},
+        'mid_min': row['mid_min'],
+        'mid_max': row['mid_max'],
+        'series_valid': {name: row[f'valid_{name}'] for name in PAIR_SERIES},
+        'above': {name: [int(row[f'n_above_{name}_{k}']) for k in range(len(thresholds))]
+                  for name in PAIR_SERIES},
+    }
+
+
+def pair_aggregates(
+    joined: pl.DataFrame,
+    thresholds: List[float],
+    zero_threshold: float
+) -> Dict[str, Any]:
+    """
+    Raw aggregates of a synchronized pair, as assemble_metrics takes them.
 
-    cycles = 0
-    was_above = False
+    All flags and aggregates are built in one fused select; cycles for all
+    thresholds of a series come from one kernel call.
 
-    for i in range(len(above)):
-        if above[i]:
-            was_above = True
-        elif neutral[i] and was_above:
-            # Completed a cycle: was above threshold, now returned to neutral
-            cycles += 1
-            was_above = False
+    Args:
+        joined: Output of pair_deviation (bid/ask of both exchanges)
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+    """
+    aggregates, flags = pair_aggregate_exprs(thresholds, zero_threshold)
+    frame = joined.select([flag for above, neutral in flags.values() for flag in (*above, neutral)])
+    result = pair_aggregate_values(joined.select(aggregates).row(0, named=True), thresholds)
+
+    result['cycles'] = {}
+    for name, (above, neutral) in flags.items():
+        results = find_complete_cycles(
+            frame.select([flag.meta.output_name() for flag in above]).to_numpy().T,
+            frame[neutral.meta.output_name()]
+        )
+        result['cycles'][name] = [len(ends) for _, ends in results]
+    return result
 
-    return cycles
+
+def assemble_metrics(
+    aggregates: Dict[str, Any],
+    thresholds: List[float],
+    labels: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    analyze_joined's metrics dict from a pair's raw aggregates.
+
+    Every engine (analyze_joined, the lazy query, merged PairPartials, live
+    state) reduces a pair to these aggregates, so metric names, key order and
+    formulas are defined only here.
+
+    Args:
+        aggregates: Dict with
+            rows, valid: rows analyzed / rows with a deviation
+            deviation_sum, deviation_min, deviation_max, zero_crossings
+            last_deviation: last non-null deviation
+            duration_sec: time from the first to the last row (stale time included)
+            series_valid, above, cycles: per series of PAIR_SERIES - non-null
+                rows, rows above each threshold, complete cycles per threshold.
+                Only 'deviation' is required; the direction and mid metrics
+                are reported when the other series are present (with max_edge,
+                mid_min and mid_max).
+            stale_gaps, stale_rows, stale_time_sec: optional (see stale_stats);
+                stale rows and time are subtracted from data_points and
+                duration_hours
+        thresholds: Profitability thresholds in %
+        labels: Column suffix per threshold (default: threshold_labels)
+
+    Returns:
+        Metrics dict, or None if there are no rows with a deviation
+    """
+    if not aggregates['rows'] or not aggregates['valid']:
+        return None
+    labels = threshold_labels(thresholds, labels)
+    series_valid = aggregates['series_valid']
+    above = aggregates['above']
+    cycles = aggregates['cycles']
+
+    # Stale rows (ex2 quote older than max_quote_age) and the time they span
+    # are left out: data_points counts fresh rows, rates are per fresh hour
+    stale_rows = aggregates.get('stale_rows', 0)
+    duration_hours = (aggregates['duration_sec'] - aggregates.get('stale_time_sec', 0.0)) / 3600
+    zero_crossings = int(aggregates['zero_crossings'])
+    zero_crossings_per_hour = zero_crossings / duration_hours if duration_hours > 0 else 0
+    zero_crossings_per_minute = zero_crossings_per_hour / 60 if duration_hours > 0 else 0
+
+    def pct_above(name: str, k: int) -> float:
+        valid = series_valid[name]
+        return above[name][k] / valid * 100 if valid else 0.0
+
+    # Cycle = return to neutral AFTER being above threshold; a cycle's
+    # average duration is its share of the time above threshold.
+    # Pattern break: the deviation ends above threshold (last cycle incomplete)
+    threshold_stats = {}
+    for k, (threshold, label) in enumerate(zip(thresholds, labels)):
+        n_cycles = int(cycles['deviation'][k])
+        pct = pct_above('deviation', k)
+        threshold_stats.update({
+            f'opportunity_cycles_{label}': n_cycles,
+            f'cycles_{label}_per_hour': n_cycles / duration_hours if duration_hours > 0 else 0,
+            f'pct_time_above_{label}': pct,
+            f'avg_cycle_duration_{label}_sec': (duration_hours * pct / 100 * 3600) / n_cycles if n_cycles > 0 else 0,
+            f'pattern_break_{label}': abs(aggregates['last_deviation']) > threshold,
+        })
+
+    # Executable directions + mid reference
+    direction_metrics = {}
+    names = [name for name in PAIR_SERIES if name != 'deviation' and name in series_valid]
+    if names:
+        direction_metrics.update({
+            **{f'max_edge_{name}_pct': aggregates['max_edge'][name] or 0.0 for name in DIRECTION_EDGES},
+            'max_deviation_mid_pct': aggregates['mid_max'] or 0.0,
+            'min_deviation_mid_pct': aggregates['mid_min'] or 0.0,
+        })
+        for name in names:
+            for k, label in enumerate(labels):
+                direction_metrics[f'pct_time_above_{name}_{label}'] = pct_above(name, k)
+        for name in names:
+            for k, label in enumerate(labels):
+                direction_metrics[f'opportunity_cycles_{name}_{label}'] = int(cycles[name][k])
+
+    metrics = {
+        'max_deviation_pct': float(aggregates['deviation_max']),
+        'min_deviation_pct': float(aggregates['deviation_min']),
+        # Asymmetry = average deviation from parity (directional bias indicator):
+        # ≈ 0 for symmetric oscillation, |asymmetry| > 0.2 for a persistent bias
+        'deviation_asymmetry': aggregates['deviation_sum'] / aggregates['valid'],
+        'zero_crossings': zero_crossings,
+        'zero_crossings_per_hour': zero_crossings_per_hour,
+        'zero_crossings_per_minute': zero_crossings_per_minute,
+        **threshold_stats,
+        **direction_metrics,
+        'data_points': int(aggregates['rows']) - stale_rows,
+        'duration_hours': duration_hours
+    }
+    if 'stale_gaps' in aggregates:
+        metrics.update({key: aggregates[key] for key in ('stale_gaps', 'stale_rows', 'stale_time_sec')})
+    return metrics
+
+
+def pair_deviation(
+    data1: pl.DataFrame,
+    data2: pl.DataFrame,
+    max_quote_age: Optional[timedelta] = None
+) -> Optional[pl.DataFrame]:
+    """
+    Synchronize two exchanges and compute the ratio deviation from parity.
+
+    Args:
+        data1: DataFrame for first exchange (columns: timestamp, bestBid, bestAsk)
+        data2: DataFrame for second exchange (columns: timestamp, bestBid, bestAsk)
+        max_quote_age: Oldest ex2 quote a row may be matched with (see with_deviation);
+            None = no limit
+
+    Returns:
+        Joined DataFrame with bid/ask of both exchanges, ratio and deviation (%),
+        or None if the join is empty
+    """
+    if max_quote_age is not None:
+        # Keep the matched quote's own timestamp (join_asof drops the right key)
+        data2 = data2.with_columns(pl.col('timestamp').alias('timestamp_ex2'))
+
+    # Synchronize data using join_asof (backward strategy - no look-ahead bias)
+    joined = data1.rename({
+        'bestBid': 'bid_ex1',
+        'bestAsk': 'ask_ex1'
+    }).join_asof(
+        data2.rename({
+            'bestBid': 'bid_ex2',
+            'bestAsk': 'ask_ex2'
+        }),
+        on='timestamp'
+    )
+
+    if joined.is_empty():
+        return None
+
+    return with_deviation(joined, max_quote_age)
+
+
+def with_deviation(joined: pl.DataFrame, max_quote_age: Optional[timedelta] = None) -> pl.DataFrame:
+    """
+    Add ratio and deviation (%) columns to a synchronized pair frame.
+
+    With max_quote_age, rows whose ex2 quote is older than that are stale:
+    their ex2 bid/ask (and so ratio and deviation) become null, exactly like
+    rows before ex2's first quote, so every metric skips them. The staleness
+    mask is computed in the same expression pass and kept as a `stale`
+    column for gap statistics.
+
+    Args:
+        joined: DataFrame with bid_ex1, ask_ex1, bid_ex2, ask_ex2 columns (and
+            timestamp_ex2, the matched quote's timestamp, when max_quote_age is set)
+        max_quote_age: Oldest ex2 quote a row may be matched with; None = no limit
+
+    Returns:
+        The frame with ratio = bid_ex1 / bid_ex2 and deviation from parity in %
+    """
+    if max_quote_age is not None:
+        stale = ((pl.col('timestamp') - pl.col('timestamp_ex2')) > max_quote_age).fill_null(False)
+        joined = joined.with_columns([
+            pl.when(stale).then(None).otherwise(pl.col('bid_ex2')).alias('bid_ex2'),
+            pl.when(stale).then(None).otherwise(pl.col('ask_ex2')).alias('ask_ex2'),
+            (pl.when(stale).then(None).otherwise(pl.col('bid_ex1') / pl.col('bid_ex2'))).alias('ratio'),
+            stale.alias('stale')
+        ]).drop('timestamp_ex2')
+    else:
+        # OPTIMIZATION #4: Pure Polars operations (1.5-2x faster, zero-copy)
+        # Calculate ratio and statistics in Polars
+        joined = joined.with_columns([
+            (pl.col('bid_ex1') / pl.col('bid_ex2')).alias('ratio')
+        ])
+
+    # CRITICAL FIX: Calculate deviation from 1.0, NOT from mean!
+    # For arbitrage, we need to know deviation from PRICE EQUALITY, not from average
+    # deviation = 0 means prices are equal → can close position at break-even
+    # If we used mean_ratio, deviation = 0 would NOT guarantee break-even close!
+    return joined.with_columns([
+        ((pl.col('ratio') - 1.0) / 1.0 * 100).alias('deviation')
+    ])
 
 
 def analyze_pair_fast(
@@ -49,7 +419,8 @@ def analyze_pair_fast(
     data1: pl.DataFrame,
     data2: pl.DataFrame,
     thresholds: Optional[List[float]] = None,
-    zero_threshold: float = 0.05
+    zero_threshold: float = 0.05,
+    mean_reversion_interval: Optional[timedelta] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Fast pair analysis - OPTIMIZED with Polars operations.
@@ -62,8 +433,10 @@ def analyze_pair_fast(
         ex2: Second exchange name
         data1: DataFrame for first exchange (columns: timestamp, bestBid, bestAsk)
         data2: DataFrame for second exchange (columns: timestamp, bestBid, bestAsk)
-        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        thresholds: List of profitability thresholds in % (default: DEFAULT_THRESHOLDS)
         zero_threshold: Neutral zone threshold in % (default: 0.05)
+        mean_reversion_interval: Resampling grid of the mean-reversion statistics;
+            None (default) skips them
 
     Returns:
         Dictionary with analysis metrics or None if analysis fails
@@ -80,164 +453,503 @@ def analyze_pair_fast(
         - pct_time_above_XXXbp: % of time deviation > threshold
         - avg_cycle_duration_XXXbp_sec: Average cycle duration in seconds
         - pattern_break_XXXbp: True if last deviation > threshold (pattern breaking)
-        - data_points: Number of data points analyzed
-        - duration_hours: Analysis duration in hours
+        - max_edge_<dir>_pct, opportunity_cycles_<dir>_XXXbp, pct_time_above_<dir>_XXXbp:
+          executable directions bid1_ask2 / bid2_ask1 and the mid reference
+          (see pair_aggregates)
+        - data_points: Number of data points analyzed (without stale rows)
+        - duration_hours: Analysis duration in hours (without stale time); the
+          per-hour rates and average cycle durations are based on it
+        - adf_stat, adf_stationary, ar1_coef, half_life_sec, deviation_std,
+          deviation_skewness, deviation_excess_kurtosis, jarque_bera_pvalue:
+          with mean_reversion_interval only (see lib/mean_reversion.py)
     """
-    # Synchronize data using join_asof (backward strategy - no look-ahead bias)
     try:
-        joined = data1.rename({
-            'bestBid': 'bid_ex1',
-            'bestAsk': 'ask_ex1'
-        }).join_asof(
-            data2.rename({
-                'bestBid': 'bid_ex2',
-                'bestAsk': 'ask_ex2'
-            }),
-            on='timestamp'
-        )
-
-        if joined.is_empty():
-            return None
+        joined = pair_deviation(data1, data2)
+    except Exception as e:
+        print(f"Error in analyze_pair_fast: {e}")
+        return None
 
-        # OPTIMIZATION #4: Pure Polars operations (1.5-2x faster, zero-copy)
-        # Calculate ratio and statistics in Polars
-        joined = joined.with_columns([
-            (pl.col('bid_ex1') / pl.col('bid_ex2')).alias('ratio')
-        ])
+    stats = analyze_joined(joined, thresholds, zero_threshold)
+    if stats is not None and mean_reversion_interval is not None:
+        stats.update(mean_reversion_stats([joined], mean_reversion_interval)[0])
+    return stats
 
-        # CRITICAL FIX: Calculate deviation from 1.0, NOT from mean!
-        # For arbitrage, we need to know deviation from PRICE EQUALITY, not from average
-        # deviation = 0 means prices are equal → can close position at break-even
-        # If we used mean_ratio, deviation = 0 would NOT guarantee break-even close!
-        joined = joined.with_columns([
-            ((pl.col('ratio') - 1.0) / 1.0 * 100).alias('deviation')
-        ])
 
-        # All aggregations in pure Polars (no NumPy conversion)
-        max_deviation_pct = float(joined['deviation'].max())
-        min_deviation_pct = float(joined['deviation'].min())
-        mean_deviation_pct = float(joined['deviation'].mean())
-
-        # Calculate asymmetry (directional bias indicator)
-        # Now using deviation from 1.0 (price equality)
-        # asymmetry = average deviation from zero
-        # For symmetric oscillation around parity: asymmetry ≈ 0
-        # For persistent bias (e.g., always +0.3%): |asymmetry| > 0.2
-        asymmetry = mean_deviation_pct
-
-        # Zero crossings in pure Polars
-        # FIXED: Use multiplication to detect true sign flips (+1 to -1 or vice versa)
-        # This prevents counting transitions through exactly 0.0 as two separate events
-        # sign[i] * sign[i-1] < 0 only when crossing from positive to negative (or vice versa)
-        deviation_sign = pl.col('deviation').sign()
-        zero_crossings = int(
-            joined.with_columns([
-                (deviation_sign * deviation_sign.shift(1) < 0).alias('crossed')
-            ])['crossed'].sum()
-        )
+def analyze_joined(
+    joined: Optional[pl.DataFrame],
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> Optional[Dict[str, Any]]:
+    """
+    Pair metrics from an already synchronized frame.
 
-        # Time range
-        min_timestamp = joined['timestamp'].min()
-        max_timestamp = joined['timestamp'].max()
-        duration_hours = (max_timestamp - min_timestamp).total_seconds() / 3600
-
-        # Calculate zero crossings per time
-        zero_crossings_per_hour = zero_crossings / duration_hours if duration_hours > 0 else 0
-        zero_crossings_per_minute = zero_crossings_per_hour / 60 if duration_hours > 0 else 0
-
-        # BATCH OPTIMIZATION: Calculate all thresholds in one pass
-        # CORRECTED LOGIC: Count only COMPLETE cycles that return to ZERO
-        #
-        # A cycle = movement from ~zero → above threshold → back to ~zero
-        # This ensures we only count tradeable opportunities (can close position at break-even)
-
-        # Use provided thresholds or defaults
-        if thresholds is None:
-            thresholds = [0.3, 0.5, 0.4]
-
-        joined_with_thresholds = joined.with_columns([
-            # Above threshold flags
-            (pl.col('deviation').abs() > thresholds[0]).alias('above_030bp'),
-            (pl.col('deviation').abs() > thresholds[1]).alias('above_050bp'),
-            (pl.col('deviation').abs() > thresholds[2]).alias('above_040bp'),
-            # In neutral zone flag
-            (pl.col('deviation').abs() < zero_threshold).alias('in_neutral')
-        ])
+    Args:
+        joined: Output of pair_deviation or SymbolTimeline.pair (may be None)
+        thresholds: List of profitability thresholds in % (default: DEFAULT_THRESHOLDS)
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
 
-        # Count COMPLETE cycles using correct logic
-        # Cycle = return to neutral AFTER being above threshold
-        cycles_030bp = count_complete_cycles(
-            joined_with_thresholds['above_030bp'],
-            joined_with_thresholds['in_neutral']
-        )
-        cycles_050bp = count_complete_cycles(
-            joined_with_thresholds['above_050bp'],
-            joined_with_thresholds['in_neutral']
-        )
-        cycles_040bp = count_complete_cycles(
-            joined_with_thresholds['above_040bp'],
-            joined_with_thresholds['in_neutral']
-        )
+    Returns:
+        Same metrics as analyze_pair_fast, or None if analysis fails
+    """
+    if joined is None or joined.is_empty():
+        return None
 
-        # Calculate percentage of time above thresholds
-        threshold_metrics = joined_with_thresholds.select([
-            (pl.col('above_030bp').mean() * 100).alias('pct_030bp'),
-            (pl.col('above_050bp').mean() * 100).alias('pct_050bp'),
-            (pl.col('above_040bp').mean() * 100).alias('pct_040bp')
-        ])
+    # Use provided thresholds or defaults
+    if thresholds is None:
+        thresholds = list(DEFAULT_THRESHOLDS)
 
-        # Extract results
-        metrics = threshold_metrics.row(0, named=True)
-
-        pct_030bp = float(metrics['pct_030bp'])
-        pct_050bp = float(metrics['pct_050bp'])
-        pct_040bp = float(metrics['pct_040bp'])
-
-        # Average duration per cycle (in seconds)
-        avg_duration_030bp_sec = (duration_hours * pct_030bp / 100 * 3600) / cycles_030bp if cycles_030bp > 0 else 0
-        avg_duration_050bp_sec = (duration_hours * pct_050bp / 100 * 3600) / cycles_050bp if cycles_050bp > 0 else 0
-        avg_duration_040bp_sec = (duration_hours * pct_040bp / 100 * 3600) / cycles_040bp if cycles_040bp > 0 else 0
-
-        # Pattern break detection: check if last cycle is incomplete (didn't return below threshold)
-        # If deviation ends above threshold, pattern may be breaking
-        last_deviation = float(joined['deviation'][-1])
-        pattern_break_030bp = abs(last_deviation) > thresholds[0]
-        pattern_break_050bp = abs(last_deviation) > thresholds[1]
-        pattern_break_040bp = abs(last_deviation) > thresholds[2]
-
-        threshold_stats = {
-            'opportunity_cycles_030bp': cycles_030bp,
-            'cycles_030bp_per_hour': cycles_030bp / duration_hours if duration_hours > 0 else 0,
-            'pct_time_above_030bp': pct_030bp,
-            'avg_cycle_duration_030bp_sec': avg_duration_030bp_sec,
-            'pattern_break_030bp': pattern_break_030bp,
-
-            'opportunity_cycles_050bp': cycles_050bp,
-            'cycles_050bp_per_hour': cycles_050bp / duration_hours if duration_hours > 0 else 0,
-            'pct_time_above_050bp': pct_050bp,
-            'avg_cycle_duration_050bp_sec': avg_duration_050bp_sec,
-            'pattern_break_050bp': pattern_break_050bp,
-
-            'opportunity_cycles_040bp': cycles_040bp,
-            'cycles_040bp_per_hour': cycles_040bp / duration_hours if duration_hours > 0 else 0,
-            'pct_time_above_040bp': pct_040bp,
-            'avg_cycle_duration_040bp_sec': avg_duration_040bp_sec,
-            'pattern_break_040bp': pattern_break_040bp
-        }
-
-        return {
-            'max_deviation_pct': max_deviation_pct,
-            'min_deviation_pct': min_deviation_pct,
-            'deviation_asymmetry': asymmetry,
-            'zero_crossings': zero_crossings,
-            'zero_crossings_per_hour': zero_crossings_per_hour,
-            'zero_crossings_per_minute': zero_crossings_per_minute,
-            **threshold_stats,
-            'data_points': len(joined),
-            'duration_hours': duration_hours
-        }
+    try:
+        aggregates = pair_aggregates(joined, thresholds, zero_threshold)
+        if 'stale' in joined.columns:
+            aggregates.update(stale_stats(joined))
+        return assemble_metrics(aggregates, thresholds)
     except Exception as e:
         print(f"Error in analyze_pair_fast: {e}")
         import traceback
         traceback.print_exc()
         return None
+
+
+def stale_stats(joined: pl.DataFrame) -> Dict[str, Any]:
+    """
+    Quote-gap statistics of a frame built with max_quote_age.
+
+    Returns:
+        stale_gaps (runs of stale rows), stale_rows and stale_time_sec (time
+        from each stale row to the next row, summed)
+    """
+    stale = pl.col('stale')
+    stats = joined.select([
+        (stale & ~stale.shift(1, fill_value=False)).sum().alias('stale_gaps'),
+        stale.sum().alias('stale_rows'),
+        pl.when(stale).then(pl.col('timestamp').diff().shift(-1)).otherwise(None)
+        .dt.total_microseconds().sum().alias('stale_time_us')
+    ]).row(0, named=True)
+    return {
+        'stale_gaps': int(stats['stale_gaps']),
+        'stale_rows': int(stats['stale_rows']),
+        'stale_time_sec': (stats['stale_time_us'] or 0) / 10**6
+    }
+
+
+def build_excursions(abs_deviation: np.ndarray, timestamps: np.ndarray, zero_threshold: float) -> Dict[str, np.ndarray]:
+    """
+    Segment a deviation series into neutral-to-neutral excursions.
+
+    An excursion is a maximal run of rows outside the neutral zone
+    (|deviation| >= zero_threshold). It is closed when a neutral row follows
+    it; the trailing excursion may still be open.
+
+    For any threshold T >= zero_threshold, the complete cycles of
+    count_complete_cycles are exactly the closed excursions with peak > T, so
+    one table answers every threshold.
+
+    Args:
+        abs_deviation: |deviation| in %, NaN treated as +inf (as Polars compares it)
+        timestamps: Row timestamps as datetime64 (same length)
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        Dict of arrays for closed excursions: peak (max |deviation|), start
+        (first row), end (closing neutral row), duration_sec (start to end)
+    """
+    abs_deviation = np.nan_to_num(abs_deviation, nan=np.inf)
+    outside = ~(abs_deviation < zero_threshold)
+
+    prev_outside = np.empty_like(outside)
+    if len(outside):
+        prev_outside[0] = False
+        prev_outside[1:] = outside[:-1]
+
+    starts = np.flatnonzero(outside & ~prev_outside)
+    ends = np.flatnonzero(~outside & prev_outside)
+    if len(starts) == 0:
+        empty = np.array([], dtype=np.int64)
+        return {'peak': np.array([], dtype=np.float64), 'start': empty, 'end': empty,
+                'duration_sec': np.array([], dtype=np.float64)}
+
+    # Segments from each start to the next include the neutral rows in
+    # between; those are below every peak, so the segment max is the peak
+    peaks = np.maximum.reduceat(abs_deviation, starts)
+    starts = starts[:len(ends)]
+    peaks = peaks[:len(ends)]
+
+    duration_sec = (timestamps[ends] - timestamps[starts]) / np.timedelta64(1, 's')
+    return {'peak': peaks, 'start': starts, 'end': ends, 'duration_sec': duration_sec.astype(np.float64)}
+
+
+def _validate_sweep(thresholds: List[float], zero_thresholds: List[float]) -> np.ndarray:
+    """Check a sweep grid and return the thresholds as a sorted array."""
+    thresholds = np.asarray(sorted(thresholds), dtype=np.float64)
+    if len(thresholds) == 0 or not zero_thresholds:
+        raise ValueError("thresholds and zero_thresholds must not be empty")
+    if thresholds[0] < max(zero_thresholds):
+        raise ValueError(
+            f"thresholds must be >= zero thresholds, got {thresholds[0]} < {max(zero_thresholds)}"
+        )
+    return thresholds
+
+
+def sweep_pair(
+    symbol: str,
+    ex1: str,
+    ex2: str,
+    data1: pl.DataFrame,
+    data2: pl.DataFrame,
+    thresholds: List[float],
+    zero_thresholds: List[float]
+) -> Optional[pl.DataFrame]:
+    """
+    Cycle statistics for an arbitrary threshold grid, in long format.
+
+    The pair is joined once; per zero threshold the deviation series is
+    reduced to an excursion table (build_excursions), and every threshold is
+    answered from that table and the sorted |deviation| with binary search.
+    Rows for thresholds used by analyze_pair_fast match its fixed columns.
+
+    Args:
+        symbol: Symbol name (e.g., "BTC/USDT")
+        ex1: First exchange name
+        ex2: Second exchange name
+        data1: DataFrame for first exchange (columns: timestamp, bestBid, bestAsk)
+        data2: DataFrame for second exchange (columns: timestamp, bestBid, bestAsk)
+        thresholds: Profitability thresholds in %, any number
+        zero_thresholds: Neutral zone thresholds in %
+
+    Returns:
+        One row per (zero_threshold, threshold): symbol, exchange1, exchange2,
+        zero_threshold, threshold, cycles, cycles_per_hour, pct_time_above,
+        avg_cycle_duration_sec (same definition as analyze_pair_fast),
+        avg_excursion_duration_sec (neutral-to-neutral time of counted
+        cycles), pattern_break, data_points, duration_hours.
+        None if the pair has no overlapping data.
+
+    Raises:
+        ValueError: If a threshold is below a zero threshold (above-threshold
+            and neutral rows would overlap and excursions no longer apply)
+    """
+    _validate_sweep(thresholds, zero_thresholds)
+    return sweep_joined(symbol, ex1, ex2, pair_deviation(data1, data2), thresholds, zero_thresholds)
+
+
+def sweep_joined(
+    symbol: str,
+    ex1: str,
+    ex2: str,
+    joined: Optional[pl.DataFrame],
+    thresholds: List[float],
+    zero_thresholds: List[float]
+) -> Optional[pl.DataFrame]:
+    """
+    Threshold sweep over an already synchronized frame (see sweep_pair).
+
+    Args:
+        joined: Output of pair_deviation or SymbolTimeline.pair (may be None)
+
+    Raises:
+        ValueError: If a threshold is below a zero threshold
+    """
+    thresholds = _validate_sweep(thresholds, zero_thresholds)
+
+    if joined is None or joined.is_empty():
+        return None
+
+    abs_deviation = np.nan_to_num(joined['deviation'].abs().to_numpy(), nan=np.inf)
+    # Rows without a (fresh) ex2 quote are neither above nor neutral, as in analyze_joined
+    missing = joined['deviation'].is_null().to_numpy()
+    timestamps = joined['timestamp'].to_numpy()
+    n_valid = len(abs_deviation) - int(missing.sum())
+    if n_valid == 0:
+        return None
+
+    # Stale rows and their time are left out as in analyze_joined
+    gaps = stale_stats(joined) if 'stale' in joined.columns else {'stale_rows': 0, 'stale_time_sec': 0.0}
+    n_rows = len(abs_deviation) - gaps['stale_rows']
+    duration_hours = (
+        (joined['timestamp'].max() - joined['timestamp'].min()).total_seconds() - gaps['stale_time_sec']
+    ) / 3600
+
+    # pct time above is independent of the zero threshold
+    sorted_abs = np.sort(abs_deviation[~missing])
+    pct_above = (n_valid - np.searchsorted(sorted_abs, thresholds, side='right')) / n_valid * 100
+    pattern_break = abs_deviation[~missing][-1] > thresholds
+
+    frames = []
+    for zero_threshold in zero_thresholds:
+        # |deviation| = zero_threshold: outside the neutral zone, above no threshold (all >= it)
+        excursions = build_excursions(np.where(missing, zero_threshold, abs_deviation), timestamps, zero_threshold)
+
+        # Sort closed excursions by peak; suffix sums answer "peak > T" for all T
+        order = np.argsort(excursions['peak'], kind='stable')
+        peaks = excursions['peak'][order]
+        durations = excursions['duration_sec'][order]
+        suffix_duration = np.concatenate([np.cumsum(durations[::-1])[::-1], [0.0]])
+
+        first = np.searchsorted(peaks, thresholds, side='right')
+        cycles = len(peaks) - first
+        total_duration = suffix_duration[first]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_cycle_duration = np.where(
+                cycles > 0, duration_hours * pct_above / 100 * 3600 / cycles, 0.0
+            )
+            avg_excursion_duration = np.where(cycles > 0, total_duration / cycles, 0.0)
+
+        frames.append(pl.DataFrame({
+            'zero_threshold': np.full(len(thresholds), zero_threshold, dtype=np.float64),
+            'threshold': thresholds,
+            'cycles': cycles.astype(np.int64),
+            'cycles_per_hour': cycles / duration_hours if duration_hours > 0 else np.zeros(len(thresholds)),
+            'pct_time_above': pct_above,
+            'avg_cycle_duration_sec': avg_cycle_duration,
+            'avg_excursion_duration_sec': avg_excursion_duration,
+            'pattern_break': pattern_break
+        }))
+
+    return pl.concat(frames).with_columns([
+        pl.lit(symbol).alias('symbol'),
+        pl.lit(ex1).alias('exchange1'),
+        pl.lit(ex2).alias('exchange2'),
+        pl.lit(n_rows, dtype=pl.Int64).alias('data_points'),
+        pl.lit(duration_hours).alias('duration_hours')
+    ]).select([
+        'symbol', 'exchange1', 'exchange2', 'zero_threshold', 'threshold', 'cycles', 'cycles_per_hour',
+        'pct_time_above', 'avg_cycle_duration_sec', 'avg_excursion_duration_sec', 'pattern_break',
+        'data_points', 'duration_hours'
+    ])
+
+
+def threshold_grid(start: float, stop: float, step: float) -> List[float]:
+    """
+    Inclusive threshold grid in %, e.g. threshold_grid(0.10, 1.00, 0.01).
+
+    Raises:
+        ValueError: If step isn't positive or stop < start
+    """
+    if step <= 0 or stop < start:
+        raise ValueError(f"Invalid threshold grid: start={start}, stop={stop}, step={step}")
+    count = int(round((stop - start) / step)) + 1
+    return [round(start + i * step, 10) for i in range(count)]
+
+
+def rolling_joined(
+    symbol: str,
+    ex1: str,
+    ex2: str,
+    joined: Optional[pl.DataFrame],
+    window: timedelta,
+    step: timedelta,
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05,
+    labels: Optional[List[str]] = None
+) -> Optional[pl.DataFrame]:
+    """
+    Rolling-window metric time series of a synchronized pair.
+
+    One pass builds per-row event indicators (zero crossing, above each
+    threshold, cycle completion) and their cumulative sums; every window is
+    then two binary searches and a difference, so the cost is O(rows +
+    windows) whatever the window/step ratio.
+
+    Windows [start, start + window) start at multiples of `step` (UTC) and
+    only windows fully inside the pair's data are reported. Events count in
+    the window of the row where they complete: a crossing at its second row,
+    a cycle at its return to neutral (its entry may lie before the window).
+    Rates are per window length. With max_quote_age, stale rows are not
+    data points and their time (each stale row to the next row, clipped to
+    the window, as in stale_stats) is taken off the window length; a
+    window that is stale throughout has null rates.
+
+    Args:
+        joined: Output of pair_deviation or SymbolTimeline.pair (may be None)
+        window: Window length
+        step: Distance between window starts
+        thresholds: List of profitability thresholds in % (default: DEFAULT_THRESHOLDS)
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+        labels: Column suffix per threshold (default: threshold_labels)
+
+    Returns:
+        One row per window (symbol, exchange1, exchange2, window_start,
+        window_end, data_points, zero_crossings_per_minute and, per threshold,
+        cycles_<label>_per_hour and pct_time_above_<label>), or None if no
+        window fits
+
+    Raises:
+        ValueError: If window or step isn't positive
+    """
+    if window <= timedelta(0) or step <= timedelta(0):
+        raise ValueError(f"Window and step must be positive, got window={window}, step={step}")
+    if thresholds is None:
+        thresholds = list(DEFAULT_THRESHOLDS)
+    labels = threshold_labels(thresholds, labels)
+
+    if joined is None or joined.is_empty():
+        return None
+
+    timestamps = joined['timestamp'].dt.epoch('us').to_numpy()
+    window_us = window // timedelta(microseconds=1)
+    step_us = step // timedelta(microseconds=1)
+
+    # Window starts on the step grid, fully inside [first row, last row]
+    first_start = -(-timestamps[0] // step_us) * step_us
+    starts = np.arange(first_start, timestamps[-1] - window_us + 1, step_us, dtype=np.int64)
+    if len(starts) == 0:
+        return None
+
+    flags = joined.select([
+        pl.col('deviation').is_not_null().alias('valid'),
+        (pl.col('deviation').sign() * pl.col('deviation').sign().shift(1) < 0).fill_null(False).alias('crossing'),
+        *((pl.col('deviation').abs() > threshold).fill_null(False).alias(f'above_{k}')
+          for k, threshold in enumerate(thresholds)),
+        (pl.col('deviation').abs() < zero_threshold).fill_null(False).alias('neutral')
+    ])
+    above = flags.select([f'above_{k}' for k in range(len(thresholds))]).to_numpy().T
+    cycle_end = np.zeros_like(above)
+    for k, (_, ends) in enumerate(find_complete_cycles(above, flags['neutral'])):
+        cycle_end[k, ends] = True
+
+    def window_sums(indicator: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate([[0], np.cumsum(indicator, dtype=np.int64)])
+        return cumulative[hi] - cumulative[lo]
+
+    ends = starts + window_us
+    lo = np.searchsorted(timestamps, starts, side='left')
+    hi = np.searchsorted(timestamps, ends, side='left')
+    valid = window_sums(flags['valid'].to_numpy())
+    data_points = (hi - lo).astype(np.int64)
+    live_us = np.full(len(starts), window_us, dtype=np.int64)
+
+    if 'stale' in joined.columns:
+        stale = joined['stale'].fill_null(False).to_numpy()
+        next_ts = np.append(timestamps[1:], timestamps[-1])
+        data_points -= window_sums(stale)
+        # Stale time of the rows in the window, the last one's cut at the window end
+        stale_us = window_sums(np.where(stale, next_ts - timestamps, 0))
+        last = np.maximum(hi - 1, 0)
+        stale_us -= np.where((hi > lo) & stale[last], np.maximum(next_ts[last] - ends, 0), 0)
+        # A stale row before the window whose gap reaches into it
+        before = np.maximum(lo - 1, 0)
+        stale_us += np.where((lo > 0) & stale[before],
+                             np.clip(np.minimum(next_ts[before], ends) - starts, 0, None), 0)
+        live_us -= stale_us
+
+    live_hours = np.where(live_us > 0, live_us / 3.6e9, np.nan)
+    columns = {
+        'data_points': data_points,
+        'zero_crossings_per_minute': window_sums(flags['crossing'].to_numpy()) / (live_hours * 60),
+    }
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for k, label in enumerate(labels):
+            columns[f'cycles_{label}_per_hour'] = window_sums(cycle_end[k]) / live_hours
+            columns[f'pct_time_above_{label}'] = np.where(valid > 0, window_sums(above[k]) / valid * 100, np.nan)
+
+    return pl.DataFrame({
+        'symbol': [symbol] * len(starts),
+        'exchange1': [ex1] * len(starts),
+        'exchange2': [ex2] * len(starts),
+        # Naive UTC, like the collector's Timestamp
+        'window_start': pl.Series(starts).cast(pl.Datetime('us')),
+        'window_end': pl.Series(starts + window_us).cast(pl.Datetime('us')),
+        **columns
+    }).with_columns(pl.col('^(zero_crossings_per_minute|cycles_.*_per_hour|pct_time_above_.*)$').fill_nan(None))
+
+
+def delay_joined(
+    symbol: str,
+    ex1: str,
+    ex2: str,
+    joined: Optional[pl.DataFrame],
+    delays_ms: List[float],
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> Optional[pl.DataFrame]:
+    """
+    Execution-delay sensitivity of a synchronized pair's cycles.
+
+    Cycle metrics assume the trade fills at the row that crosses the
+    threshold. Here every cycle entry is re-priced `delay` later: the as-of
+    row at entry time + delay (last row at or before it) is looked up for
+    all cycles, thresholds and delays with one searchsorted call over the
+    existing join, not one join per delay.
+
+    Deviations are taken in the entry direction (sign of the entry
+    deviation), so a reversal within the delay counts negative. A cycle is
+    captured at a delay if that deviation is still above the threshold.
+
+    Args:
+        joined: Output of pair_deviation or SymbolTimeline.pair (may be None)
+        delays_ms: Execution delays in milliseconds
+        thresholds: List of profitability thresholds in % (default: DEFAULT_THRESHOLDS)
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+
+    Returns:
+        One row per (threshold, delay) with cycles, avg_entry_deviation_pct,
+        avg_available_deviation_pct, avg_available_edge_pct (executable edge
+        in the entry direction) and capture_rate_pct, or None without data
+
+    Raises:
+        ValueError: If a delay is negative
+    """
+    if thresholds is None:
+        thresholds = list(DEFAULT_THRESHOLDS)
+    delays_ms = np.asarray(delays_ms, dtype=np.float64)
+    if (delays_ms < 0).any():
+        raise ValueError(f"Execution delays must be >= 0 ms, got {delays_ms.tolist()}")
+
+    if joined is None or joined.is_empty():
+        return None
+
+    flags = joined.select([
+        *((pl.col('deviation').abs() > threshold).fill_null(False).alias(f'above_{k}')
+          for k, threshold in enumerate(thresholds)),
+        (pl.col('deviation').abs() < zero_threshold).fill_null(False).alias('neutral')
+    ])
+    cycles = find_complete_cycles(
+        flags.select([f'above_{k}' for k in range(len(thresholds))]).to_numpy().T,
+        flags['neutral']
+    )
+
+    timestamps = joined['timestamp'].dt.epoch('us').to_numpy()
+    deviation = joined['deviation'].to_numpy()
+    edges = joined.select(list(DIRECTION_EDGES.values())).to_numpy().T
+
+    # All cycle entries of all thresholds x all delays: one batched as-of lookup
+    starts = np.concatenate([starts for starts, _ in cycles])
+    threshold_of = np.repeat(np.arange(len(thresholds)), [len(starts) for starts, _ in cycles])
+    targets = timestamps[starts][:, None] + np.round(delays_ms * 1000).astype(np.int64)[None, :]
+    rows = np.searchsorted(timestamps, targets, side='right') - 1
+
+    direction = np.sign(deviation[starts])[:, None]
+    entry = np.abs(deviation[starts])
+    available = deviation[rows] * direction
+    # deviation > 0: ex1 rich, sell ex1 at its bid / buy ex2 at its ask (bid1_ask2)
+    available_edge = np.where(direction > 0, edges[0][rows], edges[1][rows])
+    captured = available > np.asarray(thresholds)[threshold_of][:, None]
+
+    def mean(values: np.ndarray) -> Optional[float]:
+        # Entries delayed into a stale quote (null) can't be filled: not captured, not averaged
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else None
+
+    records = {
+        'threshold': [], 'delay_ms': [], 'cycles': [], 'avg_entry_deviation_pct': [],
+        'avg_available_deviation_pct': [], 'avg_available_edge_pct': [], 'capture_rate_pct': []
+    }
+    for k, threshold in enumerate(thresholds):
+        mask = threshold_of == k
+        n_cycles = int(mask.sum())
+        for d, delay in enumerate(delays_ms):
+            records['threshold'].append(float(threshold))
+            records['delay_ms'].append(float(delay))
+            records['cycles'].append(n_cycles)
+            records['avg_entry_deviation_pct'].append(mean(entry[mask]))
+            records['avg_available_deviation_pct'].append(mean(available[mask, d]))
+            records['avg_available_edge_pct'].append(mean(available_edge[mask, d]))
+            records['capture_rate_pct'].append(float(captured[mask, d].mean() * 100) if n_cycles else None)
+
+    return pl.DataFrame(records, schema_overrides={'cycles': pl.Int64}).select([
+        pl.lit(symbol).alias('symbol'),
+        pl.lit(ex1).alias('exchange1'),
+        pl.lit(ex2).alias('exchange2'),
+        pl.all()
+    ])
@@ -0,0 +1,377 @@
+"""
+Persistent partition catalog for the market data directory.
+
+Walks exchange=*/symbol=*/date=*/hour=* once and stores one row per parquet
+file (path, partition keys, size, mtime, row count, Timestamp range) in a
+single small parquet file. Discovery and loading are then answered from the
+catalog instead of re-globbing hundreds of thousands of flush files per run.
+"""
+
+import os
+import time
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import polars as pl
+import pyarrow.parquet as pq
+
+
+# Analyzer-owned files live next to the partitions they describe.
+# The leading underscore keeps them out of the exchange=* scan.
+ANALYZER_DIRNAME = '_analyzer'
+CATALOG_FILENAME = 'catalog.parquet'
+
+CATALOG_SCHEMA = {
+    'path': pl.Utf8,            # Relative to data root, '/'-separated
+    'exchange': pl.Utf8,
+    'symbol': pl.Utf8,          # Raw directory name, e.g. VIRTUAL_USDT
+    'date': pl.Utf8,            # YYYY-MM-DD
+    'hour': pl.Int32,           # Null for day-level (compacted) files
+    'kind': pl.Utf8,            # 'spreads' or 'trades' (see file_kind)
+    'size': pl.Int64,
+    'mtime_ns': pl.Int64,
+    'dir_mtime_ns': pl.Int64,   # Hour directory mtime at scan time (null for day-level files)
+    'rows': pl.Int64,
+    'min_ts': pl.Datetime('us'),
+    'max_ts': pl.Datetime('us'),
+}
+
+PARTITION_KEYS = ['exchange', 'symbol', 'date', 'hour']
+
+# Closed hours can still receive a final flush for a short while after the
+# hour changes (see ParquetDataWriter.FlushAsync), so wait before compacting.
+# Until then an hour counts as live: a file in it may still be being written.
+DEFAULT_GRACE_MINUTES = 15
+
+# Per-file columns handed to the loader (see PartitionCatalog.entries)
+ENTRY_COLUMNS = ['path', 'date', 'hour', 'size', 'mtime_ns', 'rows', 'min_ts', 'max_ts']
+
+# The collector writes both kinds into the same hour directories with
+# different schemas: spreads-*.parquet (BestBid/BestAsk) and trades-*.parquet
+# (Price/Quantity/Side). Anything not named trades-* is treated as spreads,
+# which also covers legacy and compacted spreads files.
+FILE_KIND_SPREADS = 'spreads'
+FILE_KIND_TRADES = 'trades'
+
+
+def file_kind(name: str) -> str:
+    """Classify a parquet file name as 'spreads' or 'trades'."""
+    return FILE_KIND_TRADES if name.startswith('trades-') else FILE_KIND_SPREADS
+
+
+def _partition_value(name: str, prefix: str) -> Optional[str]:
+    """Return the value of a `key=value` directory name, or None if it doesn't match."""
+    if not name.startswith(prefix):
+        return None
+    return name[len(prefix):]
+
+
+def _to_naive_utc(value) -> Optional[datetime]:
+    """Normalize parquet statistics values to naive UTC datetimes."""
+    if value is None:
+        return None
+    if hasattr(value, 'to_pydatetime'):
+        value = value.to_pydatetime()
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _hour_live_until_ns(date: str, hour: int) -> int:
+    """Epoch ns at which an hour partition stops counting as live (its end plus the grace period)."""
+    start = datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    live_until = start + timedelta(hours=hour + 1, minutes=DEFAULT_GRACE_MINUTES)
+    return int(live_until.timestamp()) * 10**9
+
+
+def read_file_stats(path: str) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+    """
+    Read row count and Timestamp range of a parquet file.
+
+    Uses footer metadata (row count, column statistics) when available and
+    falls back to reading only the Timestamp column when the writer didn't
+    store usable statistics (e.g. INT96 timestamps).
+
+    Returns:
+        (rows, min_ts, max_ts); (0, None, None) if the file can't be read
+    """
+    try:
+        meta = pq.read_metadata(path)
+    except Exception:
+        return 0, None, None
+
+    rows = meta.num_rows
+    if rows == 0:
+        return 0, None, None
+
+    names = [meta.schema.column(i).name for i in range(meta.num_columns)]
+    if 'Timestamp' not in names:
+        return rows, None, None
+    ts_index = names.index('Timestamp')
+
+    min_ts = None
+    max_ts = None
+    for rg in range(meta.num_row_groups):
+        stats = meta.row_group(rg).column(ts_index).statistics
+        rg_min = _to_naive_utc(stats.min) if stats is not None and stats.has_min_max else None
+        rg_max = _to_naive_utc(stats.max) if stats is not None and stats.has_min_max else None
+        if rg_min is None or rg_max is None:
+            min_ts = max_ts = None
+            break
+        min_ts = rg_min if min_ts is None else min(min_ts, rg_min)
+        max_ts = rg_max if max_ts is None else max(max_ts, rg_max)
+
+    if min_ts is None:
+        try:
+            ts = pl.read_parquet(path, columns=['Timestamp'])['Timestamp']
+            min_ts = _to_naive_utc(ts.min())
+            max_ts = _to_naive_utc(ts.max())
+        except Exception:
+            return rows, None, None
+
+    return rows, min_ts, max_ts
+
+
+class PartitionCatalog:
+    """
+    On-disk catalog of all parquet files under a market data directory.
+
+    The catalog is built once and refreshed incrementally: only hour
+    directories whose mtime changed since the last refresh (new hours and the
+    hour the collector is still writing into) are listed and their new files
+    read. Unchanged hours are carried over from the previous catalog as-is,
+    except hours that were still live at the last refresh: a file being
+    written then doesn't change its directory's mtime when it is finished,
+    so those hours are listed again and files whose size or mtime changed
+    are re-read.
+
+    Instances only hold paths, so they are cheap to pickle into worker tasks.
+    """
+
+    def __init__(self, data_path: str, catalog_path: Optional[str] = None):
+        self.data_path = str(data_path)
+        if catalog_path is None:
+            catalog_path = Path(data_path) / ANALYZER_DIRNAME / CATALOG_FILENAME
+        self.catalog_path = str(catalog_path)
+
+    def exists(self) -> bool:
+        """Check whether the catalog file has been built."""
+        return Path(self.catalog_path).exists()
+
+    def load(self) -> Optional[pl.DataFrame]:
+        """
+        Load the catalog table.
+
+        Returns:
+            Catalog DataFrame, or None if it doesn't exist or has an outdated schema
+        """
+        if not self.exists():
+            return None
+        try:
+            df = pl.read_parquet(self.catalog_path)
+        except Exception:
+            return None
+        if dict(df.schema) != CATALOG_SCHEMA:
+            return None
+        return df
+
+    def scan(self) -> pl.LazyFrame:
+        """Lazily scan the catalog file (predicates are pushed into the read)."""
+        return pl.scan_parquet(self.catalog_path)
+
+    def refresh(self, full: bool = False) -> pl.DataFrame:
+        """
+        Bring the catalog up to date with the data directory and persist it.
+
+        Args:
+            full: Ignore the existing catalog and re-read every file
+
+        Returns:
+            The refreshed catalog DataFrame
+        """
+        started_ns = time.time_ns()
+        previous = None if full else self.load()
+        if previous is None:
+            previous = pl.DataFrame(schema=CATALOG_SCHEMA)
+            # Stamped with the scan start of the refresh that wrote it (see _write)
+            previous_ns = None
+        else:
+            previous_ns = os.stat(self.catalog_path).st_mtime_ns
+
+        known_dirs: Dict[Tuple[str, str, str, int], int] = {
+            (row[0], row[1], row[2], row[3]): row[4]
+            for row in previous.select(PARTITION_KEYS + ['dir_mtime_ns']).unique().iter_rows()
+        }
+
+        unchanged: List[Tuple[str, str, str, int]] = []
+        changed: List[Tuple[str, str, str, int, str, int]] = []
+        date_files = []
+
+        base = Path(self.data_path)
+        if base.exists():
+            for ex_item in os.scandir(base):
+                exchange = _partition_value(ex_item.name, 'exchange=')
+                if exchange is None or not ex_item.is_dir():
+                    continue
+                for sym_item in os.scandir(ex_item.path):
+                    symbol = _partition_value(sym_item.name, 'symbol=')
+                    if symbol is None or not sym_item.is_dir():
+                        continue
+                    for date_item in os.scandir(sym_item.path):
+                        date = _partition_value(date_item.name, 'date=')
+                        if date is None or not date_item.is_dir():
+                            continue
+                        for hour_item in os.scandir(date_item.path):
+                            if hour_item.name.endswith('.parquet') and hour_item.is_file():
+                                # Day-level compacted file (lib/compaction.py); few enough to stat every time
+                                date_files.append((exchange, symbol, date, hour_item))
+                                continue
+                            hour_str = _partition_value(hour_item.name, 'hour=')
+                            if hour_str is None or not hour_str.isdigit() or not hour_item.is_dir():
+                                continue
+                            key = (exchange, symbol, date, int(hour_str))
+                            dir_mtime_ns = hour_item.stat().st_mtime_ns
+                            if (known_dirs.get(key) == dir_mtime_ns and
+                                    _hour_live_until_ns(date, key[3]) <= previous_ns):
+                                unchanged.append(key)
+                            else:
+                                changed.append(key + (hour_item.path, dir_mtime_ns))
+
+        keep = previous.join(
+            pl.DataFrame(unchanged, schema={k: CATALOG_SCHEMA[k] for k in PARTITION_KEYS}, orient='row'),
+            on=PARTITION_KEYS,
+            how='semi'
+        )
+
+        # Files in changed directories that were already read keep their stats
+        # as long as size and mtime are unchanged (e.g. the live hour).
+        known_files = {
+            row[0]: row[1:]
+            for row in previous.select(['path', 'size', 'mtime_ns', 'rows', 'min_ts', 'max_ts']).iter_rows()
+        }
+
+        def _file_row(rel_path, file_item, keys, dir_mtime_ns):
+            st = file_item.stat()
+            cached = known_files.get(rel_path)
+            if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                rows, min_ts, max_ts = cached[2], cached[3], cached[4]
+            else:
+                rows, min_ts, max_ts = read_file_stats(file_item.path)
+            return (rel_path, *keys, file_kind(file_item.name),
+                    st.st_size, st.st_mtime_ns, dir_mtime_ns, rows, min_ts, max_ts)
+
+        new_rows = []
+        for exchange, symbol, date, hour, dir_path, dir_mtime_ns in changed:
+            for file_item in os.scandir(dir_path):
+                if not file_item.name.endswith('.parquet') or not file_item.is_file():
+                    continue
+                rel_path = f"exchange={exchange}/symbol={symbol}/date={date}/{Path(dir_path).name}/{file_item.name}"
+                new_rows.append(_file_row(rel_path, file_item, (exchange, symbol, date, hour), dir_mtime_ns))
+
+        for exchange, symbol, date, file_item in date_files:
+            rel_path = f"exchange={exchange}/symbol={symbol}/date={date}/{file_item.name}"
+            new_rows.append(_file_row(rel_path, file_item, (exchange, symbol, date, None), None))
+
+        catalog = pl.concat([
+            keep,
+            pl.DataFrame(new_rows, schema=CATALOG_SCHEMA, orient='row')
+        ]).sort('path')
+
+        self._write(catalog, started_ns)
+        return catalog
+
+    def _write(self, catalog: pl.DataFrame, scanned_ns: int) -> None:
+        """
+        Write the catalog atomically (readers never see a partial file).
+
+        The file's mtime is set to scanned_ns, the time the directory walk
+        started, so the next refresh knows which hours were live during it.
+        """
+        target = Path(self.catalog_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        catalog.write_parquet(tmp)
+        os.utime(tmp, ns=(scanned_ns, scanned_ns))
+        os.replace(tmp, target)
+
+    def symbols(self) -> Dict[str, Set[str]]:
+        """
+        Map raw symbol directory names to the exchanges that have files for them.
+
+        Returns:
+            Dictionary like {'VIRTUAL_USDT': {'Binance', 'Bybit'}}
+        """
+        symbol_map: Dict[str, Set[str]] = {}
+        pairs = self.scan().select(['symbol', 'exchange']).unique().collect()
+        for symbol, exchange in pairs.iter_rows():
+            symbol_map.setdefault(symbol, set()).add(exchange)
+        return symbol_map
+
+    def entries(
+        self,
+        exchange: str,
+        symbol_dirs: Sequence[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        kind: Optional[str] = None
+    ) -> pl.DataFrame:
+        """
+        Catalog rows for (exchange, symbol) with absolute paths.
+
+        Args:
+            exchange: Exchange name
+            symbol_dirs: Candidate symbol directory names in priority order;
+                the first one with any files is used
+            start_date: Start date filter (YYYY-MM-DD), inclusive
+            end_date: End date filter (YYYY-MM-DD), inclusive
+            kind: Only files of this kind ('spreads' or 'trades'); None = all
+
+        Returns:
+            DataFrame with ENTRY_COLUMNS ordered by date, hour and file name
+        """
+        query = self.scan().filter(
+            (pl.col('exchange') == exchange) &
+            pl.col('symbol').is_in(list(symbol_dirs))
+        )
+        if start_date:
+            query = query.filter(pl.col('date') >= start_date)
+        if end_date:
+            query = query.filter(pl.col('date') <= end_date)
+        if kind:
+            query = query.filter(pl.col('kind') == kind)
+
+        entries = query.select(['symbol'] + ENTRY_COLUMNS).collect()
+        if entries.is_empty():
+            return entries.drop('symbol')
+
+        present = set(entries['symbol'].unique().to_list())
+        symbol_dir = next(s for s in symbol_dirs if s in present)
+
+        prefix = str(Path(self.data_path)) + os.sep
+        return entries \
+            .filter(pl.col('symbol') == symbol_dir) \
+            .drop('symbol') \
+            .sort('path') \
+            .with_columns(
+                (pl.lit(prefix) + pl.col('path').str.replace_all('/', os.sep, literal=True)).alias('path')
+            )
+
+    def files(
+        self,
+        exchange: str,
+        symbol_dirs: Sequence[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        kind: Optional[str] = None
+    ) -> List[str]:
+        """
+        List parquet files for (exchange, symbol) from the catalog.
+
+        Same arguments as entries().
+
+        Returns:
+            Absolute file paths ordered by date, hour and file name
+        """
+        return self.entries(exchange, symbol_dirs, start_date, end_date, kind)['path'].to_list()
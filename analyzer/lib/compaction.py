@@ -0,0 +1,266 @@
+"""
+Compaction of closed collector partitions.
+
+The collector flushes many small spreads-mm-ss.fffffff.parquet files per hour
+directory. Once an hour (or a whole day) is closed, its spreads files are
+rewritten into a single timestamp-sorted file with Float64 prices and sized
+row groups. The loader prefers compacted files and keeps reading the raw
+flush files of live partitions.
+
+A compacted file records in its parquet metadata the newest mtime of the
+sources it was built from, as listed. A flush that lands in the partition
+after the listing is newer than that and stays visible until the next
+compaction folds it in.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import polars as pl
+import polars.selectors as cs
+import pyarrow.parquet as pq
+
+from .catalog import DEFAULT_GRACE_MINUTES, FILE_KIND_SPREADS, file_kind
+
+
+COMPACTED_FILENAME = 'spreads-compacted.parquet'
+
+# Parquet metadata of a compacted file: mtime_ns of its newest source as
+# listed, and the sources with exactly that mtime (paths relative to the
+# compacted file's directory), which tell them apart from a late flush
+# within the same clock tick
+THROUGH_KEY = b'compacted_through_ns'
+THROUGH_SOURCES_KEY = b'compacted_through_sources'
+DEFAULT_ROW_GROUP_SIZE = 500_000
+
+
+def is_spreads_file(name: str) -> bool:
+    """Check whether a file holds spreads (see catalog.file_kind)."""
+    return name.endswith('.parquet') and file_kind(name) == FILE_KIND_SPREADS
+
+
+def compacted_through(path) -> Optional[Tuple[int, Set[str]]]:
+    """
+    Newest source mtime_ns recorded in a compacted file, and the sources with that mtime.
+
+    Returns:
+        (mtime_ns, relative source paths), or None for a file compacted
+        without the record or one that can't be read
+    """
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except Exception:
+        return None
+    if THROUGH_KEY not in metadata:
+        return None
+    return int(metadata[THROUGH_KEY]), set(json.loads(metadata.get(THROUGH_SOURCES_KEY, b'[]')))
+
+
+def prefer_compacted(files: Iterable, mtimes: Optional[Sequence[int]] = None) -> List:
+    """
+    Drop raw spreads files superseded by a compacted file.
+
+    A day-level compacted file (date=D/spreads-compacted.parquet) supersedes
+    the spreads files in that date's hour directories; an hour-level one
+    supersedes the other spreads files in its hour. Only files the compacted
+    file was built from are superseded: those not modified after its newest
+    source (compacted_through). A late flush into a compacted partition is
+    kept until the next compaction folds it in. Other files are kept.
+
+    The compacted file's metadata is only read when raw spreads files are
+    next to it, i.e. rarely.
+
+    Args:
+        files: Parquet file paths (str or Path) inside the partition tree
+        mtimes: mtime_ns per file (e.g. catalog entries); None = stat the
+            files (one that no longer exists counts as superseded)
+
+    Returns:
+        The selected files, in their original order and type
+    """
+    files = list(files)
+    paths = [Path(f) for f in files]
+
+    compacted_dirs = {p.parent: k for k, p in enumerate(paths) if p.name == COMPACTED_FILENAME}
+    if not compacted_dirs:
+        return files
+
+    def mtime_ns(k: int) -> int:
+        if mtimes is not None:
+            return mtimes[k]
+        try:
+            return paths[k].stat().st_mtime_ns
+        except OSError:
+            return -1
+
+    records = {}
+
+    def superseded(k: int, c: Optional[int]) -> bool:
+        if c is None:
+            return False
+        if c not in records:
+            records[c] = compacted_through(paths[c])
+        if records[c] is None:
+            # Compacted before sources were recorded: by the file's own mtime
+            return mtime_ns(k) <= mtime_ns(c)
+        through, through_sources = records[c]
+        mtime = mtime_ns(k)
+        return mtime < through or (
+            mtime == through and paths[k].relative_to(paths[c].parent).as_posix() in through_sources
+        )
+
+    selected = []
+    for k, (original, path) in enumerate(zip(files, paths)):
+        if not is_spreads_file(path.name):
+            selected.append(original)
+            continue
+
+        # Compacted file of the same directory, then of the date (day-level)
+        superseding = [compacted_dirs.get(path.parent) if path.name != COMPACTED_FILENAME else None]
+        if path.parent.name.startswith('hour='):
+            superseding.append(compacted_dirs.get(path.parent.parent))
+        if any(superseded(k, c) for c in superseding):
+            continue
+        selected.append(original)
+    return selected
+
+
+def _partition_end(date_str: str, hour: Optional[int]) -> datetime:
+    """End of an hour partition (or of the whole day when hour is None)."""
+    start = datetime.strptime(date_str, '%Y-%m-%d')
+    if hour is None:
+        return start + timedelta(days=1)
+    return start + timedelta(hours=hour + 1)
+
+
+def compact_files(
+    sources: List[Path],
+    target: Path,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    mtimes: Optional[Sequence[int]] = None
+) -> int:
+    """
+    Rewrite spreads files into one sorted Float64 file and swap it in atomically.
+
+    The compacted file is written next to the target and moved into place
+    with os.replace; that rename is the commit point. The loader ignores the
+    raw spreads files it was built from once it exists, so removing the
+    sources afterwards is only cleanup.
+
+    Args:
+        sources: Spreads files to merge (may include an existing compacted file)
+        target: Path of the compacted file
+        row_group_size: Rows per parquet row group
+        mtimes: mtime_ns per source when it was listed (None = stat them now);
+            the newest is recorded as the compacted file's THROUGH_KEY
+
+    Returns:
+        Number of rows written
+    """
+    if mtimes is None:
+        mtimes = [source.stat().st_mtime_ns for source in sources]
+    through = max(mtimes)
+    through_sources = sorted(
+        source.relative_to(target.parent).as_posix() for source, mtime in zip(sources, mtimes) if mtime == through
+    )
+
+    # Per-file scans: an existing compacted file is already Float64 while raw
+    # flush files carry Decimal(28,10), so the schemas must be aligned first
+    frames = [
+        pl.scan_parquet(source).with_columns(cs.decimal().cast(pl.Float64))
+        for source in sources
+    ]
+    df = pl.concat(frames, how='vertical_relaxed').sort('Timestamp').collect()
+
+    table = df.to_arrow().replace_schema_metadata({
+        THROUGH_KEY: str(through).encode(),
+        THROUGH_SOURCES_KEY: json.dumps(through_sources).encode(),
+    })
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp, row_group_size=row_group_size, compression='zstd', write_statistics=True)
+    os.replace(tmp, target)
+
+    for source in sources:
+        if source != target:
+            source.unlink(missing_ok=True)
+
+    return len(df)
+
+
+def _listed_mtimes(sources: List[Path]) -> List[int]:
+    """mtime_ns of just-listed sources; files written after this are not compacted."""
+    return [source.stat().st_mtime_ns for source in sources]
+
+
+def compact_partitions(
+    data_path: str,
+    granularity: str = 'hour',
+    grace_minutes: int = DEFAULT_GRACE_MINUTES,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    exchanges: Optional[List[str]] = None,
+    now: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Compact all closed partitions under the data directory.
+
+    Args:
+        data_path: Path to the market data directory
+        granularity: 'hour' (one file per hour directory) or 'day' (one file per date directory)
+        grace_minutes: Minutes after a partition ends before it counts as closed
+        row_group_size: Rows per parquet row group in compacted files
+        exchanges: Only compact these exchanges (None = all)
+        now: Current UTC time (naive); defaults to the system clock
+
+    Returns:
+        One dict per compacted partition: path, files, rows
+    """
+    if granularity not in ('hour', 'day'):
+        raise ValueError(f"granularity must be 'hour' or 'day', got: {granularity}")
+
+    if now is None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(minutes=grace_minutes)
+
+    base = Path(data_path)
+    if not base.exists():
+        return []
+
+    compacted = []
+    for exchange_dir in sorted(base.glob("exchange=*")):
+        if exchanges and exchange_dir.name.split('=', 1)[1] not in exchanges:
+            continue
+        for date_dir in sorted(exchange_dir.glob("symbol=*/date=*")):
+            date_str = date_dir.name.split('=', 1)[1]
+            hour_dirs = sorted(d for d in date_dir.glob("hour=*") if d.is_dir())
+
+            if granularity == 'day':
+                if _partition_end(date_str, None) > cutoff:
+                    continue
+                sources = [f for d in hour_dirs for f in sorted(d.glob("*.parquet")) if is_spreads_file(f.name)]
+                target = date_dir / COMPACTED_FILENAME
+                if target.exists():
+                    sources.insert(0, target)
+                groups = [(target, sources, _listed_mtimes(sources))]
+            else:
+                groups = []
+                for hour_dir in hour_dirs:
+                    hour = int(hour_dir.name.split('=', 1)[1])
+                    if _partition_end(date_str, hour) > cutoff:
+                        continue
+                    sources = [f for f in sorted(hour_dir.glob("*.parquet")) if is_spreads_file(f.name)]
+                    groups.append((hour_dir / COMPACTED_FILENAME, sources, _listed_mtimes(sources)))
+
+            for target, sources, mtimes in groups:
+                # Nothing to do when the partition is already a single compacted file
+                if not sources or sources == [target]:
+                    continue
+                rows = compact_files(sources, target, row_group_size, mtimes)
+                compacted.append({
+                    'path': str(target),
+                    'files': len(sources),
+                    'rows': rows
+                })
+
+    return compacted
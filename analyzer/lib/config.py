@@ -5,10 +5,12 @@ Loads configuration from config.yaml file.
 """
 
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 from dataclasses import dataclass
 import yaml
 
+from .analysis import DEFAULT_THRESHOLDS
+
 
 @dataclass
 class AnalyzerConfig:
@@ -33,6 +35,63 @@ class AnalyzerConfig:
     start_date: Optional[str]
     end_date: Optional[str]
 
+    # Partition catalog (lib/catalog.py) instead of walking the data tree
+    use_catalog: bool = True
+
+    # Memory-mapped Arrow IPC cache of loaded series (lib/series_cache.py)
+    use_series_cache: bool = True
+
+    # Align all exchanges of a symbol once (lib/alignment.py) instead of
+    # one join_asof per pair
+    symbol_alignment: bool = False
+
+    # Analyze pairs hour by hour with carried state (lib/streaming.py), so
+    # worker memory is bounded by one hour per exchange
+    streaming: bool = False
+
+    # Cache per-hour pair partials (lib/results_cache.py) so repeated runs
+    # only recompute hours whose source files changed; implies streaming
+    use_results_cache: bool = False
+
+    # Resampling grid of the mean-reversion statistics (ADF, half-life,
+    # moments; lib/mean_reversion.py), e.g. "1s"; None = not computed
+    mean_reversion_interval: Optional[str] = None
+
+    # Oldest quote the pair join may match, e.g. "5s"; older (stale) rows
+    # are excluded from all metrics and counted as quote gaps. None = no limit
+    max_quote_age: Optional[str] = None
+
+    # Lead-lag of mid-price returns (lib/lead_lag.py): grid spacing, e.g.
+    # "50ms" (None = not computed), and the largest lag searched
+    lead_lag_interval: Optional[str] = None
+    lead_lag_max_lag: str = "2s"
+
+    # Cycle backtest (lib/backtest.py): taker fees in % per fill by exchange,
+    # fee of unlisted exchanges, slippage in % per fill
+    backtest: bool = False
+    taker_fees: Optional[Dict[str, float]] = None
+    default_taker_fee: float = 0.1
+    slippage: float = 0.0
+
+    # Polars threads per worker (lib/scheduler.py); None = CPUs / workers
+    polars_threads: Optional[int] = None
+
+    # Analyze symbols heavier than a worker's share as pair tasks over
+    # shared memory-mapped frames (lib/shared_frames.py)
+    split_symbols: bool = True
+
+    # Seconds without a heartbeat before a queue worker's symbol is leased
+    # again (lib/work_queue.py)
+    lease_timeout: float = 120.0
+
+    # Pair analysis engine (lib/lazy_engine.py): 'eager' pair by pair or
+    # 'lazy' = all pairs of a symbol in one pl.collect_all
+    engine: str = 'eager'
+
+    # Admit tasks only while their estimated memory fits in this many MB
+    # (lib/memory_budget.py); None = no limit
+    memory_budget_mb: Optional[float] = None
+
 
 def load_config(config_path: Optional[Path] = None) -> AnalyzerConfig:
     """
@@ -63,6 +122,7 @@ def load_config(config_path: Optional[Path] = None) -> AnalyzerConfig:
     analysis = config_data.get('analysis', {})
     performance = config_data.get('performance', {})
     date_range = config_data.get('date_range', {})
+    backtest = config_data.get('backtest', {})
 
     return AnalyzerConfig(
         # Paths
@@ -71,7 +131,7 @@ def load_config(config_path: Optional[Path] = None) -> AnalyzerConfig:
 
         # Analysis parameters
         zero_threshold=analysis.get('zero_threshold', 0.05),
-        thresholds=analysis.get('thresholds', [0.3, 0.5, 0.4]),
+        thresholds=analysis.get('thresholds', list(DEFAULT_THRESHOLDS)),
 
         # Performance
         workers=performance.get('workers'),
@@ -82,7 +142,31 @@ def load_config(config_path: Optional[Path] = None) -> AnalyzerConfig:
 
         # Date range
         start_date=date_range.get('start_date'),
-        end_date=date_range.get('end_date')
+        end_date=date_range.get('end_date'),
+
+        # Catalog
+        use_catalog=performance.get('use_catalog', True),
+        use_series_cache=performance.get('use_series_cache', True),
+        symbol_alignment=performance.get('symbol_alignment', False),
+        streaming=performance.get('streaming', False),
+        use_results_cache=performance.get('use_results_cache', False),
+        mean_reversion_interval=analysis.get('mean_reversion_interval'),
+        max_quote_age=analysis.get('max_quote_age'),
+        lead_lag_interval=analysis.get('lead_lag_interval'),
+        lead_lag_max_lag=analysis.get('lead_lag_max_lag', "2s"),
+
+        # Backtest
+        backtest=backtest.get('enabled', False),
+        taker_fees=backtest.get('taker_fees'),
+        default_taker_fee=backtest.get('default_taker_fee', 0.1),
+        slippage=backtest.get('slippage', 0.0),
+
+        # Scheduler
+        polars_threads=performance.get('polars_threads'),
+        split_symbols=performance.get('split_symbols', True),
+        lease_timeout=performance.get('lease_timeout', 120.0),
+        engine=performance.get('engine', 'eager'),
+        memory_budget_mb=performance.get('memory_budget_mb')
     )
 
 
@@ -97,10 +181,28 @@ def get_default_config() -> AnalyzerConfig:
         data_directory='C:/visual projects/arb1/data/market_data',
         output_directory='C:/visual projects/arb1/analyzer/summary_stats',
         zero_threshold=0.05,
-        thresholds=[0.3, 0.5, 0.4],
+        thresholds=list(DEFAULT_THRESHOLDS),
         workers=None,
         chunk_size=1,
         exchanges=None,
         start_date=None,
-        end_date=None
+        end_date=None,
+        use_catalog=True,
+        use_series_cache=True,
+        symbol_alignment=False,
+        streaming=False,
+        use_results_cache=False,
+        mean_reversion_interval=None,
+        max_quote_age=None,
+        lead_lag_interval=None,
+        lead_lag_max_lag="2s",
+        backtest=False,
+        taker_fees=None,
+        default_taker_fee=0.1,
+        slippage=0.0,
+        polars_threads=None,
+        split_symbols=True,
+        lease_timeout=120.0,
+        engine='eager',
+        memory_budget_mb=None
     )
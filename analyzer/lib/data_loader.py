@@ -2,19 +2,54 @@
 Data loading utilities for market data.
 
 Handles loading parquet files for exchange/symbol pairs with date filtering.
+Spreads and trades files share hour directories but have different schemas,
+so every loader selects only the file kind it can read.
 """
 
 from pathlib import Path
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
 import polars as pl
 
+from .catalog import (
+    CATALOG_SCHEMA, ENTRY_COLUMNS, FILE_KIND_SPREADS, FILE_KIND_TRADES, PartitionCatalog, file_kind
+)
+from .compaction import COMPACTED_FILENAME, prefer_compacted
+from .series_cache import SeriesCache, source_fingerprint
+from .time_window import window_dates
+
+
+# Above this many out-of-order runs a full sort beats the k-way merge
+MAX_MERGE_RUNS = 64
+
+
+def symbol_dir_candidates(symbol: str) -> List[str]:
+    """
+    Candidate symbol directory names for a symbol, in order of likelihood.
+
+    IMPORTANT: Collections saves as "SYMBOL_USDT" format (e.g., "VIRTUAL_USDT")
+    1. SYMBOL_USDT (Collections standard)
+    2. SYMBOL#USDT (legacy format)
+    3. SYMBOLUSDT (no separator)
+    """
+    return [
+        symbol.replace('/', '_'),  # VIRTUAL/USDT -> VIRTUAL_USDT (COLLECTIONS FORMAT)
+        symbol.replace('/', '#'),  # VIRTUAL/USDT -> VIRTUAL#USDT (legacy)
+        symbol.replace('/', '').replace('_', '')  # VIRTUAL/USDT -> VIRTUALUSDT (fallback)
+    ]
+
 
 def load_exchange_symbol_data(
     data_path: str,
     exchange: str,
     symbol: str,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    cache: Optional[SeriesCache] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
 ) -> Optional[pl.DataFrame]:
     """
     Load all data for (exchange, symbol) pair - OPTIMIZED with single scan.
@@ -25,6 +60,12 @@ def load_exchange_symbol_data(
         symbol: Symbol name (e.g., "BTC/USDT")
         start_date: Start date filter (YYYY-MM-DD format), inclusive. If None, no start filter.
         end_date: End date filter (YYYY-MM-DD format), inclusive. If None, no end filter.
+        catalog: Optional partition catalog. When given, the file list comes from
+            the catalog and the directory tree is never walked.
+        cache: Optional Arrow IPC series cache. Closed dates are read from
+            memory-mapped cache files and (re)built when their sources changed.
+        start_time: Window start (naive UTC), inclusive. If None, no start filter.
+        end_time: Window end (naive UTC), exclusive. If None, no end filter.
 
     Returns:
         Polars DataFrame with columns: timestamp, bestBid, bestAsk
@@ -35,35 +76,508 @@ def load_exchange_symbol_data(
         - Filters null values early (filter pushdown optimization)
         - Casts decimals to Float64 for faster calculations
         - Single parquet scan for all files (2-4x faster I/O)
+        - Files are read in partition/flush order, so sorting only touches
+          out-of-order runs (see sort_by_timestamp)
+        - A time window prunes hour directories and files (catalog min/max
+          timestamps) before scanning and pushes the Timestamp predicate into
+          the scan, so row groups outside the window are skipped
+    """
+    start_date, end_date = window_dates(start_date, end_date, start_time, end_time)
+    entries = _find_entries(data_path, exchange, symbol, FILE_KIND_SPREADS, start_date, end_date, catalog)
+
+    # Closed partitions may have been compacted (lib/compaction.py):
+    # read the compacted file instead of the raw flush files it replaced
+    if not entries.is_empty():
+        entries = _prefer_compacted(entries)
+
+    if entries.is_empty():
+        return None
+
+    try:
+        if cache is None:
+            in_window = _prune_to_window(entries, start_time, end_time)
+            if in_window.is_empty():
+                return None
+            df = sort_by_timestamp(_read_spreads(in_window['path'].to_list(), start_time, end_time))
+        else:
+            df = _read_spreads_cached(entries, exchange, cache, start_time, end_time)
+
+        return df if not df.is_empty() else None
+    except Exception as e:
+        print(f"WARNING: Failed to load spreads for {exchange} {symbol}: {e}")
+        return None
+
+
+def plan_exchange_symbol_hours(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> List[Tuple[datetime, datetime, datetime, pl.DataFrame]]:
+    """
+    Hours of (exchange, symbol) spreads that may hold rows, without reading them.
+
+    Hour directories map to their hour; day-level files (compacted or flat)
+    to every hour of their day. Hours are clipped to the time window.
+
+    Returns:
+        (hour start, window start, window end, file entries) per hour in time
+        order; the window is the hour unless the time window cuts into it
+    """
+    start_date, end_date = window_dates(start_date, end_date, start_time, end_time)
+    entries = _find_entries(data_path, exchange, symbol, FILE_KIND_SPREADS, start_date, end_date, catalog)
+    if not entries.is_empty():
+        entries = _prefer_compacted(entries)
+    entries = _prune_to_window(entries, start_time, end_time)
+
+    hours = set()
+    for date, hour in entries.select(['date', 'hour']).unique().iter_rows():
+        day_start = datetime.strptime(date, '%Y-%m-%d')
+        candidates = range(24) if hour is None else [hour]
+        hours.update(day_start + timedelta(hours=h) for h in candidates)
+
+    plan = []
+    for hour_start in sorted(hours):
+        lo = hour_start if start_time is None else max(hour_start, start_time)
+        hi = hour_start + timedelta(hours=1)
+        hi = hi if end_time is None else min(hi, end_time)
+        if lo >= hi:
+            continue
+        in_hour = _prune_to_window(entries, lo, hi)
+        if not in_hour.is_empty():
+            plan.append((hour_start, lo, hi, in_hour))
+    return plan
+
+
+def exchange_symbol_size(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> Tuple[int, Optional[int]]:
+    """
+    On-disk size of the (exchange, symbol) spreads a load would read, without reading them.
+
+    Same file selection as load_exchange_symbol_data (compacted files
+    preferred, pruned to the time window).
+
+    Returns:
+        (bytes, rows). rows is None unless the catalog knows the row count
+        of every file (it doesn't without a catalog).
+    """
+    start_date, end_date = window_dates(start_date, end_date, start_time, end_time)
+    entries = _find_entries(data_path, exchange, symbol, FILE_KIND_SPREADS, start_date, end_date, catalog)
+    if not entries.is_empty():
+        entries = _prefer_compacted(entries)
+    entries = _prune_to_window(entries, start_time, end_time)
+
+    if entries.is_empty():
+        return 0, 0
+    rows = None if entries['rows'].null_count() else int(entries['rows'].sum())
+    return int(entries['size'].sum()), rows
+
+
+def load_spreads_hour(
+    entries: pl.DataFrame,
+    start_time: datetime,
+    end_time: datetime
+) -> Optional[pl.DataFrame]:
+    """
+    Read one planned hour (see plan_exchange_symbol_hours).
+
+    Returns:
+        Sorted DataFrame (timestamp, bestBid, bestAsk) of [start_time, end_time),
+        or None if it holds no rows
+
+    Raises:
+        Exception: Whatever reading the files raised
+    """
+    df = sort_by_timestamp(_read_spreads(entries['path'].to_list(), start_time, end_time))
+    return df if not df.is_empty() else None
+
+
+def iter_exchange_symbol_hours(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> Iterator[Tuple[datetime, pl.DataFrame]]:
+    """
+    Stream (exchange, symbol) spreads one hour at a time, in time order.
+
+    Same files, filters and output columns as load_exchange_symbol_data, but
+    only one hour is in memory at a time: hour directories are read on their
+    own, and day-level files (compacted or flat) once per hour with the hour
+    pushed into the scan as a Timestamp predicate.
+
+    Yields:
+        (hour start, sorted non-empty DataFrame of that hour); an hour that
+        fails to load is reported and skipped
+    """
+    for hour_start, lo, hi, entries in plan_exchange_symbol_hours(
+            data_path, exchange, symbol, start_date, end_date, catalog, start_time, end_time):
+        try:
+            df = load_spreads_hour(entries, lo, hi)
+        except Exception as e:
+            print(f"WARNING: Failed to load spreads for {exchange} {symbol} at {hour_start}: {e}")
+            continue
+        if df is not None:
+            yield hour_start, df
+
+
+def _read_spreads(
+    all_files: List,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> pl.DataFrame:
+    """Read spreads files into (timestamp, bestBid, bestAsk) in file order, without sorting."""
+    # Single scan per run of same-format files (much faster than one scan per
+    # file). Compacted files store Float64 prices while raw flush files carry
+    # Decimal(28,10), so they can't share a scan; runs keep the file order.
+    runs = []
+    for f in all_files:
+        is_compacted = Path(f).name == COMPACTED_FILENAME
+        if runs and runs[-1][0] == is_compacted:
+            runs[-1][1].append(f)
+        else:
+            runs.append((is_compacted, [f]))
+
+    scans = [
+        _filter_window(pl.scan_parquet(files), 'Timestamp', start_time, end_time)
+        .select(['Timestamp', 'BestBid', 'BestAsk'])
+        .with_columns([
+            pl.col('BestBid').cast(pl.Float64),
+            pl.col('BestAsk').cast(pl.Float64)
+        ])
+        for _, files in runs
+    ]
+
+    return pl.concat(scans, how='vertical_relaxed') \
+        .rename({
+            'Timestamp': 'timestamp',
+            'BestBid': 'bestBid',
+            'BestAsk': 'bestAsk'
+        }) \
+        .filter(
+            pl.col('bestBid').is_not_null() &
+            pl.col('bestAsk').is_not_null()
+        ) \
+        .collect()
+
+
+def sort_by_timestamp(df: pl.DataFrame, max_merge_runs: int = MAX_MERGE_RUNS) -> pl.DataFrame:
+    """
+    Sort a frame read in partition/flush order, exploiting existing order.
+
+    Files are read ordered by date, hour and flush time, and each flush is
+    already time-ordered, so the frame is usually sorted or a concatenation
+    of a few sorted runs. One vectorized pass finds the run boundaries:
+    - no boundary: nothing to sort
+    - up to max_merge_runs runs: k-way merge of the runs (O(n log k))
+    - otherwise: full sort
+
+    The result is flagged as sorted so downstream join_asof doesn't re-check it.
+
+    Args:
+        df: Frame with a 'timestamp' column
+        max_merge_runs: Run count above which a full sort is cheaper
+
+    Returns:
+        Frame sorted by timestamp with the sorted flag set
+    """
+    if df.height < 2:
+        return df.set_sorted('timestamp')
+
+    ts = df['timestamp'].to_physical().to_numpy()
+    breaks = np.flatnonzero(ts[1:] < ts[:-1]) + 1
+    if len(breaks) == 0:
+        return df.set_sorted('timestamp')
+
+    if len(breaks) + 1 > max_merge_runs:
+        return df.sort('timestamp')
+
+    bounds = [0, *breaks.tolist(), df.height]
+    runs = [
+        df.slice(start, end - start).set_sorted('timestamp')
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+    # Pairwise tree merge: every row takes part in log2(k) merges
+    while len(runs) > 1:
+        merged = [
+            runs[i].merge_sorted(runs[i + 1], key='timestamp')
+            for i in range(0, len(runs) - 1, 2)
+        ]
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+
+    return runs[0].rechunk().set_sorted('timestamp')
+
+
+def _read_spreads_cached(
+    entries: pl.DataFrame,
+    exchange: str,
+    cache: SeriesCache,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> pl.DataFrame:
+    """
+    Read spreads date by date through the series cache.
+
+    Cache files always hold whole days; a time window slices them. A day the
+    window only partly covers is read from its pruned files on a miss and not
+    written to the cache.
+    """
+    symbol_dir = next(
+        part.split('=', 1)[1] for part in Path(entries['path'][0]).parts if part.startswith('symbol=')
+    )
+
+    frames = []
+    for (date,), date_entries in entries.group_by(['date'], maintain_order=True):
+        fingerprint = source_fingerprint(date_entries)
+        path = cache.path_for(exchange, symbol_dir, date)
+
+        df = cache.read(path, fingerprint)
+        if df is not None:
+            df = _slice_window(df, start_time, end_time)
+        elif _covers_date(date, start_time, end_time):
+            df = sort_by_timestamp(_read_spreads(date_entries['path'].to_list()))
+            if not cache.is_live(date) and not df.is_empty():
+                # The data is loaded either way; a failed write only costs the next run a re-read
+                try:
+                    cache.write(path, df, fingerprint)
+                except OSError as e:
+                    print(f"WARNING: Failed to cache {exchange} {symbol_dir} {date}: {e}")
+        else:
+            in_window = _prune_to_window(date_entries, start_time, end_time)
+            if in_window.is_empty():
+                continue
+            df = sort_by_timestamp(_read_spreads(in_window['path'].to_list(), start_time, end_time))
+        frames.append(df)
+
+    if not frames:
+        return pl.DataFrame(schema={'timestamp': pl.Datetime, 'bestBid': pl.Float64, 'bestAsk': pl.Float64})
+
+    # Dates are disjoint and ascending, so the concatenation stays sorted
+    return pl.concat(frames, rechunk=False).set_sorted('timestamp')
+
+
+def _covers_date(date: str, start_time: Optional[datetime], end_time: Optional[datetime]) -> bool:
+    """Check whether a time window contains the whole day."""
+    day_start = datetime.strptime(date, '%Y-%m-%d')
+    return (start_time is None or start_time <= day_start) and \
+        (end_time is None or end_time >= day_start + timedelta(days=1))
+
+
+def _prune_to_window(
+    entries: pl.DataFrame,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime]
+) -> pl.DataFrame:
+    """
+    Drop files that can't hold rows inside [start_time, end_time).
+
+    Hour directories are pruned by their partition interval (the collector
+    partitions by the row timestamp, so it is exact). Files with catalog
+    statistics are additionally pruned by their min/max Timestamp.
+    """
+    if start_time is None and end_time is None:
+        return entries
+
+    part_start = pl.col('date').str.to_datetime('%Y-%m-%d', time_unit='us') + \
+        pl.duration(hours=pl.col('hour').fill_null(0))
+    part_end = part_start + pl.when(pl.col('hour').is_null()) \
+        .then(pl.duration(days=1)).otherwise(pl.duration(hours=1))
+
+    keep = pl.lit(True)
+    if start_time is not None:
+        keep = keep & (part_end > start_time) & \
+            (pl.col('max_ts').is_null() | (pl.col('max_ts') >= start_time))
+    if end_time is not None:
+        keep = keep & (part_start < end_time) & \
+            (pl.col('min_ts').is_null() | (pl.col('min_ts') < end_time))
+    return entries.filter(keep)
+
+
+def _window_bound(value: datetime, dtype: pl.DataType) -> datetime:
+    """Match a naive UTC bound to a Timestamp column that may carry a time zone."""
+    if getattr(dtype, 'time_zone', None):
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _filter_window(
+    scan: pl.LazyFrame,
+    column: str,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime]
+) -> pl.LazyFrame:
+    """Push a [start_time, end_time) predicate on `column` into a parquet scan."""
+    if start_time is None and end_time is None:
+        return scan
+    dtype = scan.collect_schema()[column]
+    if start_time is not None:
+        scan = scan.filter(pl.col(column) >= _window_bound(start_time, dtype))
+    if end_time is not None:
+        scan = scan.filter(pl.col(column) < _window_bound(end_time, dtype))
+    return scan
+
+
+def _slice_window(
+    df: pl.DataFrame,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime]
+) -> pl.DataFrame:
+    """Zero-copy slice of a timestamp-sorted frame to [start_time, end_time)."""
+    if start_time is None and end_time is None:
+        return df
+    ts = df['timestamp']
+    lo = 0 if start_time is None else ts.search_sorted(_window_bound(start_time, ts.dtype), side='left')
+    hi = len(df) if end_time is None else ts.search_sorted(_window_bound(end_time, ts.dtype), side='left')
+    return df.slice(lo, max(hi - lo, 0))
+
+
+def load_exchange_symbol_trades(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> Optional[pl.DataFrame]:
+    """
+    Load all trades for (exchange, symbol) pair with a single scan.
+
+    Reads only the trades-*.parquet files the collector writes next to the
+    spreads files; date and time window filtering and catalog usage work
+    exactly like load_exchange_symbol_data.
+
+    Args:
+        data_path: Base path to market data
+        exchange: Exchange name (e.g., "Binance", "Bybit")
+        symbol: Symbol name (e.g., "BTC/USDT")
+        start_date: Start date filter (YYYY-MM-DD format), inclusive. If None, no start filter.
+        end_date: End date filter (YYYY-MM-DD format), inclusive. If None, no end filter.
+        catalog: Optional partition catalog (see load_exchange_symbol_data)
+        start_time: Window start (naive UTC), inclusive. If None, no start filter.
+        end_time: Window end (naive UTC), exclusive. If None, no end filter.
+
+    Returns:
+        Polars DataFrame with columns: timestamp, price, quantity, side
+        Or None if no data found
+    """
+    start_date, end_date = window_dates(start_date, end_date, start_time, end_time)
+    entries = _find_entries(data_path, exchange, symbol, FILE_KIND_TRADES, start_date, end_date, catalog)
+    entries = _prune_to_window(entries, start_time, end_time)
+    if entries.is_empty():
+        return None
+    all_files = entries['path'].to_list()
+
+    try:
+        df = _filter_window(pl.scan_parquet(all_files), 'Timestamp', start_time, end_time) \
+            .select(['Timestamp', 'Price', 'Quantity', 'Side']) \
+            .rename({
+                'Timestamp': 'timestamp',
+                'Price': 'price',
+                'Quantity': 'quantity',
+                'Side': 'side'
+            }) \
+            .with_columns([
+                pl.col('price').cast(pl.Float64),
+                pl.col('quantity').cast(pl.Float64)
+            ]) \
+            .filter(
+                pl.col('price').is_not_null() &
+                pl.col('quantity').is_not_null()
+            ) \
+            .collect()
+        df = sort_by_timestamp(df)
+
+        return df if not df.is_empty() else None
+    except Exception as e:
+        print(f"WARNING: Failed to load trades for {exchange} {symbol}: {e}")
+        return None
+
+
+def _prefer_compacted(entries: pl.DataFrame) -> pl.DataFrame:
+    """Entries without the raw spreads files a compacted file supersedes (see prefer_compacted)."""
+    selected = prefer_compacted(entries['path'].to_list(), entries['mtime_ns'].to_list())
+    return entries.filter(pl.col('path').is_in(selected))
+
+
+def _find_entries(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    kind: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None
+) -> pl.DataFrame:
+    """
+    File entries of one kind for (exchange, symbol), from the catalog if available.
+
+    Returns:
+        DataFrame with catalog ENTRY_COLUMNS, ordered by path. Without a
+        catalog the files are stat-ed and rows/min_ts/max_ts are null.
     """
+    if catalog is not None:
+        return catalog.entries(exchange, symbol_dir_candidates(symbol), start_date, end_date, kind=kind)
+
+    rows = []
+    for f in _collect_files(data_path, exchange, symbol, start_date, end_date):
+        if file_kind(f.name) != kind:
+            continue
+        in_hour = f.parent.name.startswith('hour=')
+        date_dir = f.parent.parent if in_hour else f.parent
+        hour = int(f.parent.name.split('=', 1)[1]) if in_hour else None
+        st = f.stat()
+        rows.append((str(f), date_dir.name.split('=', 1)[1], hour, st.st_size, st.st_mtime_ns, None, None, None))
+
+    schema = {col: CATALOG_SCHEMA[col] for col in ENTRY_COLUMNS}
+    return pl.DataFrame(rows, schema=schema, orient='row').sort('path')
+
+
+def _collect_files(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> List[Path]:
+    """Walk the partition tree for (exchange, symbol) and collect parquet files."""
     import os
 
     base_path = Path(data_path)
     exchange_path = base_path / f"exchange={exchange}"
 
     if not exchange_path.exists():
-        return None
-
-    # IMPORTANT: Collections saves as "SYMBOL_USDT" format (e.g., "VIRTUAL_USDT")
-    # Try formats in order of likelihood:
-    # 1. SYMBOL_USDT (Collections standard)
-    # 2. SYMBOL#USDT (legacy format)
-    # 3. SYMBOLUSDT (no separator)
-    symbol_formats = [
-        symbol.replace('/', '_'),  # VIRTUAL/USDT -> VIRTUAL_USDT (COLLECTIONS FORMAT)
-        symbol.replace('/', '#'),  # VIRTUAL/USDT -> VIRTUAL#USDT (legacy)
-        symbol.replace('/', '').replace('_', '')  # VIRTUAL/USDT -> VIRTUALUSDT (fallback)
-    ]
+        return []
 
     symbol_path = None
-    for fmt in symbol_formats:
+    for fmt in symbol_dir_candidates(symbol):
         candidate = exchange_path / f"symbol={fmt}"
         if candidate.exists():
             symbol_path = candidate
             break
 
     if symbol_path is None:
-        return None
+        return []
 
     # OPTIMIZATION #8: Single parquet scan for ALL dates (2-4x faster I/O)
     # Now supports date filtering with improved file collection
@@ -77,13 +591,14 @@ def load_exchange_symbol_data(
                     available_dates.append(date_str)
 
         if not available_dates:
-            return None
+            return []
 
         # Collect ALL parquet files for the filtered dates (single scan approach)
         all_files = []
         for date in available_dates:
             date_path = symbol_path / f"date={date}"
             if date_path.exists():
+                all_files.extend(date_path.glob("*.parquet"))
                 for hour_dir in date_path.glob("hour=*"):
                     if hour_dir.is_dir():
                         all_files.extend(hour_dir.glob("*.parquet"))
@@ -92,33 +607,9 @@ def load_exchange_symbol_data(
         all_files = []
         for date_dir in symbol_path.glob("date=*"):
             if date_dir.is_dir():
+                all_files.extend(date_dir.glob("*.parquet"))
                 for hour_dir in date_dir.glob("hour=*"):
                     if hour_dir.is_dir():
                         all_files.extend(hour_dir.glob("*.parquet"))
 
-    if not all_files:
-        return None
-
-    # Single scan for ALL collected files (much faster than multiple scans)
-    try:
-        df = pl.scan_parquet(all_files) \
-            .select(['Timestamp', 'BestBid', 'BestAsk']) \
-            .rename({
-                'Timestamp': 'timestamp',
-                'BestBid': 'bestBid',
-                'BestAsk': 'bestAsk'
-            }) \
-            .with_columns([
-                pl.col('bestBid').cast(pl.Float64),
-                pl.col('bestAsk').cast(pl.Float64)
-            ]) \
-            .filter(
-                pl.col('bestBid').is_not_null() &
-                pl.col('bestAsk').is_not_null()
-            ) \
-            .collect() \
-            .sort('timestamp')
-
-        return df if not df.is_empty() else None
-    except Exception:
-        return None
+    return all_files
@@ -7,15 +7,34 @@ Scans the data directory and builds a map of symbols to exchanges.
 import os
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 
+from .catalog import PartitionCatalog
 
-def discover_data(data_path: str) -> Dict[str, Set[str]]:
+
+def normalize_symbol(raw_symbol: str) -> str:
+    """
+    Convert a symbol directory name back to the canonical "BASE/QUOTE" form.
+
+    Collections saves as "VIRTUAL_USDT", we convert back to "VIRTUAL/USDT".
+    """
+    if '_USDT' in raw_symbol:
+        return raw_symbol.replace('_USDT', '/USDT')
+    elif '_USDC' in raw_symbol:
+        return raw_symbol.replace('_USDC', '/USDC')
+    else:
+        # Fallback: legacy format with # separator
+        return raw_symbol.replace('#', '/')
+
+
+def discover_data(data_path: str, catalog: Optional[PartitionCatalog] = None) -> Dict[str, Set[str]]:
     """
     Scan data directory and group symbols by exchanges.
 
     Args:
         data_path: Path to the market data directory
+        catalog: Optional partition catalog. When given, symbols are read from
+            the catalog instead of walking the directory tree.
 
     Returns:
         Dictionary mapping symbol names to sets of exchange names.
@@ -34,26 +53,20 @@ def discover_data(data_path: str) -> Dict[str, Set[str]]:
         print(f"ERROR: Data path does not exist: {data_path}")
         return {}
 
-    for item in os.scandir(data_path):
-        if item.is_dir() and item.name.startswith('exchange='):
-            exchange_name = item.name.split('=')[1]
-            exchange_path = Path(item.path)
-
-            for symbol_item in os.scandir(exchange_path):
-                if symbol_item.is_dir() and symbol_item.name.startswith('symbol='):
-                    # Collections saves as "VIRTUAL_USDT", we convert back to "VIRTUAL/USDT"
-                    raw_symbol = symbol_item.name.split('=')[1]
-                    
-                    # Convert SYMBOL_USDT -> SYMBOL/USDT for consistency
-                    if '_USDT' in raw_symbol:
-                        symbol_name = raw_symbol.replace('_USDT', '/USDT')
-                    elif '_USDC' in raw_symbol:
-                        symbol_name = raw_symbol.replace('_USDC', '/USDC')
-                    else:
-                        # Fallback: legacy format with # separator
-                        symbol_name = raw_symbol.replace('#', '/')
-                    
-                    symbol_map[symbol_name].add(exchange_name)
+    if catalog is not None:
+        # Catalog knows every (exchange, symbol) with files - no directory walk
+        for raw_symbol, exchanges in catalog.symbols().items():
+            symbol_map[normalize_symbol(raw_symbol)].update(exchanges)
+    else:
+        for item in os.scandir(data_path):
+            if item.is_dir() and item.name.startswith('exchange='):
+                exchange_name = item.name.split('=')[1]
+                exchange_path = Path(item.path)
+
+                for symbol_item in os.scandir(exchange_path):
+                    if symbol_item.is_dir() and symbol_item.name.startswith('symbol='):
+                        raw_symbol = symbol_item.name.split('=')[1]
+                        symbol_map[normalize_symbol(raw_symbol)].add(exchange_name)
 
     print("--- Discovery Complete ---")
     valid_symbols = {s: e for s, e in symbol_map.items() if len(e) >= 2}
@@ -0,0 +1,146 @@
+"""
+Lazy engine: all pairs of a symbol as one Polars query batch.
+
+The eager path joins each pair into a DataFrame and then makes several
+passes over it (max/min/mean, zero crossings, threshold flags, time above,
+direction flags), materializing an intermediate frame per pass and copying
+the flags to NumPy for the cycle kernel. Here every pair is a LazyFrame
+(as-of join, deviation) with a single select of all its metrics, and the
+queries of all pairs are evaluated together by one pl.collect_all. Polars
+fuses each select into one pass over the join, shares repeated
+sub-expressions (|deviation|, the edges) and runs the pairs in parallel;
+only one row per pair is materialized.
+
+Complete cycles are counted in the query too, with the same rule as
+find_complete_cycles: among the rows that are above threshold or neutral
+(events), a cycle ends at every neutral event whose previous event was
+above.
+
+Covers the default metrics and max_quote_age (quote gaps); the other
+options need the materialized join and use the eager path.
+"""
+
+import polars as pl
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .analysis import (
+    DEFAULT_THRESHOLDS, PAIR_SERIES, assemble_metrics, pair_aggregate_exprs, pair_aggregate_values, with_deviation
+)
+
+
+ENGINES = ('eager', 'lazy')
+
+
+def pair_deviation_lazy(
+    data1: pl.LazyFrame,
+    data2: pl.LazyFrame,
+    max_quote_age: Optional[timedelta] = None
+) -> pl.LazyFrame:
+    """
+    Lazy counterpart of pair_deviation: as-of join of two exchanges plus ratio and deviation (%).
+
+    Args:
+        data1: First exchange (columns: timestamp, bestBid, bestAsk), sorted by timestamp
+        data2: Second exchange, same columns
+        max_quote_age: Oldest ex2 quote a row may be matched with; None = no limit
+    """
+    if max_quote_age is not None:
+        data2 = data2.with_columns(pl.col('timestamp').alias('timestamp_ex2'))
+
+    joined = data1.rename({'bestBid': 'bid_ex1', 'bestAsk': 'ask_ex1'}).join_asof(
+        data2.rename({'bestBid': 'bid_ex2', 'bestAsk': 'ask_ex2'}),
+        on='timestamp'
+    )
+    return with_deviation(joined, max_quote_age)
+
+
+def _cycles(above: pl.Expr, neutral: pl.Expr) -> pl.Expr:
+    """Complete cycles of an above/neutral flag pair (find_complete_cycles in one expression)."""
+    is_above = above.filter(above | neutral)
+    return (~is_above & is_above.shift(1, fill_value=False)).sum()
+
+
+def pair_query(
+    joined: pl.LazyFrame,
+    thresholds: List[float],
+    zero_threshold: float,
+    stale: bool = False
+) -> pl.LazyFrame:
+    """
+    One-row query with every raw aggregate assemble_metrics takes (pair_aggregates, lazily).
+
+    Args:
+        joined: Output of pair_deviation_lazy
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+        stale: Add quote-gap aggregates (joined built with max_quote_age)
+    """
+    aggregates, flags = pair_aggregate_exprs(thresholds, zero_threshold)
+    for name, (above, neutral) in flags.items():
+        aggregates.extend(_cycles(flag, neutral).alias(f'cycles_{name}_{k}') for k, flag in enumerate(above))
+
+    if stale:
+        flag = pl.col('stale')
+        aggregates.extend([
+            (flag & ~flag.shift(1, fill_value=False)).sum().alias('stale_gaps'),
+            flag.sum().alias('stale_rows'),
+            pl.when(flag).then(pl.col('timestamp').diff().shift(-1)).otherwise(None)
+            .dt.total_microseconds().sum().alias('stale_time_us'),
+        ])
+
+    return joined.select(aggregates)
+
+
+def pair_metrics(row: Dict[str, Any], thresholds: List[float]) -> Optional[Dict[str, Any]]:
+    """
+    Metrics of one pair from its collected pair_query row.
+
+    Returns:
+        Same keys, order and values as analyze_joined, or None for an empty join
+    """
+    aggregates = pair_aggregate_values(row, thresholds)
+    aggregates['cycles'] = {
+        name: [row[f'cycles_{name}_{k}'] for k in range(len(thresholds))] for name in PAIR_SERIES
+    }
+    if 'stale_gaps' in row:
+        aggregates.update({
+            'stale_gaps': int(row['stale_gaps']),
+            'stale_rows': int(row['stale_rows']),
+            'stale_time_sec': (row['stale_time_us'] or 0) / 10**6,
+        })
+    return assemble_metrics(aggregates, thresholds)
+
+
+def analyze_pairs_lazy(
+    exchange_data: Dict[str, pl.DataFrame],
+    pairs: Iterable[Tuple[str, str]],
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05,
+    max_quote_age: Optional[timedelta] = None
+) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+    """
+    Analyze pairs of loaded exchanges with one pl.collect_all.
+
+    Args:
+        exchange_data: Exchange -> DataFrame (timestamp, bestBid, bestAsk), sorted
+        pairs: (ex1, ex2) pairs; pairs with an exchange missing from exchange_data get None
+        thresholds: Profitability thresholds in % (default: DEFAULT_THRESHOLDS)
+        zero_threshold: Neutral zone threshold in %
+        max_quote_age: Oldest ex2 quote a row may be matched with; None = no limit
+
+    Returns:
+        (ex1, ex2) -> metrics as analyze_joined returns them, or None
+    """
+    thresholds = thresholds or list(DEFAULT_THRESHOLDS)
+    pairs = list(pairs)
+    frames = {exchange: data.lazy() for exchange, data in exchange_data.items()}
+
+    loaded = [(ex1, ex2) for ex1, ex2 in pairs if ex1 in frames and ex2 in frames]
+    queries = [
+        pair_query(pair_deviation_lazy(frames[ex1], frames[ex2], max_quote_age), thresholds, zero_threshold,
+                   stale=max_quote_age is not None)
+        for ex1, ex2 in loaded
+    ]
+    rows = {pair: frame.row(0, named=True) for pair, frame in zip(loaded, pl.collect_all(queries))}
+    return {pair: pair_metrics(rows[pair], thresholds) if pair in rows else None for pair in pairs}
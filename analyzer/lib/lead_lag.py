@@ -0,0 +1,145 @@
+"""
+Cross-exchange lead-lag of a symbol's mid prices.
+
+The deviation metrics say how far exchanges drift apart, not which one
+moves first. Here each exchange's log mid price is sampled as-of on a
+common grid of `interval` (e.g. 50ms) over the range all of them cover,
+and the cross-correlation of grid returns is taken at every lag up to
+±max_lag:
+
+    cc(k) = Σ_t r1[t] · r2[t + k] / sqrt(Σ r1² · Σ r2²)
+
+A peak at k > 0 means ex2's returns follow ex1's: ex1 leads by k·interval.
+
+Correlations come from FFTs (O(n log n)) instead of one dot product per
+lag. The grid is cut into segments of about SEGMENT_POINTS returns; only one
+segment's grid, mids and returns exist at a time. Each segment is
+transformed twice per exchange: as ex1, just its returns; as ex2, its
+returns plus max_lag on either side, so products across the boundary are
+kept. Each pair only multiplies spectra, and the summed cross spectra give
+the same correlations as one transform of the whole grid.
+"""
+
+from datetime import timedelta
+from itertools import combinations
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import polars as pl
+
+
+LEAD_LAG_COLUMNS = ['lead_lag_ms', 'lead_lag_corr', 'lead_lag_corr_zero']
+
+# Returns per FFT segment, at least (each segment fills the power-of-two
+# transform that fits it and 2 * max_lag)
+SEGMENT_POINTS = 1 << 16
+
+
+def _log_mid(data: pl.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(timestamps in epoch us, log mid price) of an exchange's quotes."""
+    return (data['timestamp'].dt.epoch('us').to_numpy(),
+            np.log(((data['bestBid'] + data['bestAsk']) / 2).to_numpy()))
+
+
+def _asof_returns(quotes: Tuple[np.ndarray, np.ndarray], grid: np.ndarray) -> np.ndarray:
+    """Log mid returns between consecutive grid timestamps (epoch us), quotes taken as-of."""
+    timestamps, log_mid = quotes
+    return np.diff(log_mid[np.searchsorted(timestamps, grid, side='right') - 1])
+
+
+def common_span(exchange_data: Dict[str, pl.DataFrame]) -> Tuple[int, int]:
+    """(latest first, earliest last) timestamp in epoch us over sorted, non-empty frames."""
+    return (max(df['timestamp'].dt.epoch('us')[0] for df in exchange_data.values()),
+            min(df['timestamp'].dt.epoch('us')[-1] for df in exchange_data.values()))
+
+
+def lead_lag_stats(
+    exchange_data: Dict[str, pl.DataFrame],
+    interval: timedelta,
+    max_lag: timedelta,
+    span: Optional[Tuple[int, int]] = None
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Lead-lag of every exchange pair of a symbol in one pass.
+
+    Args:
+        exchange_data: Exchange name -> DataFrame (timestamp, bestBid, bestAsk), sorted
+        interval: Grid spacing
+        max_lag: Largest lag searched in each direction
+        span: (start, end) in epoch us of the range the grid covers (default:
+            the range all given exchanges cover). A pair's result only
+            depends on the grid and its two exchanges, so passing the
+            symbol-wide span gives the same values for a subset of exchanges.
+
+    Returns:
+        (ex1, ex2) -> {lead_lag_ms, lead_lag_corr, lead_lag_corr_zero} for
+        every pair of sorted exchanges. lead_lag_ms > 0: ex1 leads ex2, < 0:
+        ex2 leads; lead_lag_corr is the correlation at that lag,
+        lead_lag_corr_zero the contemporaneous one. Values are None without a
+        common range or without price changes.
+    """
+    exchanges = sorted(exchange_data)
+    pairs = list(combinations(exchanges, 2))
+    empty = {pair: {column: None for column in LEAD_LAG_COLUMNS} for pair in pairs}
+
+    frames = {exchange: exchange_data[exchange] for exchange in exchanges if not exchange_data[exchange].is_empty()}
+    if len(frames) < 2:
+        return empty
+
+    interval_us = interval // timedelta(microseconds=1)
+    max_lag_points = max(1, max_lag // interval)
+
+    # Common range: every grid point has a quote on every exchange
+    start, end = span if span is not None else common_span(frames)
+    first = -(-start // interval_us) * interval_us
+    n_returns = (end - first) // interval_us if end >= first else -1
+    if n_returns < 2 * max_lag_points + 1:
+        return empty
+
+    names = list(frames)
+    quotes = {exchange: _log_mid(frames[exchange]) for exchange in names}
+    energy = {exchange: 0.0 for exchange in names}
+
+    # ex2's window is the segment plus max_lag on either side, so its
+    # correlation with the zero-padded segment never wraps at the searched
+    # lags; segments fill the power-of-two transform
+    nfft = 1 << int(np.ceil(np.log2(min(SEGMENT_POINTS, n_returns) + 2 * max_lag_points)))
+    segment = min(nfft - 2 * max_lag_points, n_returns)
+    present = [(ex1, ex2) for ex1, ex2 in pairs if ex1 in frames and ex2 in frames]
+    cross = np.zeros((len(present), nfft // 2 + 1), dtype=np.complex128)
+    for lo in range(0, n_returns, segment):
+        hi = min(lo + segment, n_returns)
+        # Returns lo - max_lag .. hi + max_lag, clipped to the grid (zeros outside)
+        wlo, whi = max(lo - max_lag_points, 0), min(hi + max_lag_points, n_returns)
+        grid = first + np.arange(wlo, whi + 1, dtype=np.int64) * interval_us
+        offset = wlo - (lo - max_lag_points)
+
+        spectra1, spectra2 = {}, {}
+        for exchange in names:
+            window = np.zeros(nfft)
+            window[offset:offset + whi - wlo] = _asof_returns(quotes[exchange], grid)
+            spectra2[exchange] = np.fft.rfft(window)
+            core = np.zeros(nfft)
+            core[max_lag_points:max_lag_points + hi - lo] = window[max_lag_points:max_lag_points + hi - lo]
+            spectra1[exchange] = np.fft.rfft(core)
+            energy[exchange] += float((core ** 2).sum())
+        for p, (ex1, ex2) in enumerate(present):
+            cross[p] += np.conj(spectra1[ex1]) * spectra2[ex2]
+
+    # irfft of conj(R1)·R2 at index k is Σ r1[t] r2[t + k]; negative lags wrap to the end
+    correlation = np.fft.irfft(cross, n=nfft, axis=1)
+    lags = np.arange(-max_lag_points, max_lag_points + 1)
+    window = correlation[:, lags % nfft]
+
+    results = dict(empty)
+    for p, (ex1, ex2) in enumerate(present):
+        norm = np.sqrt(energy[ex1] * energy[ex2])
+        if norm == 0:
+            continue
+        values = window[p] / norm
+        peak = int(np.argmax(values))
+        results[(ex1, ex2)] = {
+            'lead_lag_ms': float(lags[peak] * interval_us / 1000),
+            'lead_lag_corr': float(values[peak]),
+            'lead_lag_corr_zero': float(values[max_lag_points]),
+        }
+    return results
@@ -0,0 +1,415 @@
+"""
+Live analysis of the collector's realtime WebSocket stream.
+
+The collector (RealTimeController, /ws/realtime_charts) pushes, per pair,
+JSON snapshots of its rolling window:
+
+    {"symbol", "exchange1", "exchange2",
+     "timestamps": [epoch seconds], "spreads": [%], "upperBand", "lowerBand"}
+
+where spreads are (bid_ex1 / bid_ex2 - 1) * 100 - the analyzer's deviation
+- and consecutive snapshots overlap. LiveAnalyzer feeds only the new points
+of every snapshot into a per-pair LivePairState, which keeps the
+zero-crossing and cycle metrics of analyze_pair_fast up to date with O(1)
+work per tick. run_live drives it from the WebSocket and publishes a
+ranking on an interval.
+
+For testing without the collector, replay_pairs/replay_messages rebuild the
+same stream from recorded parquet data and serve_replay serves it.
+
+The WebSocket parts need the optional `websockets` package.
+"""
+
+import asyncio
+import heapq
+import json
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import polars as pl
+
+from .analysis import DEFAULT_THRESHOLDS, assemble_metrics
+from .catalog import PartitionCatalog
+from .data_loader import load_exchange_symbol_data
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+# Collector defaults: 15-minute rolling window, updates throttled to 250ms
+REPLAY_WINDOW_SECONDS = 900.0
+REPLAY_INTERVAL_SECONDS = 0.25
+
+
+def _require_websockets() -> None:
+    if websockets is None:
+        raise RuntimeError("Live mode needs the 'websockets' package (pip install websockets)")
+
+
+class LivePairState:
+    """
+    Incremental metrics of one pair, updated tick by tick.
+
+    Mirrors analyze_joined on the bid/bid deviation: a null deviation counts
+    as a data point but is neither above a threshold nor neutral, breaks
+    the zero-crossing sign chain and keeps the last non-null deviation for
+    the pattern-break flags.
+    """
+
+    __slots__ = ('thresholds', 'zero_threshold', 'rows', 'valid', 'deviation_sum', 'deviation_min',
+                 'deviation_max', 'first_ts', 'last_ts', 'last_deviation', 'last_sign', 'zero_crossings',
+                 'above', 'cycles', 'armed')
+
+    def __init__(self, thresholds: List[float], zero_threshold: float):
+        self.thresholds = thresholds
+        self.zero_threshold = zero_threshold
+        self.rows = 0
+        self.valid = 0
+        self.deviation_sum = 0.0
+        self.deviation_min = None
+        self.deviation_max = None
+        self.first_ts = None
+        self.last_ts = None
+        self.last_deviation = None
+        self.last_sign = 0
+        self.zero_crossings = 0
+        self.above = [0] * len(thresholds)
+        self.cycles = [0] * len(thresholds)
+        # Armed = above the threshold since the last return to neutral
+        self.armed = [False] * len(thresholds)
+
+    def update(self, timestamp: float, deviation: Optional[float]) -> None:
+        """Add one tick (epoch seconds, deviation in % or None)."""
+        self.rows += 1
+        if self.first_ts is None:
+            self.first_ts = timestamp
+        self.last_ts = timestamp
+
+        if deviation is None:
+            self.last_sign = 0
+            return
+
+        self.valid += 1
+        self.last_deviation = deviation
+        self.deviation_sum += deviation
+        if self.deviation_min is None or deviation < self.deviation_min:
+            self.deviation_min = deviation
+        if self.deviation_max is None or deviation > self.deviation_max:
+            self.deviation_max = deviation
+
+        sign = (deviation > 0) - (deviation < 0)
+        if sign * self.last_sign < 0:
+            self.zero_crossings += 1
+        self.last_sign = sign
+
+        magnitude = abs(deviation)
+        is_neutral = magnitude < self.zero_threshold
+        for k, threshold in enumerate(self.thresholds):
+            if magnitude > threshold:
+                self.above[k] += 1
+                self.armed[k] = True
+            elif is_neutral and self.armed[k]:
+                self.cycles[k] += 1
+                self.armed[k] = False
+
+    def metrics(self, labels: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Current metrics under analyze_joined's names (built by assemble_metrics).
+
+        Only the bid/bid deviation is streamed, so the executable-direction
+        and mid metrics are not available.
+
+        Returns:
+            Metrics dict, or None before the first non-null deviation
+        """
+        if self.valid == 0:
+            return None
+        return assemble_metrics({
+            'rows': self.rows,
+            'valid': self.valid,
+            'deviation_sum': self.deviation_sum,
+            'deviation_min': self.deviation_min,
+            'deviation_max': self.deviation_max,
+            'last_deviation': self.last_deviation,
+            'zero_crossings': self.zero_crossings,
+            'duration_sec': self.last_ts - self.first_ts,
+            'series_valid': {'deviation': self.valid},
+            'above': {'deviation': self.above},
+            'cycles': {'deviation': self.cycles},
+        }, self.thresholds, labels)
+
+
+class LiveAnalyzer:
+    """
+    Per-pair live state fed from overlapping collector snapshots.
+
+    A snapshot repeats points that were already processed; per pair the last
+    processed timestamp and the number of points seen at it identify where
+    the new points start.
+    """
+
+    def __init__(self, thresholds: Optional[List[float]] = None, zero_threshold: float = 0.05):
+        self.thresholds = thresholds if thresholds is not None else list(DEFAULT_THRESHOLDS)
+        self.zero_threshold = zero_threshold
+        self.states: Dict[Tuple[str, str, str], LivePairState] = {}
+        self._position: Dict[Tuple[str, str, str], Tuple[float, int]] = {}
+        self.messages = 0
+        self.ticks = 0
+
+    def handle_message(self, message: Dict[str, Any]) -> int:
+        """
+        Process one collector snapshot.
+
+        A malformed snapshot raises ValueError before any state changes.
+
+        Returns:
+            Number of new ticks applied
+        """
+        if not isinstance(message, dict):
+            raise ValueError(f"Snapshot is a {type(message).__name__}, not an object")
+        try:
+            timestamps = [float(ts) for ts in message.get('timestamps') or []]
+            spreads = [None if spread is None else float(spread) for spread in message.get('spreads') or []]
+            key = (message['symbol'], message['exchange1'], message['exchange2'])
+        except (TypeError, KeyError) as e:
+            raise ValueError(f"Malformed snapshot: {type(e).__name__}: {e}") from e
+        if len(timestamps) != len(spreads):
+            raise ValueError(f"Snapshot has {len(timestamps)} timestamps but {len(spreads)} spreads")
+        self.messages += 1
+
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = LivePairState(self.thresholds, self.zero_threshold)
+
+        begin = 0
+        if key in self._position:
+            last_ts, seen_at_last = self._position[key]
+            first_at_last = bisect_left(timestamps, last_ts)
+            at_last = bisect_right(timestamps, last_ts) - first_at_last
+            begin = first_at_last + min(seen_at_last, at_last)
+        if begin >= len(timestamps):
+            return 0
+
+        for timestamp, spread in zip(timestamps[begin:], spreads[begin:]):
+            state.update(timestamp, spread)
+
+        last_ts = timestamps[-1]
+        at_last = len(timestamps) - bisect_left(timestamps, last_ts)
+        previous_ts, previous_seen = self._position.get(key, (None, 0))
+        if previous_ts == last_ts:
+            at_last = max(at_last, previous_seen)
+        self._position[key] = (last_ts, at_last)
+
+        applied = len(timestamps) - begin
+        self.ticks += applied
+        return applied
+
+    def ranking(self) -> pl.DataFrame:
+        """Current metrics of all pairs, sorted by zero crossings per minute."""
+        rows = []
+        for (symbol, ex1, ex2), state in self.states.items():
+            stats = state.metrics()
+            if stats is not None:
+                rows.append({'symbol': symbol, 'exchange1': ex1, 'exchange2': ex2, **stats})
+        if not rows:
+            return pl.DataFrame()
+        return pl.DataFrame(rows).sort('zero_crossings_per_minute', descending=True)
+
+
+async def run_live(
+    uri: str,
+    analyzer: LiveAnalyzer,
+    publish: Callable[[pl.DataFrame], None],
+    interval: float = 10.0,
+    duration: Optional[float] = None,
+    reconnect_delay: float = 5.0
+) -> None:
+    """
+    Consume the collector stream and publish the ranking every `interval` seconds.
+
+    A dropped connection or a rejected handshake is retried after
+    `reconnect_delay`; a malformed message is skipped with a warning. Any
+    other failure of the receive or publish loop ends the run with its
+    exception (an invalid URI as RuntimeError).
+
+    Args:
+        uri: WebSocket URI (e.g. ws://localhost:5000/ws/realtime_charts)
+        analyzer: State to feed
+        publish: Called with LiveAnalyzer.ranking() on every interval and at the end
+        interval: Seconds between rankings
+        duration: Stop after this many seconds (None = run until cancelled)
+        reconnect_delay: Seconds to wait before reconnecting after a dropped connection
+    """
+    _require_websockets()
+
+    async def receive():
+        while True:
+            try:
+                async with websockets.connect(uri, max_size=None, close_timeout=1) as websocket:
+                    print(f"--- Connected to {uri} ---")
+                    async for raw in websocket:
+                        try:
+                            analyzer.handle_message(json.loads(raw))
+                        except ValueError as e:
+                            print(f"WARNING: Skipping unexpected message from {uri}: {e}")
+            except websockets.InvalidURI as e:
+                raise RuntimeError(f"Invalid live stream URI: {e}") from e
+            except (OSError, websockets.WebSocketException) as e:
+                print(f"WARNING: Live stream {uri} unavailable: {e}")
+            await asyncio.sleep(reconnect_delay)
+
+    async def publish_periodically():
+        while True:
+            await asyncio.sleep(interval)
+            publish(analyzer.ranking())
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(publish_periodically())]
+    try:
+        # Both loops run forever, so a finished task has failed
+        done, _ = await asyncio.wait(tasks, timeout=duration, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in done:
+        task.result()
+    publish(analyzer.ranking())
+
+
+def replay_pairs(
+    data_path: str,
+    symbols: Dict[str, List[str]],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> List[Tuple[str, str, str, np.ndarray, np.ndarray]]:
+    """
+    Rebuild the collector's spread points from recorded quotes.
+
+    Like the collector, every tick of either exchange produces a point
+    against the other exchange's latest bid, once both have quoted.
+
+    Args:
+        data_path: Base path to market data
+        symbols: Symbol -> exchanges to pair up (as returned by discover_data)
+        start_date, end_date, catalog, start_time, end_time: As for load_exchange_symbol_data
+
+    Returns:
+        (symbol, ex1, ex2, epoch seconds, spreads in %) per pair with points
+    """
+    pairs = []
+    for symbol, exchanges in symbols.items():
+        data = {}
+        for exchange in exchanges:
+            df = load_exchange_symbol_data(data_path, exchange, symbol, start_date, end_date,
+                                           catalog, None, start_time, end_time)
+            if df is not None:
+                data[exchange] = df
+
+        for ex1, ex2 in combinations(sorted(data), 2):
+            ticks = data[ex1].select([
+                pl.col('timestamp'), pl.col('bestBid').alias('bid1'), pl.lit(None, dtype=pl.Float64).alias('bid2')
+            ]).merge_sorted(data[ex2].select([
+                pl.col('timestamp'), pl.lit(None, dtype=pl.Float64).alias('bid1'), pl.col('bestBid').alias('bid2')
+            ]), key='timestamp')
+            points = ticks.with_columns(
+                pl.col('bid1').forward_fill(), pl.col('bid2').forward_fill()
+            ).filter(
+                (pl.col('bid1') > 0) & (pl.col('bid2') > 0)
+            ).select([
+                # Collector: ToUnixTimeMilliseconds() / 1000.0
+                (pl.col('timestamp').dt.epoch('ms') / 1000.0).alias('ts'),
+                ((pl.col('bid1') / pl.col('bid2') - 1.0) * 100).alias('spread')
+            ])
+            if not points.is_empty():
+                pairs.append((symbol, ex1, ex2, points['ts'].to_numpy(), points['spread'].to_numpy()))
+    return pairs
+
+
+def replay_messages(
+    pairs: List[Tuple[str, str, str, np.ndarray, np.ndarray]],
+    interval: float = REPLAY_INTERVAL_SECONDS,
+    window: float = REPLAY_WINDOW_SECONDS
+) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """
+    Collector-format snapshots of replay_pairs output, in time order.
+
+    Each pair sends at most one snapshot per `interval` (at the end of every
+    interval with new points) holding its last `window` seconds.
+
+    Yields:
+        (replay time in epoch seconds, message)
+    """
+    def pair_messages(symbol, ex1, ex2, ts, spreads):
+        for end in np.unique(np.ceil(ts / interval)) * interval:
+            lo = int(np.searchsorted(ts, end - window, side='right'))
+            hi = int(np.searchsorted(ts, end, side='right'))
+            n = hi - lo
+            yield float(end), {
+                'symbol': symbol,
+                'exchange1': ex1,
+                'exchange2': ex2,
+                'timestamps': ts[lo:hi].tolist(),
+                'spreads': spreads[lo:hi].tolist(),
+                'upperBand': [None] * n,
+                'lowerBand': [None] * n
+            }
+
+    # Only the time is compared, so messages never take part in the ordering
+    yield from heapq.merge(*(pair_messages(*pair) for pair in pairs), key=lambda item: item[0])
+
+
+async def serve_replay(
+    pairs: List[Tuple[str, str, str, np.ndarray, np.ndarray]],
+    host: str = 'localhost',
+    port: int = 5000,
+    speed: float = 1.0,
+    interval: float = REPLAY_INTERVAL_SECONDS,
+    window: float = REPLAY_WINDOW_SECONDS,
+    ready: Optional[Callable[[int], None]] = None
+) -> None:
+    """
+    Serve recorded data like the collector's realtime endpoint.
+
+    Every connection gets its own replay from the start; the connection is
+    closed when the data is exhausted.
+
+    Args:
+        pairs: Output of replay_pairs
+        host, port: Address to listen on (port 0 picks a free port)
+        speed: Replay speed (1.0 = real time, 0 = as fast as possible)
+        interval, window: Snapshot interval and length (see replay_messages)
+        ready: Called with the bound port once the server listens
+    """
+    _require_websockets()
+
+    async def handler(websocket, *_):
+        first = None
+        started = time.monotonic()
+        try:
+            for sent, (replay_time, message) in enumerate(replay_messages(pairs, interval, window)):
+                if first is None:
+                    first = replay_time
+                if speed > 0:
+                    delay = (replay_time - first) / speed - (time.monotonic() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                elif sent % 100 == 0:
+                    await asyncio.sleep(0)
+                await websocket.send(json.dumps(message))
+        except websockets.ConnectionClosed:
+            pass
+
+    async with websockets.serve(handler, host, port, max_size=None) as server:
+        bound_port = next(iter(server.sockets)).getsockname()[1]
+        print(f"--- Replaying {len(pairs)} pairs on ws://{host}:{bound_port}/ws/realtime_charts ---")
+        if ready is not None:
+            ready(bound_port)
+        await asyncio.Future()
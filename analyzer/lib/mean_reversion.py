@@ -0,0 +1,197 @@
+"""
+Mean-reversion statistics of pair deviations, batched across pairs.
+
+The cycle metrics say how often a pair's deviation returns to parity; the
+statistics here say whether the series is stationary at all and how fast it
+reverts:
+
+- ADF statistic: t-stat of γ in Δx_t = α + γ·x_{t-1} + Σ δ_i·Δx_{t-i}
+  (constant, no trend); below ADF_CRITICAL_5PCT rejects a unit root
+- AR(1) coefficient b of x_t = a + b·x_{t-1} and the Ornstein–Uhlenbeck
+  half-life -ln 2 / ln b (only defined for 0 < b < 1)
+- deviation moments (std, skewness, excess kurtosis) and the Jarque–Bera
+  normality p-value
+
+Ticks arrive irregularly, so every series is first resampled to a regular
+grid (last deviation per interval, carried forward through empty intervals).
+All pairs of a call then share one stacked (pairs × grid) array and every
+regression is solved for all pairs at once from batched normal equations -
+no per-pair model fitting loop.
+"""
+
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import polars as pl
+
+
+# MacKinnon asymptotic 5% critical value of the ADF t-stat with a constant
+ADF_CRITICAL_5PCT = -2.86
+
+MEAN_REVERSION_COLUMNS = [
+    'adf_stat', 'adf_stationary', 'ar1_coef', 'half_life_sec',
+    'deviation_std', 'deviation_skewness', 'deviation_excess_kurtosis', 'jarque_bera_pvalue'
+]
+
+
+def resample_deviation(joined: Optional[pl.DataFrame], interval: timedelta) -> Optional[Tuple[int, np.ndarray]]:
+    """
+    Resample a pair's deviation to a regular grid.
+
+    Grid points are multiples of `interval` since the epoch; each takes the
+    last deviation of its interval, or the previous point's value if no
+    tick arrived (as-of semantics, like the pair join).
+
+    Args:
+        joined: Output of pair_deviation or SymbolTimeline.pair (may be None)
+        interval: Grid spacing
+
+    Returns:
+        (index of the first grid point, values), or None without deviations
+    """
+    if joined is None:
+        return None
+    rows = joined.select(['timestamp', 'deviation']).drop_nulls()
+    if rows.is_empty():
+        return None
+
+    interval_us = interval // timedelta(microseconds=1)
+    buckets = rows['timestamp'].dt.epoch('us').to_numpy() // interval_us
+    deviation = rows['deviation'].to_numpy()
+
+    # Timestamps are sorted: the last row of a bucket is where the next one starts
+    is_last = np.ones(len(buckets), dtype=bool)
+    np.not_equal(buckets[1:], buckets[:-1], out=is_last[:-1])
+    filled, last = buckets[is_last], deviation[is_last]
+
+    grid = np.arange(filled[0], filled[-1] + 1)
+    return int(filled[0]), last[np.searchsorted(filled, grid, side='right') - 1]
+
+
+def _batched_ols(y: np.ndarray, regressors: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Least squares of y on the regressors for every row (pair) at once.
+
+    Args:
+        y: (pairs, n) targets; NaN marks missing observations
+        regressors: k arrays shaped like y; NaN marks missing observations
+
+    Returns:
+        (beta, se), each (pairs, k); NaN where a row has too few observations
+    """
+    X = np.stack(regressors)
+    valid = np.isfinite(y) & np.isfinite(X).all(axis=0)
+    X = np.where(valid, X, 0.0)
+    y = np.where(valid, y, 0.0)
+
+    XtX = np.einsum('ipt,jpt->pij', X, X)
+    Xty = np.einsum('ipt,pt->pi', X, y)
+    # pinv: constant series make XtX singular, which must not fail the whole batch
+    XtX_inv = np.linalg.pinv(XtX, hermitian=True)
+    beta = np.einsum('pij,pj->pi', XtX_inv, Xty)
+
+    residuals = np.where(valid, y - np.einsum('pi,ipt->pt', beta, X), 0.0)
+    dof = valid.sum(axis=1) - len(regressors)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = np.where(dof > 0, (residuals ** 2).sum(axis=1) / dof, np.nan)
+        se = np.sqrt(s2[:, None] * np.diagonal(XtX_inv, axis1=1, axis2=2))
+    beta[dof <= 0] = np.nan
+    return beta, se
+
+
+def mean_reversion_batch(
+    series: List[Optional[Tuple[int, np.ndarray]]],
+    interval: timedelta,
+    adf_lags: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Mean-reversion statistics for many resampled series in one pass.
+
+    Args:
+        series: resample_deviation outputs (None entries allowed)
+        interval: Grid spacing the series were resampled with
+        adf_lags: Lagged differences in the ADF regression
+
+    Returns:
+        One dict per input with MEAN_REVERSION_COLUMNS; values are None
+        where undefined (no or too little data, non-reverting AR(1))
+    """
+    empty = {column: None for column in MEAN_REVERSION_COLUMNS}
+    present = [i for i, s in enumerate(series) if s is not None and len(s[1]) > 0]
+    if not present:
+        return [dict(empty) for _ in series]
+
+    # Stack on one grid; pairs of a symbol cover (nearly) the same range
+    origin = min(series[i][0] for i in present)
+    length = max(series[i][0] + len(series[i][1]) for i in present) - origin
+    x = np.full((len(present), length), np.nan)
+    for row, i in enumerate(present):
+        offset = series[i][0] - origin
+        x[row, offset:offset + len(series[i][1])] = series[i][1]
+
+    # ADF: Δx_t on [1, x_{t-1}, Δx_{t-1..t-p}]
+    dx = np.diff(x, axis=1)
+    y = dx[:, adf_lags:]
+    ones = np.ones_like(y)
+    x_lag = x[:, adf_lags:-1]
+    lagged = [dx[:, adf_lags - i:dx.shape[1] - i] for i in range(1, adf_lags + 1)]
+    beta, se = _batched_ols(y, [ones, x_lag, *lagged])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        adf_stat = beta[:, 1] / se[:, 1]
+
+    # AR(1) on levels is the lag-free DF regression: b = 1 + γ
+    beta_ar, _ = _batched_ols(dx, [np.ones_like(dx), x[:, :-1]])
+    ar1 = 1.0 + beta_ar[:, 1]
+    seconds = interval.total_seconds()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_life = np.where((ar1 > 0) & (ar1 < 1), -np.log(2) / np.log(ar1) * seconds, np.nan)
+
+    # Moments of the grid values (time-weighted, unlike per-tick means)
+    valid = np.isfinite(x)
+    n = valid.sum(axis=1)
+    mean = np.where(valid, x, 0.0).sum(axis=1) / n
+    centered = np.where(valid, x - mean[:, None], 0.0)
+    m2 = (centered ** 2).sum(axis=1) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(m2 * n / (n - 1))
+        skewness = (centered ** 3).sum(axis=1) / n / m2 ** 1.5
+        kurtosis = (centered ** 4).sum(axis=1) / n / m2 ** 2 - 3.0
+    # Jarque–Bera is χ²(2) under normality, whose survival function is exp(-JB/2)
+    jarque_bera_pvalue = np.exp(-n / 6 * (skewness ** 2 + kurtosis ** 2 / 4) / 2)
+
+    def value(v: float) -> Optional[float]:
+        return float(v) if np.isfinite(v) else None
+
+    results = [dict(empty) for _ in series]
+    for row, i in enumerate(present):
+        stat = value(adf_stat[row])
+        results[i] = {
+            'adf_stat': stat,
+            'adf_stationary': stat is not None and stat < ADF_CRITICAL_5PCT,
+            'ar1_coef': value(ar1[row]),
+            'half_life_sec': value(half_life[row]),
+            'deviation_std': value(std[row]),
+            'deviation_skewness': value(skewness[row]),
+            'deviation_excess_kurtosis': value(kurtosis[row]),
+            'jarque_bera_pvalue': value(jarque_bera_pvalue[row]),
+        }
+    return results
+
+
+def mean_reversion_stats(
+    joined: List[Optional[pl.DataFrame]],
+    interval: timedelta,
+    adf_lags: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Mean-reversion statistics of several synchronized pairs in one batch.
+
+    Args:
+        joined: Outputs of pair_deviation or SymbolTimeline.pair (None allowed)
+        interval: Resampling grid spacing
+        adf_lags: Lagged differences in the ADF regression
+
+    Returns:
+        One dict per pair with MEAN_REVERSION_COLUMNS (see mean_reversion_batch)
+    """
+    return mean_reversion_batch([resample_deviation(frame, interval) for frame in joined], interval, adf_lags)
@@ -0,0 +1,245 @@
+"""
+Memory-budget admission control for the worker pool.
+
+Every worker holds the full loaded history of the symbol it analyzes, so a
+large date range with many workers can exceed the machine's memory and get
+the whole run OOM-killed. With a budget:
+
+- each task's footprint is estimated from the row counts of the files it
+  would read (catalog row counts, or bytes on disk when they are missing),
+  before anything is loaded
+- the pool has at most as many workers as their fixed overhead leaves
+  room for (max_workers)
+- tasks are dispatched largest first, but only while the estimated
+  footprints of the running tasks fit in the budget minus the workers'
+  fixed overhead
+- symbols larger than that are analyzed by the streaming path (one hour
+  per exchange in memory) when the run's options allow it, or else as
+  separate pair tasks; a run whose tasks still don't fit is refused
+
+Each worker reports its peak RSS after every task (getrusage, or the peak
+working set on Windows), so the run report and the saved task timings show
+how close the estimates came. A worker killed anyway (the OOM killer)
+breaks the pool: its tasks and all tasks not yet run come back as errors
+instead of hanging the run.
+"""
+
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Executor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .catalog import PartitionCatalog
+from .data_loader import plan_exchange_symbol_hours
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Bytes per loaded row: timestamp + bestBid + bestAsk (Int64/Float64)
+LOADED_ROW_BYTES = 24
+# Bytes per row of the pair being analyzed: the join (timestamp, 4 prices,
+# ratio, deviation) plus flag and intermediate columns of the metric passes
+PAIR_ROW_BYTES = 160
+# On-disk bytes per row, to estimate rows when the catalog has no row counts
+# (low end of compressed spreads, so the row estimate errs on the high side)
+DISK_ROW_BYTES = 6
+# Interpreter, Polars and NumPy of an idle spawned worker
+WORKER_BASE_BYTES = 200 * 2**20
+
+
+def estimated_rows(cost: int, unit: str) -> int:
+    """Rows of a scheduler cost (lib/scheduler.py symbol_costs) in 'rows' or 'bytes'."""
+    return cost if unit == 'rows' else -(-cost // DISK_ROW_BYTES)
+
+
+def task_footprint(rows: Dict[str, int], pairs: Iterable[Tuple[str, str]]) -> int:
+    """
+    Estimated peak bytes of analyzing pairs of loaded exchanges.
+
+    All exchanges are held at once and pairs are joined one at a time, so
+    the largest join counts once.
+
+    Args:
+        rows: Exchange -> loaded rows
+        pairs: (ex1, ex2) pairs analyzed; a join has ex1's rows
+    """
+    largest_join = max((rows.get(ex1, 0) for ex1, _ in pairs), default=0)
+    return LOADED_ROW_BYTES * sum(rows.values()) + PAIR_ROW_BYTES * largest_join
+
+
+def hourly_rows(
+    data_path: str,
+    exchange: str,
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> int:
+    """
+    Estimated rows of the largest hour the streaming path would load.
+
+    Rows of all files read for the hour (a day-level file counts in full);
+    without catalog row counts, estimated from bytes on disk.
+    """
+    largest = 0
+    for _, _, _, entries in plan_exchange_symbol_hours(data_path, exchange, symbol, start_date, end_date,
+                                                       catalog, start_time, end_time):
+        if entries['rows'].null_count():
+            largest = max(largest, estimated_rows(int(entries['size'].sum()), 'bytes'))
+        else:
+            largest = max(largest, int(entries['rows'].sum()))
+    return largest
+
+
+def max_workers(budget_bytes: int) -> int:
+    """Most workers whose fixed overhead fits in a budget (0 if not even one does)."""
+    return budget_bytes // WORKER_BASE_BYTES
+
+
+def _windows_peak_rss() -> Optional[int]:
+    """Peak working set of this process (GetProcessMemoryInfo), None if the call fails."""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.WinDLL('kernel32')
+    psapi = ctypes.WinDLL('psapi')
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+    psapi.GetProcessMemoryInfo.restype = wintypes.BOOL
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, None where the platform can't tell."""
+    if resource is None:
+        # Windows: the peak working set is the resident peak
+        return _windows_peak_rss() if sys.platform == 'win32' else None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryBudget:
+    """
+    Estimated bytes of the running tasks against a fixed budget.
+
+    The workers' fixed overhead (WORKER_BASE_BYTES each) is taken off the
+    top; the rest is shared by the running tasks.
+    """
+
+    def __init__(self, budget_bytes: int, workers: int):
+        self.budget_bytes = budget_bytes
+        self.workers = workers
+        self.available = budget_bytes - workers * WORKER_BASE_BYTES
+        self.in_use = 0
+        self.running = 0
+        self.peak = 0
+
+    def fits(self, footprint: int) -> bool:
+        """Whether a task fits next to the running ones (or would run alone)."""
+        return self.running == 0 or self.in_use + footprint <= self.available
+
+    def admit(self, footprint: int) -> None:
+        self.in_use += footprint
+        self.running += 1
+        self.peak = max(self.peak, self.in_use)
+
+    def release(self, footprint: int) -> None:
+        self.in_use -= footprint
+        self.running -= 1
+
+
+def plan_budget(budget_mb: float, workers: int) -> MemoryBudget:
+    """
+    Budget of a run with at most `workers` workers, fewer if their overhead doesn't fit.
+
+    Raises:
+        ValueError: If the budget doesn't fit even one worker
+    """
+    budget_bytes = int(budget_mb * 2**20)
+    if max_workers(budget_bytes) < 1:
+        raise ValueError(f"A memory budget of {budget_mb:,.0f} MB doesn't fit one worker "
+                         f"(~{WORKER_BASE_BYTES // 2**20} MB)")
+    return MemoryBudget(budget_bytes, min(workers, max_workers(budget_bytes)))
+
+
+def imap_admitted(
+    executor: Executor,
+    function: Callable[[Any], Any],
+    tasks: Sequence[Any],
+    footprints: Sequence[int],
+    budget: Optional[MemoryBudget],
+    workers: int
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run tasks on an executor, at most `workers` at a time, with admission control.
+
+    Tasks are submitted in order; with a budget, only while the next one
+    fits (MemoryBudget.fits). A failed task doesn't stop the others; once
+    the pool is broken (a worker was killed), its running tasks and every
+    task left fail with BrokenProcessPool.
+
+    Args:
+        executor: Process (or thread) pool executor
+        function: Picklable task function
+        tasks: Task arguments in dispatch order
+        footprints: Estimated bytes per task
+        budget: Budget to admit against; None = no memory limit
+        workers: Pool size
+
+    Yields:
+        (task, result, None) or (task, None, exception), as tasks finish
+    """
+    waiting: deque = deque(zip(tasks, footprints))
+    running: Dict[Any, Tuple[Any, int]] = {}
+    while waiting or running:
+        while waiting and len(running) < workers and (budget is None or budget.fits(waiting[0][1])):
+            task, footprint = waiting.popleft()
+            try:
+                future = executor.submit(function, task)
+            except BrokenExecutor as e:
+                yield task, None, e
+                continue
+            if budget is not None:
+                budget.admit(footprint)
+            running[future] = (task, footprint)
+        if not running:
+            continue
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task, footprint = running.pop(future)
+            if budget is not None:
+                budget.release(footprint)
+            error = future.exception()
+            yield task, (future.result() if error is None else None), error
+
+
+def rss_report(peaks: Dict[Any, Optional[int]]) -> List[int]:
+    """Peak RSS in MB per worker, largest first (workers that couldn't measure left out)."""
+    return sorted((peak // 2**20 for peak in peaks.values() if peak is not None), reverse=True)
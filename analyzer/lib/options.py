@@ -0,0 +1,121 @@
+"""
+Run-wide options of an analysis run.
+
+Every worker task (symbol batch, pair, time range, exchange stage) gets
+the same RunOptions next to the few arguments of its own, instead of a
+long positional tuple. The data selection, the catalog/cache handles and
+the analysis settings travel together; handles only hold paths, so the
+options stay cheap to pickle. to_dict/from_dict carry the settings to
+work queue workers on other hosts as JSON.
+"""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .analysis import DEFAULT_THRESHOLDS
+from .backtest import CostModel
+from .catalog import PartitionCatalog
+from .results_cache import ResultsCache
+from .series_cache import SeriesCache
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """
+    Options shared by every task of a run.
+
+    Data selection:
+        data_path: Path to the market data directory
+        start_date, end_date: Date filter (YYYY-MM-DD), inclusive; None = open
+        start_time, end_time: Time window (naive UTC), end exclusive; None = open
+        catalog, cache: Partition catalog and series cache handles (None = not used)
+        results_cache: Per-hour partials cache (implies streaming); None = not used
+        streaming: Analyze hour by hour with carried state (lib/streaming.py)
+
+    Analysis:
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+        sweep: {'thresholds', 'zero_thresholds'} of a threshold sweep, or None
+        symbol_alignment: Align all exchanges of a symbol once (lib/alignment.py)
+        rolling: {'window', 'step'} of rolling-window metrics, or None
+        mean_reversion: Resampling grid of the mean-reversion statistics, or None
+        costs: CostModel of the cycle backtest, or None
+        lead_lag: {'interval', 'max_lag'} of the lead-lag estimation, or None
+        delays_ms: Execution delays in ms of the delay sweep, or None
+        max_quote_age: Oldest ex2 quote a row may be matched with; None = no limit
+        engine: 'eager' or 'lazy' (lib/lazy_engine.py)
+    """
+    data_path: str = ''
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    catalog: Optional[PartitionCatalog] = None
+    cache: Optional[SeriesCache] = None
+    results_cache: Optional[ResultsCache] = None
+    streaming: bool = False
+
+    thresholds: List[float] = field(default_factory=lambda: list(DEFAULT_THRESHOLDS))
+    zero_threshold: float = 0.05
+    sweep: Optional[Dict[str, List[float]]] = None
+    symbol_alignment: bool = False
+    rolling: Optional[Dict[str, timedelta]] = None
+    mean_reversion: Optional[timedelta] = None
+    costs: Optional[CostModel] = None
+    lead_lag: Optional[Dict[str, timedelta]] = None
+    delays_ms: Optional[List[float]] = None
+    max_quote_age: Optional[timedelta] = None
+    engine: str = 'eager'
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Plain (JSON-serializable) representation of the settings.
+
+        Durations are stored in seconds, times in ISO format. data_path and
+        the handles are left out: each host opens its own on its data path.
+        """
+        def seconds(value: Optional[timedelta]) -> Optional[float]:
+            return value.total_seconds() if value is not None else None
+
+        def durations(value: Optional[Dict[str, timedelta]]) -> Optional[Dict[str, float]]:
+            return {key: seconds(duration) for key, duration in value.items()} if value is not None else None
+
+        return {
+            **{key: getattr(self, key) for key in _PLAIN_FIELDS},
+            'start_time': self.start_time.isoformat() if self.start_time is not None else None,
+            'end_time': self.end_time.isoformat() if self.end_time is not None else None,
+            'rolling': durations(self.rolling),
+            'mean_reversion': seconds(self.mean_reversion),
+            'costs': asdict(self.costs) if self.costs is not None else None,
+            'lead_lag': durations(self.lead_lag),
+            'max_quote_age': seconds(self.max_quote_age),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RunOptions':
+        """Inverse of to_dict (data_path empty, no handles)."""
+        def duration(value: Optional[float]) -> Optional[timedelta]:
+            return timedelta(seconds=value) if value is not None else None
+
+        def durations(value: Optional[Dict[str, float]]) -> Optional[Dict[str, timedelta]]:
+            return {key: duration(seconds) for key, seconds in value.items()} if value is not None else None
+
+        def time(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value is not None else None
+
+        return cls(
+            **{key: data[key] for key in _PLAIN_FIELDS},
+            start_time=time(data['start_time']),
+            end_time=time(data['end_time']),
+            rolling=durations(data['rolling']),
+            mean_reversion=duration(data['mean_reversion']),
+            costs=CostModel(**data['costs']) if data['costs'] is not None else None,
+            lead_lag=durations(data['lead_lag']),
+            max_quote_age=duration(data['max_quote_age']),
+        )
+
+
+# Settings that are JSON values as they are
+_PLAIN_FIELDS = ('start_date', 'end_date', 'streaming', 'thresholds', 'zero_threshold', 'sweep',
+                 'symbol_alignment', 'delays_ms', 'engine')
@@ -0,0 +1,288 @@
+"""
+Mergeable partial aggregates of pair metrics.
+
+analyze_joined needs a pair's whole synchronized history at once. A
+PairPartial summarizes one time chunk of it (e.g. one hour) such that
+summaries of consecutive chunks merge associatively into the summary of
+their concatenation, and finalize_partial turns the merged summary into
+exactly the metrics analyze_joined reports:
+
+- counts, sums, min/max and first/last timestamps merge trivially
+- zero crossings add up, plus one if the sign flips across the boundary
+  (last row of A vs first row of B)
+- cycle state per series/threshold is (cycles, first event, last event),
+  where events are rows above threshold or neutral. A cycle spans the
+  boundary when A ends "armed" (last event above) and B's first event is
+  neutral; after any event the state no longer depends on earlier chunks.
+
+Only the float sums (mean deviation) can differ from the batch result, in
+the last bits, because they are added in a different order.
+
+Chunks don't have to come from streaming: summarize_pair_range summarizes
+any time range of a loaded pair, so one pair can be cut into ranges that
+are analyzed in parallel and stitched with merge_partials.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import reduce
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import polars as pl
+
+from .analysis import (
+    DIRECTION_EDGES, PAIR_SERIES, assemble_metrics, find_complete_cycles, pair_aggregate_exprs,
+    pair_aggregate_values, pair_deviation
+)
+from .options import RunOptions
+
+# Series with cycle/time-above state: |bid deviation|, executable edges, |mid deviation|
+SERIES = list(PAIR_SERIES)
+
+# first_event / last_event values
+NO_EVENT = -1
+NEUTRAL_EVENT = 0
+ABOVE_EVENT = 1
+
+
+def _min(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return b if a is None else a if b is None else max(a, b)
+
+
+@dataclass
+class PairPartial:
+    """
+    Associative summary of a chunk of a synchronized pair.
+
+    Timestamps are epoch microseconds; Optional fields are None for chunks
+    without (non-null) rows. Per-series lists are indexed like thresholds.
+    """
+    rows: int = 0
+    first_ts: Optional[int] = None
+    last_ts: Optional[int] = None
+
+    # Bid/bid deviation
+    valid: int = 0
+    deviation_sum: float = 0.0
+    deviation_min: Optional[float] = None
+    deviation_max: Optional[float] = None
+    first_sign: Optional[float] = None
+    last_sign: Optional[float] = None
+    last_deviation: Optional[float] = None
+    zero_crossings: int = 0
+
+    # Executable edges and mid reference
+    max_edge: Dict[str, Optional[float]] = field(default_factory=dict)
+    mid_min: Optional[float] = None
+    mid_max: Optional[float] = None
+
+    # Per series: non-null rows, rows above each threshold, cycle state
+    series_valid: Dict[str, int] = field(default_factory=dict)
+    above: Dict[str, List[int]] = field(default_factory=dict)
+    cycles: Dict[str, List[int]] = field(default_factory=dict)
+    first_event: Dict[str, List[int]] = field(default_factory=dict)
+    last_event: Dict[str, List[int]] = field(default_factory=dict)
+
+    def merge(self, other: 'PairPartial') -> 'PairPartial':
+        """Summary of this chunk followed by `other` (chunks must be in time order)."""
+        if self.rows == 0:
+            return other
+        if other.rows == 0:
+            return self
+
+        boundary_crossing = int(
+            self.last_sign is not None and other.first_sign is not None and
+            self.last_sign * other.first_sign < 0
+        )
+
+        merged = PairPartial(
+            rows=self.rows + other.rows,
+            first_ts=self.first_ts,
+            last_ts=other.last_ts,
+            valid=self.valid + other.valid,
+            deviation_sum=self.deviation_sum + other.deviation_sum,
+            deviation_min=_min(self.deviation_min, other.deviation_min),
+            deviation_max=_max(self.deviation_max, other.deviation_max),
+            first_sign=self.first_sign,
+            last_sign=other.last_sign,
+            last_deviation=self.last_deviation if other.last_deviation is None else other.last_deviation,
+            zero_crossings=self.zero_crossings + other.zero_crossings + boundary_crossing,
+            max_edge={name: _max(self.max_edge[name], other.max_edge[name]) for name in DIRECTION_EDGES},
+            mid_min=_min(self.mid_min, other.mid_min),
+            mid_max=_max(self.mid_max, other.mid_max),
+        )
+
+        for name in SERIES:
+            merged.series_valid[name] = self.series_valid[name] + other.series_valid[name]
+            merged.above[name] = [a + b for a, b in zip(self.above[name], other.above[name])]
+            merged.cycles[name] = [
+                a + b + int(a_last == ABOVE_EVENT and b_first == NEUTRAL_EVENT)
+                for a, b, a_last, b_first in zip(
+                    self.cycles[name], other.cycles[name], self.last_event[name], other.first_event[name]
+                )
+            ]
+            merged.first_event[name] = [
+                a if a != NO_EVENT else b for a, b in zip(self.first_event[name], other.first_event[name])
+            ]
+            merged.last_event[name] = [
+                b if b != NO_EVENT else a for a, b in zip(self.last_event[name], other.last_event[name])
+            ]
+
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain (JSON-serializable) representation."""
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PairPartial':
+        """Inverse of to_dict."""
+        return cls(**data)
+
+
+def summary_only(options: RunOptions) -> bool:
+    """
+    Whether a run asks for nothing beyond what PairPartial summaries cover.
+
+    Summaries carry the default metrics of plain per-pair joins only; every
+    mode that summarizes chunks (streaming, the results cache, time-range
+    splitting) requires this. Sweeps, rolling windows, mean reversion,
+    backtests, lead-lag, delays and quote-age limits need the materialized
+    join, and symbol alignment is a different way to build it.
+    """
+    return not (options.sweep or options.symbol_alignment or options.rolling or options.mean_reversion
+                or options.costs or options.lead_lag or options.delays_ms or options.max_quote_age)
+
+
+def summarize_chunk(joined: pl.DataFrame, thresholds: List[float], zero_threshold: float) -> PairPartial:
+    """
+    Summarize one time chunk of a synchronized pair.
+
+    Args:
+        joined: Output of pair_deviation (or SymbolTimeline.pair) for the chunk
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        PairPartial of the chunk (empty for an empty frame)
+    """
+    if joined.is_empty():
+        return PairPartial()
+
+    aggregates, flags = pair_aggregate_exprs(thresholds, zero_threshold)
+    deviation_sign = pl.col('deviation').sign()
+    stats = joined.select([
+        *aggregates,
+        pl.col('timestamp').first().dt.epoch('us').alias('first_ts'),
+        pl.col('timestamp').last().dt.epoch('us').alias('last_ts'),
+        deviation_sign.first().alias('first_sign'),
+        deviation_sign.last().alias('last_sign'),
+    ]).row(0, named=True)
+    frame = joined.select([flag for above, neutral in flags.values() for flag in (*above, neutral)])
+
+    values = pair_aggregate_values(stats, thresholds)
+    del values['duration_sec']
+    partial = PairPartial(
+        **values,
+        first_ts=stats['first_ts'],
+        last_ts=stats['last_ts'],
+        first_sign=stats['first_sign'],
+        last_sign=stats['last_sign'],
+    )
+
+    # Cycle state: complete cycles plus the first and last event, which
+    # decide whether a cycle spans the boundary to a neighbouring chunk
+    for name, (above_flags, neutral_flag) in flags.items():
+        above = frame.select([flag.meta.output_name() for flag in above_flags]).to_numpy().T
+        neutral = frame[neutral_flag.meta.output_name()].to_numpy()
+
+        partial.cycles[name] = []
+        partial.first_event[name] = []
+        partial.last_event[name] = []
+        for above_k, (_, ends) in zip(above, find_complete_cycles(above, neutral)):
+            events = np.flatnonzero(above_k | neutral)
+            partial.cycles[name].append(len(ends))
+            if len(events):
+                partial.first_event[name].append(ABOVE_EVENT if above_k[events[0]] else NEUTRAL_EVENT)
+                partial.last_event[name].append(ABOVE_EVENT if above_k[events[-1]] else NEUTRAL_EVENT)
+            else:
+                partial.first_event[name].append(NO_EVENT)
+                partial.last_event[name].append(NO_EVENT)
+
+    return partial
+
+
+def summarize_pair_range(
+    data1: pl.DataFrame,
+    data2: pl.DataFrame,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    thresholds: List[float],
+    zero_threshold: float
+) -> PairPartial:
+    """
+    Summarize the rows of a pair whose ex1 timestamp is in [start, end).
+
+    Only ex1's rows in the range and ex2's quotes from the last one at or
+    before the first of them are joined. Every row is matched with the same
+    quote as in the whole pair's join, so summaries of consecutive ranges
+    merge into the summary of the whole join.
+
+    Args:
+        data1: Sorted DataFrame (timestamp, bestBid, bestAsk) of ex1
+        data2: Sorted DataFrame (timestamp, bestBid, bestAsk) of ex2
+        start: Range start (naive UTC), inclusive; None = from the first row
+        end: Range end (naive UTC), exclusive; None = to the last row
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        PairPartial of the range (empty if ex1 has no rows in it)
+    """
+    timestamps1 = data1['timestamp']
+    lo = 0 if start is None else timestamps1.search_sorted(start, 'left')
+    hi = len(data1) if end is None else timestamps1.search_sorted(end, 'left')
+    if hi <= lo:
+        return PairPartial()
+    chunk1 = data1.slice(lo, hi - lo)
+
+    # Binary searches only: no pass over the rows outside the range
+    timestamps2 = data2['timestamp']
+    lo2 = max(timestamps2.search_sorted(chunk1['timestamp'][0], 'right') - 1, 0)
+    hi2 = timestamps2.search_sorted(chunk1['timestamp'][-1], 'right')
+    joined = pair_deviation(chunk1, data2.slice(lo2, max(hi2 - lo2, 0)))
+    return summarize_chunk(joined, thresholds, zero_threshold) if joined is not None else PairPartial()
+
+
+def merge_partials(partials: Iterable[PairPartial]) -> PairPartial:
+    """Merge summaries of consecutive chunks, in time order."""
+    return reduce(PairPartial.merge, partials, PairPartial())
+
+
+def finalize_partial(
+    partial: PairPartial,
+    thresholds: List[float],
+    labels: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Turn a (merged) summary into analyze_joined's metrics dict.
+
+    Args:
+        partial: Summary of the whole analyzed range
+        thresholds: Thresholds the summary was built with
+        labels: Column suffix per threshold (default: threshold_labels)
+
+    Returns:
+        Same keys, order and values as analyze_joined, or None if there are
+        no rows with a deviation
+    """
+    if partial.rows == 0:
+        return None
+    return assemble_metrics({
+        **partial.to_dict(),
+        'duration_sec': (partial.last_ts - partial.first_ts) / 10**6,
+    }, thresholds, labels)
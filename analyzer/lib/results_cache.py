@@ -0,0 +1,88 @@
+"""
+On-disk cache of per-hour pair partials.
+
+Repeated runs over the same days recompute every pair although only the
+live hour got new data. The results cache keeps, per symbol, the
+PairPartial of every (pair, hour) together with the key it was computed
+under, plus each exchange's last quote per hour (the as-of state carried
+into the next hour). An hour is recomputed only when its key changes:
+
+- exchange hour key: fingerprint of the hour's source files
+- pair hour key: both exchange hour keys and the quote carried into the
+  hour for the second exchange
+
+Files live under <data>/_analyzer/results/config=<hash>/symbol=<dir>.json;
+the hash covers everything the partials depend on (thresholds, zero
+threshold, partial format). One file per symbol means one writer per file,
+since the analyzer processes a symbol in a single worker.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .catalog import ANALYZER_DIRNAME
+
+
+RESULTS_DIRNAME = 'results'
+
+# Bump when PairPartial or the way it is computed changes (2: last_deviation is
+# the last non-null deviation)
+PARTIAL_FORMAT_VERSION = 2
+
+
+def results_key(*parts: Any) -> str:
+    """Hex digest of the parts' JSON representation."""
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class ResultsCache:
+    """
+    Per-symbol JSON files of hour partials under <data>/_analyzer/results.
+
+    Instances only hold paths and the config hash, so they are cheap to
+    pickle into worker tasks.
+    """
+
+    def __init__(
+        self,
+        data_path: str,
+        thresholds: List[float],
+        zero_threshold: float,
+        cache_dir: Optional[str] = None
+    ):
+        if cache_dir is None:
+            cache_dir = Path(data_path) / ANALYZER_DIRNAME / RESULTS_DIRNAME
+        self.cache_dir = str(cache_dir)
+        self.config_hash = results_key(PARTIAL_FORMAT_VERSION, list(thresholds), zero_threshold)[:16]
+
+    def path_for(self, symbol: str) -> Path:
+        """Cache file of one symbol under the current config."""
+        return Path(self.cache_dir) / f"config={self.config_hash}" / f"symbol={symbol.replace('/', '_')}.json"
+
+    def read(self, symbol: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Load a symbol's cached hours.
+
+        Returns:
+            {'quotes': {exchange: {hour: record}}, 'pairs': {"ex1|ex2": {hour: record}}};
+            empty on a miss or an unreadable file
+        """
+        path = self.path_for(symbol)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return {'quotes': data['quotes'], 'pairs': data['pairs']}
+        except (OSError, ValueError, KeyError):
+            return {'quotes': {}, 'pairs': {}}
+
+    def write(self, symbol: str, data: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Write a symbol's cached hours atomically."""
+        path = self.path_for(symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
@@ -0,0 +1,367 @@
+"""
+Load-aware scheduling of symbol batches over the worker pool.
+
+Symbols differ in size by orders of magnitude, so dispatching them in
+discovery order leaves a giant symbol started last as a straggler while
+every other worker idles. Here:
+
+- each symbol's cost is estimated from what a load would read: catalog row
+  counts when every file has one, otherwise bytes on disk
+- batches are dispatched largest first (longest processing time first), so
+  the big ones start immediately and small ones fill the gaps at the end
+- symbols heavier than a worker's share of the total are split into pair
+  tasks that memory-map the symbol's loaded frames (lib/shared_frames.py),
+  and pairs still heavier than that into time-range tasks whose summaries
+  are stitched (lib/partials.py)
+- the worker count and the Polars thread pool of each worker are sized
+  together: workers x threads ~ CPUs, instead of every worker starting a
+  pool of all cores
+
+plan_run makes all of these decisions, together with the memory budget's
+(lib/memory_budget.py), before anything is loaded; the run only dispatches
+the plan. After the run, schedule_report compares busy time with workers x
+wall time.
+"""
+
+import math
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import combinations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .catalog import PartitionCatalog
+from .data_loader import exchange_symbol_size
+from .memory_budget import MemoryBudget, estimated_rows, hourly_rows, plan_budget, task_footprint
+from .options import RunOptions
+from .partials import summary_only
+
+# (symbol, ex1, ex2) of a pair task
+PairKey = Tuple[str, str, str]
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (affinity mask if the platform has one)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def plan_workers(
+    n_tasks: int,
+    cpus: Optional[int] = None,
+    n_workers: Optional[int] = None,
+    polars_threads: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Size the process pool and the Polars thread pool of each worker together.
+
+    Args:
+        n_tasks: Number of symbol batches
+        cpus: CPUs to fill (default: available_cpus())
+        n_workers: Fixed worker count (default: one per CPU, at most one per task)
+        polars_threads: Fixed Polars threads per worker (default: CPUs / workers)
+        max_workers: Upper limit on the workers, fixed count included (e.g. from a memory budget)
+
+    Returns:
+        (workers, Polars threads per worker), both at least 1
+    """
+    cpus = cpus or available_cpus()
+    workers = n_workers or min(cpus, n_tasks)
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    workers = max(1, workers)
+    threads = polars_threads or max(1, cpus // workers)
+    return workers, threads
+
+
+def symbol_costs(
+    data_path: str,
+    symbols: Dict[str, Iterable[str]],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> Tuple[Dict[str, Dict[str, int]], str]:
+    """
+    Estimated work per symbol and exchange.
+
+    Args:
+        data_path: Base path to market data
+        symbols: Symbol -> exchanges to load
+        start_date, end_date, start_time, end_time: The run's window
+
+    Returns:
+        (symbol -> exchange -> cost, unit). The unit is 'rows' if the catalog
+        knows the row count of every file, otherwise 'bytes' for all
+        symbols, so costs are always comparable. A symbol's cost is the sum
+        over its exchanges, a pair's the sum over its two.
+    """
+    sizes = {
+        symbol: {exchange: exchange_symbol_size(data_path, exchange, symbol, start_date, end_date, catalog,
+                                                start_time, end_time)
+                 for exchange in exchanges}
+        for symbol, exchanges in symbols.items()
+    }
+    unit = 'rows' if all(rows is not None for per_exchange in sizes.values()
+                         for _, rows in per_exchange.values()) else 'bytes'
+    return {
+        symbol: {exchange: rows if unit == 'rows' else size for exchange, (size, rows) in per_exchange.items()}
+        for symbol, per_exchange in sizes.items()
+    }, unit
+
+
+def heavy_symbols(costs: Dict[str, int], n_pairs: Dict[str, int], workers: int) -> Set[str]:
+    """
+    Symbols to split into pair tasks.
+
+    A symbol costing more than a worker's fair share of the total (total /
+    workers) would keep one worker busy while the others run out of work,
+    so its pairs are analyzed as separate tasks. Single-pair symbols and
+    single-worker runs gain nothing from splitting.
+
+    Args:
+        costs: Symbol -> cost
+        n_pairs: Symbol -> number of exchange pairs
+        workers: Worker count the run would use
+
+    Returns:
+        Symbols to split
+    """
+    if workers < 2:
+        return set()
+    share = sum(costs.values()) / workers
+    return {symbol for symbol, cost in costs.items() if cost > share and n_pairs[symbol] > 1}
+
+
+def pair_chunks(cost: int, total: int, workers: int) -> int:
+    """
+    Number of time ranges to cut a pair of a split symbol into.
+
+    Enough ranges that none costs more than a worker's fair share of the
+    total, and never more than there are workers.
+
+    Args:
+        cost: The pair's cost
+        total: Cost of all symbols
+        workers: Worker count the run would use
+
+    Returns:
+        Range count, 1 = analyze the pair in one task
+    """
+    if workers < 2 or total <= 0:
+        return 1
+    return max(1, min(workers, math.ceil(cost / (total / workers))))
+
+
+@dataclass
+class RunPlan:
+    """
+    Tasks of a run and the pool to run them on.
+
+    Symbols not in split run as one batch each (streaming if in stream).
+    Split symbols are staged exchange by exchange (stage, in dispatch
+    order), then run as pair tasks, each cut into chunks time ranges.
+    Costs are in cost_unit (see symbol_costs), footprints in estimated bytes
+    (see task_footprint; a pair's is for all of its ranges).
+    """
+    symbols: List[str]
+    exchanges: Dict[str, List[str]]
+    exchange_costs: Dict[str, Dict[str, int]]
+    cost_unit: str
+    costs: Dict[str, int]
+    n_pairs: Dict[str, int]
+    workers: int = 1
+    threads: int = 1
+    budget: Optional[MemoryBudget] = None
+    footprints: Dict[str, int] = field(default_factory=dict)
+    stream: Set[str] = field(default_factory=set)
+    oversized: Set[str] = field(default_factory=set)
+    split: Set[str] = field(default_factory=set)
+    stage: List[Tuple[str, str, int]] = field(default_factory=list)
+    pair_costs: Dict[PairKey, int] = field(default_factory=dict)
+    pair_footprints: Dict[PairKey, int] = field(default_factory=dict)
+    chunks: Dict[PairKey, int] = field(default_factory=dict)
+
+    @property
+    def total_pairs(self) -> int:
+        return sum(self.n_pairs.values())
+
+    @property
+    def batches(self) -> List[str]:
+        """Symbols analyzed as one batch each, largest first."""
+        return [symbol for symbol in self.symbols if symbol not in self.split]
+
+
+def rank_symbols(data_path: str, symbols: Dict[str, Iterable[str]], options: RunOptions) -> RunPlan:
+    """
+    Plan of symbol batches only, largest first.
+
+    A big task dispatched last would run alone at the end, so the heaviest
+    symbols go first.
+
+    Args:
+        data_path: Base path to market data
+        symbols: Symbol -> exchanges to analyze
+        options: The run's options (window and catalog)
+    """
+    exchange_costs, unit = symbol_costs(data_path, symbols, options.start_date, options.end_date,
+                                        options.catalog, options.start_time, options.end_time)
+    costs = {symbol: sum(per_exchange.values()) for symbol, per_exchange in exchange_costs.items()}
+    return RunPlan(
+        symbols=sorted(symbols, key=lambda symbol: costs[symbol], reverse=True),
+        exchanges={symbol: sorted(exchanges) for symbol, exchanges in symbols.items()},
+        exchange_costs=exchange_costs,
+        cost_unit=unit,
+        costs=costs,
+        n_pairs={symbol: len(exchanges) * (len(exchanges) - 1) // 2 for symbol, exchanges in symbols.items()},
+    )
+
+
+def plan_run(
+    data_path: str,
+    symbols: Dict[str, Iterable[str]],
+    options: RunOptions,
+    n_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    memory_budget_mb: Optional[float] = None,
+    split_symbols: bool = True
+) -> RunPlan:
+    """
+    Plan a run: task order, splitting, memory footprints and pool size.
+
+    - symbols are ranked largest first (rank_symbols)
+    - with a budget, the pool has no more workers than the budget has room
+      for, and the budget's overhead counts the same workers when sizing
+      symbols and when admitting tasks; symbols that can't fit stream hour
+      by hour when the options allow it (summary_only)
+    - symbols heavier than a worker's share run as pair tasks over shared
+      frames, and so do symbols over the budget that can't stream (one
+      pair's exchanges in memory at a time)
+    - pairs still heavier than that run as time ranges stitched from
+      summaries, which cover the default metrics only
+
+    Args:
+        data_path: Base path to market data
+        symbols: Symbol -> exchanges to analyze
+        options: The run's options
+        n_workers: Fixed worker count (default: one per CPU, at most one per task)
+        threads_per_worker: Fixed Polars threads per worker (default: CPUs / workers)
+        memory_budget_mb: Memory budget in MB; None = no limit
+        split_symbols: Split heavy symbols into pair tasks (never when streaming)
+
+    Raises:
+        ValueError: If the budget doesn't fit one worker, or a task on its own
+    """
+    plan = rank_symbols(data_path, symbols, options)
+    streaming = options.streaming
+    workers = n_workers or available_cpus()
+    if memory_budget_mb:
+        plan.budget = plan_budget(memory_budget_mb, workers)
+        workers = plan.budget.workers
+    budget = plan.budget
+
+    pairs = {symbol: list(combinations(plan.exchanges[symbol], 2)) for symbol in plan.symbols}
+    rows = {symbol: {exchange: estimated_rows(cost, plan.cost_unit) for exchange, cost in per_exchange.items()}
+            for symbol, per_exchange in plan.exchange_costs.items()}
+    plan.footprints = {symbol: task_footprint(rows[symbol], pairs[symbol]) for symbol in plan.symbols}
+    if budget is not None:
+        if not streaming:
+            plan.oversized = {symbol for symbol, footprint in plan.footprints.items()
+                              if footprint > budget.available}
+        plan.stream = plan.oversized if summary_only(options) else set()
+        for symbol in (plan.symbols if streaming else plan.stream):
+            plan.footprints[symbol] = task_footprint(
+                {exchange: hourly_rows(data_path, exchange, symbol, options.start_date, options.end_date,
+                                       options.catalog, options.start_time, options.end_time)
+                 for exchange in plan.exchanges[symbol]},
+                pairs[symbol]
+            )
+
+    if split_symbols and not streaming:
+        plan.split = (heavy_symbols(plan.costs, plan.n_pairs, workers) | plan.oversized) - plan.stream
+
+    total = sum(plan.costs.values())
+    exchange_costs = plan.exchange_costs
+    for symbol in plan.symbols:
+        if symbol not in plan.split:
+            continue
+        for exchange in sorted(plan.exchanges[symbol], key=exchange_costs[symbol].get, reverse=True):
+            plan.stage.append((symbol, exchange, task_footprint({exchange: rows[symbol][exchange]}, [])))
+        for ex1, ex2 in pairs[symbol]:
+            key = (symbol, ex1, ex2)
+            plan.pair_costs[key] = exchange_costs[symbol][ex1] + exchange_costs[symbol][ex2]
+            plan.pair_footprints[key] = task_footprint({ex1: rows[symbol][ex1], ex2: rows[symbol][ex2]},
+                                                       [(ex1, ex2)])
+            plan.chunks[key] = pair_chunks(plan.pair_costs[key], total, workers) if summary_only(options) else 1
+
+    # Tasks over the budget even on their own would only run into the OOM killer
+    if budget is not None:
+        task_footprints = [
+            *((symbol, plan.footprints[symbol]) for symbol in plan.batches),
+            *((f"{symbol} {exchange} (load)", footprint) for symbol, exchange, footprint in plan.stage),
+            *((f"{symbol} {ex1}/{ex2}", footprint // plan.chunks[(symbol, ex1, ex2)])
+              for (symbol, ex1, ex2), footprint in plan.pair_footprints.items()),
+        ]
+        too_large = [f"{label} (~{footprint / 2**20:,.0f} MB)"
+                     for label, footprint in task_footprints if footprint > budget.available]
+        if too_large:
+            raise ValueError(
+                f"Over the memory budget on their own ({max(0, budget.available) / 2**20:,.0f} MB "
+                f"for tasks next to {workers} workers): {', '.join(too_large)}\n"
+                "Raise --memory-budget, use fewer --workers, or drop the options that need the full "
+                "history (then oversized symbols stream hour by hour)"
+            )
+
+    n_tasks = len(plan.batches) + sum(plan.chunks.values())
+    plan.workers, plan.threads = plan_workers(n_tasks, n_workers=n_workers, polars_threads=threads_per_worker,
+                                              max_workers=workers if budget is not None else None)
+    return plan
+
+
+@contextmanager
+def polars_threads(threads: int) -> Iterator[None]:
+    """
+    Set POLARS_MAX_THREADS for processes started inside the block.
+
+    Polars reads it once at import, so it only takes effect in new (spawned)
+    workers; this process keeps its pool. The previous value is restored.
+    """
+    previous = os.environ.get('POLARS_MAX_THREADS')
+    os.environ['POLARS_MAX_THREADS'] = str(threads)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop('POLARS_MAX_THREADS', None)
+        else:
+            os.environ['POLARS_MAX_THREADS'] = previous
+
+
+def schedule_report(busy: Dict[str, float], workers: int, wall: float) -> Dict[str, Any]:
+    """
+    How well a run kept its workers busy.
+
+    Args:
+        busy: Task label -> seconds it ran in a worker
+        workers: Pool size
+        wall: Wall-clock seconds of the pool
+
+    Returns:
+        utilization_pct (busy time / workers x wall), busy_sec, longest_task,
+        longest_sec and bound_sec - the shortest possible wall time for these
+        tasks (the longest one, or the total spread evenly over the workers)
+    """
+    total = sum(busy.values())
+    longest_task = max(busy, key=busy.get) if busy else None
+    longest = busy[longest_task] if busy else 0.0
+    return {
+        'utilization_pct': total / (workers * wall) * 100 if wall > 0 else 0.0,
+        'busy_sec': total,
+        'longest_task': longest_task,
+        'longest_sec': longest,
+        'bound_sec': max(longest, total / workers),
+    }
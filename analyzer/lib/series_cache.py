@@ -0,0 +1,137 @@
+"""
+Memory-mapped Arrow IPC cache of analysis-ready price series.
+
+Decoding Decimal(28,10) prices from parquet and sorting them is the same work
+on every run over the same days. The cache stores one uncompressed Arrow IPC
+file per (exchange, symbol, date) with the loader's output (timestamp,
+bestBid, bestAsk as Float64) already sorted. Workers memory-map these files,
+so a repeated run costs page-cache reads instead of parquet decoding.
+
+Each file carries a fingerprint of its source partition (file paths within
+the date directory, sizes, mtimes) in the schema metadata; a changed
+partition invalidates the file.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+import polars as pl
+import pyarrow as pa
+
+from .catalog import ANALYZER_DIRNAME
+
+
+SERIES_DIRNAME = 'series'
+FINGERPRINT_KEY = b'source_fingerprint'
+
+
+def _partition_relative(path: str) -> str:
+    """
+    Path of a file relative to its date=... directory ('hour=HH/<name>').
+
+    Compacted hours all hold a file with the same name, so the bare name does
+    not identify a partition; the hour directory does.
+    """
+    parts = Path(path).parts
+    for i, part in enumerate(parts):
+        if part.startswith('date='):
+            return '/'.join(parts[i + 1:])
+    return Path(path).name
+
+
+def source_fingerprint(entries: pl.DataFrame) -> str:
+    """
+    Fingerprint a partition's source files.
+
+    Args:
+        entries: File entries (path, size, mtime_ns) of one partition
+
+    Returns:
+        Hex digest that changes when any file is added, removed or rewritten
+    """
+    digest = hashlib.sha1()
+    for path, size, mtime_ns in entries.select(['path', 'size', 'mtime_ns']).sort('path').iter_rows():
+        digest.update(f"{_partition_relative(path)}|{size}|{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def write_ipc(path: Path, df: pl.DataFrame, metadata: Optional[Dict[bytes, bytes]] = None) -> None:
+    """
+    Write a sorted frame atomically as an uncompressed IPC file.
+
+    Uncompressed buffers are what makes zero-copy memory mapping possible.
+    """
+    table = df.to_arrow()
+    if metadata:
+        table = table.replace_schema_metadata(metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with pa.OSFile(str(tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def map_ipc(path: Path) -> pa.ipc.RecordBatchFileReader:
+    """
+    Open an IPC file written by write_ipc through a memory map.
+
+    The mapping stays alive as long as the buffers read from it reference it.
+    """
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r'))
+
+
+def read_mapped(reader: pa.ipc.RecordBatchFileReader) -> pl.DataFrame:
+    """Sorted DataFrame backed by a map_ipc reader's buffers (no copy)."""
+    return pl.from_arrow(reader.read_all(), rechunk=False).set_sorted('timestamp')
+
+
+class SeriesCache:
+    """
+    Per-(exchange, symbol, date) Arrow IPC files under <data>/_analyzer/series.
+
+    Instances only hold paths, so they are cheap to pickle into worker tasks.
+    """
+
+    def __init__(self, data_path: str, cache_dir: Optional[str] = None):
+        if cache_dir is None:
+            cache_dir = Path(data_path) / ANALYZER_DIRNAME / SERIES_DIRNAME
+        self.cache_dir = str(cache_dir)
+
+    def path_for(self, exchange: str, symbol_dir: str, date: str) -> Path:
+        """Cache file for one (exchange, symbol directory, date) partition."""
+        return Path(self.cache_dir) / f"exchange={exchange}" / f"symbol={symbol_dir}" / f"date={date}.arrow"
+
+    def read(self, path: Path, fingerprint: str) -> Optional[pl.DataFrame]:
+        """
+        Memory-map a cached series if it matches the source fingerprint.
+
+        Returns:
+            Sorted DataFrame backed by the mapped file, or None on a miss
+        """
+        if not path.exists():
+            return None
+        try:
+            reader = map_ipc(path)
+            metadata = reader.schema.metadata or {}
+            if metadata.get(FINGERPRINT_KEY, b'').decode() != fingerprint:
+                return None
+            return read_mapped(reader)
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def write(self, path: Path, df: pl.DataFrame, fingerprint: str) -> None:
+        """Write a sorted series tagged with its source fingerprint."""
+        write_ipc(path, df, {FINGERPRINT_KEY: fingerprint.encode()})
+
+    @staticmethod
+    def is_live(date: str) -> bool:
+        """Today's (UTC) partition is still being written; caching it would only churn."""
+        return date >= datetime.now(timezone.utc).strftime('%Y-%m-%d')
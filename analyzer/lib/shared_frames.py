@@ -0,0 +1,67 @@
+"""
+Loaded price series shared between worker processes as memory-mapped Arrow IPC files.
+
+When a heavy symbol is split into pair tasks (lib/scheduler.py), each of
+its exchanges is loaded once and written here as an uncompressed IPC file.
+Every pair task maps the two files it needs: the OS page cache holds one
+copy of each frame for all workers, nothing is pickled through the pool's
+pipes and nothing is decoded twice. Files live in a per-run directory that
+is removed when the run ends.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import polars as pl
+
+from .series_cache import map_ipc, read_mapped, write_ipc
+
+
+# Timestamp quantiles recorded per shared frame (see row_quantiles)
+QUANTILE_POINTS = 64
+
+
+def frame_path(shared_dir: str, symbol: str, exchange: str) -> Path:
+    """Shared file of one (symbol, exchange) frame."""
+    return Path(shared_dir) / symbol.replace('/', '_') / f"{exchange}.arrow"
+
+
+def row_quantiles(df: pl.DataFrame, points: int = QUANTILE_POINTS) -> List[datetime]:
+    """
+    Timestamps at evenly spaced rows, first and last row included.
+
+    Bounds for time ranges with about equal row counts, e.g. quantile
+    [i * points / n] for range i of n.
+    """
+    rows = np.linspace(0, len(df) - 1, points + 1).round().astype(np.int64)
+    return df['timestamp'].gather(rows).to_list()
+
+
+def range_bounds(quantiles: List[datetime], chunks: int) -> List[Optional[datetime]]:
+    """
+    Bounds of `chunks` time ranges with about equal rows, from row_quantiles.
+
+    The first and last range are open-ended (None), so together they cover
+    every row.
+    """
+    points = len(quantiles) - 1
+    return [None, *(quantiles[k * points // chunks] for k in range(1, chunks)), None]
+
+
+def share_frame(df: pl.DataFrame, path: Path) -> None:
+    """Write a sorted frame for other workers to map (see write_ipc)."""
+    write_ipc(path, df)
+
+
+def open_shared_frame(path: Optional[str]) -> Optional[pl.DataFrame]:
+    """
+    Memory-map a shared frame.
+
+    Returns:
+        DataFrame (timestamp, bestBid, bestAsk) sorted by timestamp and backed
+        by the mapped file, or None without a path
+    """
+    if path is None:
+        return None
+    return read_mapped(map_ipc(Path(path)))
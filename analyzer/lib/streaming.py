@@ -0,0 +1,176 @@
+"""
+Bounded-memory streaming analysis of a symbol's pairs.
+
+The batch path loads each exchange's whole range and synchronizes pairs in
+one join, so memory grows with the analyzed range. Here the exchanges'
+hour chunks are consumed in time order and every pair carries just enough
+state across hours to reproduce the batch metrics:
+
+- the as-of quote: ex2's last quote so far is put in front of its next
+  chunk, so ex1 rows early in an hour still see the previous hour's quote
+- everything else (aggregates, zero-crossing sign, cycle state) lives in
+  a PairPartial merged hour by hour (see lib/partials.py)
+
+Memory is bounded by one hour per exchange of the symbol. With a results
+cache (lib/results_cache.py) hours whose inputs didn't change aren't read
+at all: their partials and last quotes come from the cache.
+"""
+
+from itertools import combinations
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import polars as pl
+
+from .analysis import DEFAULT_THRESHOLDS, pair_deviation
+from .catalog import PartitionCatalog
+from .data_loader import load_spreads_hour, plan_exchange_symbol_hours
+from .partials import PairPartial, finalize_partial, summarize_chunk
+from .results_cache import ResultsCache, results_key
+from .series_cache import source_fingerprint
+
+
+def _carried_frame(quote: Tuple[float, float], data1: pl.DataFrame, data2: Optional[pl.DataFrame]) -> pl.DataFrame:
+    """
+    One-row ex2 frame for a quote carried over from an earlier hour.
+
+    Its timestamp only has to sort before every row of the hour, so it takes
+    the earliest first timestamp of the chunks (ties resolve to the chunk's
+    own quote, as join_asof matches the last of equal keys).
+    """
+    heads = [df['timestamp'].head(1) for df in (data1, data2) if df is not None]
+    return pl.DataFrame({
+        'timestamp': pl.concat(heads).sort().head(1),
+        'bestBid': [quote[0]],
+        'bestAsk': [quote[1]]
+    })
+
+
+def analyze_symbol_streaming(
+    data_path: str,
+    symbol: str,
+    exchanges: List[str],
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    catalog: Optional[PartitionCatalog] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    results_cache: Optional[ResultsCache] = None
+) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+    """
+    Analyze all pairs of a symbol hour by hour.
+
+    Args:
+        data_path: Base path to market data
+        symbol: Symbol name (e.g., "BTC/USDT")
+        exchanges: Exchanges to pair up
+        thresholds: List of profitability thresholds in % (default: DEFAULT_THRESHOLDS)
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+        start_date, end_date, catalog, start_time, end_time: As for load_exchange_symbol_data
+        results_cache: Optional cache of hour partials. It must have been
+            created with the same thresholds and zero threshold.
+
+    Returns:
+        (ex1, ex2) -> analyze_joined metrics for every pair of sorted exchanges
+        where both have data; the value is None if the pair yields no metrics
+    """
+    if thresholds is None:
+        thresholds = list(DEFAULT_THRESHOLDS)
+
+    pairs = list(combinations(sorted(exchanges), 2))
+    partials = {pair: PairPartial() for pair in pairs}
+    last_quote: Dict[str, Tuple[float, float]] = {}
+    has_data = set()
+
+    plans = {
+        exchange: {
+            hour_start: (lo, hi, entries)
+            for hour_start, lo, hi, entries in plan_exchange_symbol_hours(
+                data_path, exchange, symbol, start_date, end_date, catalog, start_time, end_time)
+        }
+        for exchange in exchanges
+    }
+
+    cached = results_cache.read(symbol) if results_cache is not None else {'quotes': {}, 'pairs': {}}
+    cache_changed = False
+
+    for hour_start in sorted(set().union(*plans.values())):
+        hour = hour_start.isoformat()
+        present = {exchange: plan[hour_start] for exchange, plan in plans.items() if hour_start in plan}
+        # Hours cut by the time window (or failing to load) are computed but never cached
+        cacheable = results_cache is not None and all(
+            lo == hour_start and hi == hour_start + timedelta(hours=1) for lo, hi, _ in present.values()
+        )
+        keys = {
+            exchange: results_key(source_fingerprint(entries), lo, hi)
+            for exchange, (lo, hi, entries) in present.items()
+        }
+
+        chunks: Dict[str, Optional[pl.DataFrame]] = {}
+
+        def chunk(exchange: str) -> Optional[pl.DataFrame]:
+            nonlocal cacheable
+            if exchange not in chunks:
+                lo, hi, entries = present[exchange]
+                try:
+                    chunks[exchange] = load_spreads_hour(entries, lo, hi)
+                except Exception as e:
+                    print(f"WARNING: Failed to load spreads for {exchange} {symbol} at {hour_start}: {e}")
+                    chunks[exchange] = None
+                    cacheable = False
+            return chunks[exchange]
+
+        for ex1, ex2 in pairs:
+            if ex1 not in present:
+                continue
+            pair = f"{ex1}|{ex2}"
+            key = results_key(keys[ex1], keys.get(ex2), last_quote.get(ex2))
+            record = cached['pairs'].get(pair, {}).get(hour)
+
+            if record is not None and record['key'] == key:
+                partial = PairPartial.from_dict(record['partial'])
+            else:
+                partial = PairPartial()
+                data1 = chunk(ex1)
+                data2 = chunk(ex2) if ex2 in present else None
+                if data1 is not None:
+                    if ex2 in last_quote:
+                        carried = _carried_frame(last_quote[ex2], data1, data2)
+                        data2 = carried if data2 is None else pl.concat([carried, data2])
+                    data2 = data2.set_sorted('timestamp') if data2 is not None else data1.clear()
+                    try:
+                        joined = pair_deviation(data1, data2)
+                        if joined is not None:
+                            partial = summarize_chunk(joined, thresholds, zero_threshold)
+                    except Exception as e:
+                        print(f"Error aligning {symbol} {ex1}/{ex2} at {hour_start}: {e}")
+                        continue
+                if cacheable:
+                    cached['pairs'].setdefault(pair, {})[hour] = {'key': key, 'partial': partial.to_dict()}
+                    cache_changed = True
+
+            partials[(ex1, ex2)] = partials[(ex1, ex2)].merge(partial)
+
+        for exchange in present:
+            record = cached['quotes'].get(exchange, {}).get(hour)
+            if record is not None and record['key'] == keys[exchange]:
+                quote = record['last_quote']
+            else:
+                df = chunk(exchange)
+                quote = None if df is None else [df['bestBid'][-1], df['bestAsk'][-1]]
+                if cacheable:
+                    cached['quotes'].setdefault(exchange, {})[hour] = {'key': keys[exchange], 'last_quote': quote}
+                    cache_changed = True
+            if quote is not None:
+                last_quote[exchange] = tuple(quote)
+                has_data.add(exchange)
+
+    if results_cache is not None and cache_changed:
+        results_cache.write(symbol, cached)
+
+    return {
+        (ex1, ex2): finalize_partial(partials[(ex1, ex2)], thresholds)
+        for ex1, ex2 in pairs
+        if ex1 in has_data and ex2 in has_data
+    }
@@ -0,0 +1,67 @@
+"""
+Intra-day time windows for analysis.
+
+A window is a half-open UTC interval [start_time, end_time) of naive
+datetimes, the same convention as the collector's Timestamp column and its
+date=/hour= partition directories. Either bound may be None (open).
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+
+_DURATION_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|[smhd])\s*$')
+_DURATION_UNITS = {'ms': 'milliseconds', 's': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a UTC timestamp given on the command line.
+
+    Accepts ISO formats such as '2025-11-03 14:00', '2025-11-03T14:00:30'
+    or a bare date ('2025-11-03' = midnight). Aware values are converted to
+    naive UTC.
+
+    Raises:
+        ValueError: If the value isn't a valid timestamp
+    """
+    parsed = datetime.fromisoformat(value.strip())
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_duration(value: str) -> timedelta:
+    """
+    Parse a duration like '90m', '3h', '45s', '1.5d' or '50ms'.
+
+    Raises:
+        ValueError: If the value isn't a positive number with an ms/s/m/h/d suffix
+    """
+    match = _DURATION_RE.match(value)
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Expected a positive duration like 50ms, 90m, 3h or 1d, got: {value}")
+    return timedelta(**{_DURATION_UNITS[match.group(2)]: float(match.group(1))})
+
+
+def window_dates(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    start_time: Optional[datetime],
+    end_time: Optional[datetime]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Narrow an inclusive date range (YYYY-MM-DD) to the days a time window touches.
+
+    Returns:
+        (start_date, end_date), either may be None when unbounded
+    """
+    if start_time is not None:
+        first = start_time.strftime('%Y-%m-%d')
+        start_date = max(start_date, first) if start_date else first
+    if end_time is not None:
+        # end_time is exclusive: a window ending at midnight doesn't touch that day
+        last = (end_time - timedelta(microseconds=1)).strftime('%Y-%m-%d')
+        end_date = min(end_date, last) if end_date else last
+    return start_date, end_date
@@ -0,0 +1,355 @@
+"""
+File-based work queue for spreading symbol batches over several hosts.
+
+A coordinator writes the run's tasks (one per symbol, largest first) and
+its analysis options into a directory every host can reach (NFS, SMB, a
+synced volume). Workers on any host lease tasks, write each task's result
+next to them and take the next one; the coordinator waits for all results
+and merges them. No server is involved - only atomic file operations:
+
+    <queue>/queue.json                tasks in dispatch order, lease timeout
+    <queue>/spec.json                 analysis options shared by all tasks
+    <queue>/leases/<id>.lease         held by one worker (O_CREAT | O_EXCL),
+                                      holds its id; the mtime is its heartbeat
+    <queue>/results/<id>.json         the finished task (written atomically)
+    <queue>/results/<id>.<name>.parquet  frames of the result, written first
+
+Everything is JSON or Parquet: every host can write the directory, so
+nothing read from it may be able to run code (no pickle).
+
+A lease whose heartbeat is older than the lease timeout belongs to a dead
+(or partitioned) worker: the next worker to look renames it away and
+leases the task again. Checking the age and renaming are two steps, so a
+reclaimer may rename a lease another reclaimer has just taken fresh; it
+then sees the fresh mtime on the renamed file and puts the lease back.
+Workers renew and release only leases that still hold their own id, so a
+slow worker whose lease was taken over doesn't remove the new one. If it
+finishes anyway, both write the same result and the later rename wins, so
+a task is never lost and never merged twice. Heartbeats compare file mtimes
+with the local clock, so keep host clocks in sync and the timeout generous.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import polars as pl
+
+from .memory_budget import peak_rss_bytes
+
+
+QUEUE_FILENAME = 'queue.json'
+SPEC_FILENAME = 'spec.json'
+LEASES_DIRNAME = 'leases'
+RESULTS_DIRNAME = 'results'
+
+# Seconds without a heartbeat after which a lease is taken over
+DEFAULT_LEASE_TIMEOUT = 120.0
+
+
+def worker_name() -> str:
+    """Default worker id: host and process."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{worker_name()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _json_default(value: Any) -> Any:
+    """NumPy scalars in metrics dicts serialize as their Python value."""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _to_json(data: Any) -> bytes:
+    return json.dumps(data, default=_json_default).encode()
+
+
+def _read_owner(path: Path) -> Optional[str]:
+    """Worker id in a lease file, None if there is no lease."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+class WorkQueue:
+    """
+    Tasks, leases and results of one run in a shared directory.
+
+    Instances only hold the path, so they are cheap to pickle into worker
+    processes.
+    """
+
+    def __init__(self, queue_dir: str):
+        self.queue_dir = str(queue_dir)
+
+    @property
+    def _root(self) -> Path:
+        return Path(self.queue_dir)
+
+    def create(self, tasks: List[Dict[str, Any]], spec: Any,
+               lease_timeout: float = DEFAULT_LEASE_TIMEOUT) -> None:
+        """
+        Start a run: replace any previous run's tasks, leases and results.
+
+        Args:
+            tasks: Task dicts in dispatch order, each with a unique 'id'
+                (usable as a file name); the rest is up to the caller
+            spec: JSON-serializable options shared by all tasks
+            lease_timeout: Seconds without a heartbeat before a lease is taken over
+        """
+        for dirname in (LEASES_DIRNAME, RESULTS_DIRNAME):
+            directory = self._root / dirname
+            directory.mkdir(parents=True, exist_ok=True)
+            for item in directory.iterdir():
+                item.unlink()
+        _write_atomic(self._root / SPEC_FILENAME, _to_json(spec))
+        _write_atomic(self._root / QUEUE_FILENAME,
+                      json.dumps({'tasks': tasks, 'lease_timeout': lease_timeout}).encode())
+
+    def _queue(self) -> Dict[str, Any]:
+        with open(self._root / QUEUE_FILENAME) as f:
+            return json.load(f)
+
+    def tasks(self) -> List[Dict[str, Any]]:
+        """Tasks in dispatch order."""
+        return self._queue()['tasks']
+
+    @property
+    def lease_timeout(self) -> float:
+        return self._queue()['lease_timeout']
+
+    def spec(self) -> Any:
+        """Options shared by all tasks."""
+        with open(self._root / SPEC_FILENAME) as f:
+            return json.load(f)
+
+    def _lease_path(self, task_id: str) -> Path:
+        return self._root / LEASES_DIRNAME / f"{task_id}.lease"
+
+    def _result_path(self, task_id: str) -> Path:
+        return self._root / RESULTS_DIRNAME / f"{task_id}.json"
+
+    def _frame_path(self, task_id: str, name: str) -> Path:
+        return self._root / RESULTS_DIRNAME / f"{task_id}.{name}.parquet"
+
+    def is_done(self, task_id: str) -> bool:
+        return self._result_path(task_id).exists()
+
+    def pending(self) -> List[str]:
+        """Ids of tasks without a result, in dispatch order."""
+        return [task['id'] for task in self.tasks() if not self.is_done(task['id'])]
+
+    def _expire(self, task_id: str, lease_timeout: float) -> bool:
+        """
+        Break the lease of a task if its heartbeat is too old.
+
+        Returns:
+            True if this call broke it
+        """
+        path = self._lease_path(task_id)
+        expired = path.with_name(f"{path.name}.expired-{worker_name()}-{time.time_ns()}")
+        try:
+            if time.time() - path.stat().st_mtime <= lease_timeout:
+                return False
+            os.rename(path, expired)
+            stat = expired.stat()
+        except FileNotFoundError:
+            return False
+
+        # Another reclaimer may have broken the stale lease and taken a fresh
+        # one between the stat and the rename: put that one back
+        if time.time() - stat.st_mtime <= lease_timeout:
+            owner = _read_owner(expired)
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Yet another worker leased it meanwhile; its lease stands
+                pass
+            else:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(owner or '')
+                os.utime(path, (stat.st_atime, stat.st_mtime))
+            expired.unlink()
+            return False
+        expired.unlink()
+        return True
+
+    def reclaim_expired(self) -> List[str]:
+        """Break every lease whose heartbeat is older than the lease timeout; returns their task ids."""
+        lease_timeout = self.lease_timeout
+        return [task_id for task_id in self.pending() if self._expire(task_id, lease_timeout)]
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the first task that has no result and no live lease.
+
+        Returns:
+            The task, or None if every remaining task is leased by a live worker
+        """
+        lease_timeout = self.lease_timeout
+        for task in self.tasks():
+            task_id = task['id']
+            if self.is_done(task_id):
+                continue
+            self._expire(task_id, lease_timeout)
+            try:
+                fd = os.open(self._lease_path(task_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(worker)
+            # Finished by a worker whose lease we just broke
+            if self.is_done(task_id):
+                self.release(task_id, worker)
+                continue
+            return task
+        return None
+
+    def heartbeat(self, task_id: str, worker: Optional[str] = None) -> None:
+        """Renew a lease (only if `worker` still holds it, when given)."""
+        path = self._lease_path(task_id)
+        if worker is not None and _read_owner(path) != worker:
+            return
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def keep_alive(self, task_id: str, worker: Optional[str] = None) -> Iterator[None]:
+        """Renew the lease from a background thread while the block runs."""
+        stop = threading.Event()
+        interval = self.lease_timeout / 4
+
+        def beat():
+            while not stop.wait(interval):
+                self.heartbeat(task_id, worker)
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def release(self, task_id: str, worker: Optional[str] = None) -> None:
+        """
+        Give up a lease.
+
+        Args:
+            task_id: Task whose lease to remove
+            worker: Remove it only if this worker still holds it (None = any holder)
+        """
+        path = self._lease_path(task_id)
+        if worker is not None and _read_owner(path) != worker:
+            return
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def complete(
+        self,
+        task_id: str,
+        record: Dict[str, Any],
+        frames: Optional[Dict[str, pl.DataFrame]] = None,
+        worker: Optional[str] = None
+    ) -> None:
+        """
+        Store a task's result and release its lease.
+
+        Args:
+            task_id: Finished task
+            record: JSON-serializable result record
+            frames: Name -> DataFrame stored next to the record as Parquet
+            worker: Release the lease only if this worker still holds it
+        """
+        frames = frames or {}
+        for name, frame in frames.items():
+            path = self._frame_path(task_id, name)
+            tmp = path.with_name(f"{path.name}.{worker_name()}.tmp")
+            frame.write_parquet(tmp)
+            os.replace(tmp, path)
+        # The record is written last: once it exists, the task is done
+        _write_atomic(self._result_path(task_id), _to_json({**record, 'frames': sorted(frames)}))
+        self.release(task_id, worker)
+
+    def records(self) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(task, result record) of every finished task, in dispatch order; frames are not read."""
+        for task in self.tasks():
+            path = self._result_path(task['id'])
+            if path.exists():
+                with open(path) as f:
+                    yield task, json.load(f)
+
+    def results(self) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, pl.DataFrame]]]:
+        """(task, result record, frames) of every finished task, in dispatch order."""
+        for task, record in self.records():
+            frames = {name: pl.read_parquet(self._frame_path(task['id'], name))
+                      for name in record.pop('frames', [])}
+            yield task, record, frames
+
+
+def run_worker(
+    queue: WorkQueue,
+    process: Callable[[Dict[str, Any], Any], Any],
+    worker: Optional[str] = None,
+    poll_interval: float = 1.0
+) -> int:
+    """
+    Lease and process tasks until every task of the queue has a result.
+
+    When all remaining tasks are leased by others, keep polling: a lease of
+    a dead worker expires and is taken over here.
+
+    Args:
+        queue: The run's queue
+        process: Called as process(task, spec); returns (result, frames):
+            the task's JSON-serializable result and a dict of DataFrames
+            stored as Parquet. An exception is stored as the task's error,
+            the worker's peak RSS so far (lib/memory_budget.py) as peak_rss.
+        worker: Worker id stored in leases and results (default: host-pid)
+        poll_interval: Seconds between polls while waiting
+
+    Returns:
+        Number of tasks this worker completed
+    """
+    worker = worker or worker_name()
+    spec = queue.spec()
+    completed = 0
+    while True:
+        task = queue.claim(worker)
+        if task is None:
+            if not queue.pending():
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        started = time.perf_counter()
+        frames = {}
+        with queue.keep_alive(task['id'], worker):
+            try:
+                (result, frames), error = process(task, spec), None
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+        queue.complete(task['id'], {
+            'worker': worker,
+            'seconds': time.perf_counter() - started,
+            'result': result,
+            'error': error,
+            'peak_rss': peak_rss_bytes(),
+        }, frames, worker)
+        completed += 1
@@ -8,6 +8,7 @@ Key optimizations:
 3. Data caching in worker memory
 4. Single parquet scan - read all dates at once (2-4x faster I/O)
 5. Parallel exchange loading - ThreadPoolExecutor (1.5-2x faster)
+   Load-aware scheduling - largest symbols first, workers x Polars threads ~ CPUs
 6. Pure Polars operations - zero-copy, no NumPy conversion (1.5-2x faster)
 7. Filter pushdown - filter nulls before sort (10-30% faster)
 8. Decimal → Float64 cast - 1.5-2x faster parsing
@@ -22,18 +23,265 @@ Expected speedup: 2-3x vs previous version, 30-60x vs naive implementation
 """
 
 import os
+import time
+import shutil
+import tempfile
+import asyncio
+from dataclasses import replace
+from functools import partial
 from pathlib import Path
 from itertools import combinations
-from multiprocessing import Pool, cpu_count
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import polars as pl
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 # Import analyzer library modules
 from lib.config import load_config, get_default_config
 from lib.data_loader import load_exchange_symbol_data
-from lib.analysis import analyze_pair_fast
+from lib.analysis import (
+    analyze_joined, delay_joined, pair_deviation, rolling_joined, sweep_joined, threshold_grid, threshold_labels
+)
+from lib.alignment import SymbolTimeline
+from lib.mean_reversion import mean_reversion_batch, resample_deviation
+from lib.backtest import CostModel, backtest_joined
+from lib.lead_lag import lead_lag_stats
+from lib.streaming import analyze_symbol_streaming
+from lib.results_cache import ResultsCache
+from lib.live import LiveAnalyzer, replay_pairs, run_live, serve_replay
 from lib.discovery import discover_data
+from lib.catalog import PartitionCatalog
+from lib.series_cache import SeriesCache
+from lib.compaction import compact_partitions, DEFAULT_GRACE_MINUTES
+from lib.time_window import parse_duration, parse_time
+from lib.scheduler import plan_run, plan_workers, polars_threads, rank_symbols, schedule_report
+from lib.shared_frames import frame_path, open_shared_frame, range_bounds, row_quantiles, share_frame
+from lib.partials import PairPartial, finalize_partial, merge_partials, summarize_pair_range, summary_only
+from lib.options import DEFAULT_THRESHOLDS, RunOptions
+from lib.lazy_engine import ENGINES, analyze_pairs_lazy
+from lib.memory_budget import imap_admitted, peak_rss_bytes, rss_report
+from lib.work_queue import DEFAULT_LEASE_TIMEOUT, QUEUE_FILENAME, WorkQueue, run_worker, worker_name
+
+
+DEFAULT_LIVE_URI = "ws://localhost:5000/ws/realtime_charts"
+
+
+# Result record keys holding output frames instead of stats
+OUTPUT_FRAMES = ('sweep', 'rolling', 'delays')
+
+
+class RunResults:
+    """Pair results of a run as they arrive, and the report written from them."""
+
+    def __init__(self, total_pairs, thresholds=None):
+        self.total_pairs = total_pairs
+        self.thresholds = thresholds or list(DEFAULT_THRESHOLDS)
+        self.successful = 0
+        self.skipped = 0
+        self.errors = 0
+        self.processed_pairs = 0
+        self.all_stats = []
+        self.sweep_frames = []
+        self.rolling_frames = []
+        self.delay_frames = []
+        self.frames = dict(zip(OUTPUT_FRAMES, (self.sweep_frames, self.rolling_frames, self.delay_frames)))
+        # Range summaries per pair until all of its ranges are in
+        self.pending = {}
+        # Pairs counted under errors; results of their other ranges are dropped
+        self.failed = set()
+        # (label, worker, seconds, worker's peak RSS so far) per finished task
+        self.task_runs = []
+
+    def add(self, result):
+        """Count one result record of a symbol batch, pair or time-range task."""
+        pair = (result['symbol'], result['ex1'], result['ex2'])
+        if pair in self.failed:
+            return
+        if 'partial' in result:
+            partials = self.pending.setdefault(pair, [None] * result['chunks'])
+            partials[result['chunk']] = result['partial']
+            if any(partial is None for partial in partials):
+                return
+            stats = finalize_partial(merge_partials(self.pending.pop(pair)), self.thresholds)
+            result = {
+                'symbol': result['symbol'],
+                'ex1': result['ex1'],
+                'ex2': result['ex2'],
+                'status': 'SUCCESS' if stats is not None else 'SKIPPED',
+                'stats': stats
+            }
+
+        self.processed_pairs += 1
+        symbol = result['symbol']
+        ex1 = result['ex1']
+        ex2 = result['ex2']
+        status = result['status']
+
+        if status == "SUCCESS":
+            print(f"[{self.processed_pairs}/{self.total_pairs}] OK {symbol} ({ex1} vs {ex2})")
+            self.successful += 1
+
+            for kind, frames in self.frames.items():
+                if result.get(kind) is not None:
+                    frames.append(result[kind])
+
+            if result['stats']:
+                self.all_stats.append({
+                    'symbol': symbol,
+                    'exchange1': ex1,
+                    'exchange2': ex2,
+                    **result['stats']
+                })
+        else:
+            self.skipped += 1
+
+    def add_task(self, label, worker, seconds, peak_rss):
+        """Record a finished task's run time and its worker's peak RSS in bytes (None if unknown)."""
+        self.task_runs.append((label, str(worker), seconds, peak_rss))
+
+    @property
+    def busy(self):
+        """Task label -> seconds it ran."""
+        return {label: seconds for label, _, seconds, _ in self.task_runs}
+
+    @property
+    def worker_rss(self):
+        """Worker -> peak RSS in bytes (None if unknown)."""
+        peaks = {}
+        for _, worker, _, peak_rss in self.task_runs:
+            peaks[worker] = max(filter(None, [peaks.get(worker), peak_rss]), default=None)
+        return peaks
+
+    def add_frames(self, frames):
+        """Add output frames (sweep, rolling, delays) that arrived apart from their result records."""
+        for kind, frame in frames.items():
+            self.frames[kind].append(frame)
+
+    def add_error(self, symbol, n_pairs, error):
+        """Count the pairs of a symbol whose task failed."""
+        self.processed_pairs += n_pairs
+        self.errors += n_pairs
+        print(f"[{self.processed_pairs}/{self.total_pairs}] ERROR {symbol} ({n_pairs} pairs): {error}")
+
+    def add_pair_error(self, pair, error):
+        """Count a pair whose task, or one of its time-range tasks, failed (once)."""
+        if pair in self.failed:
+            return
+        self.failed.add(pair)
+        self.pending.pop(pair, None)
+        symbol, ex1, ex2 = pair
+        self.add_error(f"{symbol} ({ex1} vs {ex2})", 1, error)
+
+    def save(self, save_dir=None):
+        """
+        Write the output files and print the rankings and totals.
+
+        Args:
+            save_dir: Output directory (default: summary_stats next to this script)
+        """
+        save_dir = Path(save_dir) if save_dir is not None else Path(__file__).parent / "summary_stats"
+        os.makedirs(save_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        def save_frame(name, df, fmt):
+            """Write one output file of the run as summary_stats/<name>_<timestamp>.<fmt>."""
+            filename = save_dir / f"{name}_{timestamp}.{fmt}"
+            if fmt == 'parquet':
+                df.write_parquet(filename)
+            else:
+                df.write_csv(filename)
+            return filename
+
+        # Save threshold sweep (long format: one row per pair, zero threshold and threshold)
+        if self.sweep_frames:
+            sweep_df = pl.concat(self.sweep_frames).sort(['symbol', 'exchange1', 'exchange2', 'zero_threshold', 'threshold'])
+            sweep_filename = save_frame('threshold_sweep', sweep_df, 'csv')
+            print(f"\n[OK] Threshold sweep saved to: {sweep_filename} ({len(sweep_df)} rows)")
+
+        # Save rolling-window time series (parquet: pair columns dictionary-encoded, ~1 row per window)
+        if self.rolling_frames:
+            rolling_df = pl.concat(self.rolling_frames) \
+                .sort(['symbol', 'exchange1', 'exchange2', 'window_start']) \
+                .with_columns(pl.col(['symbol', 'exchange1', 'exchange2']).cast(pl.Categorical))
+            rolling_filename = save_frame('rolling', rolling_df, 'parquet')
+            print(f"\n[OK] Rolling metrics saved to: {rolling_filename} ({len(rolling_df)} windows)")
+
+        # Save execution-delay sensitivity (long format: one row per pair, threshold and delay)
+        if self.delay_frames:
+            delay_df = pl.concat(self.delay_frames).sort(['symbol', 'exchange1', 'exchange2', 'threshold', 'delay_ms'])
+            delay_filename = save_frame('delay_sensitivity', delay_df, 'csv')
+            print(f"\n[OK] Delay sensitivity saved to: {delay_filename} ({len(delay_df)} rows)")
+
+        # Save task run times next to the peak RSS their worker had reached by then
+        if self.task_runs:
+            timings_df = pl.DataFrame(
+                [(label, worker, seconds, peak_rss / 2**20 if peak_rss is not None else None)
+                 for label, worker, seconds, peak_rss in self.task_runs],
+                schema={'task': pl.Utf8, 'worker': pl.Utf8, 'seconds': pl.Float64, 'worker_peak_rss_mb': pl.Float64},
+                orient='row'
+            ).sort('seconds', descending=True)
+            timings_filename = save_frame('task_timings', timings_df, 'csv')
+            print(f"\n[OK] Task timings and worker peak RSS saved to: {timings_filename}")
+
+        # Save statistics
+        if self.all_stats:
+            # Use Polars instead of pandas (faster, no extra dependency)
+            stats_df = pl.DataFrame(self.all_stats)
+            # Sort by zero_crossings_per_minute (MOST IMPORTANT for mean reversion)
+            stats_df = stats_df.sort('zero_crossings_per_minute', descending=True)
+            stats_filename = save_frame('summary_stats', stats_df, 'csv')
+
+            print(f"\n[OK] Summary statistics saved to: {stats_filename}")
+
+            # Rankings use the primary (last) threshold
+            label = threshold_labels(self.thresholds)[-1]
+            cycles_column = f'opportunity_cycles_{label}'
+            per_hour_column = f'cycles_{label}_per_hour'
+
+            print(f"\n  Top 10 pairs by mean reversion frequency (zero crossings/min):")
+            print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'ZC/min':<8} {'Cycles':<7} {label + '/hr':<9} {'Asymm':<7}")
+            print(f"  {'-'*82}")
+            for row in stats_df.head(10).iter_rows(named=True):
+                asymmetry = row.get('deviation_asymmetry', 0)
+
+                print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
+                      f"{row.get('zero_crossings_per_minute', 0):>7.2f} "
+                      f"{row.get(cycles_column, 0):>6.0f} "
+                      f"{row.get(per_hour_column, 0):>8.1f} "
+                      f"{abs(asymmetry):>6.2f}")
+
+            # Sort by opportunity cycles (complete round-trips with return to neutral)
+            cycles_sorted = stats_df.sort(cycles_column, descending=True)
+            print(f"\n  Top 10 pairs by COMPLETE cycles (most tradeable opportunities):")
+            print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'Cycles':<7} {'Per hr':<8} {'ZC/min':<8} {'Asymm':<7}")
+            print(f"  {'-'*82}")
+            for row in cycles_sorted.head(10).iter_rows(named=True):
+                asymmetry = row.get('deviation_asymmetry', 0)
+
+                print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
+                      f"{row.get(cycles_column, 0):>6.0f} "
+                      f"{row.get(per_hour_column, 0):>7.1f} "
+                      f"{row.get('zero_crossings_per_minute', 0):>7.2f} "
+                      f"{abs(asymmetry):>6.2f}")
+
+            # Net of fees and slippage (backtest of the primary threshold)
+            if f'backtest_net_pnl_{label}_pct' in stats_df.columns:
+                pnl_sorted = stats_df.sort(f'backtest_net_pnl_{label}_pct', descending=True)
+                print(f"\n  Top 10 pairs by backtest NET PnL ({label} entry, after fees and slippage):")
+                print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'Trades':<7} {'Gross%':<8} {'Net%':<8} {'Win%':<6}")
+                print(f"  {'-'*82}")
+                for row in pnl_sorted.head(10).iter_rows(named=True):
+                    print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
+                          f"{row[f'backtest_trades_{label}']:>6.0f} "
+                          f"{row[f'backtest_gross_pnl_{label}_pct']:>7.2f} "
+                          f"{row[f'backtest_net_pnl_{label}_pct']:>7.2f} "
+                          f"{row[f'backtest_win_rate_{label}']:>5.1f}")
+
+        print(f"\n--- ULTRA-FAST Analysis Finished ---")
+        print(f"Total pairs: {self.total_pairs}")
+        print(f"[OK] Successful: {self.successful}")
+        print(f"[ -] Skipped (no data): {self.skipped}")
+        print(f"[!!] Errors: {self.errors}")
 
 
 def analyze_symbol_batch(args):
@@ -43,16 +291,27 @@ def analyze_symbol_batch(args):
 
     This is the key optimization - prevents re-loading same data.
     """
-    symbol, exchanges, data_path, start_date, end_date, thresholds, zero_threshold = args
+    symbol, exchanges, options = args
+
+    # Streaming: hour by hour with carried state, never the whole range in memory
+    if options.streaming or options.results_cache is not None:
+        pair_stats = analyze_symbol_streaming(options.data_path, symbol, exchanges, options.thresholds,
+                                              options.zero_threshold, options.start_date, options.end_date,
+                                              options.catalog, options.start_time, options.end_time,
+                                              options.results_cache)
+        return pair_records(symbol, combinations(sorted(exchanges), 2), pair_stats)
 
     # OPTIMIZATION #12: Parallel loading of exchanges (1.5-2x faster)
     # Load data for all exchanges in parallel using ThreadPoolExecutor
     exchange_data = {}
 
-    with ThreadPoolExecutor(max_workers=len(exchanges)) as executor:
+    # Capped at the worker's Polars thread budget (see lib/scheduler.py)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(exchanges), pl.thread_pool_size()))) as executor:
         # Submit all loading tasks
         future_to_exchange = {
-            executor.submit(load_exchange_symbol_data, data_path, exchange, symbol, start_date, end_date): exchange
+            executor.submit(load_exchange_symbol_data, options.data_path, exchange, symbol, options.start_date,
+                            options.end_date, options.catalog, options.cache, options.start_time,
+                            options.end_time): exchange
             for exchange in exchanges
         }
 
@@ -66,86 +325,456 @@ def analyze_symbol_batch(args):
             except Exception:
                 pass
 
+    # Lazy engine: every pair as a LazyFrame, all of them in one collect_all
+    if options.engine == 'lazy':
+        pairs = list(combinations(sorted(exchanges), 2))
+        return pair_records(symbol, pairs, analyze_pairs_lazy(exchange_data, pairs, options.thresholds,
+                                                              options.zero_threshold, options.max_quote_age))
+
+    # Symbol-wide alignment: one merge for all exchanges instead of a join per pair
+    timeline = SymbolTimeline(exchange_data) if options.symbol_alignment else None
+
+    # Lead-lag: every exchange transformed once, all pairs from the spectra
+    lead_lag = options.lead_lag
+    pair_lead_lag = lead_lag_stats(exchange_data, lead_lag['interval'], lead_lag['max_lag']) \
+        if lead_lag is not None else {}
+
     # Now analyze all pairs
     results = []
-    exchange_pairs = list(combinations(sorted(exchanges), 2))
-
-    for ex1, ex2 in exchange_pairs:
-        if ex1 not in exchange_data or ex2 not in exchange_data:
-            results.append({
-                'symbol': symbol,
-                'ex1': ex1,
-                'ex2': ex2,
-                'status': 'SKIPPED',
-                'stats': None
-            })
-            continue
+    # Resampled deviations of analyzed pairs, for one batched mean-reversion pass
+    resampled = []
 
-        # Data already loaded - just analyze
-        stats = analyze_pair_fast(
-            symbol, ex1, ex2,
-            exchange_data[ex1],
-            exchange_data[ex2],
-            thresholds,
-            zero_threshold
-        )
+    for ex1, ex2 in combinations(sorted(exchanges), 2):
+        result, series = analyze_loaded_pair(symbol, ex1, ex2, exchange_data, timeline, pair_lead_lag, options)
+        results.append(result)
+        if series is not None:
+            resampled.append((result['stats'], series))
 
-        if stats is not None:
-            results.append({
-                'symbol': symbol,
-                'ex1': ex1,
-                'ex2': ex2,
-                'status': 'SUCCESS',
-                'stats': stats
-            })
-        else:
-            results.append({
-                'symbol': symbol,
-                'ex1': ex1,
-                'ex2': ex2,
-                'status': 'SKIPPED',
-                'stats': None
-            })
+    # All pairs of the symbol in one batch: stacked grids, batched least squares
+    if resampled:
+        batch = mean_reversion_batch([series for _, series in resampled], options.mean_reversion)
+        for (stats, _), mean_reversion_metrics in zip(resampled, batch):
+            stats.update(mean_reversion_metrics)
 
     return results
 
 
+def pair_records(symbol, pairs, pair_stats):
+    """Result records of pairs from (ex1, ex2) -> metrics (None or missing = skipped)."""
+    return [
+        {
+            'symbol': symbol,
+            'ex1': ex1,
+            'ex2': ex2,
+            'status': 'SUCCESS' if pair_stats.get((ex1, ex2)) is not None else 'SKIPPED',
+            'stats': pair_stats.get((ex1, ex2))
+        }
+        for ex1, ex2 in pairs
+    ]
+
+
+def analyze_loaded_pair(symbol, ex1, ex2, exchange_data, timeline, pair_lead_lag, options):
+    """
+    Analyze one pair of a symbol whose exchanges are loaded.
+
+    Returns:
+        (result record, resampled deviation for the mean-reversion batch or None)
+    """
+    thresholds = options.thresholds
+    zero_threshold = options.zero_threshold
+    max_quote_age = options.max_quote_age
+    sweep = options.sweep
+    rolling = options.rolling
+
+    if ex1 not in exchange_data or ex2 not in exchange_data:
+        return {
+            'symbol': symbol,
+            'ex1': ex1,
+            'ex2': ex2,
+            'status': 'SKIPPED',
+            'stats': None
+        }, None
+
+    try:
+        if timeline is not None:
+            joined = timeline.pair(ex1, ex2, max_quote_age)
+        else:
+            joined = pair_deviation(exchange_data[ex1], exchange_data[ex2], max_quote_age)
+    except Exception as e:
+        print(f"Error aligning {symbol} {ex1}/{ex2}: {e}")
+        joined = None
+
+    # Rolling mode: per-window metric time series next to the full-range result
+    rolling_df = rolling_joined(symbol, ex1, ex2, joined, rolling['window'], rolling['step'],
+                                thresholds, zero_threshold) if rolling is not None else None
+
+    # Execution-delay sensitivity: cycle entries re-priced after each delay
+    delay_df = delay_joined(symbol, ex1, ex2, joined, options.delays_ms, thresholds, zero_threshold) \
+        if options.delays_ms else None
+
+    # Threshold sweep mode: long-format rows instead of fixed columns
+    if sweep is not None:
+        sweep_df = sweep_joined(symbol, ex1, ex2, joined, sweep['thresholds'], sweep['zero_thresholds'])
+        return {
+            'symbol': symbol,
+            'ex1': ex1,
+            'ex2': ex2,
+            'status': 'SUCCESS' if sweep_df is not None else 'SKIPPED',
+            'stats': None,
+            'sweep': sweep_df,
+            'rolling': rolling_df,
+            'delays': delay_df
+        }, None
+
+    # Data already loaded - just analyze
+    stats = analyze_joined(joined, thresholds, zero_threshold)
+
+    if stats is None:
+        return {
+            'symbol': symbol,
+            'ex1': ex1,
+            'ex2': ex2,
+            'status': 'SKIPPED',
+            'stats': None
+        }, None
+
+    if options.costs is not None:
+        stats.update(backtest_joined(joined, ex1, ex2, options.costs, thresholds, zero_threshold))
+
+    if (ex1, ex2) in pair_lead_lag:
+        stats.update(pair_lead_lag[(ex1, ex2)])
+
+    series = resample_deviation(joined, options.mean_reversion) if options.mean_reversion is not None else None
+
+    return {
+        'symbol': symbol,
+        'ex1': ex1,
+        'ex2': ex2,
+        'status': 'SUCCESS',
+        'stats': stats,
+        'rolling': rolling_df,
+        'delays': delay_df
+    }, series
+
+
+def stage_exchange(args):
+    """
+    Load one exchange of a heavy symbol into a shared frame (lib/shared_frames.py).
+
+    Returns:
+        (symbol, exchange, path, first and last timestamp in epoch us, row
+        quantiles of the timestamps), path None if there is no data
+    """
+    symbol, exchange, options, shared_dir = args
+    data = load_exchange_symbol_data(options.data_path, exchange, symbol, options.start_date, options.end_date,
+                                     options.catalog, options.cache, options.start_time, options.end_time)
+    if data is None or data.is_empty():
+        return symbol, exchange, None, None, None, None
+
+    path = frame_path(shared_dir, symbol, exchange)
+    try:
+        share_frame(data, path)
+    except OSError as e:
+        print(f"WARNING: Failed to share {exchange} {symbol}: {e}")
+        return symbol, exchange, None, None, None, None
+    timestamps = data['timestamp'].dt.epoch('us')
+    return symbol, exchange, str(path), timestamps[0], timestamps[-1], row_quantiles(data)
+
+
+def analyze_chunk_task(args):
+    """
+    Summarize one time range of a split pair from its shared frames.
+
+    Returns a PairPartial instead of metrics; the caller merges the ranges
+    of the pair in time order (lib/partials.py) and finalizes them.
+    """
+    symbol, ex1, ex2, paths, chunk, n_chunks, start, end, options = args
+    data1, data2 = open_shared_frame(paths[ex1]), open_shared_frame(paths[ex2])
+    try:
+        partial = summarize_pair_range(data1, data2, start, end, options.thresholds, options.zero_threshold)
+    except Exception as e:
+        print(f"Error aligning {symbol} {ex1}/{ex2} from {start} to {end}: {e}")
+        partial = PairPartial()
+    return [{'symbol': symbol, 'ex1': ex1, 'ex2': ex2, 'chunk': chunk, 'chunks': n_chunks, 'partial': partial}]
+
+
+def analyze_pair_task(args):
+    """
+    Analyze one pair of a split symbol from its shared frames.
+
+    Same result as the pair's part of analyze_symbol_batch: lead-lag uses the
+    symbol-wide grid span and mean-reversion statistics are per pair anyway.
+    Symbol alignment is not used; per-pair joins give identical results.
+    """
+    symbol, ex1, ex2, paths, lead_lag_span, options = args
+
+    exchange_data = {}
+    for exchange in (ex1, ex2):
+        data = open_shared_frame(paths.get(exchange))
+        if data is not None:
+            exchange_data[exchange] = data
+
+    if options.engine == 'lazy':
+        pair_stats = analyze_pairs_lazy(exchange_data, [(ex1, ex2)], options.thresholds, options.zero_threshold,
+                                        options.max_quote_age)
+        return pair_records(symbol, [(ex1, ex2)], pair_stats)
+
+    lead_lag = options.lead_lag
+    pair_lead_lag = lead_lag_stats(exchange_data, lead_lag['interval'], lead_lag['max_lag'], lead_lag_span) \
+        if lead_lag is not None and len(exchange_data) == 2 else {}
+
+    result, series = analyze_loaded_pair(symbol, ex1, ex2, exchange_data, None, pair_lead_lag, options)
+    if series is not None:
+        result['stats'].update(mean_reversion_batch([series], options.mean_reversion)[0])
+    return [result]
+
+
+def describe_error(error):
+    """One-line message of a failed task."""
+    return f"{type(error).__name__}: {error}"
+
+
+def timed_task(task):
+    """
+    Run a (label, function, args) pool task.
+
+    Returns:
+        (label, result, run time, worker pid, worker peak RSS) for the run report
+    """
+    label, function, args = task
+    started = time.perf_counter()
+    result = function(args)
+    return label, result, time.perf_counter() - started, os.getpid(), peak_rss_bytes()
+
+
+def print_memory_report(worker_rss, budget=None):
+    """Print the budget's estimated peak and the measured peak RSS per worker."""
+    if budget is not None:
+        print(f"--- Memory budget: {budget.budget_bytes / 2**20:,.0f} MB, estimated peak of running tasks "
+              f"{budget.peak / 2**20:,.0f} MB of {max(0, budget.available) / 2**20:,.0f} MB ---")
+    peaks = rss_report(worker_rss)
+    if peaks:
+        print(f"--- Peak RSS per worker: {', '.join(f'{peak:,}' for peak in peaks)} MB ---")
+
+
+def process_queue_task(task, spec, data_path):
+    """
+    Analyze one symbol leased from a work queue (lib/work_queue.py).
+
+    The worker reads the data through its own data_path (the shared storage
+    may be mounted elsewhere than on the coordinator) and its own catalog,
+    series cache and results cache handles on it.
+
+    Returns:
+        (result records without their frames, output frames concatenated
+        per kind) - JSON and Parquet for the queue
+    """
+    options = RunOptions.from_dict(spec['options'])
+    options = replace(
+        options,
+        data_path=data_path,
+        catalog=PartitionCatalog(data_path) if spec['use_catalog'] else None,
+        cache=SeriesCache(data_path) if spec['use_series_cache'] and not options.streaming else None,
+        results_cache=ResultsCache(data_path, options.thresholds, options.zero_threshold)
+        if spec['use_results_cache'] else None
+    )
+    records = analyze_symbol_batch((task['symbol'], task['exchanges'], options))
+    frames = {}
+    for kind in OUTPUT_FRAMES:
+        kind_frames = [record[kind] for record in records if record.get(kind) is not None]
+        if kind_frames:
+            frames[kind] = pl.concat(kind_frames)
+    return [{key: value for key, value in record.items() if key not in OUTPUT_FRAMES} for record in records], frames
+
+
+def queue_worker(queue_dir, data_path, worker):
+    """Worker process: lease and analyze symbols until the queue is done."""
+    run_worker(WorkQueue(queue_dir), partial(process_queue_task, data_path=data_path), worker=worker)
+
+
+def start_queue_workers(queue_dir, data_path, n_workers, worker_threads):
+    """
+    Start worker processes on this host for a queue.
+
+    Plain processes instead of a pool: every worker leases symbols until the
+    queue is done, so one killed mid-task (e.g. by the OOM killer) only
+    loses its lease - the other workers, here or on other hosts, lease the
+    symbol again once it expires - and waiting on the processes still ends.
+
+    Returns:
+        The started processes, named by the worker id in their results
+    """
+    context = get_context('spawn')
+    processes = [
+        context.Process(target=queue_worker, args=(queue_dir, data_path, f"{worker_name()}-{k}"),
+                        name=f"{worker_name()}-{k}")
+        for k in range(n_workers)
+    ]
+    # Spawned workers read POLARS_MAX_THREADS when they import Polars
+    with polars_threads(worker_threads):
+        for process in processes:
+            process.start()
+    return processes
+
+
+def stop_queue_workers(processes):
+    """Terminate the worker processes still running and wait for all of them."""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+
+
+def run_queue_workers(queue_dir, data_path, n_workers=None, polars_threads_per_worker=None):
+    """
+    Run worker processes on this host for a coordinator's queue.
+
+    Args:
+        queue_dir: The coordinator's queue directory
+        data_path: Path to the market data directory on this host
+        n_workers: Worker processes (default: one per CPU, at most one per pending symbol)
+        polars_threads_per_worker: Polars threads in each worker (default: CPUs / workers)
+
+    Returns:
+        Number of symbols analyzed here
+    """
+    queue = WorkQueue(queue_dir)
+    n_workers, worker_threads = plan_workers(len(queue.pending()), n_workers=n_workers,
+                                             polars_threads=polars_threads_per_worker)
+    print(f"Using {n_workers} queue workers x {worker_threads} Polars threads on {queue_dir}")
+    processes = start_queue_workers(queue_dir, data_path, n_workers, worker_threads)
+    try:
+        for process in processes:
+            process.join()
+    finally:
+        stop_queue_workers(processes)
+
+    for process in processes:
+        if process.exitcode:
+            print(f"WARNING: Queue worker {process.name} exited with code {process.exitcode}; "
+                  f"its symbol is leased again once the lease expires")
+    names = {process.name for process in processes}
+    return sum(record['worker'] in names for _, record in queue.records())
+
+
+def coordinate_queue(queue_dir, tasks, spec, data_path, results, n_workers, worker_threads,
+                     lease_timeout=DEFAULT_LEASE_TIMEOUT, poll_interval=1.0):
+    """
+    Publish symbol tasks to a work queue, wait for every result and merge them.
+
+    Workers on other hosts join with --worker; n_workers local workers are
+    started here as well (0 = coordinate only). Leases of dead workers are
+    broken after lease_timeout and their symbols leased again. A run whose
+    local workers have all died is aborted (RuntimeError).
+
+    Task run times and worker peak RSS go to results (RunResults.add_task).
+    """
+    queue = WorkQueue(queue_dir)
+    queue.create(tasks, spec, lease_timeout)
+    print(f"--- Work queue: {queue_dir} ({len(tasks)} symbols, lease timeout {lease_timeout:g}s) ---")
+
+    processes = start_queue_workers(queue_dir, data_path, n_workers, worker_threads) if n_workers else []
+    dead = set()
+    try:
+        remaining = None
+        while True:
+            pending = queue.pending()
+            if len(pending) != remaining:
+                remaining = len(pending)
+                print(f"[queue] {len(tasks) - remaining}/{len(tasks)} symbols done")
+            if not pending:
+                break
+            # A local worker that died (killed, or its worker loop failed) leaves its lease to expire
+            for process in processes:
+                if process.exitcode and process.name not in dead:
+                    dead.add(process.name)
+                    print(f"[queue] Local worker {process.name} exited with code {process.exitcode}")
+            if processes and len(dead) == len(processes):
+                raise RuntimeError(f"Every local queue worker died with {len(pending)} symbols left "
+                                   f"(see above); workers started with --worker on {queue_dir} can finish them")
+            for task_id in queue.reclaim_expired():
+                print(f"[queue] Lease of {task_id} expired, leasing it again")
+            time.sleep(poll_interval)
+    finally:
+        stop_queue_workers(processes)
+
+    for task, record, frames in queue.results():
+        results.add_task(task['symbol'], record['worker'], record['seconds'], record['peak_rss'])
+        if record['error'] is not None:
+            results.add_error(task['symbol'], task['pairs'], f"{record['error']} (worker {record['worker']})")
+            continue
+        for result in record['result']:
+            results.add(result)
+        results.add_frames(frames)
+
+
 def run_ultra_fast_analysis(
     data_path,
+    options,
     exchanges_filter=None,
     n_workers=None,
-    start_date=None,
-    end_date=None,
-    thresholds=None,
-    zero_threshold=0.05
+    use_catalog=True,
+    rebuild_catalog=False,
+    use_series_cache=True,
+    use_results_cache=False,
+    polars_threads_per_worker=None,
+    split_symbols=True,
+    queue_dir=None,
+    lease_timeout=DEFAULT_LEASE_TIMEOUT,
+    memory_budget_mb=None
 ):
     """
     ULTRA-FAST analysis with batching and caching.
 
     Args:
         data_path: Path to the market data directory.
+        options: RunOptions with the date/time filters, streaming and the analysis
+            settings (thresholds, sweep, rolling, mean reversion, backtest costs,
+            lead-lag, delays, max quote age, engine); the data path and the
+            catalog/cache handles are filled in here.
         exchanges_filter: A list of exchanges to filter by.
-        n_workers: Number of parallel workers (default: 3x CPU cores)
-        start_date: Start date filter (YYYY-MM-DD format), inclusive. If None, no start filter.
-        end_date: End date filter (YYYY-MM-DD format), inclusive. If None, no end filter.
-        thresholds: List of analysis thresholds (default: [0.3, 0.5, 0.4])
-        zero_threshold: Neutral zone threshold (default: 0.05)
+        n_workers: Number of parallel workers (default: one per CPU, at most one per symbol)
+        use_catalog: Use the on-disk partition catalog for discovery and loading
+        rebuild_catalog: Re-read every file instead of refreshing the catalog incrementally
+        use_series_cache: Read closed days from the memory-mapped Arrow IPC series cache
+        use_results_cache: Reuse cached per-hour partials of unchanged hours (implies streaming)
+        polars_threads_per_worker: Polars threads in each worker (default: CPUs / workers)
+        split_symbols: Analyze symbols heavier than a worker's share as pair tasks over
+            shared frames (not in streaming mode)
+        queue_dir: Shared directory. When given, coordinate: lease the symbols to workers
+            on any host (--worker) through a work queue there and merge their results;
+            n_workers local workers join (0 = none).
+        lease_timeout: Seconds without a heartbeat before a worker's symbol is leased again
+        memory_budget_mb: Admit tasks only while their estimated footprints fit in this many MB,
+            with at most as many workers as fit; symbols larger than the budget stream hour by
+            hour when the options allow it and run as pair tasks otherwise, and a run with a
+            task that still doesn't fit is refused (lib/memory_budget.py). None = no limit.
     """
     DATA_PATH = data_path
+    print_window(options)
 
-    # Print date filter info
-    if start_date or end_date:
-        if start_date and end_date:
-            print(f"\n>>> Filtering data: {start_date} to {end_date} <<<")
-        elif start_date:
-            print(f"\n>>> Filtering data: from {start_date} onwards <<<")
-        else:
-            print(f"\n>>> Filtering data: up to {end_date} <<<")
-    else:
-        print("\n>>> Analyzing ALL available data <<<")
+    # Refresh the partition catalog once; workers only read it
+    catalog = None
+    if use_catalog and Path(DATA_PATH).exists():
+        catalog = PartitionCatalog(DATA_PATH)
+        catalog_df = catalog.refresh(full=rebuild_catalog)
+        print(f"--- Catalog: {len(catalog_df)} files ({catalog.catalog_path}) ---")
+
+    streaming = options.streaming or use_results_cache
+    options = replace(
+        options,
+        data_path=DATA_PATH,
+        catalog=catalog,
+        cache=SeriesCache(DATA_PATH) if use_series_cache and not streaming else None,
+        results_cache=ResultsCache(DATA_PATH, options.thresholds, options.zero_threshold)
+        if use_results_cache else None,
+        streaming=streaming
+    )
+    print_settings(options)
 
     # Discover symbols
-    symbols_to_analyze = discover_data(DATA_PATH)
+    symbols_to_analyze = discover_data(DATA_PATH, catalog)
 
     # DEBUG: Print some symbols to check formats
     print("\n--- Sample symbols found ---")
@@ -178,111 +807,268 @@ def run_ultra_fast_analysis(
 
     print("\n--- Preparing Symbol Batches ---")
 
-    # Create tasks (one per SYMBOL, not per pair)
+    # Coordinator: one task per symbol, largest first, for workers on any host
+    if queue_dir:
+        plan = rank_symbols(DATA_PATH, symbols_to_analyze, options)
+        tasks = [
+            {'id': f"{rank:05d}-{symbol.replace('/', '_')}", 'symbol': symbol,
+             'exchanges': plan.exchanges[symbol], 'pairs': plan.n_pairs[symbol], 'cost': plan.costs[symbol]}
+            for rank, symbol in enumerate(plan.symbols)
+        ]
+        # Workers open their own handles on the data as mounted on their host
+        spec = {
+            'options': options.to_dict(),
+            'use_catalog': catalog is not None, 'use_series_cache': use_series_cache,
+            'use_results_cache': use_results_cache,
+        }
+        local_workers, worker_threads = (0, 1) if n_workers == 0 else \
+            plan_workers(len(tasks), n_workers=n_workers, polars_threads=polars_threads_per_worker)
+
+        print(f"Total symbols: {len(plan.symbols)}")
+        print(f"Total pairs: {plan.total_pairs}")
+        print(f"Local workers: {local_workers} x {worker_threads} Polars threads")
+        print("\n--- Starting ULTRA-FAST Analysis (coordinator) ---\n")
+
+        results = RunResults(plan.total_pairs, options.thresholds)
+        started = time.perf_counter()
+        coordinate_queue(queue_dir, tasks, spec, DATA_PATH, results, local_workers, worker_threads, lease_timeout)
+        workers = max(1, len(results.worker_rss))
+        report = schedule_report(results.busy, workers, time.perf_counter() - started)
+        print(f"\n--- Scheduler: {report['utilization_pct']:.0f}% worker utilization "
+              f"({report['busy_sec']:.1f}s busy over {workers} workers); longest task "
+              f"{report['longest_task']} {report['longest_sec']:.1f}s ---")
+        print_memory_report(results.worker_rss)
+        results.save()
+        return
+
+    # Task order, splitting, memory footprints and pool size (lib/scheduler.py)
+    try:
+        plan = plan_run(DATA_PATH, symbols_to_analyze, options, n_workers, polars_threads_per_worker,
+                        memory_budget_mb, split_symbols)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return
+    print_plan(plan)
+
+    # One task per SYMBOL, not per pair; split symbols get theirs once they are loaded
+    symbol_tasks = [
+        (plan.costs[symbol], plan.footprints[symbol],
+         (symbol, analyze_symbol_batch,
+          (symbol, plan.exchanges[symbol],
+           replace(options, streaming=True, cache=None) if symbol in plan.stream else options)))
+        for symbol in plan.batches
+    ]
+    shared_dir = tempfile.mkdtemp(prefix='analyzer-shared-') if plan.split else None
+    stage_tasks = [
+        (f"{symbol} {exchange} (load)", stage_exchange, (symbol, exchange, options, shared_dir))
+        for symbol, exchange, _ in plan.stage
+    ]
+
+    # Process in parallel
+    n_workers = plan.workers
+    budget = plan.budget
+    results = RunResults(plan.total_pairs, options.thresholds)
+
+    # 'spawn' (the Windows default everywhere): forking after Polars has
+    # started its thread pool in this process (catalog refresh) can deadlock.
+    # Spawned workers read POLARS_MAX_THREADS when they import Polars; the
+    # executor spawns them as tasks are submitted, so it stays set throughout.
+    # A failed task is counted under Errors and the others go on; a killed
+    # worker fails the tasks left (BrokenProcessPool) instead of hanging.
+    pool_started = time.perf_counter()
+    try:
+        with polars_threads(plan.threads), \
+                ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context('spawn')) as pool:
+            # Split symbols first: every exchange loaded once into a shared frame
+            shared = {symbol: {} for symbol in plan.split}
+            failed = {}
+            for (label, _, (symbol, _, _, _)), staged, error in \
+                    imap_admitted(pool, timed_task, stage_tasks, [footprint for _, _, footprint in plan.stage],
+                                  budget, n_workers):
+                if error is not None:
+                    failed.setdefault(symbol, error)
+                    continue
+                _, (_, exchange, path, first, last, quantiles), seconds, pid, rss = staged
+                results.add_task(label, pid, seconds, rss)
+                shared[symbol][exchange] = (path, first, last, quantiles)
+
+            pair_tasks = []
+            for symbol in plan.split:
+                if symbol in failed:
+                    results.add_error(symbol, plan.n_pairs[symbol], describe_error(failed[symbol]))
+                    continue
+                pair_tasks.extend(split_pair_tasks(plan, symbol, shared[symbol], options))
+
+            # Process by SYMBOL batches and pair tasks, largest first, while they fit the memory budget
+            ordered = sorted(symbol_tasks + pair_tasks, key=lambda item: item[0], reverse=True)
+            results_batches = imap_admitted(pool, timed_task, [task for _, _, task in ordered],
+                                            [footprint for _, footprint, _ in ordered], budget, n_workers)
+
+            for (label, function, args), batch, error in results_batches:
+                if error is not None:
+                    if function is analyze_symbol_batch:
+                        results.add_error(args[0], plan.n_pairs[args[0]], describe_error(error))
+                    else:
+                        results.add_pair_error(tuple(args[:3]), describe_error(error))
+                    continue
+                _, batch_results, seconds, pid, rss = batch
+                results.add_task(label, pid, seconds, rss)
+                for result in batch_results:
+                    results.add(result)
+
+        report = schedule_report(results.busy, n_workers, time.perf_counter() - pool_started)
+        print(f"\n--- Scheduler: {report['utilization_pct']:.0f}% worker utilization "
+              f"({report['busy_sec']:.1f}s busy over {n_workers} workers); longest task "
+              f"{report['longest_task']} {report['longest_sec']:.1f}s, best possible wall "
+              f"{report['bound_sec']:.1f}s ---")
+        print_memory_report(results.worker_rss, budget)
+    finally:
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+        # What finished is written even if the run was cut short
+        results.save()
+
+
+def split_pair_tasks(plan, symbol, shared, options):
+    """
+    Pair and time-range tasks of a split symbol whose exchanges are staged.
+
+    Args:
+        plan: The run's RunPlan
+        symbol: A symbol of plan.split
+        shared: Exchange -> (path, first, last, quantiles) from stage_exchange
+
+    Returns:
+        (cost, footprint, (label, function, args)) per task
+    """
+    # Lead-lag grid over the range all of the symbol's exchanges cover, as in a symbol batch
+    loaded = [(first, last) for path, first, last, _ in shared.values() if path is not None]
+    span = (max(first for first, _ in loaded), min(last for _, last in loaded)) if loaded else None
+    paths = {exchange: path for exchange, (path, _, _, _) in shared.items()}
+
     tasks = []
-    total_pairs = 0
+    for ex1, ex2 in combinations(plan.exchanges[symbol], 2):
+        key = (symbol, ex1, ex2)
+        pair_cost, pair_footprint, chunks = plan.pair_costs[key], plan.pair_footprints[key], plan.chunks[key]
+        if chunks > 1 and paths[ex1] is not None and paths[ex2] is not None:
+            # Ranges with about equal ex1 rows
+            bounds = range_bounds(shared[ex1][3], chunks)
+            for k in range(chunks):
+                args = (symbol, ex1, ex2, paths, k, chunks, bounds[k], bounds[k + 1], options)
+                tasks.append((pair_cost / chunks, pair_footprint // chunks,
+                              (f"{symbol} {ex1}/{ex2} [{k + 1}/{chunks}]", analyze_chunk_task, args)))
+            continue
+        args = (symbol, ex1, ex2, paths, span, options)
+        tasks.append((pair_cost, pair_footprint, (f"{symbol} {ex1}/{ex2}", analyze_pair_task, args)))
+    return tasks
 
-    for symbol, exchanges in symbols_to_analyze.items():
-        n_pairs = len(list(combinations(exchanges, 2)))
-        total_pairs += n_pairs
-        tasks.append((symbol, list(exchanges), DATA_PATH, start_date, end_date, thresholds, zero_threshold))
 
-    print(f"Total symbols: {len(tasks)}")
-    print(f"Total pairs: {total_pairs}")
+def print_window(options):
+    """Print the run's date filter and time window."""
+    start_date, end_date = options.start_date, options.end_date
+    start_time, end_time = options.start_time, options.end_time
+
+    # Print date filter info
+    if start_date or end_date:
+        if start_date and end_date:
+            print(f"\n>>> Filtering data: {start_date} to {end_date} <<<")
+        elif start_date:
+            print(f"\n>>> Filtering data: from {start_date} onwards <<<")
+        else:
+            print(f"\n>>> Filtering data: up to {end_date} <<<")
+    elif not (start_time or end_time):
+        print("\n>>> Analyzing ALL available data <<<")
+
+    if start_time or end_time:
+        print(f"\n>>> Time window (UTC): {start_time or '-inf'} to {end_time or '+inf'} <<<")
 
-    # Determine workers
-    if n_workers is None:
-        n_workers = cpu_count() * 3
 
-    print(f"Using {n_workers} parallel workers")
-    print(f"Batch processing: {total_pairs / len(tasks):.1f} pairs per symbol (avg)")
+def print_settings(options):
+    """Print the analysis modes and settings a run uses."""
+    if options.streaming:
+        print("\n>>> Streaming mode: hour by hour, bounded memory <<<")
+    if options.results_cache is not None:
+        print(f"--- Results cache: {options.results_cache.cache_dir} "
+              f"(config {options.results_cache.config_hash}) ---")
+
+    sweep = options.sweep
+    if sweep is not None:
+        print(f"\n>>> Threshold sweep: {len(sweep['thresholds'])} thresholds "
+              f"({min(sweep['thresholds'])}%-{max(sweep['thresholds'])}%) x "
+              f"zero thresholds {sweep['zero_thresholds']} <<<")
+
+    if options.rolling is not None:
+        print(f"\n>>> Rolling windows: {options.rolling['window']} every {options.rolling['step']} <<<")
+
+    if options.mean_reversion:
+        print(f"\n>>> Mean-reversion statistics on a {options.mean_reversion} grid <<<")
+
+    costs = options.costs
+    if costs is not None:
+        print(f"\n>>> Backtest: taker fee {costs.default_taker_fee}% default "
+              f"({len(costs.taker_fees)} exchanges listed), slippage {costs.slippage}% per fill <<<")
+
+    if options.lead_lag is not None:
+        print(f"\n>>> Lead-lag: {options.lead_lag['interval']} grid, "
+              f"lags up to +/-{options.lead_lag['max_lag']} <<<")
+
+    if options.delays_ms:
+        print(f"\n>>> Execution delays: {', '.join(f'{delay:g}' for delay in options.delays_ms)} ms <<<")
+
+    if options.max_quote_age:
+        print(f"\n>>> Max quote age: {options.max_quote_age} (older quotes count as gaps) <<<")
+
+    if options.engine == 'lazy':
+        print("\n>>> Lazy engine: all pairs of a symbol in one query batch <<<")
+
+
+def print_plan(plan):
+    """Print the totals, pool size and splitting of a RunPlan."""
+    print(f"Total symbols: {len(plan.symbols)}")
+    print(f"Total pairs: {plan.total_pairs}")
+    print(f"Using {plan.workers} parallel workers x {plan.threads} Polars threads")
+    print(f"Largest symbol: {plan.symbols[0]} ({plan.costs[plan.symbols[0]]:,} {plan.cost_unit})")
+    if plan.split:
+        print(f"Split into pair tasks: {', '.join(symbol for symbol in plan.symbols if symbol in plan.split)}")
+    if any(chunks > 1 for chunks in plan.chunks.values()):
+        print(f"Split into time ranges: {sum(chunks > 1 for chunks in plan.chunks.values())} pairs")
+    if plan.budget is not None:
+        print(f"Memory budget: {plan.budget.budget_bytes / 2**20:,.0f} MB, largest task ~{max(plan.footprints.values()) / 2**20:,.0f} MB")
+    if plan.stream:
+        print(f"Streaming (over memory budget): "
+              f"{', '.join(symbol for symbol in plan.symbols if symbol in plan.stream)}")
+    elif plan.oversized:
+        print(f"Pair tasks (over memory budget): "
+              f"{', '.join(symbol for symbol in plan.symbols if symbol in plan.oversized)}")
+    print(f"Batch processing: {plan.total_pairs / len(plan.symbols):.1f} pairs per symbol (avg)")
     print(f"\n--- Starting ULTRA-FAST Analysis ---\n")
 
-    # Process in parallel
-    successful = 0
-    skipped = 0
-    errors = 0
-    all_stats = []
-
-    processed_pairs = 0
-
-    with Pool(processes=n_workers) as pool:
-        # Process by SYMBOL batches
-        results_batches = pool.imap_unordered(analyze_symbol_batch, tasks, chunksize=1)
-
-        for batch_results in results_batches:
-            for result in batch_results:
-                processed_pairs += 1
-                symbol = result['symbol']
-                ex1 = result['ex1']
-                ex2 = result['ex2']
-                status = result['status']
-
-                if status == "SUCCESS":
-                    print(f"[{processed_pairs}/{total_pairs}] OK {symbol} ({ex1} vs {ex2})")
-                    successful += 1
-
-                    if result['stats']:
-                        all_stats.append({
-                            'symbol': symbol,
-                            'exchange1': ex1,
-                            'exchange2': ex2,
-                            **result['stats']
-                        })
-                else:
-                    skipped += 1
-
-    # Save statistics
-    if all_stats:
-        # Use Polars instead of pandas (faster, no extra dependency)
-        stats_df = pl.DataFrame(all_stats)
-        # Sort by zero_crossings_per_minute (MOST IMPORTANT for mean reversion)
-        stats_df = stats_df.sort('zero_crossings_per_minute', descending=True)
-
-        # Create summary_stats directory inside analyzer if it doesn't exist
-        analyzer_dir = Path(__file__).parent
-        save_dir = analyzer_dir / "summary_stats"
-        os.makedirs(save_dir, exist_ok=True)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        stats_filename = save_dir / f"summary_stats_{timestamp}.csv"
-        stats_df.write_csv(stats_filename)
-
-        print(f"\n[OK] Summary statistics saved to: {stats_filename}")
-
-        print(f"\n  Top 10 pairs by mean reversion frequency (zero crossings/min):")
-        print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'ZC/min':<8} {'Cycles':<7} {'40bp/hr':<9} {'Asymm':<7}")
-        print(f"  {'-'*82}")
-        for row in stats_df.head(10).iter_rows(named=True):
-            asymmetry = row.get('deviation_asymmetry', 0)
-            cycles_040bp = row.get('opportunity_cycles_040bp', 0)
-
-            print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
-                  f"{row.get('zero_crossings_per_minute', 0):>7.2f} "
-                  f"{cycles_040bp:>6.0f} "
-                  f"{row.get('cycles_040bp_per_hour', 0):>8.1f} "
-                  f"{abs(asymmetry):>6.2f}")
-
-        # Sort by opportunity cycles (complete round-trips with return to neutral)
-        cycles_sorted = stats_df.sort('opportunity_cycles_040bp', descending=True)
-        print(f"\n  Top 10 pairs by COMPLETE cycles (most tradeable opportunities):")
-        print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'Cycles':<7} {'Per hr':<8} {'ZC/min':<8} {'Asymm':<7}")
-        print(f"  {'-'*82}")
-        for row in cycles_sorted.head(10).iter_rows(named=True):
-            asymmetry = row.get('deviation_asymmetry', 0)
-            cycles_040bp = row.get('opportunity_cycles_040bp', 0)
-
-            print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
-                  f"{cycles_040bp:>6.0f} "
-                  f"{row.get('cycles_040bp_per_hour', 0):>7.1f} "
-                  f"{row.get('zero_crossings_per_minute', 0):>7.2f} "
-                  f"{abs(asymmetry):>6.2f}")
-
-    print(f"\n--- ULTRA-FAST Analysis Finished ---")
-    print(f"Total pairs: {total_pairs}")
-    print(f"[OK] Successful: {successful}")
-    print(f"[ -] Skipped (no data): {skipped}")
-    print(f"[!!] Errors: {errors}")
+def publish_live_ranking(stats_df, top=10, thresholds=None):
+    """Print the live ranking and keep summary_stats/live_ranking.csv current."""
+    if stats_df.is_empty():
+        print("--- Live: no pairs yet ---")
+        return
+
+    save_dir = Path(__file__).parent / "summary_stats"
+    os.makedirs(save_dir, exist_ok=True)
+    ranking_path = save_dir / "live_ranking.csv"
+    tmp = ranking_path.with_name(f"{ranking_path.name}.{os.getpid()}.tmp")
+    stats_df.write_csv(tmp)
+    os.replace(tmp, ranking_path)
+
+    print(f"\n  Live ranking {datetime.now().strftime('%H:%M:%S')} - top {top} of {len(stats_df)} pairs "
+          f"by zero crossings/min:")
+    # Primary (last) threshold, as in RunResults.save
+    label = threshold_labels(thresholds or list(DEFAULT_THRESHOLDS))[-1]
+    print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'ZC/min':<8} {'Cycles':<7} {label + '/hr':<9} {'Hours':<7}")
+    print(f"  {'-'*82}")
+    for row in stats_df.head(top).iter_rows(named=True):
+        print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
+              f"{row['zero_crossings_per_minute']:>7.2f} "
+              f"{row.get(f'opportunity_cycles_{label}', 0):>6.0f} "
+              f"{row.get(f'cycles_{label}_per_hour', 0):>8.1f} "
+              f"{row['duration_hours']:>6.2f}")
 
 
 if __name__ == "__main__":
@@ -313,11 +1099,68 @@ Examples:
   # Analyze up to a specific date
   python run_all_ultra.py --end-date 2025-11-02
 
+  # Analyze an intra-day window (UTC, end exclusive)
+  python run_all_ultra.py --start "2025-11-02 14:00" --end "2025-11-02 16:00"
+
+  # Analyze the last 90 minutes
+  python run_all_ultra.py --last 90m
+
+  # Sweep thresholds 0.10%-1.00% in 1bp steps for two neutral zones
+  python run_all_ultra.py --sweep 0.10 1.00 0.01 --zero-thresholds 0.03 0.05
+
+  # Analyze a long range with bounded worker memory
+  python run_all_ultra.py --start-date 2025-10-01 --end-date 2025-10-31 --streaming
+
+  # Rerun during the day, recomputing only hours with new data
+  python run_all_ultra.py --results-cache
+
+  # Live ranking from the collector's realtime stream
+  python run_all_ultra.py --live ws://localhost:5000/ws/realtime_charts
+
+  # Serve recorded data like the collector (for --live without the collector)
+  python run_all_ultra.py --replay-server --date 2025-11-03 --replay-speed 10
+
+  # Hourly metrics every 15 minutes per pair (regime changes within the range)
+  python run_all_ultra.py --rolling 1h 15m
+
+  # Add ADF statistic, half-life and deviation moments (1s grid)
+  python run_all_ultra.py --mean-reversion 1s
+
+  # Net PnL per pair after taker fees (config backtest section) and 0.05% slippage
+  python run_all_ultra.py --backtest --slippage 0.05
+
+  # Which exchange moves first (50ms grid, lags up to 2s)
+  python run_all_ultra.py --lead-lag 50ms --lead-lag-max 2s
+
+  # How much of each cycle is left after 5-500ms execution delays
+  python run_all_ultra.py --delays 5 50 100 250 500
+
+  # Ignore quotes older than 5s (silent feeds) and report the gaps
+  python run_all_ultra.py --max-quote-age 5s
+
   # Use more workers for faster processing
   python run_all_ultra.py --workers 16 --date 2025-11-03
 
+  # Several hosts: a coordinator leases symbols through a shared directory ...
+  python run_all_ultra.py --coordinator /mnt/shared/queue --workers 0
+  # ... to workers on every host (data path as mounted there)
+  python run_all_ultra.py --worker /mnt/shared/queue --data-path /mnt/shared/data
+
+  # Keep the estimated memory of running tasks under 8 GB
+  python run_all_ultra.py --memory-budget 8000 --start-date 2025-10-01 --end-date 2025-11-03
+
+  # Evaluate all pairs of a symbol as one lazy Polars query batch
+  python run_all_ultra.py --engine lazy
+
   # Use config file
   python run_all_ultra.py --config config.yaml
+
+  # Rebuild the partition catalog from scratch
+  python run_all_ultra.py --rebuild-catalog
+
+  # Compact closed hours (or whole days) of collector output
+  python run_all_ultra.py --compact
+  python run_all_ultra.py --compact --compact-by day
         """
     )
     parser.add_argument("--data-path", type=str, default=None,
@@ -325,19 +1168,97 @@ Examples:
     parser.add_argument("--exchanges", type=str, nargs='+', default=None,
                         help="List of exchanges to analyze (e.g., Binance Bybit OKX)")
     parser.add_argument("--workers", type=int, default=None,
-                        help="Number of parallel workers (default: 3x CPU cores)")
+                        help="Number of parallel workers (default: one per CPU, at most one per symbol)")
+    parser.add_argument("--polars-threads", type=int, default=None,
+                        help="Polars threads per worker (default: CPUs / workers)")
+    parser.add_argument("--no-split-symbols", action="store_true",
+                        help="Always analyze a symbol's pairs in one task, even for heavy symbols")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar='MB',
+                        help="Run tasks only while their estimated memory fits in MB; larger symbols stream "
+                             "hour by hour or run as pair tasks (default: from config, no limit; not with "
+                             "--coordinator/--worker)")
+    parser.add_argument("--engine", type=str, choices=ENGINES, default=None,
+                        help="eager: pair by pair; lazy: all pairs of a symbol as one Polars query batch "
+                             "(default: from config, eager)")
+    parser.add_argument("--coordinator", type=str, default=None, metavar='DIR',
+                        help="Lease symbols to --worker processes on any host through a work queue in the "
+                             "shared directory DIR and merge their results (--workers local workers join, 0 = none)")
+    parser.add_argument("--worker", type=str, default=None, metavar='DIR',
+                        help="Analyze symbols leased from the coordinator's work queue in DIR until it is done")
+    parser.add_argument("--lease-timeout", type=float, default=None,
+                        help="Seconds without a heartbeat before a worker's symbol is leased again "
+                             "(default: from config, 120)")
     parser.add_argument("--date", type=str, default=None,
                         help="Analyze data for a specific date (YYYY-MM-DD). Shortcut for --start-date=DATE --end-date=DATE")
     parser.add_argument("--start-date", type=str, default=None,
                         help="Start date for analysis (YYYY-MM-DD), inclusive")
     parser.add_argument("--end-date", type=str, default=None,
                         help="End date for analysis (YYYY-MM-DD), inclusive")
+    parser.add_argument("--start", type=str, default=None,
+                        help="Window start timestamp in UTC (e.g. '2025-11-03 14:00'), inclusive")
+    parser.add_argument("--end", type=str, default=None,
+                        help="Window end timestamp in UTC (e.g. '2025-11-03 16:00'), exclusive")
+    parser.add_argument("--last", type=str, default=None,
+                        help="Analyze the last DURATION up to --end or now (e.g. 90m, 3h, 1d)")
     parser.add_argument("--thresholds", type=float, nargs=3, default=None,
                         help="Analysis thresholds as percentages (default from config: 0.3 0.5 0.4)")
+    parser.add_argument("--sweep", type=float, nargs=3, default=None, metavar=('START', 'STOP', 'STEP'),
+                        help="Threshold sweep over START..STOP (inclusive, %%) in STEP increments; "
+                             "writes long-format results instead of the fixed three thresholds")
+    parser.add_argument("--zero-thresholds", type=float, nargs='+', default=None,
+                        help="Neutral zone thresholds (%%) for --sweep (default from config)")
+    parser.add_argument("--rolling", type=str, nargs='+', default=None, metavar='DURATION',
+                        help="Also write per-pair rolling metrics: WINDOW [STEP] (e.g. 1h 15m; STEP defaults to WINDOW)")
+    parser.add_argument("--mean-reversion", type=str, nargs='?', const='1s', default=None, metavar='INTERVAL',
+                        help="Add ADF statistic, AR(1) half-life and deviation moments per pair, "
+                             "resampled to INTERVAL (default: 1s)")
+    parser.add_argument("--backtest", action="store_true",
+                        help="Backtest every cycle with taker fees and slippage, add net PnL per pair")
+    parser.add_argument("--slippage", type=float, default=None,
+                        help="Backtest slippage in %% per fill (default: from config)")
+    parser.add_argument("--lead-lag", type=str, nargs='?', const='50ms', default=None, metavar='INTERVAL',
+                        help="Add lead-lag of mid-price returns per pair on an INTERVAL grid (default: 50ms)")
+    parser.add_argument("--lead-lag-max", type=str, default=None, metavar='LAG',
+                        help="Largest lead-lag searched in each direction (default: from config, 2s)")
+    parser.add_argument("--delays", type=float, nargs='+', default=None, metavar='MS',
+                        help="Execution delays in ms: write deviation and capture rate of cycles after each delay")
+    parser.add_argument("--max-quote-age", type=str, default=None, metavar='DURATION',
+                        help="Exclude rows matched with a quote older than this (e.g. 5s) and report quote gaps "
+                             "(default: from config, no limit)")
     parser.add_argument("--today", action="store_true",
                         help="Analyze only today's data. Shortcut for --date=<today>")
     parser.add_argument("--config", type=str, default=None,
                         help="Path to config file (default: config.yaml in script directory)")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="Walk the data directory instead of using the partition catalog")
+    parser.add_argument("--rebuild-catalog", action="store_true",
+                        help="Rebuild the partition catalog from scratch instead of refreshing it")
+    parser.add_argument("--no-series-cache", action="store_true",
+                        help="Decode parquet on every run instead of using the Arrow IPC series cache")
+    parser.add_argument("--symbol-alignment", action="store_true",
+                        help="Align all exchanges of a symbol on one timeline instead of one join per pair")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Analyze hour by hour with carried state, so memory is bounded by one hour per exchange")
+    parser.add_argument("--results-cache", action="store_true",
+                        help="Reuse cached per-hour partial results of unchanged hours (implies --streaming)")
+    parser.add_argument("--live", type=str, nargs='?', const=DEFAULT_LIVE_URI, default=None, metavar='URI',
+                        help=f"Analyze the collector's realtime WebSocket stream (default URI: {DEFAULT_LIVE_URI})")
+    parser.add_argument("--live-interval", type=float, default=10.0,
+                        help="Seconds between live rankings (default: 10)")
+    parser.add_argument("--live-duration", type=float, default=None,
+                        help="Stop live mode after this many seconds (default: run until interrupted)")
+    parser.add_argument("--replay-server", action="store_true",
+                        help="Serve recorded data (date/time filters apply) as a collector realtime stream")
+    parser.add_argument("--replay-port", type=int, default=5000,
+                        help="Port of the replay server (default: 5000)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Replay speed, 1 = real time, 0 = as fast as possible (default: 1)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Compact closed partitions into one sorted Float64 file each, then exit")
+    parser.add_argument("--compact-by", type=str, choices=['hour', 'day'], default='hour',
+                        help="Compaction granularity (default: hour)")
+    parser.add_argument("--compact-grace", type=int, default=DEFAULT_GRACE_MINUTES,
+                        help=f"Minutes after a partition ends before it is compacted (default: {DEFAULT_GRACE_MINUTES})")
 
     args = parser.parse_args()
 
@@ -354,10 +1275,48 @@ Examples:
     # Command line args override config
     data_path = args.data_path if args.data_path else config.data_directory
     exchanges_filter = args.exchanges if args.exchanges else config.exchanges
-    n_workers = args.workers if args.workers else config.workers
+    n_workers = args.workers if args.workers is not None else config.workers
     thresholds = args.thresholds if args.thresholds else config.thresholds
     zero_threshold = config.zero_threshold
 
+    # Compaction mode: rewrite closed partitions and exit
+    if args.compact:
+        print(f">>> COMPACTION MODE ({args.compact_by}) <<<")
+        compacted = compact_partitions(
+            data_path,
+            granularity=args.compact_by,
+            grace_minutes=args.compact_grace,
+            exchanges=exchanges_filter
+        )
+        for item in compacted:
+            print(f"[OK] {item['path']} <- {item['files']} files, {item['rows']} rows")
+        print(f"\n--- Compacted {len(compacted)} partitions "
+              f"({sum(item['files'] for item in compacted)} files) ---")
+        if config.use_catalog and not args.no_catalog:
+            PartitionCatalog(data_path).refresh()
+        exit(0)
+
+    # Queue workers lease one symbol at a time per process, without admission control
+    if args.memory_budget is not None and (args.coordinator or args.worker):
+        print("ERROR: --memory-budget can't be combined with --coordinator or --worker "
+              "(size each host with --workers instead)")
+        exit(1)
+    if config.memory_budget_mb is not None and (args.coordinator or args.worker):
+        print(f"WARNING: Ignoring memory_budget_mb = {config.memory_budget_mb} from the config "
+              "in --coordinator/--worker mode (size each host with --workers instead)")
+        config = replace(config, memory_budget_mb=None)
+
+    # Worker mode: analyze symbols leased from a coordinator's work queue, then exit
+    if args.worker:
+        if not (Path(args.worker) / QUEUE_FILENAME).exists():
+            print(f"ERROR: No work queue in {args.worker} (start the coordinator first)")
+            exit(1)
+        print(f">>> WORKER MODE: {args.worker} <<<")
+        completed = run_queue_workers(args.worker, data_path, n_workers or None,
+                                      args.polars_threads or config.polars_threads)
+        print(f"\n--- Worker finished: {completed} symbols analyzed here ---")
+        exit(0)
+
     # Handle --today flag
     if args.today:
         today_str = date.today().strftime('%Y-%m-%d')
@@ -381,15 +1340,184 @@ Examples:
                 print(f"ERROR: Invalid {name} format. Expected YYYY-MM-DD, got: {date_str}")
                 exit(1)
 
+    # Intra-day time window (--start/--end/--last)
+    try:
+        start_time = parse_time(args.start) if args.start else None
+        end_time = parse_time(args.end) if args.end else None
+        if args.last:
+            if start_time:
+                print("ERROR: --last can't be combined with --start")
+                exit(1)
+            if end_time is None:
+                end_time = datetime.now(timezone.utc).replace(tzinfo=None)
+            start_time = end_time - parse_duration(args.last)
+    except ValueError as e:
+        print(f"ERROR: Invalid time window: {e}")
+        exit(1)
+
+    if start_time and end_time and start_time >= end_time:
+        print(f"ERROR: Window start {start_time} must be before end {end_time}")
+        exit(1)
+
+    # Threshold sweep grid
+    sweep_thresholds = None
+    zero_thresholds = args.zero_thresholds if args.zero_thresholds else [zero_threshold]
+    if args.sweep:
+        try:
+            sweep_thresholds = threshold_grid(*args.sweep)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            exit(1)
+        if min(sweep_thresholds) < max(zero_thresholds):
+            print(f"ERROR: Sweep thresholds must be >= zero thresholds "
+                  f"({min(sweep_thresholds)} < {max(zero_thresholds)})")
+            exit(1)
+
+    # Rolling window time series
+    rolling_window = rolling_step = None
+    if args.rolling:
+        if len(args.rolling) > 2:
+            print("ERROR: --rolling takes WINDOW and an optional STEP")
+            exit(1)
+        try:
+            rolling_window = parse_duration(args.rolling[0])
+            rolling_step = parse_duration(args.rolling[1]) if len(args.rolling) > 1 else rolling_window
+        except ValueError as e:
+            print(f"ERROR: Invalid --rolling: {e}")
+            exit(1)
+
+    # Mean-reversion statistics
+    mean_reversion_interval = None
+    if args.mean_reversion or config.mean_reversion_interval:
+        try:
+            mean_reversion_interval = parse_duration(args.mean_reversion or config.mean_reversion_interval)
+        except ValueError as e:
+            print(f"ERROR: Invalid mean-reversion interval: {e}")
+            exit(1)
+
+    # Lead-lag
+    lead_lag_interval = lead_lag_max_lag = None
+    if args.lead_lag or config.lead_lag_interval:
+        try:
+            lead_lag_interval = parse_duration(args.lead_lag or config.lead_lag_interval)
+            lead_lag_max_lag = parse_duration(args.lead_lag_max or config.lead_lag_max_lag)
+        except ValueError as e:
+            print(f"ERROR: Invalid lead-lag setting: {e}")
+            exit(1)
+
+    # Bounded staleness of the pair join
+    max_quote_age = None
+    if args.max_quote_age or config.max_quote_age:
+        try:
+            max_quote_age = parse_duration(args.max_quote_age or config.max_quote_age)
+        except ValueError as e:
+            print(f"ERROR: Invalid max quote age: {e}")
+            exit(1)
+
+    # Execution delays
+    if args.delays and min(args.delays) < 0:
+        print("ERROR: --delays must be >= 0 ms")
+        exit(1)
+
+    # Cycle backtest
+    costs = None
+    if config.backtest or args.backtest:
+        costs = CostModel(
+            taker_fees=config.taker_fees or {},
+            default_taker_fee=config.default_taker_fee,
+            slippage=args.slippage if args.slippage is not None else config.slippage
+        )
+
+    use_results_cache = config.use_results_cache or args.results_cache
+    # Live mode: incremental metrics from the collector stream, ranking on an interval
+    if args.live:
+        print(f">>> LIVE MODE: {args.live} (ranking every {args.live_interval:g}s) <<<")
+        analyzer = LiveAnalyzer(thresholds, zero_threshold)
+        publish = partial(publish_live_ranking, thresholds=analyzer.thresholds)
+        try:
+            asyncio.run(run_live(args.live, analyzer, publish,
+                                 interval=args.live_interval, duration=args.live_duration))
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            exit(1)
+        except KeyboardInterrupt:
+            publish(analyzer.ranking())
+        print(f"\n--- Live mode finished: {analyzer.messages} messages, {analyzer.ticks} ticks ---")
+        exit(0)
+
+    # Replay server: recorded data in the collector's realtime format
+    if args.replay_server:
+        symbols = discover_data(data_path)
+        if exchanges_filter:
+            symbols = {symbol: set(exchanges) & set(exchanges_filter) for symbol, exchanges in symbols.items()}
+        pairs = replay_pairs(data_path, {s: sorted(e) for s, e in symbols.items() if len(e) >= 2},
+                             start_date, end_date, None, start_time, end_time)
+        try:
+            asyncio.run(serve_replay(pairs, port=args.replay_port, speed=args.replay_speed))
+        except RuntimeError as e:
+            print(f"ERROR: {e}")
+            exit(1)
+        except KeyboardInterrupt:
+            pass
+        exit(0)
+
+    engine = args.engine or config.engine
+    if engine not in ENGINES:
+        print(f"ERROR: Unknown engine '{engine}' (expected one of: {', '.join(ENGINES)})")
+        exit(1)
+
+    streaming = config.streaming or args.streaming or use_results_cache
+    options = RunOptions(
+        start_date=start_date,
+        end_date=end_date,
+        start_time=start_time,
+        end_time=end_time,
+        streaming=streaming,
+        thresholds=list(thresholds) if thresholds else list(DEFAULT_THRESHOLDS),
+        zero_threshold=zero_threshold,
+        sweep={'thresholds': sweep_thresholds, 'zero_thresholds': zero_thresholds} if sweep_thresholds else None,
+        symbol_alignment=config.symbol_alignment or args.symbol_alignment,
+        rolling={'window': rolling_window, 'step': rolling_step} if rolling_window else None,
+        mean_reversion=mean_reversion_interval,
+        costs=costs,
+        lead_lag={'interval': lead_lag_interval, 'max_lag': lead_lag_max_lag or timedelta(seconds=2)}
+        if lead_lag_interval else None,
+        delays_ms=args.delays,
+        max_quote_age=max_quote_age,
+        engine=engine
+    )
+
+    if streaming and not summary_only(options):
+        print("ERROR: --streaming/--results-cache can't be combined with --sweep, --symbol-alignment, "
+              "--rolling, --mean-reversion, --backtest, --lead-lag, --delays or --max-quote-age")
+        exit(1)
+
+    memory_budget_mb = args.memory_budget or config.memory_budget_mb
+    if memory_budget_mb is not None and memory_budget_mb <= 0:
+        print("ERROR: --memory-budget must be > 0 MB")
+        exit(1)
+
+    # The lazy query covers the summary metrics plus quote gaps
+    if engine == 'lazy' and (streaming or not summary_only(replace(options, max_quote_age=None))):
+        print("ERROR: --engine lazy can't be combined with --streaming, --results-cache, --sweep, "
+              "--symbol-alignment, --rolling, --mean-reversion, --backtest, --lead-lag or --delays")
+        exit(1)
+
     print(">>> ULTRA-FAST MODE <<<")
     print("Optimizations: Batch processing + No subprocess + Data caching\n")
 
     run_ultra_fast_analysis(
         data_path=data_path,
+        options=options,
         exchanges_filter=exchanges_filter,
         n_workers=n_workers,
-        start_date=start_date,
-        end_date=end_date,
-        thresholds=thresholds,
-        zero_threshold=zero_threshold
+        use_catalog=config.use_catalog and not args.no_catalog,
+        rebuild_catalog=args.rebuild_catalog,
+        use_series_cache=config.use_series_cache and not args.no_series_cache,
+        use_results_cache=use_results_cache,
+        polars_threads_per_worker=args.polars_threads or config.polars_threads,
+        split_symbols=config.split_symbols and not args.no_split_symbols,
+        queue_dir=args.coordinator,
+        lease_timeout=args.lease_timeout or config.lease_timeout,
+        memory_budget_mb=memory_budget_mb
     )
@@ -0,0 +1,75 @@
+"""
+Unit tests for alignment module.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+import polars as pl
+
+from lib.alignment import SymbolTimeline
+from lib.analysis import pair_deviation
+
+
+def quotes(seconds, prices):
+    """Exchange frame with quotes at the given second offsets."""
+    start = datetime(2025, 1, 1)
+    return pl.DataFrame({
+        'timestamp': [start + timedelta(seconds=s) for s in seconds],
+        'bestBid': [float(p) for p in prices],
+        'bestAsk': [float(p) + 0.1 for p in prices]
+    })
+
+
+class TestSymbolTimeline(unittest.TestCase):
+    """Tests for symbol-wide alignment."""
+
+    def assert_matches_join(self, data, max_quote_age=None):
+        timeline = SymbolTimeline(data)
+        for ex1 in data:
+            for ex2 in data:
+                if ex1 == ex2:
+                    continue
+                expected = pair_deviation(data[ex1], data[ex2], max_quote_age)
+                actual = timeline.pair(ex1, ex2, max_quote_age)
+                self.assertTrue(actual.equals(expected.select(actual.columns)), f"{ex1}/{ex2} differs")
+
+    def test_matches_join_asof(self):
+        """Test that every pair view equals the per-pair join_asof"""
+        data = {
+            'Binance': quotes([0, 2, 4, 6, 8], [100, 101, 102, 103, 104]),
+            'Bybit': quotes([1, 2, 5, 9], [200, 201, 202, 203]),
+            'OKX': quotes([3, 3, 3, 7], [300, 301, 302, 303]),
+        }
+        self.assert_matches_join(data)
+
+    def test_late_start_and_ties(self):
+        """Test null prefix before the first quote and duplicate timestamps on both sides"""
+        data = {
+            'A': quotes([0, 1, 1, 5, 5, 5], [1, 2, 3, 4, 5, 6]),
+            'B': quotes([1, 1, 5, 6], [10, 11, 12, 13]),
+        }
+        self.assert_matches_join(data)
+
+        pair = SymbolTimeline(data).pair('A', 'B')
+        self.assertIsNone(pair['bid_ex2'][0])
+        self.assertEqual(pair['bid_ex2'].to_list()[1:], [11.0, 11.0, 12.0, 12.0, 12.0])
+
+    def test_random_quotes(self):
+        """Test equivalence on random quote streams with many collisions"""
+        rng = np.random.default_rng(3)
+        data = {
+            name: quotes(np.sort(rng.integers(0, 500, size)).tolist(), rng.normal(100, 1, size))
+            for name, size in (('A', 400), ('B', 700), ('C', 250), ('D', 50))
+        }
+        self.assert_matches_join(data)
+        self.assert_matches_join(data, max_quote_age=timedelta(seconds=3))
+
+    def test_missing_exchange(self):
+        """Test that unknown exchanges return None"""
+        timeline = SymbolTimeline({'A': quotes([0], [1])})
+        self.assertIsNone(timeline.pair('A', 'B'))
+
+
+if __name__ == '__main__':
+    unittest.main()
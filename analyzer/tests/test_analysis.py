@@ -5,7 +5,28 @@ Unit tests for analysis module - critical calculations.
 import unittest
 import polars as pl
 import numpy as np
-from lib.analysis import count_complete_cycles, analyze_pair_fast
+from datetime import datetime, timedelta
+from lib.analysis import (
+    DEFAULT_THRESHOLDS, count_complete_cycles, find_complete_cycles, analyze_pair_fast, analyze_joined,
+    delay_joined, pair_deviation, rolling_joined, sweep_joined, sweep_pair, threshold_grid, threshold_labels
+)
+
+
+def reference_cycles(above, neutral):
+    """The original per-row loop, extended to record cycle start/end rows."""
+    starts, ends = [], []
+    was_above = False
+    start = None
+    for i in range(len(above)):
+        if above[i]:
+            if not was_above:
+                start = i
+            was_above = True
+        elif neutral[i] and was_above:
+            starts.append(start)
+            ends.append(i)
+            was_above = False
+    return starts, ends
 
 
 class TestCountCompleteCycles(unittest.TestCase):
@@ -56,6 +77,36 @@ class TestCountCompleteCycles(unittest.TestCase):
         cycles = count_complete_cycles(above, neutral)
         self.assertEqual(cycles, 0, "Should be 0 when stuck above threshold")
 
+    def test_empty_series(self):
+        """Test empty input"""
+        self.assertEqual(count_complete_cycles(pl.Series([], dtype=pl.Boolean), pl.Series([], dtype=pl.Boolean)), 0)
+
+    def test_matches_reference_loop(self):
+        """Test that the vectorized kernel matches the per-row loop on random walks"""
+        rng = np.random.default_rng(42)
+        thresholds = np.array([0.3, 0.5, 0.4, 0.01])  # 0.01 < zero threshold: above and neutral overlap
+
+        for _ in range(20):
+            deviation = np.abs(np.cumsum(rng.normal(0, 0.05, 5000)))
+            above = deviation[None, :] > thresholds[:, None]
+            neutral = deviation < 0.05
+
+            results = find_complete_cycles(above, neutral)
+            for k, (starts, ends) in enumerate(results):
+                ref_starts, ref_ends = reference_cycles(above[k], neutral)
+                self.assertEqual(starts.tolist(), ref_starts)
+                self.assertEqual(ends.tolist(), ref_ends)
+                self.assertEqual(count_complete_cycles(pl.Series(above[k]), pl.Series(neutral)), len(ref_ends))
+
+    def test_cycle_indices(self):
+        """Test that start/end rows are returned and the open cycle is dropped"""
+        above = [False, True, True, False, False, True, False, True]
+        neutral = [True, False, False, False, True, False, True, False]
+
+        starts, ends = find_complete_cycles(above, neutral)[0]
+        self.assertEqual(starts.tolist(), [1, 5])
+        self.assertEqual(ends.tolist(), [4, 6])
+
 
 class TestAnalyzePairFast(unittest.TestCase):
     """Tests for analyze_pair_fast function."""
@@ -171,11 +222,24 @@ class TestAnalyzePairFast(unittest.TestCase):
             "Exchange2",
             self.data1,
             self.data2,
-            thresholds=[0.1, 0.2, 0.3]
+            thresholds=[0.1, 0.2, 0.3, 0.125]
         )
 
         self.assertIsNotNone(result)
-        self.assertIn('opportunity_cycles_030bp', result)
+        # Labels follow the threshold values, however many there are
+        for label in ['010bp', '020bp', '030bp', '012_5bp']:
+            self.assertIn(f'opportunity_cycles_{label}', result)
+            self.assertIn(f'pct_time_above_bid1_ask2_{label}', result)
+        self.assertNotIn('opportunity_cycles_040bp', result)
+
+    def test_threshold_labels(self):
+        """Test derived labels and rejected label lists"""
+        self.assertEqual(threshold_labels(DEFAULT_THRESHOLDS), ['030bp', '050bp', '040bp'])
+        self.assertEqual(threshold_labels([1.0, 0.05]), ['100bp', '005bp'])
+        with self.assertRaises(ValueError):
+            threshold_labels([0.3, 0.5], ['030bp'])
+        with self.assertRaises(ValueError):
+            threshold_labels([0.3, 0.3])
 
     def test_empty_data(self):
         """Test handling of empty data"""
@@ -214,5 +278,290 @@ class TestAnalyzePairFast(unittest.TestCase):
         )
 
 
+def random_walk_pair(seed: int, n: int = 20000):
+    """Two exchanges whose bid ratio follows a mean-reverting walk around parity."""
+    rng = np.random.default_rng(seed)
+    timestamps = pl.datetime_range(
+        start=datetime(2025, 1, 1), end=datetime(2025, 1, 1) + timedelta(seconds=n - 1),
+        interval="1s", eager=True
+    )
+    deviation = np.zeros(n)
+    for i in range(1, n):
+        deviation[i] = 0.98 * deviation[i - 1] + rng.normal(0, 0.08)
+    bids1 = 100.0 * (1 + deviation / 100)
+
+    data1 = pl.DataFrame({'timestamp': timestamps, 'bestBid': bids1, 'bestAsk': bids1 + 0.01})
+    data2 = pl.DataFrame({'timestamp': timestamps, 'bestBid': [100.0] * n, 'bestAsk': [100.01] * n})
+    return data1, data2
+
+
+class TestDirections(unittest.TestCase):
+    """Tests for executable-direction metrics in analyze_pair_fast."""
+
+    def test_direction_cycles_match_reference(self):
+        """Test per-direction cycles/time-above against the per-row loop"""
+        data1, data2 = random_walk_pair(11)
+        result = analyze_pair_fast("T/USDT", "A", "B", data1, data2, [0.3, 0.5, 0.4], 0.05)
+
+        bid1, ask1 = data1['bestBid'].to_numpy(), data1['bestAsk'].to_numpy()
+        bid2, ask2 = data2['bestBid'].to_numpy(), data2['bestAsk'].to_numpy()
+        edges = {
+            'bid1_ask2': (bid1 / ask2 - 1.0) * 100,
+            'bid2_ask1': (bid2 / ask1 - 1.0) * 100,
+        }
+        mid = np.abs(((bid1 + ask1) / (bid2 + ask2) - 1.0) * 100)
+
+        for name, values in {**edges, 'mid': mid}.items():
+            for threshold, label in ((0.3, '030bp'), (0.5, '050bp'), (0.4, '040bp')):
+                _, ends = reference_cycles(values > threshold, values < 0.05)
+                self.assertEqual(result[f'opportunity_cycles_{name}_{label}'], len(ends))
+                self.assertAlmostEqual(result[f'pct_time_above_{name}_{label}'],
+                                       float(np.mean(values > threshold) * 100))
+
+        self.assertAlmostEqual(result['max_edge_bid1_ask2_pct'], float(edges['bid1_ask2'].max()))
+        self.assertAlmostEqual(result['max_edge_bid2_ask1_pct'], float(edges['bid2_ask1'].max()))
+
+    def test_spread_eats_bid_deviation(self):
+        """Test that a bid/bid deviation inside the spread is not executable"""
+        timestamps = pl.datetime_range(datetime(2025, 1, 1), datetime(2025, 1, 1, 0, 9), "1m", eager=True)
+        data1 = pl.DataFrame({'timestamp': timestamps, 'bestBid': [100.4] * 10, 'bestAsk': [100.5] * 10})
+        data2 = pl.DataFrame({'timestamp': timestamps, 'bestBid': [100.0] * 10, 'bestAsk': [100.6] * 10})
+
+        result = analyze_pair_fast("T/USDT", "A", "B", data1, data2, [0.3, 0.5, 0.4], 0.05)
+        self.assertEqual(result['pct_time_above_030bp'], 100.0)
+        self.assertEqual(result['pct_time_above_bid1_ask2_030bp'], 0.0)
+        self.assertLess(result['max_edge_bid1_ask2_pct'], 0)
+
+
+class TestThresholdSweep(unittest.TestCase):
+    """Tests for the excursion-based threshold sweep."""
+
+    def setUp(self):
+        self.data1, self.data2 = random_walk_pair(7)
+
+    def test_matches_fixed_thresholds(self):
+        """Test that sweep rows equal analyze_pair_fast's fixed columns"""
+        fixed = analyze_pair_fast("T/USDT", "A", "B", self.data1, self.data2, [0.3, 0.5, 0.4], 0.05)
+        sweep = sweep_pair("T/USDT", "A", "B", self.data1, self.data2, [0.3, 0.4, 0.5], [0.05])
+
+        for row in sweep.iter_rows(named=True):
+            name = f"{int(round(row['threshold'] * 100)):03d}bp"
+            self.assertEqual(row['cycles'], fixed[f'opportunity_cycles_{name}'])
+            self.assertAlmostEqual(row['pct_time_above'], fixed[f'pct_time_above_{name}'])
+            self.assertAlmostEqual(row['avg_cycle_duration_sec'], fixed[f'avg_cycle_duration_{name}_sec'])
+            self.assertAlmostEqual(row['cycles_per_hour'], fixed[f'cycles_{name}_per_hour'])
+            self.assertEqual(row['pattern_break'], fixed[f'pattern_break_{name}'])
+
+    def test_matches_reference_loop_on_grid(self):
+        """Test cycles and excursion durations for a fine grid and several zero thresholds"""
+        grid = threshold_grid(0.10, 1.00, 0.01)
+        zero_thresholds = [0.02, 0.05, 0.10]
+        sweep = sweep_pair("T/USDT", "A", "B", self.data1, self.data2, grid, zero_thresholds)
+
+        self.assertEqual(len(sweep), len(grid) * len(zero_thresholds))
+
+        deviation = ((self.data1['bestBid'] / self.data2['bestBid'] - 1.0) * 100).abs().to_numpy()
+        seconds = np.arange(len(deviation), dtype=np.float64)
+        for row in sweep.filter(pl.col('threshold').is_in([0.1, 0.37, 1.0])).iter_rows(named=True):
+            neutral = deviation < row['zero_threshold']
+            above = deviation > row['threshold']
+            _, ends = reference_cycles(above, neutral)
+            self.assertEqual(row['cycles'], len(ends))
+
+            # Excursion starts where the deviation last left the neutral zone before each cycle end
+            durations = []
+            for end in ends:
+                start = end - 1
+                while start > 0 and not neutral[start - 1]:
+                    start -= 1
+                durations.append(seconds[end] - seconds[start])
+            expected = float(np.mean(durations)) if durations else 0.0
+            self.assertAlmostEqual(row['avg_excursion_duration_sec'], expected)
+
+    def test_threshold_below_zero_threshold(self):
+        """Test that thresholds inside the neutral band are rejected"""
+        with self.assertRaises(ValueError):
+            sweep_pair("T/USDT", "A", "B", self.data1, self.data2, [0.03, 0.3], [0.05])
+
+    def test_threshold_grid(self):
+        """Test inclusive grid generation without float drift"""
+        grid = threshold_grid(0.10, 1.00, 0.01)
+        self.assertEqual(len(grid), 91)
+        self.assertEqual(grid[0], 0.1)
+        self.assertEqual(grid[37], 0.47)
+        self.assertEqual(grid[-1], 1.0)
+
+        with self.assertRaises(ValueError):
+            threshold_grid(0.5, 0.1, 0.01)
+
+
+class TestRolling(unittest.TestCase):
+    """Tests for rolling-window metric time series."""
+
+    def setUp(self):
+        data1, data2 = random_walk_pair(5, n=4 * 3600)
+        self.joined = pair_deviation(data1, data2)
+
+    def test_window_matches_analyze_joined(self):
+        """Test that a window's metrics equal analyze_joined on the window's rows"""
+        rolling = rolling_joined("T/USDT", "A", "B", self.joined, timedelta(hours=1), timedelta(minutes=30))
+
+        # 4h of 1s rows starting on the hour: windows at 0:00, 0:30, ..., 2:30
+        self.assertEqual(len(rolling), 6)
+        self.assertEqual(rolling['window_start'][1], datetime(2025, 1, 1, 0, 30))
+        self.assertEqual(rolling['window_end'][1], datetime(2025, 1, 1, 1, 30))
+
+        row = rolling.row(1, named=True)
+        rows = self.joined.filter(
+            pl.col('timestamp').is_between(datetime(2025, 1, 1, 0, 30), datetime(2025, 1, 1, 1, 30), closed='left')
+        )
+        expected = analyze_joined(rows, [0.3, 0.5, 0.4], 0.05)
+        self.assertEqual(row['data_points'], 3600)
+        for label in ('030bp', '050bp', '040bp'):
+            self.assertAlmostEqual(row[f'pct_time_above_{label}'], expected[f'pct_time_above_{label}'])
+
+        # Events by their completing row: a cycle whose entry precedes the window still counts
+        deviation = rows['deviation'].abs().to_numpy()
+        prior = self.joined.filter(pl.col('timestamp') < datetime(2025, 1, 1, 0, 30))['deviation'].abs().to_numpy()
+        all_values = np.concatenate([prior, deviation])
+        _, ends = reference_cycles(all_values > 0.3, all_values < 0.05)
+        in_window = sum(end >= len(prior) for end in ends)
+        self.assertAlmostEqual(row['cycles_030bp_per_hour'], in_window)
+
+        sign = np.sign(self.joined['deviation'].to_numpy())
+        crossings = (sign[1:] * sign[:-1] < 0)[len(prior) - 1:len(prior) - 1 + 3600].sum()
+        self.assertAlmostEqual(row['zero_crossings_per_minute'], crossings / 60)
+
+    def test_no_full_window(self):
+        """Test that a range shorter than the window yields None"""
+        self.assertIsNone(rolling_joined("T/USDT", "A", "B", self.joined, timedelta(hours=5), timedelta(hours=1)))
+        self.assertIsNone(rolling_joined("T/USDT", "A", "B", None, timedelta(hours=1), timedelta(hours=1)))
+
+    def test_invalid_window(self):
+        """Test that non-positive windows and steps are rejected"""
+        with self.assertRaises(ValueError):
+            rolling_joined("T/USDT", "A", "B", self.joined, timedelta(0), timedelta(minutes=1))
+        with self.assertRaises(ValueError):
+            rolling_joined("T/USDT", "A", "B", self.joined, timedelta(hours=1), timedelta(seconds=-1))
+
+
+class TestDelaySensitivity(unittest.TestCase):
+    """Tests for the execution-delay sweep."""
+
+    def setUp(self):
+        data1, data2 = random_walk_pair(9, n=6000)
+        # Irregular ticks: drop a third of the rows so delays fall between quotes
+        self.joined = pair_deviation(data1.gather_every(3, offset=1).vstack(data1.gather_every(3)).sort('timestamp'),
+                                     data2)
+
+    def test_matches_rejoin_per_delay(self):
+        """Test the batched lookup against one join_asof per delay"""
+        delays = [0, 250, 1000, 2500]
+        result = delay_joined("T/USDT", "A", "B", self.joined, delays, [0.3, 0.5, 0.4], 0.05)
+        self.assertEqual(len(result), 3 * len(delays))
+
+        deviation = self.joined['deviation'].abs().to_numpy()
+        for threshold in (0.3, 0.4):
+            starts, _ = reference_cycles(deviation > threshold, deviation < 0.05)
+            entries = self.joined[starts].select(['timestamp', pl.col('deviation').alias('entry')])
+            for delay in delays:
+                delayed = entries.with_columns(pl.col('timestamp') + timedelta(milliseconds=delay)) \
+                    .join_asof(self.joined.select(['timestamp', 'deviation']), on='timestamp')
+                available = (delayed['deviation'] * delayed['entry'].sign()).to_numpy()
+
+                row = result.filter((pl.col('threshold') == threshold) & (pl.col('delay_ms') == delay)).row(0, named=True)
+                self.assertEqual(row['cycles'], len(starts))
+                self.assertAlmostEqual(row['avg_available_deviation_pct'], float(available.mean()))
+                self.assertAlmostEqual(row['capture_rate_pct'], float((available > threshold).mean() * 100))
+                if delay == 0:
+                    self.assertEqual(row['capture_rate_pct'], 100.0)
+                    self.assertAlmostEqual(row['avg_entry_deviation_pct'], row['avg_available_deviation_pct'])
+
+    def test_invalid_and_empty(self):
+        """Test negative delays and missing data"""
+        with self.assertRaises(ValueError):
+            delay_joined("T/USDT", "A", "B", self.joined, [100, -5])
+        self.assertIsNone(delay_joined("T/USDT", "A", "B", None, [100]))
+
+
+class TestMaxQuoteAge(unittest.TestCase):
+    """Tests for the bounded-staleness join."""
+
+    def setUp(self):
+        # ex2 goes silent for 10 minutes while ex1 drifts 1% away and back
+        start = datetime(2025, 1, 1)
+        seconds = np.arange(0, 1800, 1)
+        bids1 = np.where((seconds >= 610) & (seconds < 1190), 101.0, 100.0)
+        self.data1 = pl.DataFrame({
+            'timestamp': [start + timedelta(seconds=int(s)) for s in seconds],
+            'bestBid': bids1, 'bestAsk': bids1 + 0.01
+        })
+        quoted = seconds[(seconds < 600) | (seconds >= 1200)]
+        self.data2 = pl.DataFrame({
+            'timestamp': [start + timedelta(seconds=int(s)) for s in quoted],
+            'bestBid': [100.0] * len(quoted), 'bestAsk': [100.01] * len(quoted)
+        })
+
+    def test_silent_feed_excluded(self):
+        """Test that a silent feed's last quote doesn't create a phantom cycle"""
+        unbounded = analyze_pair_fast("T/USDT", "A", "B", self.data1, self.data2)
+        self.assertEqual(unbounded['opportunity_cycles_040bp'], 1)
+        self.assertNotIn('stale_gaps', unbounded)
+
+        joined = pair_deviation(self.data1, self.data2, timedelta(seconds=5))
+        stats = analyze_joined(joined)
+        self.assertEqual(stats['opportunity_cycles_040bp'], 0)
+        self.assertEqual(stats['pct_time_above_030bp'], 0.0)
+        self.assertEqual(stats['max_deviation_pct'], 0.0)
+
+        # Rows 605..1199 are stale (quote at 599 is > 5s old); time runs to row 1200
+        self.assertEqual(stats['stale_gaps'], 1)
+        self.assertEqual(stats['stale_rows'], 595)
+        self.assertEqual(stats['stale_time_sec'], 595.0)
+
+        # Stale rows and time are not analyzed
+        self.assertEqual(stats['data_points'], 1800 - 595)
+        self.assertAlmostEqual(stats['duration_hours'], (1799 - 595) / 3600)
+
+    def test_sweep_skips_stale_rows(self):
+        """Test that the sweep agrees with the fixed metrics on stale rows"""
+        unbounded = sweep_pair("T/USDT", "A", "B", self.data1, self.data2, [0.3, 0.4], [0.05])
+        self.assertEqual(unbounded['cycles'].to_list(), [1, 1])
+
+        joined = pair_deviation(self.data1, self.data2, timedelta(seconds=5))
+        sweep = sweep_joined("T/USDT", "A", "B", joined, [0.3, 0.4], [0.05])
+        self.assertEqual(sweep['cycles'].to_list(), [0, 0])
+        self.assertEqual(sweep['pct_time_above'].to_list(), [0.0, 0.0])
+        self.assertEqual(sweep['data_points'].to_list(), [1800 - 595] * 2)
+
+    def test_rolling_skips_stale_time(self):
+        """Test that rolling windows count non-stale rows and rate over non-stale time"""
+        # A row a minute flipping around ex2; ex2 is silent from 4:00 to 20:00
+        start = datetime(2025, 1, 1)
+        seconds = np.arange(0, 1800, 60)
+        bids1 = np.where(seconds // 60 % 2 == 0, 100.5, 99.5)
+        data1 = pl.DataFrame({
+            'timestamp': [start + timedelta(seconds=int(s)) for s in seconds],
+            'bestBid': bids1, 'bestAsk': bids1 + 0.01
+        })
+        quoted = seconds[(seconds < 300) | (seconds >= 1200)]
+        data2 = pl.DataFrame({
+            'timestamp': [start + timedelta(seconds=int(s)) for s in quoted],
+            'bestBid': [100.0] * len(quoted), 'bestAsk': [100.01] * len(quoted)
+        })
+        joined = pair_deviation(data1, data2, timedelta(seconds=5))
+        rolling = rolling_joined("T/USDT", "A", "B", joined, timedelta(seconds=450), timedelta(seconds=450))
+
+        # Rows 300..1140 are stale. [0, 450): 5 rows, 300s live (row 420's gap cut at 450);
+        # [450, 900): stale throughout (gap of row 420 reaches in); [900, 1350): 3 rows, 150s live
+        self.assertEqual(rolling['data_points'].to_list(), [5, 0, 3])
+        crossings = rolling['zero_crossings_per_minute'].to_list()
+        self.assertAlmostEqual(crossings[0], 4 / 5)
+        self.assertIsNone(crossings[1])
+        self.assertAlmostEqual(crossings[2], 2 / 2.5)
+        self.assertIsNone(rolling['cycles_030bp_per_hour'][1])
+        self.assertEqual(rolling['pct_time_above_030bp'].to_list(), [100.0, None, 100.0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+"""
+Unit tests for backtest module.
+"""
+
+import unittest
+import polars as pl
+from datetime import datetime
+
+from lib.analysis import analyze_joined, pair_deviation
+from lib.backtest import CostModel, backtest_joined
+from tests.test_analysis import random_walk_pair
+
+
+def quotes(bids, asks):
+    """One exchange's frame with a quote per minute."""
+    timestamps = [datetime(2025, 1, 1, 0, i) for i in range(len(bids))]
+    return pl.DataFrame({'timestamp': timestamps, 'bestBid': bids, 'bestAsk': asks})
+
+
+class TestBacktest(unittest.TestCase):
+    """Tests for the cycle backtest."""
+
+    def test_single_cycle_pnl(self):
+        """Test gross and net PnL of one cycle against hand-computed fills"""
+        # Neutral, ex1 rich by 0.5%, back to parity
+        data1 = quotes([100.0, 100.5, 100.0], [100.02, 100.52, 100.02])
+        data2 = quotes([100.0, 100.0, 100.0], [100.01, 100.01, 100.01])
+        joined = pair_deviation(data1, data2)
+
+        free = backtest_joined(joined, 'A', 'B', CostModel(default_taker_fee=0.0), [0.3, 0.5, 0.4])
+        # Short A at 100.5, cover at 100.02; long B at 100.01, sell at 100.0
+        gross = ((100.5 - 100.02) / 100.5 + (100.0 - 100.01) / 100.01) * 100
+        self.assertEqual(free['backtest_trades_030bp'], 1)
+        self.assertEqual(free['backtest_trades_050bp'], 0)
+        self.assertAlmostEqual(free['backtest_gross_pnl_030bp_pct'], gross)
+        self.assertAlmostEqual(free['backtest_net_pnl_030bp_pct'], gross)
+        self.assertEqual(free['backtest_win_rate_030bp'], 100.0)
+
+        costs = CostModel(taker_fees={'A': 0.2}, default_taker_fee=0.05, slippage=0.01)
+        paid = backtest_joined(joined, 'A', 'B', costs, [0.3, 0.5, 0.4])
+        s = 0.0001
+        net = (1 - 100.02 * (1 + s) / (100.5 * (1 - s)) + 100.0 * (1 - s) / (100.01 * (1 + s)) - 1) * 100 - 2 * 0.25
+        self.assertAlmostEqual(paid['backtest_gross_pnl_030bp_pct'], gross)
+        self.assertAlmostEqual(paid['backtest_net_pnl_030bp_pct'], net)
+        self.assertEqual(paid['backtest_win_rate_030bp'], 0.0)
+
+    def test_direction_follows_sign(self):
+        """Test that a cheap ex1 is bought on ex1 and sold on ex2"""
+        data1 = quotes([100.0, 99.5, 100.0], [100.01, 99.51, 100.01])
+        data2 = quotes([100.0, 100.0, 100.0], [100.02, 100.02, 100.02])
+        result = backtest_joined(pair_deviation(data1, data2), 'A', 'B', CostModel(default_taker_fee=0.0))
+
+        # Short B at 100.0, cover at 100.02; long A at 99.51, sell at 100.0
+        gross = ((100.0 - 100.02) / 100.0 + (100.0 - 99.51) / 99.51) * 100
+        self.assertAlmostEqual(result['backtest_gross_pnl_030bp_pct'], gross)
+
+    def test_trades_match_cycles(self):
+        """Test one trade per complete cycle, and no trades without data"""
+        joined = pair_deviation(*random_walk_pair(3))
+        stats = analyze_joined(joined, [0.3, 0.5, 0.4], 0.05)
+        result = backtest_joined(joined, 'A', 'B', CostModel(), [0.3, 0.5, 0.4], 0.05)
+        for label in ('030bp', '050bp', '040bp'):
+            self.assertEqual(result[f'backtest_trades_{label}'], stats[f'opportunity_cycles_{label}'])
+            self.assertLess(result[f'backtest_net_pnl_{label}_pct'], result[f'backtest_gross_pnl_{label}_pct'])
+
+        empty = backtest_joined(None, 'A', 'B', CostModel())
+        self.assertEqual(empty['backtest_trades_040bp'], 0)
+        self.assertEqual(empty['backtest_net_pnl_040bp_pct'], 0.0)
+
+    def test_fee_schedule(self):
+        """Test per-exchange fees with a default for unlisted exchanges"""
+        costs = CostModel(taker_fees={'Binance': 0.075}, default_taker_fee=0.2)
+        self.assertEqual(costs.fee('Binance'), 0.075)
+        self.assertEqual(costs.fee('GateIo'), 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
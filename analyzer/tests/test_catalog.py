@@ -0,0 +1,160 @@
+"""
+Unit tests for catalog module.
+"""
+
+import os
+import unittest
+import tempfile
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+import polars as pl
+
+from lib import catalog as catalog_module
+from lib.catalog import PartitionCatalog
+from lib.data_loader import load_exchange_symbol_data
+from lib.discovery import discover_data
+
+
+def write_spreads(path: Path, start: datetime, minutes: int, price: float = 100.0):
+    """Write a small spreads parquet file with one row per minute."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame({
+        'Timestamp': pl.datetime_range(
+            start=start,
+            end=start.replace(minute=minutes - 1),
+            interval="1m",
+            eager=True
+        ),
+        'BestBid': [price] * minutes,
+        'BestAsk': [price + 0.1] * minutes
+    }).write_parquet(path)
+
+
+class TestPartitionCatalog(unittest.TestCase):
+    """Tests for PartitionCatalog."""
+
+    def setUp(self):
+        """Create two exchanges trading BTC_USDT over two hours"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+
+        for exchange in ['Binance', 'Bybit']:
+            for hour in [0, 1]:
+                hour_dir = (self.data_path / f"exchange={exchange}" / "symbol=BTC_USDT" /
+                            "date=2025-01-01" / f"hour={hour:02d}")
+                write_spreads(hour_dir / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, hour, 0), 10)
+
+        # Symbol on a single exchange - must not be discovered as a pair
+        write_spreads(
+            self.data_path / "exchange=Binance" / "symbol=ETH_USDT" / "date=2025-01-01" /
+            "hour=00" / "spreads-00-00.0000000.parquet",
+            datetime(2025, 1, 1, 0, 0), 5
+        )
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_refresh_builds_catalog(self):
+        """Test that every file is recorded with its stats"""
+        catalog = PartitionCatalog(str(self.data_path))
+        df = catalog.refresh()
+
+        self.assertTrue(catalog.exists())
+        self.assertEqual(len(df), 5)
+
+        row = df.filter(
+            (pl.col('exchange') == 'Bybit') & (pl.col('hour') == 1)
+        ).row(0, named=True)
+        self.assertEqual(row['symbol'], 'BTC_USDT')
+        self.assertEqual(row['date'], '2025-01-01')
+        self.assertEqual(row['rows'], 10)
+        self.assertEqual(row['min_ts'], datetime(2025, 1, 1, 1, 0))
+        self.assertEqual(row['max_ts'], datetime(2025, 1, 1, 1, 9))
+
+    def test_incremental_refresh_reads_only_new_files(self):
+        """Test that a refresh only reads files in changed hour directories"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        new_file = (self.data_path / "exchange=Binance" / "symbol=BTC_USDT" /
+                    "date=2025-01-01" / "hour=02" / "spreads-00-00.0000000.parquet")
+        write_spreads(new_file, datetime(2025, 1, 1, 2, 0), 3)
+
+        with mock.patch.object(catalog_module, 'read_file_stats',
+                               wraps=catalog_module.read_file_stats) as read_stats:
+            df = catalog.refresh()
+
+        self.assertEqual(read_stats.call_count, 1, "Only the new file should be read")
+        self.assertEqual(len(df), 6)
+
+    def test_refresh_rereads_files_of_live_hours(self):
+        """Test that a file finished after a refresh during its hour gets its stats corrected"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        hour_dir = self.data_path / "exchange=Binance" / "symbol=BTC_USDT" / "date=2025-01-01" / "hour=01"
+        dir_stat = os.stat(hour_dir)
+        write_spreads(hour_dir / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, 1, 0), 30)
+        # Finishing a file in place leaves its directory's mtime unchanged
+        os.utime(hour_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+        def binance_rows(df):
+            return df.filter(
+                (pl.col('exchange') == 'Binance') & (pl.col('symbol') == 'BTC_USDT') & (pl.col('hour') == 1)
+            )['rows'].to_list()
+
+        # Last refresh after the hour closed: the hour is carried over as-is
+        self.assertEqual(binance_rows(catalog.refresh()), [10])
+
+        # Last refresh while the hour was live: its files are checked again
+        refreshed_ns = int(datetime(2025, 1, 1, 1, 5, tzinfo=timezone.utc).timestamp()) * 10**9
+        os.utime(catalog.catalog_path, ns=(refreshed_ns, refreshed_ns))
+        with mock.patch.object(catalog_module, 'read_file_stats',
+                               wraps=catalog_module.read_file_stats) as read_stats:
+            df = catalog.refresh()
+
+        self.assertEqual(read_stats.call_count, 1, "Only the changed file should be read")
+        self.assertEqual(binance_rows(df), [30])
+
+    def test_refresh_drops_removed_files(self):
+        """Test that deleted hour directories disappear from the catalog"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        shutil.rmtree(self.data_path / "exchange=Bybit" / "symbol=BTC_USDT" / "date=2025-01-01" / "hour=01")
+        df = catalog.refresh()
+
+        self.assertEqual(len(df), 4)
+
+    def test_discovery_matches_directory_walk(self):
+        """Test that catalog-based discovery matches the directory walk"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        self.assertEqual(
+            discover_data(str(self.data_path), catalog),
+            discover_data(str(self.data_path))
+        )
+        self.assertEqual(discover_data(str(self.data_path), catalog), {'BTC/USDT': {'Binance', 'Bybit'}})
+
+    def test_loader_matches_directory_walk(self):
+        """Test that loading through the catalog returns the same frame"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        for start_date, end_date in [(None, None), ('2025-01-01', '2025-01-01')]:
+            expected = load_exchange_symbol_data(str(self.data_path), "Binance", "BTC/USDT", start_date, end_date)
+            actual = load_exchange_symbol_data(str(self.data_path), "Binance", "BTC/USDT", start_date, end_date,
+                                               catalog=catalog)
+            self.assertTrue(actual.equals(expected))
+
+        self.assertIsNone(load_exchange_symbol_data(
+            str(self.data_path), "Binance", "BTC/USDT", "2025-01-02", "2025-01-02", catalog=catalog
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Unit tests for compaction module.
+"""
+
+import os
+import unittest
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+import polars as pl
+
+from lib import compaction as compaction_module
+from lib.catalog import PartitionCatalog
+from lib.compaction import COMPACTED_FILENAME, compact_files, compact_partitions, compacted_through, prefer_compacted
+from lib.data_loader import load_exchange_symbol_data
+
+
+def write_flush(path: Path, minutes, price: float = 100.0):
+    """Write a collector-like flush file with Decimal prices."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame({
+        'Timestamp': [datetime(2025, 1, 1, int(path.parent.name[-2:]), m) for m in minutes],
+        'BestBid': [price + m for m in minutes],
+        'BestAsk': [price + m + 0.1 for m in minutes]
+    }).with_columns(
+        pl.col('BestBid').cast(pl.Decimal(28, 10)),
+        pl.col('BestAsk').cast(pl.Decimal(28, 10))
+    ).write_parquet(path)
+
+
+class TestCompaction(unittest.TestCase):
+    """Tests for compact_partitions and the loader's compacted-file preference."""
+
+    def setUp(self):
+        """Create a symbol with two closed hours and one live hour"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        self.date_dir = self.data_path / "exchange=TestExchange" / "symbol=BTC_USDT" / "date=2025-01-01"
+
+        # Flush files deliberately out of order within the hour
+        write_flush(self.date_dir / "hour=00" / "spreads-30-00.0000000.parquet", [30, 40])
+        write_flush(self.date_dir / "hour=00" / "spreads-10-00.0000000.parquet", [10, 20])
+        write_flush(self.date_dir / "hour=01" / "spreads-05-00.0000000.parquet", [5])
+        write_flush(self.date_dir / "hour=02" / "spreads-01-00.0000000.parquet", [1, 2])
+
+        # "Now" is 02:30 - hours 00 and 01 are closed, hour 02 is live
+        self.now = datetime(2025, 1, 1, 2, 30)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def load(self, **kwargs):
+        return load_exchange_symbol_data(str(self.data_path), "TestExchange", "BTC/USDT", **kwargs)
+
+    def test_compacts_only_closed_hours(self):
+        """Test that closed hours become one file and the live hour is untouched"""
+        before = self.load()
+        compacted = compact_partitions(str(self.data_path), now=self.now)
+
+        self.assertEqual(len(compacted), 2)
+        self.assertEqual(
+            sorted(p.name for p in (self.date_dir / "hour=00").iterdir()),
+            [COMPACTED_FILENAME]
+        )
+        self.assertEqual(
+            sorted(p.name for p in (self.date_dir / "hour=02").iterdir()),
+            ["spreads-01-00.0000000.parquet"]
+        )
+        self.assertTrue(self.load().equals(before), "Compaction must not change loaded data")
+
+    def test_compacted_file_is_sorted_float64(self):
+        """Test compacted file layout"""
+        compact_partitions(str(self.data_path), now=self.now)
+        df = pl.read_parquet(self.date_dir / "hour=00" / COMPACTED_FILENAME)
+
+        self.assertEqual(df['BestBid'].dtype, pl.Float64)
+        self.assertEqual(df['Timestamp'].to_list(), sorted(df['Timestamp'].to_list()))
+        self.assertEqual(len(df), 4)
+
+    def test_recompaction_merges_late_flush(self):
+        """Test that a late flush into a compacted hour is folded in by the next run"""
+        compact_partitions(str(self.data_path), now=self.now)
+        write_flush(self.date_dir / "hour=01" / "spreads-59-59.0000000.parquet", [59])
+        compact_partitions(str(self.data_path), now=self.now)
+
+        df = pl.read_parquet(self.date_dir / "hour=01" / COMPACTED_FILENAME)
+        self.assertEqual(len(df), 2)
+
+    def test_day_granularity(self):
+        """Test day compaction only touches closed days"""
+        self.assertEqual(compact_partitions(str(self.data_path), granularity='day', now=self.now), [])
+
+        before = self.load()
+        compacted = compact_partitions(str(self.data_path), granularity='day', now=datetime(2025, 1, 3))
+
+        self.assertEqual(len(compacted), 1)
+        self.assertTrue((self.date_dir / COMPACTED_FILENAME).exists())
+        self.assertTrue(self.load().equals(before))
+
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+        self.assertTrue(self.load(catalog=catalog).equals(before))
+
+    def test_invalid_granularity(self):
+        """Test that unknown granularity raises ValueError"""
+        with self.assertRaises(ValueError):
+            compact_partitions(str(self.data_path), granularity='week')
+
+    def test_prefer_compacted(self):
+        """Test that compacted files supersede raw spreads files but not trades"""
+        files = [
+            "d/date=2025-01-01/hour=00/spreads-10-00.parquet",
+            "d/date=2025-01-01/hour=00/trades-10-00.parquet",
+            f"d/date=2025-01-01/hour=00/{COMPACTED_FILENAME}",
+            "d/date=2025-01-01/hour=01/spreads-10-00.parquet",
+        ]
+        self.assertEqual(prefer_compacted(files), files[1:])
+
+        # A raw file written after the compacted file is a late flush and is kept
+        self.assertEqual(prefer_compacted(files, [2, 1, 1, 1]), files)
+        self.assertEqual(prefer_compacted(files, [1, 1, 1, 1]), files[1:])
+
+        day_files = [
+            "d/date=2025-01-01/hour=00/spreads-10-00.parquet",
+            f"d/date=2025-01-01/hour=00/{COMPACTED_FILENAME}",
+            f"d/date=2025-01-01/{COMPACTED_FILENAME}",
+        ]
+        self.assertEqual(prefer_compacted(day_files, [1, 1, 2]), day_files[2:])
+        self.assertEqual(prefer_compacted(day_files, [3, 1, 2]), day_files[::2])
+
+    def test_late_flush_into_compacted_hour_is_loaded(self):
+        """Test that a flush landing after compaction is read next to the compacted file"""
+        compact_partitions(str(self.data_path), now=self.now)
+        late = self.date_dir / "hour=01" / "spreads-59-59.0000000.parquet"
+        write_flush(late, [59])
+        compacted_mtime = (self.date_dir / "hour=01" / COMPACTED_FILENAME).stat().st_mtime_ns
+        os.utime(late, ns=(compacted_mtime + 10**9, compacted_mtime + 10**9))
+
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+        for kwargs in ({}, {'catalog': catalog}):
+            df = self.load(**kwargs)
+            self.assertEqual(len(df), 8)
+            self.assertIn(datetime(2025, 1, 1, 1, 59), df['timestamp'].to_list())
+
+    def test_flush_during_compaction_is_loaded(self):
+        """Test that a flush landing after the sources were listed but before the swap stays visible"""
+        late = self.date_dir / "hour=01" / "spreads-59-59.0000000.parquet"
+        compact = compaction_module.compact_files
+
+        def flush_then_compact(sources, target, *args):
+            if target.parent.name == 'hour=01':
+                write_flush(late, [59])
+            return compact(sources, target, *args)
+
+        with mock.patch.object(compaction_module, 'compact_files', side_effect=flush_then_compact):
+            compact_partitions(str(self.data_path), now=self.now)
+
+        compacted = self.date_dir / "hour=01" / COMPACTED_FILENAME
+        self.assertTrue(late.exists())
+        self.assertLessEqual(late.stat().st_mtime_ns, compacted.stat().st_mtime_ns,
+                             "The flush is older than the compacted file itself")
+        self.assertEqual(len(pl.read_parquet(compacted)), 1)
+
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+        for kwargs in ({}, {'catalog': catalog}):
+            df = self.load(**kwargs)
+            self.assertEqual(len(df), 8)
+            self.assertIn(datetime(2025, 1, 1, 1, 59), df['timestamp'].to_list())
+
+    def test_compacted_through_tells_sources_from_same_tick_flush(self):
+        """Test that a raw file with the newest source's exact mtime is superseded only if it was a source"""
+        hour_dir = self.date_dir / "hour=00"
+        sources = sorted(hour_dir.glob("spreads-*.parquet"))
+        target = hour_dir / COMPACTED_FILENAME
+        tick = sources[0].stat().st_mtime_ns
+        # Keep the sources around: as between the swap and their removal
+        with mock.patch.object(Path, 'unlink'):
+            compact_files(sources, target, mtimes=[tick, tick])
+        write_flush(hour_dir / "spreads-50-00.0000000.parquet", [50])
+
+        self.assertEqual(compacted_through(target), (tick, {source.name for source in sources}))
+        files = [str(source) for source in sources] + [str(hour_dir / "spreads-50-00.0000000.parquet"), str(target)]
+        self.assertEqual(prefer_compacted(files, [tick] * 4), files[2:])
+        self.assertEqual(prefer_compacted(files, [tick - 1, tick - 1, tick + 1, tick]), files[2:])
+        self.assertEqual(prefer_compacted(files, [tick + 1, tick, tick, tick]), [files[0]] + files[2:])
+
+
+if __name__ == '__main__':
+    unittest.main()
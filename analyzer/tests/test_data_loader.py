@@ -4,9 +4,13 @@ Unit tests for data_loader module.
 
 import unittest
 import tempfile
+import shutil
 import polars as pl
+from datetime import datetime
 from pathlib import Path
-from lib.data_loader import load_exchange_symbol_data
+from lib.catalog import PartitionCatalog
+from lib.data_loader import load_exchange_symbol_data, load_exchange_symbol_trades, sort_by_timestamp
+from lib.series_cache import SeriesCache
 
 
 class TestDataLoader(unittest.TestCase):
@@ -41,6 +45,20 @@ class TestDataLoader(unittest.TestCase):
         parquet_file = hour_dir / "data.parquet"
         mock_data.write_parquet(parquet_file)
 
+        # Collector writes trades into the same hour directory with another schema
+        mock_trades = pl.DataFrame({
+            'Timestamp': pl.datetime_range(
+                start=pl.datetime(2025, 1, 1, 0, 0, 30),
+                end=pl.datetime(2025, 1, 1, 0, 4, 30),
+                interval="1m",
+                eager=True
+            ),
+            'Price': [100.05] * 5,
+            'Quantity': [0.5] * 5,
+            'Side': ['Buy', 'Sell', 'Buy', 'Sell', 'Buy']
+        })
+        mock_trades.write_parquet(hour_dir / "trades-00-30.0000000.parquet")
+
     def tearDown(self):
         """Clean up temporary directory"""
         import shutil
@@ -139,6 +157,160 @@ class TestDataLoader(unittest.TestCase):
             "Data should be sorted by timestamp"
         )
 
+    def test_spreads_ignore_trades_files(self):
+        """Test that trades files in the same hour don't break or pollute spreads loading"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        for cat in (None, catalog):
+            df = load_exchange_symbol_data(str(self.data_path), "TestExchange", "BTC/USDT", catalog=cat)
+            self.assertIsNotNone(df)
+            self.assertEqual(len(df), 11)
+
+    def test_load_trades(self):
+        """Test loading trades with date filtering"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        for cat in (None, catalog):
+            df = load_exchange_symbol_trades(str(self.data_path), "TestExchange", "BTC/USDT",
+                                             start_date="2025-01-01", end_date="2025-01-01", catalog=cat)
+            self.assertIsNotNone(df)
+            self.assertEqual(df.columns, ['timestamp', 'price', 'quantity', 'side'])
+            self.assertEqual(df['price'].dtype, pl.Float64)
+            self.assertEqual(len(df), 5)
+
+            self.assertIsNone(load_exchange_symbol_trades(str(self.data_path), "TestExchange", "BTC/USDT",
+                                                          start_date="2025-01-02", catalog=cat))
+
+
+class TestSortByTimestamp(unittest.TestCase):
+    """Tests for run-aware timestamp sorting."""
+
+    def frame(self, seconds):
+        return pl.DataFrame({
+            'timestamp': [datetime(2025, 1, 1, 0, 0, s) for s in seconds],
+            'bestBid': [float(s) for s in seconds]
+        })
+
+    def test_sorted_input_is_flagged(self):
+        """Test that already sorted input is returned as is with the sorted flag"""
+        df = sort_by_timestamp(self.frame([1, 2, 2, 5]))
+        self.assertEqual(df['bestBid'].to_list(), [1.0, 2.0, 2.0, 5.0])
+        self.assertEqual(df['timestamp'].flags['SORTED_ASC'], True)
+
+    def test_merges_out_of_order_runs(self):
+        """Test that concatenated sorted runs are merged"""
+        seconds = [10, 20, 30, 5, 15, 25, 1, 40]
+        expected = sorted(seconds)
+
+        for max_runs in (64, 2):  # k-way merge and full-sort fallback
+            df = sort_by_timestamp(self.frame(seconds), max_merge_runs=max_runs)
+            self.assertEqual(df['bestBid'].to_list(), [float(s) for s in expected])
+            self.assertEqual(df['timestamp'].flags['SORTED_ASC'], True)
+
+    def test_out_of_order_flush_files(self):
+        """Test that a late flush file with earlier rows is merged into place"""
+        data_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, data_path)
+        hour_dir = data_path / "exchange=TestExchange" / "symbol=BTC_USDT" / "date=2025-01-01" / "hour=00"
+        hour_dir.mkdir(parents=True)
+        self.frame([10, 11, 12]).rename({'timestamp': 'Timestamp', 'bestBid': 'BestBid'}) \
+            .with_columns(BestAsk=pl.col('BestBid') + 1).write_parquet(hour_dir / "spreads-00-10.0000000.parquet")
+        self.frame([5, 13]).rename({'timestamp': 'Timestamp', 'bestBid': 'BestBid'}) \
+            .with_columns(BestAsk=pl.col('BestBid') + 1).write_parquet(hour_dir / "spreads-00-20.0000000.parquet")
+
+        df = load_exchange_symbol_data(str(data_path), "TestExchange", "BTC/USDT")
+        self.assertEqual(df['bestBid'].to_list(), [5.0, 10.0, 11.0, 12.0, 13.0])
+
+
+class TestTimeWindow(unittest.TestCase):
+    """Tests for intra-day time window loading."""
+
+    def setUp(self):
+        """Create two days with three hours each, one row per 10 minutes"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        symbol_dir = self.data_path / "exchange=TestExchange" / "symbol=BTC_USDT"
+
+        for day in (1, 2):
+            for hour in (0, 1, 2):
+                hour_dir = symbol_dir / f"date=2025-01-0{day}" / f"hour={hour:02d}"
+                hour_dir.mkdir(parents=True)
+                timestamps = [datetime(2025, 1, day, hour, m) for m in range(0, 60, 10)]
+                pl.DataFrame({
+                    'Timestamp': timestamps,
+                    'BestBid': [100.0 + i for i in range(6)],
+                    'BestAsk': [100.1 + i for i in range(6)]
+                }).write_parquet(hour_dir / "spreads-00-00.0000000.parquet")
+                pl.DataFrame({
+                    'Timestamp': timestamps,
+                    'Price': [100.0] * 6,
+                    'Quantity': [1.0] * 6,
+                    'Side': ['Buy'] * 6
+                }).write_parquet(hour_dir / "trades-00-00.0000000.parquet")
+
+        self.catalog = PartitionCatalog(str(self.data_path))
+        self.catalog.refresh()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def load(self, **kwargs):
+        return load_exchange_symbol_data(str(self.data_path), "TestExchange", "BTC/USDT", **kwargs)
+
+    def test_window_across_hours(self):
+        """Test a window spanning an hour boundary on every load path"""
+        start, end = datetime(2025, 1, 1, 1, 30), datetime(2025, 1, 1, 2, 10)
+        expected = [datetime(2025, 1, 1, 1, m) for m in (30, 40, 50)] + [datetime(2025, 1, 1, 2, 0)]
+
+        cache = SeriesCache(str(self.data_path))
+        for catalog, series_cache in ((None, None), (self.catalog, None), (self.catalog, cache)):
+            df = self.load(start_time=start, end_time=end, catalog=catalog, cache=series_cache)
+            self.assertEqual(df['timestamp'].to_list(), expected)
+
+    def test_cached_day_is_sliced(self):
+        """Test that a window over a cached day slices the cached series"""
+        cache = SeriesCache(str(self.data_path))
+        full = self.load(catalog=self.catalog, cache=cache)
+        self.assertTrue(cache.path_for("TestExchange", "BTC_USDT", "2025-01-02").exists())
+
+        df = self.load(start_time=datetime(2025, 1, 1, 2, 50), end_time=datetime(2025, 1, 2, 0, 10),
+                       catalog=self.catalog, cache=cache)
+        self.assertEqual(df['timestamp'].to_list(), [datetime(2025, 1, 1, 2, 50), datetime(2025, 1, 2, 0, 0)])
+        self.assertEqual(len(full), 36)
+
+    def test_window_without_rows(self):
+        """Test that a window between partitions returns None"""
+        self.assertIsNone(self.load(start_time=datetime(2025, 1, 1, 5), end_time=datetime(2025, 1, 1, 6)))
+        self.assertIsNone(self.load(start_time=datetime(2025, 1, 1, 5), end_time=datetime(2025, 1, 1, 6),
+                                    catalog=self.catalog))
+
+    def test_open_ended_window_and_trades(self):
+        """Test a start-only window for spreads and trades"""
+        start = datetime(2025, 1, 2, 2, 35)
+        self.assertEqual(len(self.load(start_time=start, catalog=self.catalog)), 2)
+
+        trades = load_exchange_symbol_trades(str(self.data_path), "TestExchange", "BTC/USDT",
+                                             start_time=start, catalog=self.catalog)
+        self.assertEqual(len(trades), 2)
+
+    def test_timezone_aware_timestamps(self):
+        """Test that naive UTC bounds work against UTC-tagged Timestamp columns"""
+        hour_dir = self.data_path / "exchange=TestExchange" / "symbol=ETH_USDT" / "date=2025-01-01" / "hour=00"
+        hour_dir.mkdir(parents=True)
+        pl.DataFrame({
+            'Timestamp': [datetime(2025, 1, 1, 0, m) for m in (0, 30)],
+            'BestBid': [1.0, 2.0],
+            'BestAsk': [1.1, 2.1]
+        }).with_columns(pl.col('Timestamp').dt.replace_time_zone('UTC')) \
+            .write_parquet(hour_dir / "spreads-00-00.0000000.parquet")
+
+        df = load_exchange_symbol_data(str(self.data_path), "TestExchange", "ETH/USDT",
+                                       start_time=datetime(2025, 1, 1, 0, 15))
+        self.assertEqual(df['bestBid'].to_list(), [2.0])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,73 @@
+"""
+Unit tests for lazy_engine module.
+"""
+
+import unittest
+from datetime import timedelta
+import numpy as np
+import polars as pl
+
+from lib.analysis import analyze_joined, find_complete_cycles, pair_deviation
+from lib.lazy_engine import _cycles, analyze_pairs_lazy
+from tests.test_analysis import random_walk_pair
+
+
+class TestLazyEngine(unittest.TestCase):
+    """Tests for analyzing all pairs of a symbol in one collect_all."""
+
+    def setUp(self):
+        """Three exchanges; C is shifted by 300ms and misses every 7th quote"""
+        data1, data2 = random_walk_pair(3, n=5000)
+        data3 = data2.filter(pl.int_range(pl.len()) % 7 != 0) \
+            .with_columns(pl.col('timestamp') + timedelta(milliseconds=300))
+        self.data = {'A': data1, 'B': data2, 'C': data3}
+        self.pairs = [('A', 'B'), ('A', 'C'), ('B', 'C')]
+
+    def assert_same_metrics(self, lazy, eager):
+        self.assertEqual(list(lazy), list(eager))
+        for key, value in eager.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(lazy[key], value, places=9, msg=key)
+            else:
+                self.assertEqual(lazy[key], value, msg=key)
+
+    def test_matches_eager_path(self):
+        """Test that every pair gets analyze_joined's metrics, keys in the same order"""
+        for max_quote_age in (None, timedelta(milliseconds=1500)):
+            with self.subTest(max_quote_age=max_quote_age):
+                results = analyze_pairs_lazy(self.data, self.pairs, [0.3, 0.5, 0.4], 0.05, max_quote_age)
+                for ex1, ex2 in self.pairs:
+                    eager = analyze_joined(pair_deviation(self.data[ex1], self.data[ex2], max_quote_age),
+                                           [0.3, 0.5, 0.4], 0.05)
+                    self.assert_same_metrics(results[(ex1, ex2)], eager)
+                    if max_quote_age is not None:
+                        # Stale rows are excluded from data_points in both engines
+                        joined = pair_deviation(self.data[ex1], self.data[ex2], max_quote_age)
+                        stale_rows = int(joined['stale'].sum())
+                        self.assertEqual(results[(ex1, ex2)]['stale_rows'], stale_rows)
+                        self.assertEqual(results[(ex1, ex2)]['data_points'], len(joined) - stale_rows)
+                if max_quote_age is not None:
+                    self.assertGreater(results[('A', 'C')]['stale_rows'], 0)
+                self.assertGreater(results[('A', 'B')]['opportunity_cycles_030bp'], 0)
+
+    def test_missing_and_empty_pairs(self):
+        """Test that pairs without data or without overlap are skipped"""
+        late = self.data['B'].with_columns(pl.col('timestamp') + timedelta(days=1))
+        results = analyze_pairs_lazy({'A': self.data['A'], 'L': late}, [('A', 'L'), ('A', 'Z')])
+        self.assertEqual(results, {('A', 'L'): None, ('A', 'Z'): None})
+
+    def test_cycle_expression(self):
+        """Test the in-query cycle count against the vectorized kernel"""
+        rng = np.random.default_rng(5)
+        deviation = rng.normal(0, 0.3, 2000)
+        frame = pl.DataFrame({'deviation': deviation})
+        for threshold in (0.1, 0.3, 0.6):
+            above = pl.col('deviation').abs() > threshold
+            neutral = pl.col('deviation').abs() < 0.05
+            count = frame.select(_cycles(above, neutral)).item()
+            _, ends = find_complete_cycles(np.abs(deviation) > threshold, np.abs(deviation) < 0.05)[0]
+            self.assertEqual(count, len(ends))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for lead_lag module.
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta
+
+from lib import lead_lag as lead_lag_module
+from lib.lead_lag import LEAD_LAG_COLUMNS, common_span, lead_lag_stats
+
+
+def lagged_exchanges(delays, n: int = 60000, seed: int = 0):
+    """Exchanges quoting one random walk every 10ms, each delayed by its number of ticks."""
+    rng = np.random.default_rng(seed)
+    timestamps = pl.datetime_range(datetime(2025, 1, 1), datetime(2025, 1, 1) + timedelta(milliseconds=10 * (n - 1)),
+                                   "10ms", eager=True)
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, n)))
+    frames = {}
+    for exchange, delay in delays.items():
+        mid = np.concatenate([np.full(delay, price[0]), price[:n - delay]])
+        frames[exchange] = pl.DataFrame({'timestamp': timestamps, 'bestBid': mid * 0.9999, 'bestAsk': mid * 1.0001})
+    return frames
+
+
+class TestLeadLag(unittest.TestCase):
+    """Tests for FFT lead-lag estimation."""
+
+    def test_recovers_planted_lags(self):
+        """Test lag sign and size for every pair of one call"""
+        result = lead_lag_stats(lagged_exchanges({'A': 0, 'B': 30, 'C': 5}),
+                                timedelta(milliseconds=50), timedelta(seconds=2))
+
+        self.assertEqual(result[('A', 'B')]['lead_lag_ms'], 300.0)
+        self.assertEqual(result[('A', 'C')]['lead_lag_ms'], 50.0)
+        self.assertEqual(result[('B', 'C')]['lead_lag_ms'], -250.0)
+        self.assertGreater(result[('A', 'B')]['lead_lag_corr'], 0.99)
+        self.assertLess(abs(result[('A', 'B')]['lead_lag_corr_zero']), 0.05)
+
+    def test_matches_direct_correlation(self):
+        """Test FFT correlations (across segments) against direct dot products"""
+        frames = lagged_exchanges({'A': 0, 'B': 7}, n=200000, seed=1)
+        interval = timedelta(milliseconds=20)
+        result = lead_lag_stats(frames, interval, timedelta(milliseconds=200))
+
+        # Quotes every 10ms, grid every 20ms from the first quote: the grid takes every other quote
+        r1, r2 = (
+            np.diff(np.log(((frames[exchange]['bestBid'] + frames[exchange]['bestAsk']) / 2).to_numpy()[::2]))
+            for exchange in ('A', 'B')
+        )
+        norm = np.sqrt((r1 ** 2).sum() * (r2 ** 2).sum())
+        lag = int(result[('A', 'B')]['lead_lag_ms'] // 20)
+
+        # 7 ticks of 10ms = 3.5 grid points: the peak is at 60 or 80ms
+        self.assertIn(lag, (3, 4))
+        self.assertAlmostEqual(result[('A', 'B')]['lead_lag_corr'], float(r1[:-lag] @ r2[lag:] / norm), places=4)
+        self.assertAlmostEqual(result[('A', 'B')]['lead_lag_corr_zero'], float(r1 @ r2 / norm), places=4)
+
+    def test_segments_match_one_transform(self):
+        """Test that any segment length (shorter than max_lag too) gives the whole grid's correlations"""
+        frames = lagged_exchanges({'A': 0, 'B': 30, 'C': 5}, n=20000, seed=2)
+        interval, max_lag = timedelta(milliseconds=50), timedelta(seconds=1)
+        with mock.patch.object(lead_lag_module, 'SEGMENT_POINTS', 1 << 30):
+            whole = lead_lag_stats(frames, interval, max_lag)
+
+        for segment in (7, 1000, 3999):
+            with mock.patch.object(lead_lag_module, 'SEGMENT_POINTS', segment):
+                segmented = lead_lag_stats(frames, interval, max_lag)
+            for pair, stats in whole.items():
+                self.assertEqual(segmented[pair]['lead_lag_ms'], stats['lead_lag_ms'])
+                self.assertAlmostEqual(segmented[pair]['lead_lag_corr'], stats['lead_lag_corr'], places=10)
+                self.assertAlmostEqual(segmented[pair]['lead_lag_corr_zero'], stats['lead_lag_corr_zero'], places=10)
+
+    def test_span_matches_full_symbol(self):
+        """Test that a pair with the symbol-wide span gets the symbol batch's values"""
+        frames = lagged_exchanges({'A': 0, 'B': 30, 'C': 5}, n=20000)
+        frames['C'] = frames['C'].slice(1000, 15000)
+        interval, max_lag = timedelta(milliseconds=50), timedelta(seconds=1)
+        full = lead_lag_stats(frames, interval, max_lag)
+
+        pair = {exchange: frames[exchange] for exchange in ('A', 'B')}
+        self.assertEqual(lead_lag_stats(pair, interval, max_lag, common_span(frames))[('A', 'B')], full[('A', 'B')])
+        # Without the span the pair's own (longer) range is used
+        self.assertNotEqual(lead_lag_stats(pair, interval, max_lag)[('A', 'B')], full[('A', 'B')])
+
+    def test_no_common_range(self):
+        """Test None values for missing or non-overlapping exchanges"""
+        frames = lagged_exchanges({'A': 0, 'B': 0}, n=1000)
+        frames['B'] = frames['B'].with_columns(pl.col('timestamp') + timedelta(hours=1))
+        result = lead_lag_stats(frames, timedelta(milliseconds=50), timedelta(seconds=1))
+        self.assertEqual(result[('A', 'B')], {column: None for column in LEAD_LAG_COLUMNS})
+
+        self.assertEqual(lead_lag_stats({'A': frames['A']}, timedelta(milliseconds=50), timedelta(seconds=1)), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Unit tests for live module.
+"""
+
+import asyncio
+import json
+import unittest
+
+from lib.analysis import analyze_joined, pair_deviation
+from lib.live import LiveAnalyzer, LivePairState, replay_messages, run_live, serve_replay, websockets
+from tests.test_analysis import random_walk_pair
+from tests.test_partials import THRESHOLDS, assert_same_metrics
+
+
+def walk_pairs():
+    """Two replay pairs from mean-reverting walks, with repeated timestamps."""
+    pairs = []
+    for seed, (ex1, ex2) in ((1, ('A', 'B')), (2, ('A', 'C'))):
+        data1, data2 = random_walk_pair(seed, 3000)
+        joined = pair_deviation(data1, data2)
+        ts = (joined['timestamp'].dt.epoch('ms') / 1000.0).to_numpy().copy()
+        # Collector ticks of both exchanges can share a millisecond
+        ts[1::7] = ts[0:-1:7]
+        pairs.append(('T/USDT', ex1, ex2, ts, joined['deviation'].to_numpy()))
+    return pairs
+
+
+class TestLive(unittest.TestCase):
+    """Tests for incremental live metrics."""
+
+    def test_matches_batch(self):
+        """Test tick-by-tick metrics equal analyze_joined's deviation metrics"""
+        data1, data2 = random_walk_pair(5)
+        joined = pair_deviation(data1, data2.slice(50))
+        expected = analyze_joined(joined, THRESHOLDS, 0.05)
+
+        state = LivePairState(THRESHOLDS, 0.05)
+        timestamps = (joined['timestamp'].dt.epoch('us') / 10**6).to_list()
+        for timestamp, deviation in zip(timestamps, joined['deviation'].to_list()):
+            state.update(timestamp, deviation)
+        result = state.metrics()
+
+        assert_same_metrics(self, result, {key: expected[key] for key in result})
+
+    def test_trailing_null_tick(self):
+        """Test a trailing tick without a deviation keeps the pattern-break flags"""
+        state = LivePairState(THRESHOLDS, 0.05)
+        for timestamp, deviation in enumerate([0.0, 0.6, 0.01, 0.45, None]):
+            state.update(float(timestamp), deviation)
+        result = state.metrics()
+
+        self.assertEqual(result['data_points'], 5)
+        self.assertTrue(result['pattern_break_030bp'])
+        self.assertFalse(result['pattern_break_050bp'])
+
+    def test_overlapping_snapshots(self):
+        """Test overlapping snapshots apply every tick exactly once"""
+        pairs = walk_pairs()
+        direct = LiveAnalyzer(THRESHOLDS, 0.05)
+        for symbol, ex1, ex2, ts, spreads in pairs:
+            direct.handle_message({'symbol': symbol, 'exchange1': ex1, 'exchange2': ex2,
+                                   'timestamps': ts.tolist(), 'spreads': spreads.tolist()})
+
+        live = LiveAnalyzer(THRESHOLDS, 0.05)
+        for _, message in replay_messages(pairs, interval=5, window=60):
+            live.handle_message(message)
+            # A repeated snapshot adds nothing
+            self.assertEqual(live.handle_message(message), 0)
+
+        self.assertEqual(live.ticks, sum(len(pair[3]) for pair in pairs))
+        self.assertTrue(live.ranking().equals(direct.ranking()))
+
+    def test_replay_messages_in_time_order(self):
+        """Test snapshots of all pairs are interleaved by time"""
+        times = [replay_time for replay_time, _ in replay_messages(walk_pairs(), interval=5, window=60)]
+        self.assertEqual(times, sorted(times))
+
+    @unittest.skipIf(websockets is None, "websockets is not installed")
+    def test_replay_server_round_trip(self):
+        """Test the live client over a local replay server"""
+        pairs = walk_pairs()
+        rankings = []
+        analyzer = LiveAnalyzer(THRESHOLDS, 0.05)
+
+        async def scenario():
+            port = asyncio.get_running_loop().create_future()
+            server = asyncio.create_task(
+                serve_replay(pairs, '127.0.0.1', 0, speed=0, interval=5, window=60, ready=port.set_result)
+            )
+            uri = f"ws://127.0.0.1:{await port}/ws/realtime_charts"
+            await run_live(uri, analyzer, rankings.append, interval=0.2, duration=1.5, reconnect_delay=0.1)
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(analyzer.ticks, sum(len(pair[3]) for pair in pairs))
+        self.assertEqual(sorted(rankings[-1]['exchange2'].to_list()), ['B', 'C'])
+
+    def test_malformed_snapshots_rejected(self):
+        """Test that a malformed snapshot raises ValueError and leaves the state alone"""
+        analyzer = LiveAnalyzer(THRESHOLDS, 0.05)
+        for message in ([1, 2], {'symbol': 'T', 'exchange1': 'A', 'exchange2': 'B', 'timestamps': [1.0]},
+                        {'symbol': 'T', 'exchange1': 'A', 'timestamps': [1.0], 'spreads': [0.1]},
+                        {'symbol': 'T', 'exchange1': 'A', 'exchange2': 'B', 'timestamps': [1.0, 2.0],
+                         'spreads': [0.1, 'x']}):
+            with self.assertRaises(ValueError):
+                analyzer.handle_message(message)
+        self.assertEqual((analyzer.messages, analyzer.ticks, analyzer.states), (0, 0, {}))
+
+    @unittest.skipIf(websockets is None, "websockets is not installed")
+    def test_bad_messages_are_skipped(self):
+        """Test that bad messages are skipped one at a time without dropping the stream"""
+        good = {'symbol': 'T/USDT', 'exchange1': 'A', 'exchange2': 'B',
+                'timestamps': [1.0, 2.0], 'spreads': [0.1, -0.1]}
+        raws = ['[1, 2]', '{"not json', json.dumps({**good, 'spreads': None}), json.dumps(good)]
+        analyzer = LiveAnalyzer(THRESHOLDS, 0.05)
+
+        async def handler(websocket, *_):
+            for raw in raws:
+                await websocket.send(raw)
+            await websocket.wait_closed()
+
+        async def scenario():
+            async with websockets.serve(handler, '127.0.0.1', 0) as server:
+                port = next(iter(server.sockets)).getsockname()[1]
+                await run_live(f"ws://127.0.0.1:{port}", analyzer, lambda _: None, interval=0.1, duration=0.5)
+
+        asyncio.run(scenario())
+        self.assertEqual((analyzer.messages, analyzer.ticks), (1, 2))
+
+    @unittest.skipIf(websockets is None, "websockets is not installed")
+    def test_rejected_handshake_is_retried(self):
+        """Test that an HTTP error instead of a WebSocket handshake is retried, and a bad URI fails"""
+        attempts = []
+
+        async def reject(reader, writer):
+            attempts.append(await reader.readuntil(b'\r\n\r\n'))
+            writer.write(b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n')
+            await writer.drain()
+            writer.close()
+
+        async def scenario():
+            server = await asyncio.start_server(reject, '127.0.0.1', 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                await run_live(f"ws://127.0.0.1:{port}", LiveAnalyzer(), lambda _: None, interval=0.1,
+                               duration=0.5, reconnect_delay=0.05)
+
+        asyncio.run(scenario())
+        self.assertGreater(len(attempts), 1)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run_live("http://127.0.0.1:1", LiveAnalyzer(), lambda _: None, duration=5))
+
+    @unittest.skipIf(websockets is None, "websockets is not installed")
+    def test_failed_loop_ends_the_run(self):
+        """Test that a failing publish ends an open-ended run with its error"""
+        def publish(_):
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            asyncio.run(run_live("ws://127.0.0.1:1", LiveAnalyzer(), publish, interval=0.05, reconnect_delay=0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
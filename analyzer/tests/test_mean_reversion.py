@@ -0,0 +1,82 @@
+"""
+Unit tests for mean_reversion module.
+"""
+
+import unittest
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta
+
+from lib.analysis import analyze_pair_fast, pair_deviation
+from lib.mean_reversion import MEAN_REVERSION_COLUMNS, mean_reversion_stats, resample_deviation
+from tests.test_analysis import random_walk_pair
+
+
+def reference_adf(x: np.ndarray, lags: int) -> float:
+    """ADF t-stat (constant, `lags` lagged differences) from a per-series least-squares fit."""
+    dx = np.diff(x)
+    y = dx[lags:]
+    X = np.column_stack([np.ones_like(y), x[lags:-1], *(dx[lags - i:len(dx) - i] for i in range(1, lags + 1))])
+    beta, ssr, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    s2 = ssr[0] / (len(y) - X.shape[1])
+    return beta[1] / np.sqrt(s2 * np.linalg.inv(X.T @ X)[1, 1])
+
+
+class TestMeanReversion(unittest.TestCase):
+    """Tests for batched ADF / half-life / moments."""
+
+    def test_batch_matches_per_pair_fit(self):
+        """Test that each pair of a batch equals its own least-squares fit"""
+        frames = [pair_deviation(*random_walk_pair(seed, n=3000)) for seed in (1, 2, 3)]
+        for lags in (0, 2):
+            results = mean_reversion_stats(frames, timedelta(seconds=1), adf_lags=lags)
+            for frame, result in zip(frames, results):
+                x = frame['deviation'].to_numpy()
+                self.assertAlmostEqual(result['adf_stat'], reference_adf(x, lags), places=8)
+
+                b = np.polyfit(x[:-1], x[1:], 1)[0]
+                self.assertAlmostEqual(result['ar1_coef'], b, places=10)
+                self.assertAlmostEqual(result['half_life_sec'], -np.log(2) / np.log(b), places=6)
+                self.assertAlmostEqual(result['deviation_std'], float(np.std(x, ddof=1)), places=10)
+                self.assertTrue(result['adf_stationary'])
+
+        # The walk reverts with coefficient 0.98 per second: half-life ≈ 34s
+        self.assertAlmostEqual(results[0]['half_life_sec'], -np.log(2) / np.log(0.98), delta=10)
+
+    def test_resample_carries_last_value(self):
+        """Test last-per-interval resampling with forward fill of empty intervals"""
+        joined = pl.DataFrame({
+            'timestamp': [datetime(2025, 1, 1, 0, 0, 0, 100000), datetime(2025, 1, 1, 0, 0, 0, 900000),
+                          datetime(2025, 1, 1, 0, 0, 3, 500000)],
+            'deviation': [0.1, 0.2, -0.3],
+        })
+        first, values = resample_deviation(joined, timedelta(seconds=1))
+        self.assertEqual(first, (datetime(2025, 1, 1) - datetime(1970, 1, 1)) // timedelta(seconds=1))
+        np.testing.assert_array_equal(values, [0.2, 0.2, 0.2, -0.3])
+
+    def test_unit_root_and_missing_pairs(self):
+        """Test that a random walk isn't stationary and missing pairs yield None values"""
+        rng = np.random.default_rng(0)
+        n = 5000
+        timestamps = pl.datetime_range(datetime(2025, 1, 1), datetime(2025, 1, 1) + timedelta(seconds=n - 1),
+                                       "1s", eager=True)
+        walk = pl.DataFrame({'timestamp': timestamps, 'deviation': np.cumsum(rng.normal(0, 0.01, n))})
+
+        walk_stats, missing = mean_reversion_stats([walk, None], timedelta(seconds=1))
+        self.assertFalse(walk_stats['adf_stationary'])
+        self.assertEqual(set(missing), set(MEAN_REVERSION_COLUMNS))
+        self.assertTrue(all(value is None for value in missing.values()))
+
+    def test_analyze_pair_fast_option(self):
+        """Test that analyze_pair_fast only adds the statistics when asked"""
+        data1, data2 = random_walk_pair(4, n=2000)
+        plain = analyze_pair_fast("T/USDT", "A", "B", data1, data2)
+        extended = analyze_pair_fast("T/USDT", "A", "B", data1, data2, mean_reversion_interval=timedelta(seconds=5))
+
+        self.assertNotIn('adf_stat', plain)
+        self.assertEqual(list(extended)[:len(plain)], list(plain))
+        self.assertEqual(list(extended)[len(plain):], MEAN_REVERSION_COLUMNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
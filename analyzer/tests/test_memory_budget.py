@@ -0,0 +1,175 @@
+"""
+Unit tests for memory_budget module.
+"""
+
+import os
+import time
+import threading
+import unittest
+import tempfile
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from unittest import mock
+
+from lib.catalog import PartitionCatalog
+from lib.memory_budget import (
+    LOADED_ROW_BYTES, PAIR_ROW_BYTES, WORKER_BASE_BYTES, MemoryBudget, estimated_rows, hourly_rows,
+    imap_admitted, max_workers, peak_rss_bytes, task_footprint
+)
+from tests.test_catalog import write_spreads
+
+
+class Tracker:
+    """Task function that records the footprints running at the same time"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, footprint):
+        with self.lock:
+            self.running += footprint
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= footprint
+        if footprint < 0:
+            raise ValueError("negative footprint")
+        return footprint
+
+
+def die_on_zero(n):
+    """Kill the worker process on task 0, like the OOM killer"""
+    if n == 0:
+        time.sleep(0.2)
+        os._exit(1)
+    return n
+
+
+class TestFootprints(unittest.TestCase):
+    """Tests for footprint estimates."""
+
+    def test_task_footprint(self):
+        """Test that all exchanges count and the largest join once"""
+        rows = {'A': 100, 'B': 300, 'C': 50}
+        pairs = [('A', 'B'), ('A', 'C'), ('B', 'C')]
+        self.assertEqual(task_footprint(rows, pairs), LOADED_ROW_BYTES * 450 + PAIR_ROW_BYTES * 300)
+        self.assertEqual(task_footprint({'A': 100}, []), LOADED_ROW_BYTES * 100)
+
+    def test_estimated_rows(self):
+        """Test row counts and the bytes-on-disk fallback"""
+        self.assertEqual(estimated_rows(1000, 'rows'), 1000)
+        self.assertGreater(estimated_rows(1000, 'bytes'), 100)
+
+    def test_peak_rss(self):
+        """Test that the peak RSS is measured where the platform supports it"""
+        peak = peak_rss_bytes()
+        if peak is None:
+            self.skipTest("no peak RSS on this platform")
+        self.assertGreater(peak, 2**20)
+
+    @unittest.skipUnless(sys.platform == 'win32', "Windows only")
+    def test_peak_rss_windows(self):
+        """Test the peak working set fallback where there is no getrusage"""
+        with mock.patch('lib.memory_budget.resource', None):
+            self.assertGreater(peak_rss_bytes(), 2**20)
+
+
+class TestHourlyRows(unittest.TestCase):
+    """Tests for the streaming footprint estimate."""
+
+    def setUp(self):
+        """BTC with 50 rows in hour 0 and 30 in hour 1"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        symbol_dir = self.data_path / "exchange=Binance" / "symbol=BTC_USDT" / "date=2025-01-01"
+        write_spreads(symbol_dir / "hour=00" / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, 0), 50)
+        write_spreads(symbol_dir / "hour=01" / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, 1), 30)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_largest_hour(self):
+        """Test catalog row counts of the largest hour and the bytes fallback"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+        self.assertEqual(hourly_rows(str(self.data_path), 'Binance', 'BTC/USDT', catalog=catalog), 50)
+        self.assertEqual(hourly_rows(str(self.data_path), 'Binance', 'BTC/USDT', catalog=catalog,
+                                     start_time=datetime(2025, 1, 1, 1)), 30)
+        self.assertGreater(hourly_rows(str(self.data_path), 'Binance', 'BTC/USDT'), 0)
+
+
+class TestAdmission(unittest.TestCase):
+    """Tests for admitting tasks against the budget."""
+
+    def test_budget_accounting(self):
+        """Test fits/admit/release, the worker overhead and the run-alone rule"""
+        budget = MemoryBudget(2 * WORKER_BASE_BYTES + 100, workers=2)
+        self.assertEqual(budget.available, 100)
+        self.assertTrue(budget.fits(500))
+        budget.admit(60)
+        self.assertTrue(budget.fits(40))
+        self.assertFalse(budget.fits(41))
+        budget.admit(40)
+        budget.release(60)
+        self.assertEqual((budget.in_use, budget.running, budget.peak), (40, 1, 100))
+        self.assertEqual(max_workers(2 * WORKER_BASE_BYTES + 100), 2)
+        self.assertEqual(max_workers(WORKER_BASE_BYTES - 1), 0)
+
+    def test_running_tasks_fit(self):
+        """Test that running footprints stay within the budget and every task finishes"""
+        footprints = [60, 50, 40, 30, 20, 10, 10]
+        tracker = Tracker()
+        budget = MemoryBudget(4 * WORKER_BASE_BYTES + 100, workers=4)
+        with ThreadPoolExecutor(4) as pool:
+            results = [result for _, result, _ in imap_admitted(pool, tracker, footprints, footprints, budget, 4)]
+        self.assertEqual(sorted(results), sorted(footprints))
+        self.assertLessEqual(tracker.peak, 100)
+        self.assertLessEqual(budget.peak, 100)
+        self.assertEqual(budget.running, 0)
+
+    def test_oversized_task_runs_alone(self):
+        """Test that a task larger than the budget runs with nothing next to it"""
+        footprints = [500, 30, 30]
+        tracker = Tracker()
+        budget = MemoryBudget(2 * WORKER_BASE_BYTES + 100, workers=2)
+        with ThreadPoolExecutor(2) as pool:
+            results = [result for _, result, _ in imap_admitted(pool, tracker, footprints, footprints, budget, 2)]
+        self.assertEqual(sorted(results), [30, 30, 500])
+        self.assertEqual(tracker.peak, 500)
+
+    def test_errors_and_no_budget(self):
+        """Test that a task error comes back with its task, the others go on, and no budget runs everything"""
+        with ThreadPoolExecutor(2) as pool:
+            budget = MemoryBudget(10**10, 2)
+            outcomes = list(imap_admitted(pool, Tracker(), [10, -1, 20], [10, 1, 20], budget, 2))
+            self.assertEqual(sorted((task, result) for task, result, _ in outcomes),
+                             [(-1, None), (10, 10), (20, 20)])
+            errors = {task: error for task, _, error in outcomes}
+            self.assertIsInstance(errors[-1], ValueError)
+            self.assertIsNone(errors[10])
+
+            outcomes = imap_admitted(pool, Tracker(), [3, 1, 2], [0, 0, 0], None, 2)
+            self.assertEqual(sorted(result for _, result, _ in outcomes), [1, 2, 3])
+
+    def test_killed_worker(self):
+        """Test that a killed worker fails the tasks left instead of hanging the run"""
+        budget = MemoryBudget(2 * WORKER_BASE_BYTES + 100, workers=2)
+        with ProcessPoolExecutor(2, mp_context=get_context('spawn')) as pool:
+            outcomes = list(imap_admitted(pool, die_on_zero, [0, 1, 2, 3, 4, 5], [10] * 6, budget, 2))
+        self.assertEqual(sorted(task for task, _, _ in outcomes), [0, 1, 2, 3, 4, 5])
+        errors = {task: error for task, _, error in outcomes if error is not None}
+        self.assertIsInstance(errors[0], BrokenProcessPool)
+        self.assertTrue(all(isinstance(error, BrokenProcessPool) for error in errors.values()))
+        self.assertEqual(budget.running, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
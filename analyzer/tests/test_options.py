@@ -0,0 +1,44 @@
+"""
+Unit tests for options module.
+"""
+
+import json
+import unittest
+from datetime import datetime, timedelta
+
+from lib.backtest import CostModel
+from lib.catalog import PartitionCatalog
+from lib.options import RunOptions
+
+
+class TestRunOptions(unittest.TestCase):
+    """Tests for the JSON form of the run options."""
+
+    def test_dict_round_trip(self):
+        """Test that every setting survives to_dict, JSON and from_dict"""
+        options = RunOptions(
+            start_date='2025-11-01', end_date='2025-11-03',
+            start_time=datetime(2025, 11, 3, 14, 30), end_time=datetime(2025, 11, 3, 16),
+            streaming=True, thresholds=[0.2, 0.4], zero_threshold=0.1,
+            sweep={'thresholds': [0.1, 0.2], 'zero_thresholds': [0.05]}, symbol_alignment=True,
+            rolling={'window': timedelta(hours=1), 'step': timedelta(minutes=15)},
+            mean_reversion=timedelta(milliseconds=250),
+            costs=CostModel(taker_fees={'binance': 0.04}, default_taker_fee=0.1, slippage=0.02),
+            lead_lag={'interval': timedelta(milliseconds=100), 'max_lag': timedelta(seconds=5)},
+            delays_ms=[0.0, 50.0], max_quote_age=timedelta(seconds=2), engine='lazy'
+        )
+        self.assertEqual(RunOptions.from_dict(json.loads(json.dumps(options.to_dict()))), options)
+        self.assertEqual(RunOptions.from_dict(RunOptions().to_dict()), RunOptions())
+
+    def test_handles_are_left_out(self):
+        """Test that the data path and handles stay on the host that made them"""
+        data = RunOptions(data_path='/data', catalog=PartitionCatalog('/data')).to_dict()
+        self.assertNotIn('data_path', data)
+        self.assertNotIn('catalog', data)
+        restored = RunOptions.from_dict(data)
+        self.assertEqual(restored.data_path, '')
+        self.assertIsNone(restored.catalog)
+
+
+if __name__ == '__main__':
+    unittest.main()
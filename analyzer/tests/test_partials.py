@@ -0,0 +1,129 @@
+"""
+Unit tests for partials module.
+"""
+
+import json
+import math
+import unittest
+from datetime import timedelta
+import polars as pl
+
+from lib.analysis import analyze_joined, pair_deviation
+from lib.options import RunOptions
+from lib.partials import (
+    PairPartial, finalize_partial, merge_partials, summarize_chunk, summarize_pair_range, summary_only
+)
+from tests.test_analysis import random_walk_pair
+
+
+THRESHOLDS = [0.3, 0.5, 0.4]
+
+
+def assert_same_metrics(test, result, expected):
+    """Exact match except float sums, which may differ in the last bits."""
+    test.assertEqual(list(result), list(expected))
+    for key, value in expected.items():
+        if isinstance(value, float):
+            test.assertTrue(math.isclose(result[key], value, rel_tol=1e-9, abs_tol=1e-12), key)
+        else:
+            test.assertEqual(result[key], value, key)
+
+
+def summarize_in_chunks(joined: pl.DataFrame, size: int) -> PairPartial:
+    partial = PairPartial()
+    for offset in range(0, len(joined), size):
+        partial = partial.merge(summarize_chunk(joined.slice(offset, size), THRESHOLDS, 0.05))
+    return partial
+
+
+class TestPairPartial(unittest.TestCase):
+    """Tests for mergeable pair summaries."""
+
+    def setUp(self):
+        data1, data2 = random_walk_pair(5)
+        # Without ex2 quotes for the first rows the deviation starts with nulls
+        self.joined = pair_deviation(data1, data2.slice(50))
+        self.expected = analyze_joined(self.joined, THRESHOLDS, 0.05)
+
+    def test_chunked_matches_batch(self):
+        """Test merged summaries of any chunking reproduce analyze_joined"""
+        # Tiny chunks on a prefix only: one summary per chunk is slow
+        head = self.joined.head(1000)
+        cases = [(self.joined, self.expected, size) for size in (len(self.joined), 4096, 777)]
+        cases += [(head, analyze_joined(head, THRESHOLDS, 0.05), size) for size in (13, 1)]
+        for joined, expected, size in cases:
+            with self.subTest(size=size):
+                assert_same_metrics(self, finalize_partial(summarize_in_chunks(joined, size), THRESHOLDS), expected)
+
+    def test_pair_ranges_match_batch(self):
+        """Test time ranges joined separately, including ranges before ex2's first quote"""
+        data1, data2 = random_walk_pair(5)
+        data2 = data2.slice(50)
+        timestamps = data1['timestamp']
+        for bounds in ([None, None], [None, timestamps[20], timestamps[5000], None],
+                       [None, *timestamps.gather([100, 100, 7001, 15000]).to_list(), None]):
+            with self.subTest(chunks=len(bounds) - 1):
+                merged = merge_partials(
+                    summarize_pair_range(data1, data2, start, end, THRESHOLDS, 0.05)
+                    for start, end in zip(bounds[:-1], bounds[1:])
+                )
+                assert_same_metrics(self, finalize_partial(merged, THRESHOLDS), self.expected)
+
+    def test_cycle_across_boundary(self):
+        """Test a cycle that enters in one chunk and returns in the next"""
+        joined = pl.DataFrame({
+            'timestamp': pl.datetime_range(pl.datetime(2025, 1, 1), pl.datetime(2025, 1, 1, 0, 0, 5),
+                                           '1s', eager=True),
+            'deviation': [0.0, 0.6, 0.35, 0.2, 0.01, -0.6],
+            'bid_ex1': [1.0] * 6, 'ask_ex1': [1.0] * 6, 'bid_ex2': [1.0] * 6, 'ask_ex2': [1.0] * 6,
+        })
+        whole = summarize_chunk(joined, THRESHOLDS, 0.05)
+        split = summarize_chunk(joined.head(3), THRESHOLDS, 0.05).merge(
+            summarize_chunk(joined.tail(3), THRESHOLDS, 0.05)
+        )
+
+        self.assertEqual(split.cycles['deviation'], [1, 1, 1])
+        self.assertEqual(split.cycles, whole.cycles)
+        self.assertEqual(split.zero_crossings, whole.zero_crossings)
+
+    def test_chunk_ending_on_null_deviation(self):
+        """Test the last non-null deviation survives a trailing chunk without quotes"""
+        joined = pl.DataFrame({
+            'timestamp': pl.datetime_range(pl.datetime(2025, 1, 1), pl.datetime(2025, 1, 1, 0, 0, 5),
+                                           '1s', eager=True),
+            'deviation': [0.0, 0.6, 0.01, 0.45, None, None],
+            'bid_ex1': [1.0] * 6, 'ask_ex1': [1.0] * 6, 'bid_ex2': [1.0] * 6, 'ask_ex2': [1.0] * 6,
+        })
+        expected = analyze_joined(joined, THRESHOLDS, 0.05)
+        for size in (5, 4, 3):
+            with self.subTest(size=size):
+                partial = summarize_in_chunks(joined, size)
+                self.assertEqual(partial.last_deviation, 0.45)
+                assert_same_metrics(self, finalize_partial(partial, THRESHOLDS), expected)
+
+    def test_dict_round_trip(self):
+        """Test summaries survive JSON serialization"""
+        partial = summarize_in_chunks(self.joined, 4096)
+        restored = PairPartial.from_dict(json.loads(json.dumps(partial.to_dict())))
+
+        assert_same_metrics(self, finalize_partial(restored, THRESHOLDS), self.expected)
+
+    def test_empty(self):
+        """Test empty and all-null chunks finalize to None like analyze_joined"""
+        self.assertIsNone(finalize_partial(PairPartial(), THRESHOLDS))
+        all_null = summarize_chunk(self.joined.head(50), THRESHOLDS, 0.05)
+        self.assertIsNone(finalize_partial(all_null, THRESHOLDS))
+        self.assertIsNone(analyze_joined(self.joined.head(50), THRESHOLDS, 0.05))
+
+    def test_summary_only(self):
+        """Test which run options summaries can cover"""
+        self.assertTrue(summary_only(RunOptions(thresholds=THRESHOLDS, streaming=True, engine='lazy')))
+        for blocking in ({'sweep': {'thresholds': [0.3], 'zero_thresholds': [0.05]}}, {'symbol_alignment': True},
+                         {'mean_reversion': timedelta(seconds=1)}, {'delays_ms': [5.0]},
+                         {'max_quote_age': timedelta(seconds=5)}):
+            with self.subTest(option=next(iter(blocking))):
+                self.assertFalse(summary_only(RunOptions(**blocking)))
+
+
+if __name__ == '__main__':
+    unittest.main()
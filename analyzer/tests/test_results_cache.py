@@ -0,0 +1,99 @@
+"""
+Unit tests for results_cache module.
+"""
+
+import unittest
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from lib import streaming
+from lib.results_cache import ResultsCache
+from lib.streaming import analyze_symbol_streaming
+from tests.test_partials import THRESHOLDS
+from tests.test_streaming import write_flush, write_symbol_hours
+
+
+class TestResultsCache(unittest.TestCase):
+    """Tests for incremental analysis from cached hour partials."""
+
+    def setUp(self):
+        """Create the symbol's hour partitions"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        self.exchanges = write_symbol_hours(self.data_path)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def analyze(self, cache=None, **kwargs):
+        """Run the streaming analysis, counting the hour chunks it reads."""
+        with mock.patch.object(streaming, 'load_spreads_hour', wraps=streaming.load_spreads_hour) as load:
+            result = analyze_symbol_streaming(str(self.data_path), "BTC/USDT", self.exchanges,
+                                              THRESHOLDS, 0.05, results_cache=cache, **kwargs)
+        return result, load.call_count
+
+    def test_warm_run_reads_nothing(self):
+        """Test that a second run assembles identical metrics without reading data"""
+        cache = ResultsCache(str(self.data_path), THRESHOLDS, 0.05)
+        expected, _ = self.analyze()
+
+        cold, cold_reads = self.analyze(cache)
+        warm, warm_reads = self.analyze(cache)
+
+        self.assertEqual(cold, expected)
+        self.assertEqual(warm, expected)
+        self.assertEqual(cold_reads, 8)
+        self.assertEqual(warm_reads, 0)
+
+    def test_changed_hour_is_recomputed(self):
+        """Test that a new flush file only invalidates its hour (and later carried quotes)"""
+        cache = ResultsCache(str(self.data_path), THRESHOLDS, 0.05)
+        self.analyze(cache)
+
+        date_dir = self.data_path / "exchange=Bybit" / "symbol=BTC_USDT" / "date=2025-01-01"
+        write_flush(date_dir / "hour=02" / "spreads-59-59.0000000.parquet",
+                    [datetime(2025, 1, 1, 2, 59, 59, 500000)], [99.0])
+
+        result, reads = self.analyze(cache)
+        self.assertEqual(result, self.analyze()[0])
+        # Hour 02 of all three exchanges, nothing else
+        self.assertEqual(reads, 3)
+
+    def test_window_hours_not_cached(self):
+        """Test that hours cut by a time window are computed but not stored"""
+        cache = ResultsCache(str(self.data_path), THRESHOLDS, 0.05)
+        window = {'start_time': datetime(2025, 1, 1, 0, 30), 'end_time': datetime(2025, 1, 1, 2, 0)}
+        self.analyze(cache, **window)
+
+        result, reads = self.analyze(cache, **window)
+        self.assertEqual(result, self.analyze(**window)[0])
+        # Hour 00 (three exchanges) is cut by the window; hour 01 comes from the cache
+        self.assertEqual(reads, 3)
+
+    def test_config_hash(self):
+        """Test that thresholds and zero threshold select separate cache files"""
+        base = ResultsCache(str(self.data_path), THRESHOLDS, 0.05)
+        same = ResultsCache(str(self.data_path), THRESHOLDS, 0.05)
+        self.assertEqual(base.path_for("BTC/USDT"), same.path_for("BTC/USDT"))
+        self.assertNotEqual(base.config_hash, ResultsCache(str(self.data_path), [0.3, 0.5, 0.45], 0.05).config_hash)
+        self.assertNotEqual(base.config_hash, ResultsCache(str(self.data_path), THRESHOLDS, 0.03).config_hash)
+
+    def test_corrupt_file_is_a_miss(self):
+        """Test that an unreadable cache file is ignored and rewritten"""
+        cache = ResultsCache(str(self.data_path), THRESHOLDS, 0.05)
+        path = cache.path_for("BTC/USDT")
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json")
+
+        result, reads = self.analyze(cache)
+        self.assertEqual(result, self.analyze()[0])
+        self.assertEqual(reads, 8)
+        self.assertEqual(self.analyze(cache)[1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
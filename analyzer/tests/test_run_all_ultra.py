@@ -0,0 +1,60 @@
+"""
+Unit tests for the run report of run_all_ultra.
+"""
+
+import io
+import unittest
+import tempfile
+import shutil
+from contextlib import redirect_stdout
+from pathlib import Path
+import polars as pl
+
+from lib.analysis import analyze_joined, pair_deviation
+from lib.backtest import CostModel, backtest_joined
+from run_all_ultra import RunResults
+from tests.test_analysis import random_walk_pair
+
+
+class TestRunResults(unittest.TestCase):
+    """Tests for RunResults.save."""
+
+    def setUp(self):
+        """Create a temporary output directory"""
+        self.save_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.save_dir)
+
+    def test_save_ranks_by_last_threshold(self):
+        """Test that thresholds without 0.4% are ranked by the last one's columns"""
+        thresholds = [0.2, 0.3, 0.6]
+        results = RunResults(2, thresholds)
+        for seed, ex2 in [(1, 'Bybit'), (2, 'OKX')]:
+            joined = pair_deviation(*random_walk_pair(seed, n=5000))
+            stats = {
+                **analyze_joined(joined, thresholds),
+                **backtest_joined(joined, 'Binance', ex2, CostModel(), thresholds),
+            }
+            with redirect_stdout(io.StringIO()):
+                results.add({'symbol': 'BTC/USDT', 'ex1': 'Binance', 'ex2': ex2, 'status': 'SUCCESS',
+                             'stats': stats})
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            results.save(self.save_dir)
+
+        summary = pl.read_csv(next(Path(self.save_dir).glob('summary_stats_*.csv')))
+        self.assertNotIn('opportunity_cycles_040bp', summary.columns)
+        report = output.getvalue()
+        self.assertIn('060bp/hr', report)
+        self.assertIn('060bp entry', report)
+
+        cycles = summary.sort('opportunity_cycles_060bp', descending=True)['opportunity_cycles_060bp'][0]
+        self.assertGreater(cycles, 0)
+        self.assertIn(f"{cycles:>6.0f}", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+Unit tests for scheduler module.
+"""
+
+import os
+import unittest
+import tempfile
+import shutil
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from lib.catalog import PartitionCatalog
+from lib.options import RunOptions
+from lib.scheduler import (
+    heavy_symbols, pair_chunks, plan_run, plan_workers, polars_threads, schedule_report, symbol_costs
+)
+from tests.test_catalog import write_spreads
+
+
+class TestPlanWorkers(unittest.TestCase):
+    """Tests for sizing workers and Polars threads together."""
+
+    def test_fills_cpus_once(self):
+        """Test that workers x threads never exceeds the CPUs by default"""
+        self.assertEqual(plan_workers(100, cpus=16), (16, 1))
+        self.assertEqual(plan_workers(4, cpus=16), (4, 4))
+        self.assertEqual(plan_workers(3, cpus=16), (3, 5))
+        self.assertEqual(plan_workers(0, cpus=4), (1, 4))
+
+    def test_overrides(self):
+        """Test fixed worker and thread counts"""
+        self.assertEqual(plan_workers(100, cpus=16, n_workers=2), (2, 8))
+        self.assertEqual(plan_workers(100, cpus=16, n_workers=32), (32, 1))
+        self.assertEqual(plan_workers(100, cpus=16, n_workers=4, polars_threads=2), (4, 2))
+        # A memory budget caps both, and the threads fill the CPUs of the fewer workers
+        self.assertEqual(plan_workers(100, cpus=16, max_workers=4), (4, 4))
+        self.assertEqual(plan_workers(100, cpus=16, n_workers=32, max_workers=4), (4, 4))
+        self.assertEqual(plan_workers(2, cpus=16, max_workers=4), (2, 8))
+
+    def test_polars_threads_restores_environment(self):
+        """Test that POLARS_MAX_THREADS is only set inside the block"""
+        with mock.patch.dict(os.environ, {'POLARS_MAX_THREADS': '7'}):
+            with polars_threads(3):
+                self.assertEqual(os.environ['POLARS_MAX_THREADS'], '3')
+            self.assertEqual(os.environ['POLARS_MAX_THREADS'], '7')
+
+        with mock.patch.dict(os.environ):
+            os.environ.pop('POLARS_MAX_THREADS', None)
+            with polars_threads(2):
+                self.assertEqual(os.environ['POLARS_MAX_THREADS'], '2')
+            self.assertNotIn('POLARS_MAX_THREADS', os.environ)
+
+
+class TestSymbolCosts(unittest.TestCase):
+    """Tests for per-symbol cost estimates."""
+
+    def setUp(self):
+        """BTC with 2 hours of 50 rows on two exchanges, ETH with 10 rows on two exchanges"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        for exchange in ['Binance', 'Bybit']:
+            for hour in [0, 1]:
+                write_spreads(self.data_path / f"exchange={exchange}" / "symbol=BTC_USDT" / "date=2025-01-01" /
+                              f"hour={hour:02d}" / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, hour), 50)
+            write_spreads(self.data_path / f"exchange={exchange}" / "symbol=ETH_USDT" / "date=2025-01-01" /
+                          "hour=00" / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, 0), 10)
+        self.symbols = {'BTC/USDT': {'Binance', 'Bybit'}, 'ETH/USDT': {'Binance', 'Bybit'}}
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_catalog_row_counts(self):
+        """Test per-exchange catalog row counts, pruned to the window"""
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        costs, unit = symbol_costs(str(self.data_path), self.symbols, catalog=catalog)
+        self.assertEqual(unit, 'rows')
+        self.assertEqual(costs, {'BTC/USDT': {'Binance': 100, 'Bybit': 100},
+                                 'ETH/USDT': {'Binance': 10, 'Bybit': 10}})
+
+        costs, _ = symbol_costs(str(self.data_path), self.symbols, catalog=catalog,
+                                start_time=datetime(2025, 1, 1, 1), end_time=datetime(2025, 1, 1, 2))
+        self.assertEqual(costs, {'BTC/USDT': {'Binance': 50, 'Bybit': 50},
+                                 'ETH/USDT': {'Binance': 0, 'Bybit': 0}})
+
+    def test_bytes_without_catalog(self):
+        """Test the on-disk size fallback"""
+        costs, unit = symbol_costs(str(self.data_path), self.symbols)
+        self.assertEqual(unit, 'bytes')
+
+        binance_files = self.data_path.glob("exchange=Binance/symbol=BTC_USDT/**/*.parquet")
+        binance_bytes = sum(f.stat().st_size for f in binance_files)
+        self.assertEqual(costs['BTC/USDT']['Binance'], binance_bytes)
+        self.assertGreater(sum(costs['BTC/USDT'].values()), sum(costs['ETH/USDT'].values()))
+
+
+class TestHeavySymbols(unittest.TestCase):
+    """Tests for choosing symbols to split into pair tasks."""
+
+    def test_fair_share(self):
+        """Test that only multi-pair symbols above total / workers are split"""
+        costs = {'ETH': 700, 'BTC': 200, 'SOL': 150, 'ONE': 900}
+        n_pairs = {'ETH': 6, 'BTC': 3, 'SOL': 3, 'ONE': 1}
+        self.assertEqual(heavy_symbols(costs, n_pairs, workers=4), {'ETH'})
+        self.assertEqual(heavy_symbols(costs, n_pairs, workers=16), {'ETH', 'BTC', 'SOL'})
+        self.assertEqual(heavy_symbols(costs, n_pairs, workers=1), set())
+
+
+class TestPairChunks(unittest.TestCase):
+    """Tests for cutting heavy pairs into time ranges."""
+
+    def test_ranges_below_fair_share(self):
+        """Test that every range fits a worker's share and there are at most `workers`"""
+        self.assertEqual(pair_chunks(300, 1000, workers=4), 2)
+        self.assertEqual(pair_chunks(250, 1000, workers=4), 1)
+        self.assertEqual(pair_chunks(900, 1000, workers=4), 4)
+        self.assertEqual(pair_chunks(900, 1000, workers=1), 1)
+
+
+class TestPlanRun(unittest.TestCase):
+    """Tests for planning a run's tasks."""
+
+    def setUp(self):
+        """BTC with 2 hours of 50 rows on three exchanges, ETH with 10 rows on two exchanges"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        for exchange in ['Binance', 'Bybit', 'OKX']:
+            for hour in [0, 1]:
+                write_spreads(self.data_path / f"exchange={exchange}" / "symbol=BTC_USDT" / "date=2025-01-01" /
+                              f"hour={hour:02d}" / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, hour), 50)
+        for exchange in ['Binance', 'Bybit']:
+            write_spreads(self.data_path / f"exchange={exchange}" / "symbol=ETH_USDT" / "date=2025-01-01" /
+                          "hour=00" / "spreads-00-00.0000000.parquet", datetime(2025, 1, 1, 0), 10)
+        self.symbols = {'BTC/USDT': {'Binance', 'Bybit', 'OKX'}, 'ETH/USDT': {'Binance', 'Bybit'}}
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+        self.options = RunOptions(data_path=str(self.data_path), catalog=catalog)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_split_heavy_symbol(self):
+        """Test that the heavy symbol is staged and split into pair and time-range tasks"""
+        plan = plan_run(str(self.data_path), self.symbols, self.options, n_workers=2)
+        self.assertEqual(plan.symbols, ['BTC/USDT', 'ETH/USDT'])
+        self.assertEqual(plan.total_pairs, 4)
+        self.assertEqual(plan.split, {'BTC/USDT'})
+        self.assertEqual(plan.batches, ['ETH/USDT'])
+        self.assertEqual([(symbol, exchange) for symbol, exchange, _ in plan.stage],
+                         [('BTC/USDT', 'Binance'), ('BTC/USDT', 'Bybit'), ('BTC/USDT', 'OKX')])
+        self.assertEqual(plan.pair_costs[('BTC/USDT', 'Binance', 'Bybit')], 200)
+        self.assertEqual(set(plan.chunks.values()), {2})
+        self.assertEqual((plan.workers, plan.budget), (2, None))
+
+        # Time-range summaries only cover the default metrics
+        sweep = replace(self.options, sweep={'thresholds': [0.1], 'zero_thresholds': [0.05]})
+        plan = plan_run(str(self.data_path), self.symbols, sweep, n_workers=2)
+        self.assertEqual(set(plan.chunks.values()), {1})
+
+        plan = plan_run(str(self.data_path), self.symbols, self.options, n_workers=2, split_symbols=False)
+        self.assertEqual((plan.split, plan.chunks), (set(), {}))
+
+    def test_memory_budget(self):
+        """Test that an oversized symbol streams, or is refused when it can't stream or split small enough"""
+        # Two workers' overhead plus 20000 bytes for tasks: BTC (~23 kB) only fits hour by hour
+        budget_mb = 400 + 20000 / 2**20
+        plan = plan_run(str(self.data_path), self.symbols, self.options, n_workers=2, memory_budget_mb=budget_mb)
+        self.assertEqual(plan.budget.available, 20000)
+        self.assertEqual(plan.stream, {'BTC/USDT'})
+        self.assertEqual(plan.split, set())
+        self.assertEqual(plan.batches, ['BTC/USDT', 'ETH/USDT'])
+        self.assertLess(plan.footprints['BTC/USDT'], 20000)
+
+        # A sweep can't stream: BTC's pair tasks are still over the budget
+        sweep = replace(self.options, sweep={'thresholds': [0.1], 'zero_thresholds': [0.05]})
+        with self.assertRaises(ValueError):
+            plan_run(str(self.data_path), self.symbols, sweep, n_workers=2, memory_budget_mb=budget_mb)
+
+        with self.assertRaises(ValueError):
+            plan_run(str(self.data_path), self.symbols, self.options, memory_budget_mb=100)
+
+
+class TestScheduleReport(unittest.TestCase):
+    """Tests for the utilization report."""
+
+    def test_report(self):
+        """Test utilization, longest task and wall-time bound"""
+        report = schedule_report({'A': 6.0, 'B': 1.0, 'C': 1.0}, workers=2, wall=8.0)
+        self.assertEqual(report['utilization_pct'], 50.0)
+        self.assertEqual(report['longest_task'], 'A')
+        self.assertEqual(report['bound_sec'], 6.0)
+
+        self.assertEqual(schedule_report({'A': 1.0, 'B': 1.0, 'C': 1.0}, workers=2, wall=2.0)['bound_sec'], 1.5)
+        self.assertEqual(schedule_report({}, workers=2, wall=0.0)['utilization_pct'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for series_cache module.
+"""
+
+import unittest
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+import polars as pl
+
+from lib.data_loader import load_exchange_symbol_data
+from lib.series_cache import SeriesCache, source_fingerprint
+
+
+def write_spreads(path: Path, start: datetime, prices):
+    """Write a spreads file with one row per second."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame({
+        'Timestamp': [start.replace(second=i) for i in range(len(prices))],
+        'BestBid': prices,
+        'BestAsk': [p + 0.1 for p in prices]
+    }).with_columns(
+        pl.col('BestBid').cast(pl.Decimal(28, 10)),
+        pl.col('BestAsk').cast(pl.Decimal(28, 10))
+    ).write_parquet(path)
+
+
+class TestSeriesCache(unittest.TestCase):
+    """Tests for the Arrow IPC series cache."""
+
+    def setUp(self):
+        """Create two closed days for one exchange/symbol"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        self.symbol_dir = self.data_path / "exchange=TestExchange" / "symbol=BTC_USDT"
+
+        write_spreads(self.symbol_dir / "date=2025-01-01" / "hour=00" / "spreads-00-00.0000000.parquet",
+                      datetime(2025, 1, 1, 0, 0), [101.0, 100.0, 102.0])
+        write_spreads(self.symbol_dir / "date=2025-01-02" / "hour=05" / "spreads-00-00.0000000.parquet",
+                      datetime(2025, 1, 2, 5, 0), [103.0, 104.0])
+
+        self.cache = SeriesCache(str(self.data_path))
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def load(self, cache=None, **kwargs):
+        return load_exchange_symbol_data(str(self.data_path), "TestExchange", "BTC/USDT", cache=cache, **kwargs)
+
+    def test_cached_load_matches_parquet(self):
+        """Test that cold and warm cache reads return the uncached frame"""
+        expected = self.load()
+
+        cold = self.load(self.cache)
+        self.assertTrue(cold.equals(expected))
+        self.assertTrue(self.cache.path_for("TestExchange", "BTC_USDT", "2025-01-01").exists())
+        self.assertTrue(self.cache.path_for("TestExchange", "BTC_USDT", "2025-01-02").exists())
+
+        warm = self.load(self.cache)
+        self.assertTrue(warm.equals(expected))
+        self.assertTrue(warm['timestamp'].is_sorted())
+        self.assertEqual(warm['bestBid'].dtype, pl.Float64)
+
+    def test_date_filter_uses_cache(self):
+        """Test that date filtering only touches the selected day"""
+        df = self.load(self.cache, start_date="2025-01-02")
+
+        self.assertEqual(len(df), 2)
+        self.assertFalse(self.cache.path_for("TestExchange", "BTC_USDT", "2025-01-01").exists())
+
+    def test_source_change_invalidates(self):
+        """Test that a new flush file in a cached day is picked up"""
+        self.load(self.cache)
+        write_spreads(self.symbol_dir / "date=2025-01-01" / "hour=01" / "spreads-00-00.0000000.parquet",
+                      datetime(2025, 1, 1, 1, 0), [99.0])
+
+        df = self.load(self.cache)
+        self.assertEqual(len(df), 6)
+        self.assertTrue(df.equals(self.load()))
+
+    def test_file_moved_between_hours_invalidates(self):
+        """Test that the same file name under another hour changes the fingerprint"""
+        entries = pl.DataFrame({
+            'path': [str(self.symbol_dir / "date=2025-01-01" / "hour=00" / "spreads-compacted.parquet")],
+            'size': [100],
+            'mtime_ns': [1]
+        })
+        moved = entries.with_columns(
+            pl.col('path').str.replace('hour=00', 'hour=01', literal=True)
+        )
+
+        self.assertNotEqual(source_fingerprint(entries), source_fingerprint(moved))
+
+    def test_stale_fingerprint_is_a_miss(self):
+        """Test reading with a different fingerprint returns None"""
+        path = self.cache.path_for("TestExchange", "BTC_USDT", "2025-01-01")
+        self.cache.write(path, self.load(), "abc")
+
+        self.assertIsNotNone(self.cache.read(path, "abc"))
+        self.assertIsNone(self.cache.read(path, "def"))
+
+    def test_failed_write_keeps_data(self):
+        """Test that a cache write failure (disk full, file in use) doesn't drop the loaded exchange"""
+        expected = self.load()
+        with mock.patch('lib.series_cache.os.replace', side_effect=PermissionError("in use")), \
+                mock.patch('builtins.print'):
+            df = self.load(self.cache)
+
+        self.assertTrue(df.equals(expected))
+        self.assertEqual(list(Path(self.cache.cache_dir).rglob('*.tmp')), [])
+        self.assertFalse(self.cache.path_for("TestExchange", "BTC_USDT", "2025-01-01").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Unit tests for shared_frames module.
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+from lib.shared_frames import frame_path, open_shared_frame, row_quantiles, share_frame
+from tests.test_analysis import random_walk_pair
+
+
+class TestSharedFrames(unittest.TestCase):
+    """Tests for memory-mapped frames shared between workers."""
+
+    def setUp(self):
+        """Create a temporary shared directory"""
+        self.shared_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.shared_dir)
+
+    def test_round_trip(self):
+        """Test that a shared frame reads back equal and sorted"""
+        data, _ = random_walk_pair(0, n=1000)
+        path = frame_path(self.shared_dir, 'BTC/USDT', 'Binance')
+        share_frame(data, path)
+
+        self.assertEqual(path, Path(self.shared_dir) / 'BTC_USDT' / 'Binance.arrow')
+        self.assertEqual(list(path.parent.iterdir()), [path])
+        shared = open_shared_frame(str(path))
+        self.assertTrue(shared.equals(data))
+        self.assertTrue(shared['timestamp'].flags['SORTED_ASC'])
+
+    def test_row_quantiles(self):
+        """Test equally spaced row timestamps including the first and last row"""
+        data, _ = random_walk_pair(0, n=1001)
+        quantiles = row_quantiles(data, points=4)
+        self.assertEqual(quantiles, data['timestamp'].gather([0, 250, 500, 750, 1000]).to_list())
+
+    def test_missing_exchange(self):
+        """Test that an exchange without data has no frame"""
+        self.assertIsNone(open_shared_frame(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
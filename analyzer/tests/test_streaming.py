@@ -0,0 +1,104 @@
+"""
+Unit tests for streaming module.
+"""
+
+import unittest
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import polars as pl
+
+from lib.analysis import analyze_joined, pair_deviation
+from lib.catalog import PartitionCatalog
+from lib.compaction import compact_partitions
+from lib.data_loader import iter_exchange_symbol_hours, load_exchange_symbol_data
+from lib.streaming import analyze_symbol_streaming
+from tests.test_partials import THRESHOLDS, assert_same_metrics
+
+
+def write_flush(path: Path, timestamps, bids):
+    """Write a collector-like flush file with Decimal prices."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame({
+        'Timestamp': timestamps,
+        'BestBid': bids,
+        'BestAsk': [b + 0.01 for b in bids]
+    }).with_columns(
+        pl.col('BestBid').cast(pl.Decimal(28, 10)),
+        pl.col('BestAsk').cast(pl.Decimal(28, 10))
+    ).write_parquet(path)
+
+
+def write_symbol_hours(data_path: Path):
+    """Three exchanges over three hours of BTC/USDT; Bybit skips the middle hour."""
+    rng = np.random.default_rng(3)
+    for exchange, hours in (('Binance', [0, 1, 2]), ('Bybit', [0, 2]), ('GateIo', [0, 1, 2])):
+        date_dir = data_path / f"exchange={exchange}" / "symbol=BTC_USDT" / "date=2025-01-01"
+        for hour in hours:
+            start = datetime(2025, 1, 1, hour)
+            seconds = np.sort(rng.choice(3600, size=600, replace=False))
+            timestamps = [start + timedelta(seconds=int(s)) for s in seconds]
+            bids = list(np.round(100 + np.cumsum(rng.normal(0, 0.05, len(seconds))), 4))
+            # Two flush files written out of order, as the loader has to handle
+            write_flush(date_dir / f"hour={hour:02d}" / "spreads-30-00.0000000.parquet",
+                        timestamps[300:], bids[300:])
+            write_flush(date_dir / f"hour={hour:02d}" / "spreads-00-00.0000000.parquet",
+                        timestamps[:300], bids[:300])
+    return ['Binance', 'Bybit', 'GateIo']
+
+
+class TestStreaming(unittest.TestCase):
+    """Tests for hour-by-hour analysis against the batch path."""
+
+    def setUp(self):
+        """Create the symbol's hour partitions"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        self.exchanges = write_symbol_hours(self.data_path)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def assert_matches_batch(self, **kwargs):
+        result = analyze_symbol_streaming(str(self.data_path), "BTC/USDT", self.exchanges, THRESHOLDS, 0.05, **kwargs)
+        kwargs.pop('catalog', None)
+        data = {
+            exchange: load_exchange_symbol_data(str(self.data_path), exchange, "BTC/USDT", **kwargs)
+            for exchange in self.exchanges
+        }
+
+        self.assertEqual(sorted(result), [('Binance', 'Bybit'), ('Binance', 'GateIo'), ('Bybit', 'GateIo')])
+        for (ex1, ex2), stats in result.items():
+            with self.subTest(pair=(ex1, ex2)):
+                expected = analyze_joined(pair_deviation(data[ex1], data[ex2]), THRESHOLDS, 0.05)
+                assert_same_metrics(self, stats, expected)
+
+    def test_matches_batch(self):
+        """Test streaming metrics equal the batch metrics, including a missing hour"""
+        self.assert_matches_batch()
+
+    def test_matches_batch_in_window(self):
+        """Test a window cutting into hours"""
+        self.assert_matches_batch(start_time=datetime(2025, 1, 1, 0, 40), end_time=datetime(2025, 1, 1, 2, 15))
+
+    def test_matches_batch_compacted_day(self):
+        """Test day-level compacted files are streamed hour by hour"""
+        compact_partitions(str(self.data_path), granularity='day', now=datetime(2025, 1, 3))
+        catalog = PartitionCatalog(str(self.data_path))
+        catalog.refresh()
+
+        hours = [h for h, _ in iter_exchange_symbol_hours(str(self.data_path), "Bybit", "BTC/USDT", catalog=catalog)]
+        self.assertEqual(hours, [datetime(2025, 1, 1, 0), datetime(2025, 1, 1, 2)])
+        self.assert_matches_batch(catalog=catalog)
+
+    def test_exchange_without_data(self):
+        """Test pairs with an exchange that has no data are left out"""
+        result = analyze_symbol_streaming(str(self.data_path), "BTC/USDT", ['Binance', 'OKX'])
+        self.assertEqual(result, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Unit tests for time_window module.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+
+from lib.time_window import parse_duration, parse_time, window_dates
+
+
+class TestTimeWindow(unittest.TestCase):
+    """Tests for time window parsing and date narrowing."""
+
+    def test_parse_time(self):
+        """Test accepted timestamp formats"""
+        self.assertEqual(parse_time("2025-11-03 14:00"), datetime(2025, 11, 3, 14, 0))
+        self.assertEqual(parse_time("2025-11-03T14:00:30"), datetime(2025, 11, 3, 14, 0, 30))
+        self.assertEqual(parse_time("2025-11-03"), datetime(2025, 11, 3))
+        self.assertEqual(parse_time("2025-11-03T16:00+02:00"), datetime(2025, 11, 3, 14, 0))
+
+        with self.assertRaises(ValueError):
+            parse_time("14:00")
+
+    def test_parse_duration(self):
+        """Test duration suffixes and invalid values"""
+        self.assertEqual(parse_duration("90m"), timedelta(minutes=90))
+        self.assertEqual(parse_duration("3h"), timedelta(hours=3))
+        self.assertEqual(parse_duration("1.5d"), timedelta(hours=36))
+        self.assertEqual(parse_duration("50ms"), timedelta(milliseconds=50))
+
+        for invalid in ("90", "0m", "-5m", "1w", ""):
+            with self.assertRaises(ValueError):
+                parse_duration(invalid)
+
+    def test_window_dates(self):
+        """Test narrowing a date range to the days a window touches"""
+        self.assertEqual(
+            window_dates(None, None, datetime(2025, 1, 1, 22), datetime(2025, 1, 3)),
+            ("2025-01-01", "2025-01-02")
+        )
+        self.assertEqual(
+            window_dates("2025-01-02", "2025-01-05", datetime(2025, 1, 1, 22), None),
+            ("2025-01-02", "2025-01-05")
+        )
+        self.assertEqual(window_dates("2025-01-02", None, None, None), ("2025-01-02", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
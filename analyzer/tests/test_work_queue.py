@@ -0,0 +1,178 @@
+"""
+Unit tests for work_queue module.
+"""
+
+import os
+import time
+import unittest
+import tempfile
+import shutil
+from multiprocessing import get_context
+from pathlib import Path
+from unittest import mock
+import polars as pl
+
+from lib.work_queue import WorkQueue, run_worker
+
+
+def double(task, spec):
+    """Task function of the worker processes"""
+    return task['n'] * spec['factor'], {}
+
+
+def crash_once(task, spec):
+    """Kill the worker on the first task it gets, like a host going down mid-task"""
+    marker = Path(spec['marker'])
+    if not marker.exists():
+        marker.write_text(str(os.getpid()))
+        os._exit(1)
+    return double(task, spec)
+
+
+def work(queue_dir, process, worker):
+    run_worker(WorkQueue(queue_dir), process, worker=worker, poll_interval=0.05)
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Tests for leasing, expiry and results of the file-based work queue."""
+
+    def setUp(self):
+        """Queue with three tasks"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.queue = WorkQueue(self.temp_dir)
+        self.queue.create([{'id': f"t{n}", 'n': n} for n in range(3)], {'factor': 2}, lease_timeout=10)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_claims_are_exclusive(self):
+        """Test that every task is leased to one worker, in dispatch order"""
+        self.assertEqual(self.queue.claim('a')['id'], 't0')
+        self.assertEqual(self.queue.claim('b')['id'], 't1')
+        self.assertEqual(self.queue.claim('c')['id'], 't2')
+        self.assertIsNone(self.queue.claim('d'))
+        self.assertEqual(self.queue.pending(), ['t0', 't1', 't2'])
+
+        self.queue.release('t1')
+        self.assertEqual(self.queue.claim('d')['id'], 't1')
+
+    def test_expired_lease_is_taken_over(self):
+        """Test that a lease without a recent heartbeat is broken and leased again"""
+        self.queue.claim('dead')
+        lease = Path(self.temp_dir) / 'leases' / 't0.lease'
+        self.queue.heartbeat('t0')
+        self.assertEqual(self.queue.claim('b')['id'], 't1')
+
+        stale = time.time() - 60
+        os.utime(lease, (stale, stale))
+        self.assertEqual(self.queue.reclaim_expired(), ['t0'])
+        self.assertEqual(self.queue.claim('c')['id'], 't0')
+        self.assertEqual(lease.read_text(), 'c')
+
+    def test_racing_reclaimers(self):
+        """Test that a lease broken and taken fresh by one reclaimer survives a second, slower one"""
+        self.queue.claim('dead')
+        lease = Path(self.temp_dir) / 'leases' / 't0.lease'
+        stale = time.time() - 60
+        os.utime(lease, (stale, stale))
+
+        rename = os.rename
+        raced = []
+
+        def slow_rename(src, dst):
+            # 'b' saw the stale lease; 'c' breaks it and leases t0 before b's rename
+            if not raced:
+                raced.append(dst)
+                self.assertEqual(self.queue.claim('c')['id'], 't0')
+            rename(src, dst)
+
+        with mock.patch('lib.work_queue.os.rename', side_effect=slow_rename):
+            task = self.queue.claim('b')
+
+        self.assertEqual(task['id'], 't1')
+        self.assertEqual(lease.read_text(), 'c')
+        self.assertLess(time.time() - lease.stat().st_mtime, 10)
+        self.assertEqual(sorted(path.name for path in lease.parent.iterdir()), ['t0.lease', 't1.lease'])
+
+    def test_release_keeps_lease_of_other_worker(self):
+        """Test that a slow worker whose lease was taken over doesn't remove the new lease"""
+        self.queue.claim('slow')
+        lease = Path(self.temp_dir) / 'leases' / 't0.lease'
+        stale = time.time() - 60
+        os.utime(lease, (stale, stale))
+        self.assertEqual(self.queue.claim('c')['id'], 't0')
+
+        self.queue.heartbeat('t0', 'slow')
+        self.queue.complete('t0', {'result': 0}, worker='slow')
+        self.assertEqual(lease.read_text(), 'c')
+        self.queue.release('t0', 'c')
+        self.assertFalse(lease.exists())
+
+    def test_results_in_dispatch_order(self):
+        """Test completing tasks, reading results and starting a new run"""
+        self.queue.claim('a')
+        self.queue.claim('a')
+        self.queue.complete('t1', {'result': 2}, {'rows': pl.DataFrame({'n': [1, 2]})})
+        self.queue.complete('t0', {'result': 0})
+
+        results = list(self.queue.results())
+        self.assertEqual([(task['id'], record['result']) for task, record, _ in results],
+                         [('t0', 0), ('t1', 2)])
+        self.assertEqual(results[0][2], {})
+        self.assertEqual(results[1][2]['rows']['n'].to_list(), [1, 2])
+        # Records alone name their frames without reading them
+        self.assertEqual([record['frames'] for _, record in self.queue.records()], [[], ['rows']])
+        self.assertEqual(sorted(path.suffix for path in (Path(self.temp_dir) / 'results').iterdir()),
+                         ['.json', '.json', '.parquet'])
+        self.assertEqual(self.queue.pending(), ['t2'])
+        self.assertEqual(list((Path(self.temp_dir) / 'leases').iterdir()), [])
+        # A completed task is not leased again
+        self.assertEqual(self.queue.claim('b')['id'], 't2')
+
+        self.queue.create([{'id': 'x'}], None)
+        self.assertEqual(list(self.queue.results()), [])
+        self.assertEqual(self.queue.pending(), ['x'])
+
+    def test_run_worker_stores_errors(self):
+        """Test that a failing task is stored as its error and the worker goes on"""
+        def process(task, spec):
+            if task['n'] == 1:
+                raise ValueError("bad data")
+            return task['n'] * spec['factor'], {}
+
+        self.assertEqual(run_worker(self.queue, process, worker='w', poll_interval=0.01), 3)
+        records = {task['id']: record for task, record, _ in self.queue.results()}
+        self.assertEqual(records['t2']['result'], 4)
+        self.assertEqual(records['t1']['error'], "ValueError: bad data")
+        self.assertIsNone(records['t1']['result'])
+        self.assertEqual(records['t0']['worker'], 'w')
+
+    def test_dead_worker_across_processes(self):
+        """Test that processes share the tasks and a killed worker's task is leased again"""
+        ctx = get_context('spawn')
+        queue = WorkQueue(self.temp_dir)
+        queue.create([{'id': f"t{n}", 'n': n} for n in range(6)],
+                     {'factor': 3, 'marker': str(Path(self.temp_dir) / 'crashed')}, lease_timeout=1.0)
+
+        dead = ctx.Process(target=work, args=(self.temp_dir, crash_once, 'dead'))
+        dead.start()
+        dead.join(60)
+        self.assertNotEqual(dead.exitcode, 0)
+        self.assertEqual(queue.pending(), [f"t{n}" for n in range(6)])
+
+        workers = [ctx.Process(target=work, args=(self.temp_dir, double, f"w{k}")) for k in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+        records = list(queue.results())
+        self.assertEqual([record['result'] for _, record, _ in records], [n * 3 for n in range(6)])
+        self.assertIn(records[0][1]['worker'], {'w0', 'w1'})
+        self.assertEqual(queue.pending(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()